@@ -4,7 +4,6 @@ import threading, time, re, json
 from pathlib import Path
 from typing import List, Dict, Optional
 import pandas as pd
-from ITS_CLI import config, tcp_client
 from pathlib import Path
 import csv
 import json
@@ -16,6 +15,24 @@ SECRET_DEFAULT = Path("secret.ini")                # USER / PW=...
 _RE_KV = re.compile(r"^\s*([A-Za-z_]+)\s*=\s*(.+?)\s*$")
 
 
+def get_project_list(session: Optional["its_session.ITSSession"] = None) -> pd.DataFrame:
+    """
+    ITS 프로젝트 목록을 DataFrame 으로 반환.
+    session 을 주지 않으면 공용 세션 풀(its_session)의 인증된 연결을 재사용한다.
+    """
+    # ITS_CLI.tcp_client 가 최상위 'api' 모듈을 import 하므로 모듈 수준에서 its_session 을
+    # import 하면 순환 import 가 됨 → 호출 시점에 import
+    import its_session
+
+    if session is None:
+        with its_session.its_session() as session:
+            return get_project_list(session)
+    res = session.message(CMD_GET_PROJECTS)
+    if not res or res.get("result") != "Success":
+        raise RuntimeError(f"프로젝트 목록 조회 실패: {(res or {}).get('msg')}")
+    return pd.DataFrame(res.get("data", []))
+
+
 def make_inp(sensor_id: str,
              sensor_csv: Path = Path("data/sensor.csv"),
              concrete_csv: Path = Path("data/concrete.csv")
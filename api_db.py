@@ -1,5 +1,5 @@
 # app.py
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 import pandas as pd
 from datetime import datetime, timedelta
 import json
@@ -8,6 +8,11 @@ import configparser
 import bcrypt
 import logging
 import os
+import threading
+import time
+from metadata_cache import cached, invalidate
+import its_mirror
+import sensor_store
 
 # --------------------------------------------------
 # 로그 설정
@@ -60,6 +65,53 @@ DB_URL = (
 )
 engine = create_engine(DB_URL, pool_pre_ping=True)
 
+# --------------------------------------------------
+# 엔진 레지스트리 설정 (ITS 번호별 엔진 1개를 만들어 재사용)
+# --------------------------------------------------
+ITS_POOL_SIZE = 5          # 유지하는 연결 수
+ITS_MAX_OVERFLOW = 10      # 몰릴 때 추가로 여는 연결 수
+ITS_POOL_RECYCLE = 1800    # 서버 wait_timeout 전에 연결 교체 (초)
+ITS_POOL_TIMEOUT = 10      # 빈 연결을 기다리는 최대 시간 (초)
+SLOW_QUERY_SEC = 1.0       # 이 시간 이상 걸린 쿼리는 로그에 기록
+
+_engines = {}              # {"ITS1": Engine, ...}
+_engine_stats = {}         # {"ITS1": {"queries", "total_time", "max_time", "slow"}, "local": ...}
+_engines_lock = threading.Lock()
+_db_logger = setup_logger('db_logger', 'db.log')
+
+
+def _attach_query_timing(eng, key: str):
+    """엔진에 쿼리 실행 시간 집계 이벤트 연결"""
+    stats = _engine_stats.setdefault(key, {"queries": 0, "total_time": 0.0, "max_time": 0.0, "slow": 0})
+
+    @event.listens_for(eng, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(eng, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        with _engines_lock:
+            stats["queries"] += 1
+            stats["total_time"] += elapsed
+            stats["max_time"] = max(stats["max_time"], elapsed)
+            if elapsed >= SLOW_QUERY_SEC:
+                stats["slow"] += 1
+        if elapsed >= SLOW_QUERY_SEC:
+            _db_logger.warning(f"SLOW_QUERY | {key} | {elapsed:.2f}s | {' '.join(statement.split())[:200]}")
+
+
+_attach_query_timing(engine, "local")
+
+# 메타데이터 조회 캐시 유효 시간 (초). 로컬 테이블은 add/update/delete 시 즉시 무효화
+CONCRETE_CACHE_TTL = 60
+SENSOR_CACHE_TTL = 60
+ITS_CACHE_TTL = 300
+AUTH_CACHE_TTL = 60         # 로그인 시 권한 목록 (권한 변경이 빨리 반영되도록 짧게)
+
+# 프로젝트 조회 날짜 컬럼 (미러(SQLite)는 문자열로 저장되므로 datetime 으로 맞춤)
+PROJECT_DATE_COLS = {"regdate": {"errors": "coerce"}, "closedate": {"errors": "coerce"}}
+
 # --------------------------------------------------
 # ITS1/ITS2 접속 설정 로딩 (user/secret.ini)
 # --------------------------------------------------
@@ -81,16 +133,94 @@ if _SECRET_INI.exists():
 
 
 def _get_its_engine(its_num: int):
-    """ITS 번호(1/2)에 해당하는 SQLAlchemy Engine 반환."""
+    """ITS 번호(1/2)에 해당하는 SQLAlchemy Engine 반환.
+
+    처음 호출할 때 연결 풀을 가진 엔진을 만들고 이후에는 같은 엔진을 재사용한다.
+    (호출 측에서 dispose() 하지 않음)
+    """
     key = f"ITS{its_num}"
+    eng = _engines.get(key)
+    if eng is not None:
+        return eng
     cfg = _its_configs.get(key)
     if not cfg:
         raise ValueError(f"secret.ini 에 {key}_DB 설정이 없습니다.")
-    uri = (
-        f"mysql+pymysql://{cfg['user']}:{cfg['pwd']}@{cfg['host']}:{cfg['port']}/{cfg['db']}"
-        "?charset=utf8mb4"
-    )
-    return create_engine(uri, pool_pre_ping=True)
+    with _engines_lock:
+        eng = _engines.get(key)
+        if eng is None:
+            uri = (
+                f"mysql+pymysql://{cfg['user']}:{cfg['pwd']}@{cfg['host']}:{cfg['port']}/{cfg['db']}"
+                "?charset=utf8mb4"
+            )
+            eng = create_engine(
+                uri,
+                pool_pre_ping=True,
+                pool_size=ITS_POOL_SIZE,
+                max_overflow=ITS_MAX_OVERFLOW,
+                pool_recycle=ITS_POOL_RECYCLE,
+                pool_timeout=ITS_POOL_TIMEOUT,
+            )
+            _engine_stats.pop(key, None)
+            _attach_query_timing(eng, key)
+            _engines[key] = eng
+            _db_logger.info(f"ENGINE_CREATE | {key} | pool_size={ITS_POOL_SIZE}, "
+                            f"max_overflow={ITS_MAX_OVERFLOW}, pool_recycle={ITS_POOL_RECYCLE}")
+    return eng
+
+
+def _its_read_engine(its_num: int):
+    """ITS 메타데이터 조회용 엔진 반환.
+
+    its_mirror 로컬 미러가 MIRROR_MAX_AGE 이내로 동기화되어 있으면 미러(SQLite)를,
+    아니면 ITS 서버 엔진을 반환한다. (비밀번호/센서 측정값 조회는 항상 ITS 서버)
+    """
+    try:
+        eng = its_mirror.mirror_engine(its_num)
+    except Exception as exc:
+        _db_logger.warning(f"MIRROR_FALLBACK | ITS{its_num} | {exc}")
+        eng = None
+    return eng if eng is not None else _get_its_engine(its_num)
+
+
+def configure_its_pool(pool_size: int = None, max_overflow: int = None,
+                       pool_recycle: int = None, pool_timeout: int = None) -> None:
+    """ITS 엔진 연결 풀 설정 변경. 이미 만든 엔진은 닫고 다음 호출 때 새 설정으로 생성"""
+    global ITS_POOL_SIZE, ITS_MAX_OVERFLOW, ITS_POOL_RECYCLE, ITS_POOL_TIMEOUT
+    with _engines_lock:
+        if pool_size is not None:
+            ITS_POOL_SIZE = pool_size
+        if max_overflow is not None:
+            ITS_MAX_OVERFLOW = max_overflow
+        if pool_recycle is not None:
+            ITS_POOL_RECYCLE = pool_recycle
+        if pool_timeout is not None:
+            ITS_POOL_TIMEOUT = pool_timeout
+        engines = list(_engines.values())
+        _engines.clear()
+    for eng in engines:
+        eng.dispose()
+
+
+def get_engine_stats() -> dict:
+    """엔진별 연결 풀 상태와 쿼리 시간 통계.
+
+    Returns
+    -------
+    dict: {"local" | "ITS1" | ...: {queries, total_time, avg_time, max_time, slow,
+                                    pool_size, checked_out, overflow}}
+    """
+    result = {}
+    engines = dict(_engines, local=engine)
+    with _engines_lock:
+        for key, eng in engines.items():
+            stats = dict(_engine_stats.get(key, {}))
+            queries = stats.get("queries", 0)
+            stats["avg_time"] = stats.get("total_time", 0.0) / queries if queries else 0.0
+            pool = eng.pool
+            for name, attr in (("pool_size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+                stats[name] = getattr(pool, attr)() if hasattr(pool, attr) else None
+            result[key] = stats
+    return result
 
 
 # --------------------------------------------------
@@ -98,6 +228,32 @@ def _get_its_engine(its_num: int):
 # --------------------------------------------------
 
 
+def get_user_credentials(user_id: str, its_num: int = 1):
+    """ITS 서버 tb_user 에서 (userid, userpw, grade) 조회. 사용자가 없으면 None.
+
+    비밀번호 해시는 미러/캐시를 거치지 않고 항상 ITS 서버에서 읽는다.
+    (연결/쿼리 오류는 호출 측으로 그대로 전달)
+    """
+    eng = _get_its_engine(its_num)
+    query = text("SELECT userid, userpw, grade FROM tb_user WHERE userid = :uid LIMIT 1")
+    df_user = pd.read_sql(query, eng, params={"uid": user_id})
+    if df_user.empty:
+        return None
+    row = df_user.iloc[0]
+    return {"userid": row["userid"], "userpw": row["userpw"], "grade": row["grade"]}
+
+
+@cached("its", "auth", ttl=AUTH_CACHE_TTL)
+def get_user_auth_list(user_id: str, its_num: int = 1) -> list[str]:
+    """tb_sensor_auth_mapping 의 허용 projectid / stid 리스트 (짧은 TTL 캐시)"""
+    df_auth = pd.read_sql(
+        text("SELECT id FROM tb_sensor_auth_mapping WHERE userid = :uid"),
+        _get_its_engine(its_num),
+        params={"uid": user_id},
+    )
+    return df_auth["id"].tolist()
+
+
 def authenticate_user(user_id: str, password: str, its_num: int = 1):
     """주어진 ITS DB 에서 사용자 인증 후 (grade, 허용 프로젝트/구조) 반환.
 
@@ -110,42 +266,34 @@ def authenticate_user(user_id: str, password: str, its_num: int = 1):
         msg:   str  (Fail 시 이유)
     """
     try:
-        eng = _get_its_engine(its_num)
+        _get_its_engine(its_num)
     except Exception as exc:
         return {"result": "Fail", "msg": f"DB 연결 실패: {exc}", "grade": None, "auth": []}
 
     try:
-        query = text("SELECT userid, userpw, grade FROM tb_user WHERE userid = :uid LIMIT 1")
-        df_user = pd.read_sql(query, eng, params={"uid": user_id})
-        if df_user.empty:
+        user = get_user_credentials(user_id, its_num)
+        if user is None:
             return {"result": "Fail", "msg": "존재하지 않는 아이디", "grade": None, "auth": []}
 
-        stored_hash = df_user.iloc[0]["userpw"].encode("utf-8")
+        stored_hash = user["userpw"].encode("utf-8")
         if not bcrypt.checkpw(password.encode("utf-8"), stored_hash):
             return {"result": "Fail", "msg": "비밀번호 불일치", "grade": None, "auth": []}
 
-        grade = df_user.iloc[0]["grade"]
+        grade = user["grade"]
 
         # grade 가 AD 면 전체 권한
-        if grade == "AD":
-            auth_list: list[str] = []
-        else:
-            df_auth = pd.read_sql(
-                text("SELECT id FROM tb_sensor_auth_mapping WHERE userid = :uid"),
-                eng,
-                params={"uid": user_id},
-            )
-            auth_list = df_auth["id"].tolist()
+        auth_list = [] if grade == "AD" else get_user_auth_list(user_id, its_num)
 
         return {"result": "Success", "msg": "", "grade": grade, "auth": auth_list}
     except Exception as exc:
         return {"result": "Fail", "msg": str(exc), "grade": None, "auth": []}
 
 
+@cached("its", ttl=ITS_CACHE_TTL)
 def get_project_structure_list(its_num: int, allow_list: list[str] | None, grade: str):
     """tb_project, tb_structure 조인해 접근 가능한 프로젝트/구조 목록 반환."""
     try:
-        eng = _get_its_engine(its_num)
+        eng = _its_read_engine(its_num)
     except Exception as exc:
         raise RuntimeError(f"DB 연결 실패: {exc}") from exc
 
@@ -166,7 +314,7 @@ def get_project_structure_list(its_num: int, allow_list: list[str] | None, grade
         ORDER BY tp.projectid, s.stid
     """
 
-    df = pd.read_sql(text(sql), _get_its_engine(its_num), params=params)
+    df = pd.read_sql(text(sql), eng, params=params, parse_dates=PROJECT_DATE_COLS)
     return df
 
 
@@ -177,9 +325,11 @@ def get_project_structure_list(its_num: int, allow_list: list[str] | None, grade
 # --------------------------------------------------
 
 # 콘크리트 조회
+@cached("concrete", ttl=CONCRETE_CACHE_TTL)
 def get_concrete_data(concrete_pk: str = None,
-                      structure_id: str = None,
+                      project_pk: str = None,
                       activate: int = None) -> pd.DataFrame:
+    # project_pk / activate 조건은 idx_concrete_project_activate 인덱스 사용 (db_migrate)
     sql = "SELECT * FROM concrete"
     conditions = []
     params = {}
@@ -187,9 +337,9 @@ def get_concrete_data(concrete_pk: str = None,
     if concrete_pk:
         conditions.append("concrete_pk = :concrete_pk")
         params["concrete_pk"] = concrete_pk
-    if structure_id:
-        conditions.append("structure_id = :structure_id")
-        params["structure_id"] = structure_id
+    if project_pk:
+        conditions.append("project_pk = :project_pk")
+        params["project_pk"] = project_pk
     if activate is not None:
         conditions.append("activate = :activate")
         params["activate"] = activate
@@ -242,6 +392,7 @@ def add_concrete_data(project_pk: str, name: str, dims: dict,
         conn.commit()
         
     # 로그 기록
+    invalidate("concrete")  # 조회 캐시 무효화
     log_concrete_operation("CREATE", new_pk, project_pk, f"name: {name}, con_unit: {con_unit}, activate: {activate}")
 
 # 콘크리트 업데이트
@@ -298,6 +449,7 @@ def update_concrete_data(concrete_pk: str, **kwargs) -> None:
     project_df = pd.read_sql(text(project_query), con=engine, params={"concrete_pk": concrete_pk})
     project_pk = project_df.iloc[0]['project_pk'] if not project_df.empty else "Unknown"
     update_details = ", ".join([f"{k}: {v}" for k, v in update_fields.items()])
+    invalidate("concrete")  # 조회 캐시 무효화
     log_concrete_operation("UPDATE", concrete_pk, project_pk, f"Updated fields: {update_details}")
 
 # 콘크리트 삭제 (관련 센서도 함께 삭제)
@@ -331,6 +483,7 @@ def delete_concrete_data(concrete_pk: str) -> dict:
         conn.commit()
         
         # 로그 기록
+        invalidate("concrete", "sensor")  # 조회 캐시 무효화
         log_concrete_operation("DELETE", concrete_pk, project_pk, f"Concrete deleted with {sensor_count} related sensors")
         
         if sensor_count > 0:
@@ -353,6 +506,7 @@ def delete_concrete_data(concrete_pk: str) -> dict:
 # 센서 DB
 
 # 센서 조회
+@cached("sensor", ttl=SENSOR_CACHE_TTL)
 def get_sensors_data(sensor_pk: str = None,
                      concrete_pk: str = None,
                      device_id: str = None,
@@ -420,6 +574,7 @@ def add_sensors_data(concrete_pk: str, device_id: str, channel: int,
         conn.commit()
         
     # 로그 기록
+    invalidate("sensor")  # 조회 캐시 무효화
     log_sensor_operation("CREATE", new_pk, concrete_pk, f"device_id: {device_id}, channel: {channel}, d_type: {d_type}")
 
 # 센서 업데이트
@@ -453,6 +608,7 @@ def update_sensors_data(sensor_pk: str, **kwargs) -> None:
     concrete_df = pd.read_sql(text(concrete_query), con=engine, params={"sensor_pk": sensor_pk})
     concrete_pk = concrete_df.iloc[0]['concrete_pk'] if not concrete_df.empty else "Unknown"
     update_details = ", ".join([f"{k}: {v}" for k, v in update_fields.items()])
+    invalidate("sensor")  # 조회 캐시 무효화
     log_sensor_operation("UPDATE", sensor_pk, concrete_pk, f"Updated fields: {update_details}")
 
 # 센서 삭제
@@ -469,6 +625,7 @@ def delete_sensors_data(sensor_pk: str) -> None:
         conn.commit()
         
     # 로그 기록
+    invalidate("sensor")  # 조회 캐시 무효화
     log_sensor_operation("DELETE", sensor_pk, concrete_pk, "Sensor deleted")
 
 # --------------------------------------------------
@@ -518,6 +675,15 @@ def get_sensor_data(device_id: str = None,
         else:
             end_dt = datetime.now()
 
+        # 센서 시계열 저장소가 시작 시각부터 갖고 있으면 필요한 월 파티션만 읽음 (아니면 sensor_data 테이블)
+        if device_id and channel:
+            key = sensor_store.sensor_key(device_id, channel)
+            if sensor_store.covers(key, start_dt):
+                df = sensor_store.read_frame(key, start_dt, end_dt)
+                df.insert(0, "device_id", device_id)
+                df.insert(1, "channel", channel)
+                return df
+
         # 2) SQL 쿼리 생성
         sql = "SELECT * FROM sensor_data"
         conditions = []
@@ -617,6 +783,56 @@ def get_latest_sensor_data_time(device_id: str, channel: str) -> dict:
         return {"status": "fail", "time": None, "msg": str(e)}
 
 
+# 마지막 데이터가 이 시간 이내면 수집 중으로 판단
+SENSOR_FRESH_HOURS = 2
+# IN 목록 한 번에 넣는 디바이스 수
+STATUS_BATCH_SIZE = 500
+
+
+def get_sensor_status_batch(sensors, now: datetime = None, fresh_hours: float = SENSOR_FRESH_HOURS) -> dict:
+    """여러 센서의 마지막 데이터 시각과 수집 상태를 디바이스 단위 GROUP BY 쿼리로 한 번에 조회합니다.
+
+    Args:
+        sensors: (device_id, channel) 목록
+        now: 기준 시각 (기본: 현재)
+        fresh_hours: 이 시간 이내 데이터가 있으면 "fresh"
+
+    Returns:
+        dict: {(device_id, str(channel)): {"time": datetime|None, "state": "fresh"|"stale"|"none"|"error"}}
+    """
+    now = now or datetime.now()
+    keys = {(str(d), str(c)) for d, c in sensors}
+    latest = {}
+    state_on_missing = "none"
+    devices = sorted({d for d, _ in keys})
+    try:
+        for start in range(0, len(devices), STATUS_BATCH_SIZE):
+            chunk = devices[start:start + STATUS_BATCH_SIZE]
+            placeholders = ", ".join(f":d{i}" for i in range(len(chunk)))
+            query = text(f"""
+                SELECT device_id, channel, MAX(time) AS time
+                FROM sensor_data
+                WHERE device_id IN ({placeholders})
+                GROUP BY device_id, channel
+            """)
+            df = pd.read_sql(query, engine, params={f"d{i}": d for i, d in enumerate(chunk)})
+            for row in df.itertuples(index=False):
+                latest[(str(row.device_id), str(row.channel))] = pd.to_datetime(row.time)
+    except Exception as e:
+        print(f"Error getting sensor status batch: {e}")
+        state_on_missing = "error"
+
+    result = {}
+    for key in keys:
+        ts = latest.get(key)
+        if ts is None or pd.isna(ts):
+            result[key] = {"time": None, "state": state_on_missing}
+        else:
+            hours = (now - ts).total_seconds() / 3600
+            result[key] = {"time": ts, "state": "fresh" if hours <= fresh_hours else "stale"}
+    return result
+
+
 def get_all_sensor_structures(its_num: int = 1) -> pd.DataFrame:
     """P_000078 프로젝트에서 모든 센서 구조 리스트를 조회합니다.
     
@@ -627,7 +843,7 @@ def get_all_sensor_structures(its_num: int = 1) -> pd.DataFrame:
         센서 구조 리스트 DataFrame (구조 단위로 그룹화)
     """
     try:
-        eng = _get_its_engine(its_num)
+        eng = _its_read_engine(its_num)
         
         # P_000078 프로젝트에서 모든 구조 리스트 조회 (구조 단위로 그룹화)
         structure_query = text("""
@@ -664,13 +880,13 @@ def get_sensor_list_for_structure(s_code: str, its_num: int = 1) -> pd.DataFrame
         센서 리스트 DataFrame
     """
     try:
-        eng = _get_its_engine(its_num)
+        eng = _its_read_engine(its_num)
         
         # P_000078 프로젝트에서 해당 구조의 센서 리스트 조회
         sensor_query = text("""
             SELECT s.deviceid, CAST(IFNULL(s.channel,1) AS CHAR) AS channel,
                    d.devicetype AS device_type, tddt.data_type,
-                   IF(tdc.modelname IS NOT NULL,'Y','N') AS is3axis
+                   CASE WHEN tdc.modelname IS NOT NULL THEN 'Y' ELSE 'N' END AS is3axis
             FROM tb_sensor s 
             JOIN tb_device d ON d.deviceid = s.deviceid 
             JOIN tb_structure st ON st.stid = d.stid 
@@ -692,6 +908,7 @@ def get_sensor_list_for_structure(s_code: str, its_num: int = 1) -> pd.DataFrame
         return pd.DataFrame()
 
 
+@cached("its", ttl=ITS_CACHE_TTL, cache_empty=False)
 def get_sensor_list_for_project(project_id: str, its_num: int = 1) -> pd.DataFrame:
     """특정 프로젝트의 모든 센서 리스트를 조회합니다.
     
@@ -703,13 +920,13 @@ def get_sensor_list_for_project(project_id: str, its_num: int = 1) -> pd.DataFra
         센서 리스트 DataFrame
     """
     try:
-        eng = _get_its_engine(its_num)
+        eng = _its_read_engine(its_num)
         
         # 해당 프로젝트의 모든 센서 리스트 조회
         sensor_query = text("""
             SELECT s.deviceid, CAST(IFNULL(s.channel,1) AS CHAR) AS channel,
                    d.devicetype AS device_type, tddt.data_type,
-                   IF(tdc.modelname IS NOT NULL,'Y','N') AS is3axis,
+                   CASE WHEN tdc.modelname IS NOT NULL THEN 'Y' ELSE 'N' END AS is3axis,
                    st.stid AS structure_id, st.stname AS structure_name
             FROM tb_sensor s 
             JOIN tb_device d ON d.deviceid = s.deviceid 
@@ -732,6 +949,103 @@ def get_sensor_list_for_project(project_id: str, its_num: int = 1) -> pd.DataFra
         return pd.DataFrame()
 
 
+def get_accessible_sensors(user_id: str, its_num: int = 1) -> list:
+    """사용자가 접근 가능한 ITS 센서 목록을 반환합니다.
+    
+    센서 데이터 페이지의 센서 목록과 CSV 내보내기 라우트의 권한 확인에 함께 사용합니다.
+    권한 확인에 쓰이므로 캐시하지 않습니다 (권한 변경/조회 실패 결과가 남지 않도록).
+    
+    Args:
+        user_id: 사용자 ID
+        its_num: ITS 번호 (1 또는 2)
+    
+    Returns:
+        list: [{'sensor_key', 'device_id', 'channel', 'device_type', 'data_type', 'is3axis', 'structure_id'}, ...]
+    """
+    try:
+        # 사용자 권한 정보 조회 (권한은 미러가 아니라 ITS 서버에서)
+        eng = _get_its_engine(its_num)
+        user_query = text("SELECT userid, grade FROM tb_user WHERE userid = :uid LIMIT 1")
+        df_user = pd.read_sql(user_query, eng, params={"uid": user_id})
+        
+        if df_user.empty:
+            return []
+        
+        grade = df_user.iloc[0]["grade"]
+        
+        # AD 권한이면 모든 구조의 센서 반환
+        if grade == "AD":
+            # 모든 구조 조회
+            structure_query = text("""
+                SELECT DISTINCT st.stid AS s_code
+                FROM tb_structure st
+                JOIN tb_group g ON g.groupid = st.groupid 
+                JOIN tb_project p ON p.projectid = g.projectid 
+                WHERE p.projectid = 'P_000078'
+                ORDER BY st.stid
+            """)
+            df_structures = pd.read_sql(structure_query, eng)
+            s_codes = df_structures['s_code'].tolist()
+        else:
+            # 일반 사용자의 경우 접근 가능한 구조만
+            auth_query = text("SELECT id FROM tb_sensor_auth_mapping WHERE userid = :uid")
+            df_auth = pd.read_sql(auth_query, eng, params={"uid": user_id})
+            
+            if df_auth.empty:
+                return []
+            
+            auth_list = df_auth["id"].tolist()
+            
+            # P_000078에 접근 가능하면 모든 구조 반환
+            if "P_000078" in auth_list:
+                structure_query = text("""
+                    SELECT DISTINCT st.stid AS s_code
+                    FROM tb_structure st
+                    JOIN tb_group g ON g.groupid = st.groupid 
+                    JOIN tb_project p ON p.projectid = g.projectid 
+                    WHERE p.projectid = 'P_000078'
+                    ORDER BY st.stid
+                """)
+                df_structures = pd.read_sql(structure_query, eng)
+                s_codes = df_structures['s_code'].tolist()
+            else:
+                # 접근 가능한 구조 ID만
+                s_codes = [auth_id for auth_id in auth_list if auth_id.startswith('S_')]
+        
+        # 각 구조별 센서 목록 수집
+        all_sensors = []
+        for s_code in s_codes:
+            try:
+                sensors_df = get_sensor_list_for_structure(s_code, its_num)
+                if not sensors_df.empty:
+                    for _, sensor in sensors_df.iterrows():
+                        device_id = sensor["deviceid"]
+                        channel = sensor["channel"]
+                        sensor_key = f"{device_id}_Ch{channel}"
+                        
+                        # 중복 제거
+                        if sensor_key not in [s['sensor_key'] for s in all_sensors]:
+                            all_sensors.append({
+                                'sensor_key': sensor_key,
+                                'device_id': device_id,
+                                'channel': channel,
+                                'device_type': sensor.get('device_type', ''),
+                                'data_type': sensor.get('data_type', ''),
+                                'is3axis': sensor.get('is3axis', 'N'),
+                                'structure_id': s_code
+                            })
+            except Exception as e:
+                print(f"Error getting sensors for structure {s_code}: {e}")
+                continue
+        
+        return all_sensors
+        
+    except Exception as e:
+        print(f"Error getting available sensors: {e}")
+        return []
+
+
+@cached("its", ttl=ITS_CACHE_TTL)
 def get_accessible_projects(user_id: str, its_num: int = 1):
     """사용자가 접근 가능한 프로젝트 목록을 반환합니다.
     
@@ -747,7 +1061,7 @@ def get_accessible_projects(user_id: str, its_num: int = 1):
         }
     """
     try:
-        eng = _get_its_engine(its_num)
+        eng = _its_read_engine(its_num)
     except Exception as exc:
         return {"result": "Fail", "projects": None, "msg": f"DB 연결 실패: {exc}"}
 
@@ -768,7 +1082,7 @@ def get_accessible_projects(user_id: str, its_num: int = 1):
                 FROM tb_project tp
                 ORDER BY tp.projectid
             """)
-            df_projects = pd.read_sql(project_query, eng)
+            df_projects = pd.read_sql(project_query, eng, parse_dates=PROJECT_DATE_COLS)
         else:
             # 일반 사용자의 경우 권한이 있는 프로젝트만 반환
             auth_query = text("SELECT id FROM tb_sensor_auth_mapping WHERE userid = :uid")
@@ -794,7 +1108,7 @@ def get_accessible_projects(user_id: str, its_num: int = 1):
                 ORDER BY tp.projectid
             """)
             params = {f"p{i}": pid for i, pid in enumerate(project_ids)}
-            df_projects = pd.read_sql(project_query, eng, params=params)
+            df_projects = pd.read_sql(project_query, eng, params=params, parse_dates=PROJECT_DATE_COLS)
 
         return {"result": "Success", "projects": df_projects, "msg": ""}
         
@@ -814,7 +1128,7 @@ def get_user_data(its_num: int = 1) -> pd.DataFrame:
         사용자 정보 DataFrame
     """
     try:
-        eng = _get_its_engine(its_num)
+        eng = _its_read_engine(its_num)
         query = text("""
             SELECT 
                 userid as user_id,
@@ -832,6 +1146,7 @@ def get_user_data(its_num: int = 1) -> pd.DataFrame:
                 df[col] = df[col].astype(str)
                 df[col] = df[col].replace('NaT', None)
                 df[col] = df[col].replace('nan', None)
+                df[col] = df[col].replace('None', None)
         
         return df
     except Exception as e:
@@ -912,6 +1227,24 @@ def collect_its_sensor_data(device_id: str, channel: str, its_num: int = 1, hour
         print(f"Error collecting ITS sensor data for {device_id}/{channel}: {e}")
         return {"status": "fail", "count": 0, "msg": str(e)}
 
+# ITS 센서 원본 조회 쿼리 (get_its_sensor_data, sensor_export 공통)
+ITS_SENSOR_DATA_SQL = """
+    SELECT 
+        deviceid AS device_id,
+        channel,
+        timestamp AS time,
+        temperature,
+        humidity,
+        sv,
+        x_accel, y_accel, z_accel,
+        x_gyro, y_gyro, z_gyro
+    FROM tb_sensor_data 
+    WHERE deviceid = :device_id 
+        AND channel = :channel 
+        AND timestamp BETWEEN :start_time AND :end_time
+    ORDER BY timestamp ASC
+"""
+
 def get_its_sensor_data(device_id: str, channel: str, its_num: int = 1, hours: int = 24) -> pd.DataFrame:
     """ITS 데이터베이스에서 직접 센서 데이터를 조회합니다.
     
@@ -933,22 +1266,7 @@ def get_its_sensor_data(device_id: str, channel: str, its_num: int = 1, hours: i
         start_time = end_time - timedelta(hours=hours)
         
         # ITS 센서 데이터 조회 쿼리
-        query = text("""
-            SELECT 
-                deviceid AS device_id,
-                channel,
-                timestamp AS time,
-                temperature,
-                humidity,
-                sv,
-                x_accel, y_accel, z_accel,
-                x_gyro, y_gyro, z_gyro
-            FROM tb_sensor_data 
-            WHERE deviceid = :device_id 
-                AND channel = :channel 
-                AND timestamp BETWEEN :start_time AND :end_time
-            ORDER BY timestamp ASC
-        """)
+        query = text(ITS_SENSOR_DATA_SQL)
         
         params = {
             "device_id": device_id,
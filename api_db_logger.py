@@ -1,6 +1,7 @@
 import logging
 import os
 from api_db import *
+from metadata_cache import invalidate
 
 # 로그 설정
 def setup_logger(log_name: str, log_file: str):
@@ -77,6 +78,7 @@ def add_project_data_with_log(s_code: str, name: str) -> None:
         conn.commit()
     
     # 로그 기록
+    invalidate("project")  # 조회 캐시 무효화
     log_project_operation("ADD", new_pk, f"프로젝트 추가 - 이름: {name}, 구조코드: {s_code}")
     return new_pk
 
@@ -104,6 +106,7 @@ def update_project_data_with_log(project_pk: str, **kwargs) -> None:
     
     # 로그 기록
     update_details = ", ".join([f"{k}: {v}" for k, v in update_fields.items()])
+    invalidate("project")  # 조회 캐시 무효화
     log_project_operation("UPDATE", project_pk, f"프로젝트 수정 - {update_details}")
 
 def delete_project_data_with_log(project_pk: str) -> None:
@@ -119,6 +122,7 @@ def delete_project_data_with_log(project_pk: str) -> None:
         conn.commit()
     
     # 로그 기록
+    invalidate("project")  # 조회 캐시 무효화
     log_project_operation("DELETE", project_pk, f"프로젝트 삭제 - 이름: {project_name}")
 
 # 로그 기능이 추가된 콘크리트 함수들
@@ -165,6 +169,7 @@ def add_concrete_data_with_log(project_pk: str, name: str, dims: dict,
         conn.commit()
     
     # 로그 기록
+    invalidate("concrete")  # 조회 캐시 무효화
     log_concrete_operation("ADD", new_pk, project_pk, f"콘크리트 추가 - 이름: {name}, 활성화: {activate}")
     return new_pk
 
@@ -209,6 +214,7 @@ def update_concrete_data_with_log(concrete_pk: str, **kwargs) -> None:
     
     # 로그 기록
     update_details = ", ".join([f"{k}: {v}" for k, v in update_fields.items()])
+    invalidate("concrete")  # 조회 캐시 무효화
     log_concrete_operation("UPDATE", concrete_pk, project_pk, f"콘크리트 수정 - {update_details}")
 
 def delete_concrete_data_with_log(concrete_pk: str) -> dict:
@@ -236,6 +242,7 @@ def delete_concrete_data_with_log(concrete_pk: str) -> dict:
         conn.commit()
         
         # 로그 기록
+        invalidate("concrete", "sensor")  # 조회 캐시 무효화
         log_concrete_operation("DELETE", concrete_pk, project_pk, 
                              f"콘크리트 삭제 - 이름: {concrete_name}, 관련 센서 {sensor_count}개도 함께 삭제")
         
@@ -290,6 +297,7 @@ def add_sensors_data_with_log(concrete_pk: str, device_id: str, channel: int,
         conn.commit()
     
     # 로그 기록
+    invalidate("sensor")  # 조회 캐시 무효화
     log_sensor_operation("ADD", new_pk, concrete_pk, 
                         f"센서 추가 - 디바이스: {device_id}, 채널: {channel}, 타입: {d_type}")
     return new_pk
@@ -326,6 +334,7 @@ def update_sensors_data_with_log(sensor_pk: str, **kwargs) -> None:
     
     # 로그 기록
     update_details = ", ".join([f"{k}: {v}" for k, v in update_fields.items()])
+    invalidate("sensor")  # 조회 캐시 무효화
     log_sensor_operation("UPDATE", sensor_pk, concrete_pk, f"센서 수정 - {update_details}")
 
 def delete_sensors_data_with_log(sensor_pk: str) -> None:
@@ -342,4 +351,5 @@ def delete_sensors_data_with_log(sensor_pk: str) -> None:
         conn.commit()
     
     # 로그 기록
+    invalidate("sensor")  # 조회 캐시 무효화
     log_sensor_operation("DELETE", sensor_pk, concrete_pk, f"센서 삭제 - 디바이스: {device_id}") 
\ No newline at end of file
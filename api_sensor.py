@@ -5,8 +5,8 @@ import json
 from datetime import datetime
 import api_concrete
 
-from ITS_CLI import config, tcp_client
-import threading, time, glob
+import its_session
+import glob
 
 # ITS 연동을 위한 모듈(필요 시 import)
 # from ITS_CLI import config, tcp_client
@@ -125,24 +125,18 @@ def delete_sensor(sensor_pk: str):
 # ──────────────────────────────────────────────────────────────────────────────
 # ITS_CLI 환경에서 ITS_CLIENT 인스턴스를 전달해야 합니다.
 def export_sensor_data(start_date=None, end_date=None):
-    # --- 1) ITS 로그인 및 연결 설정 ---
-    user_id = 'cbk4689'
-    user_pass = 'qudrhks7460!@'
-    config.config_load()
-    ITS_CLIENT = tcp_client.TCPClient(
-        config.SERVER_IP, config.SERVER_PORT, config.ITS_NUM, config.certfile
-    )
-    t = threading.Thread(target=ITS_CLIENT.receive_messages)
-    t.daemon = True
-    t.start()
-    time.sleep(1)
-    ITS_CLIENT.set_user_password(user_id, user_pass)
-    res = ITS_CLIENT.message('login')
-    if res.get('result') != 'Success':
-        print(f"[ERROR] 로그인 실패: {res.get('msg')}")
-        return
-    print("[OK] ITS 로그인 성공")
-
+    # --- 1) ITS 공용 세션 (연결/로그인 재사용, 예외가 나도 세션은 풀로 반환) ---
+    with its_session.its_session() as session:
+        try:
+            session.ensure_ready()
+        except its_session.ITSSessionError as e:
+            print(f"[ERROR] 로그인 실패: {e}")
+            return
+        print("[OK] ITS 로그인 성공")
+        _export_sensor_data(session)
+
+
+def _export_sensor_data(session):
     # --- 2) 전체 센서 메타 로드 ---
     df_meta = load_all_sensors()
     total_sensors = len(df_meta)
@@ -173,7 +167,7 @@ def export_sensor_data(start_date=None, end_date=None):
                 )
                 sd_start = last_day.strftime("%Y%m%d")  # 그 이후부터 새로 수집
 
-        result = ITS_CLIENT.message_getdata(
+        result = session.message_getdata(
             'query_device_channel_data',
             start_date=sd_start,
             end_date=None,
@@ -224,4 +218,6 @@ def export_sensor_data(start_date=None, end_date=None):
             # 일별 진행도 출력
             print(f"[{idx}/{total_sensors}] {sensor_id} {day.strftime('%Y-%m-%d')} 저장 완료")
 
-export_sensor_data()
\ No newline at end of file
+
+if __name__ == "__main__":
+    export_sensor_data()
\ No newline at end of file
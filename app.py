@@ -7,8 +7,16 @@ from urllib.parse import quote_plus
 from datetime import datetime
 import logging
 
-# 사용자 인증 모듈
-from api_db import authenticate_user
+# 사용자 인증 모듈 (ITS1/ITS2 동시 조회 + 사용자 → ITS 캐시)
+from auth_service import authenticate
+# 센서 원본 데이터 CSV 스트리밍 내보내기
+import sensor_export
+# 선택 파일 ZIP 스트리밍 다운로드 (토큰은 Dash 콜백에서 발급)
+import zip_stream
+# FRD 분할(이어 올리기) 업로드
+import frd_upload
+# 자동화 단계 계측 (Prometheus /metrics)
+import stage_metrics
 
 load_dotenv()
 
@@ -68,7 +76,9 @@ server = Flask(__name__)
 #  인증 체크: 로그인 안 했으면 /login 으로 리다이렉트
 # ──────────────────────────────────────────────────
 
-_PUBLIC_PREFIXES = ("/login", "/do_login", "/admin", "/do_admin_login", "/assets", "/_dash", "/favicon", "/logout")
+# /metrics 는 라우트에서 토큰(METRICS_TOKEN)/관리자 여부를 직접 확인 (Prometheus 는 로그인 쿠키가 없음)
+_PUBLIC_PREFIXES = ("/login", "/do_login", "/admin", "/do_admin_login", "/assets", "/_dash", "/favicon", "/logout",
+                    "/metrics")
 
 
 @server.before_request
@@ -111,18 +121,15 @@ def do_login():
         resp.delete_cookie("user_grade")
         return resp
 
-    # ITS1과 ITS2 모두에서 인증 시도
-    auth = authenticate_user(user_id, user_pw, its_num=1)
+    # ITS1과 ITS2 를 동시에 조회해 사용자가 속한 ITS 에서 인증
+    auth = authenticate(user_id, user_pw)
     if auth["result"] != "Success":
-        # ITS1에서 실패하면 ITS2에서 시도
-        auth = authenticate_user(user_id, user_pw, its_num=2)
-        if auth["result"] != "Success":
-            log_login_attempt(user_id, False, auth['msg'])
-            resp = make_response(redirect(f"/login?error={quote_plus(auth['msg'])}"))
-            # 실패한 로그인 시 기존 쿠키 삭제 (이전 세션 무효화)
-            resp.delete_cookie("login_user")
-            resp.delete_cookie("user_grade")
-            return resp
+        log_login_attempt(user_id, False, auth['msg'])
+        resp = make_response(redirect(f"/login?error={quote_plus(auth['msg'])}"))
+        # 실패한 로그인 시 기존 쿠키 삭제 (이전 세션 무효화)
+        resp.delete_cookie("login_user")
+        resp.delete_cookie("user_grade")
+        return resp
 
     # 로그인 성공 로그
     log_login_attempt(user_id, True, "로그인 성공")
@@ -150,7 +157,7 @@ def do_admin_login():
         resp.delete_cookie("admin_user")
         return resp
 
-    auth = authenticate_user(user_id, user_pw, its_num=its)
+    auth = authenticate(user_id, user_pw, its_nums=(its,))
     if auth["result"] != "Success":
         log_login_attempt(user_id, False, f"관리자 로그인: {auth['msg']}")
         resp = make_response(redirect(f"/admin?error={quote_plus(auth['msg'])}"))
@@ -186,6 +193,40 @@ def logout():
     resp.delete_cookie("admin_user")  # 관리자 쿠키도 삭제
     return resp
 
+@server.route("/export/sensor_csv")
+def export_sensor_csv():
+    """센서 원본 데이터 CSV 스트리밍 다운로드 (센서 데이터 페이지와 같은 기간 인자/권한)"""
+    return sensor_export.export_sensor_csv(request.args, request.cookies.get("login_user"))
+
+@server.route("/files/zip/<token>")
+def download_zip(token):
+    """Dash 콜백이 발급한 토큰의 파일들을 무압축 ZIP 으로 스트리밍"""
+    return zip_stream.zip_response(token, request.cookies.get("login_user"))
+
+@server.route("/upload/frd", methods=["POST"])
+def upload_frd_start():
+    """FRD 분할 업로드 시작 (concrete_pk, filename, size)"""
+    form = request.get_json(silent=True) or request.form
+    return frd_upload.handle_start(form, request.cookies.get("login_user"))
+
+@server.route("/upload/frd/<upload_id>", methods=["GET", "PUT"])
+def upload_frd_chunk(upload_id):
+    """GET: 받은 위치 조회 (이어 올리기), PUT: 조각 저장 (?offset=N 또는 ?index=i)"""
+    user_id = request.cookies.get("login_user")
+    if request.method == "GET":
+        return frd_upload.handle_status(upload_id, user_id)
+    return frd_upload.handle_chunk(upload_id, request, user_id)
+
+@server.route("/upload/frd/<upload_id>/commit", methods=["POST"])
+def upload_frd_commit(upload_id):
+    """모든 조각을 받은 파일을 frd/{concrete_pk}/ 로 옮김 (후처리는 파이프라인의 fs_watcher)"""
+    return frd_upload.handle_commit(upload_id, request.cookies.get("login_user"))
+
+@server.route("/metrics")
+def pipeline_metrics():
+    """자동화 단계 지표 (Prometheus text 형식, 모든 프로세스 누적값 합침)"""
+    return stage_metrics.metrics_response(request)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 이제 Dash 앱 생성
 # ──────────────────────────────────────────────────────────────────────────────
@@ -702,4 +743,11 @@ def update_admin_nav_active(pathname):
     return base_classes[0], base_classes[1], base_classes[2], base_classes[3]
 
 if __name__ == "__main__":
+    # 시작 시 로컬 DB 스키마/인덱스 점검 (경고만 기록, 적용은 python db_migrate.py upgrade)
+    try:
+        import api_db
+        import db_migrate
+        db_migrate.check_schema(api_db.engine)
+    except Exception as e:
+        print(f"⚠️ DB 스키마 점검 실패: {e}")
     app.run(debug=True, host="0.0.0.0", port=23022)
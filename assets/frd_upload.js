@@ -0,0 +1,57 @@
+/* assets/frd_upload.js
+   FRD 분할(이어 올리기) 업로드 클라이언트: window.uploadFrdChunked(file, concretePk, onProgress)
+   - /upload/frd 로 업로드를 시작하고, 서버가 알려준 chunk_size 로 파일을 잘라 PUT /upload/frd/<id>?offset=N
+   - 조각 전송이 실패하면 GET /upload/frd/<id> 로 받은 위치(received)를 확인한 뒤 그 위치부터 다시 보냄
+   - 다 보내면 POST /upload/frd/<id>/commit → 서버가 frd/{concretePk}/ 로 옮김 (후처리는 파이프라인)
+   - 파일을 base64 로 읽지 않으므로 수 GB FRD 도 브라우저/서버 메모리와 무관하게 업로드
+*/
+
+(function () {
+  if (window.uploadFrdChunked) return;
+
+  const MAX_RETRIES = 5;
+
+  async function requestJson(url, options) {
+    const resp = await fetch(url, Object.assign({ credentials: 'same-origin' }, options));
+    const body = await resp.json().catch(() => ({}));
+    if (!resp.ok) {
+      const err = new Error(body.msg || `HTTP ${resp.status}`);
+      err.status = resp.status;
+      err.body = body;
+      throw err;
+    }
+    return body;
+  }
+
+  window.uploadFrdChunked = async function (file, concretePk, onProgress) {
+    const started = await requestJson('/upload/frd', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ concrete_pk: concretePk, filename: file.name, size: file.size }),
+    });
+    const id = started.upload_id;
+    const chunkSize = started.chunk_size;
+    let offset = 0;
+    let retries = 0;
+
+    while (offset < file.size) {
+      const end = Math.min(offset + chunkSize, file.size);
+      try {
+        const status = await requestJson(`/upload/frd/${id}?offset=${offset}`, {
+          method: 'PUT',
+          headers: { 'Content-Type': 'application/octet-stream' },
+          body: file.slice(offset, end),
+        });
+        offset = status.received;
+        retries = 0;
+        if (onProgress) onProgress(offset, file.size);
+      } catch (err) {
+        if (err.status === 403 || err.status === 404 || ++retries > MAX_RETRIES) throw err;
+        // 네트워크 오류/위치 불일치: 서버가 받은 위치부터 이어서
+        await new Promise((r) => setTimeout(r, 1000 * retries));
+        offset = (await requestJson(`/upload/frd/${id}`)).received;
+      }
+    }
+    return requestJson(`/upload/frd/${id}/commit`, { method: 'POST' });
+  };
+})();
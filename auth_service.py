@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ITS1/ITS2 로그인 인증 서비스
+- 두 ITS 의 tb_user 를 동시에 조회해 사용자가 속한 ITS 를 찾음 (ITS2 사용자도 한 번의 왕복)
+- 사용자 → ITS 매핑을 ROUTE_TTL 동안 기억해 다음 로그인은 해당 ITS 만 조회
+- bcrypt 검사는 사용자당 한 번, 크기가 정해진 전용 스레드 풀에서 실행 (동시 로그인 폭주 시 CPU 보호)
+- 권한 목록(tb_sensor_auth_mapping)은 bcrypt 와 동시에 조회, api_db 에서 짧은 TTL 로 캐시
+
+반환 형식은 api_db.authenticate_user 와 같고 "its" (인증된 ITS 번호) 가 추가됨.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+import api_db
+
+AUTH_ITS_NUMS = (1, 2)    # 조회 순서 = 두 ITS 에 같은 아이디가 있을 때 우선순위
+ROUTE_TTL = 3600          # 사용자 → ITS 매핑 유지 시간 (초)
+BCRYPT_WORKERS = 4        # 동시에 실행하는 bcrypt 검사 수
+LOOKUP_WORKERS = 8        # ITS 사용자/권한 조회 스레드 수
+
+
+# 로거 설정
+def setup_auth_logger():
+    """auth_service 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('auth_service_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'auth.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | AUTH | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_auth_logger()
+
+_lookup_pool = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix="auth_lookup")
+_bcrypt_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="auth_bcrypt")
+
+_routes = {}              # {user_id: (its_num, 만료 시각)}
+_routes_lock = threading.Lock()
+
+
+def _fail(msg):
+    return {"result": "Fail", "msg": msg, "grade": None, "auth": [], "its": None}
+
+
+def get_route(user_id):
+    """캐시된 사용자의 ITS 번호 (없거나 만료되면 None)"""
+    with _routes_lock:
+        entry = _routes.get(user_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del _routes[user_id]
+            return None
+        return entry[0]
+
+
+def _set_route(user_id, its_num):
+    with _routes_lock:
+        _routes[user_id] = (its_num, time.monotonic() + ROUTE_TTL)
+
+
+def clear_routes(user_id=None):
+    """사용자 → ITS 매핑 삭제 (인자가 없으면 전체)"""
+    with _routes_lock:
+        if user_id is None:
+            _routes.clear()
+        else:
+            _routes.pop(user_id, None)
+
+
+def _lookup_users(user_id, its_nums):
+    """여러 ITS 의 tb_user 동시 조회. Returns: ([(its_num, 사용자 dict)], [오류 메시지])"""
+    futures = [(its_num, _lookup_pool.submit(api_db.get_user_credentials, user_id, its_num))
+               for its_num in its_nums]
+    found, errors = [], []
+    for its_num, future in futures:
+        try:
+            user = future.result()
+        except Exception as exc:
+            logger.warning(f"USER_LOOKUP_FAIL | ITS{its_num} | {user_id} | {exc}")
+            errors.append(f"ITS{its_num}: {exc}")
+            continue
+        if user is not None:
+            found.append((its_num, user))
+    return found, errors
+
+
+def _check_password(password, stored_hash):
+    return _bcrypt_pool.submit(bcrypt.checkpw, password.encode("utf-8"), stored_hash.encode("utf-8"))
+
+
+def _try_password(user_id, password, found, checked):
+    """조회된 ITS 사용자들에 대해 비밀번호 확인. Returns: (ITS 번호, 등급, 권한 목록) 또는 None
+
+    checked: 이미 검사한 해시 집합 (같은 해시는 bcrypt 를 다시 실행하지 않음)
+    """
+    for its_num, user in found:
+        if user["userpw"] in checked:
+            continue
+        checked.add(user["userpw"])
+        grade = user["grade"]
+        auth_future = None if grade == "AD" else _lookup_pool.submit(api_db.get_user_auth_list, user_id, its_num)
+        try:
+            ok = _check_password(password, user["userpw"]).result()
+        except Exception as exc:
+            logger.warning(f"BCRYPT_FAIL | ITS{its_num} | {user_id} | {exc}")
+            ok = False
+        if ok:
+            return its_num, grade, [] if auth_future is None else auth_future.result()
+    return None
+
+
+def authenticate(user_id, password, its_nums=AUTH_ITS_NUMS):
+    """ITS1/ITS2 중 사용자가 속한 ITS 에서 인증.
+
+    캐시된 ITS 에서 사용자가 없거나 비밀번호가 맞지 않으면 나머지 ITS 도 조회
+    (같은 아이디가 두 ITS 에 있고 비밀번호가 다른 경우).
+
+    Returns
+    -------
+    dict: result("Success" | "Fail"), msg, grade, auth(허용 projectid / stid, AD 면 []), its
+    """
+    start = time.perf_counter()
+    its_nums = tuple(its_nums)
+    route = get_route(user_id)
+    found, errors, checked = [], [], set()
+    matched = None
+    try:
+        if route in its_nums:
+            found, errors = _lookup_users(user_id, (route,))
+            matched = _try_password(user_id, password, found, checked)
+            if not found and not errors:
+                clear_routes(user_id)   # 다른 ITS 로 옮겨졌거나 삭제된 사용자
+        if matched is None:
+            more_found, more_errors = _lookup_users(user_id, [n for n in its_nums if n != route])
+            found += more_found
+            errors += more_errors
+            matched = _try_password(user_id, password, more_found, checked)
+    except Exception as exc:
+        return _fail(str(exc))
+
+    if matched is None:
+        if found:
+            return _fail("비밀번호 불일치")
+        if errors:
+            return _fail(f"DB 연결 실패: {'; '.join(errors)}")
+        return _fail("존재하지 않는 아이디")
+
+    its_num, grade, auth_list = matched
+    _set_route(user_id, its_num)
+    logger.info(f"LOGIN_OK | ITS{its_num} | {user_id} | route={'hit' if route == its_num else 'miss'} | "
+                f"{time.perf_counter() - start:.3f}s")
+    return {"result": "Success", "msg": "", "grade": grade, "auth": auth_list, "its": its_num}
@@ -1,14 +1,21 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-FRD → VTK 변환 스크립트 (ccx2paraview 사용)
-- ccx2paraview 라이브러리를 사용하여 안정적인 변환
+FRD → VTK 변환 스크립트
+- 기본: FRD 배열을 직접 읽어 압축 바이너리 VTU 로 한 번에 기록 (ccx2paraview / 형식 수정 불필요)
+- direct=False: ccx2paraview 라이브러리로 레거시 VTK 변환 후 형식 수정
 - frd 폴더의 모든 파일을 assets/vtk에 동일한 경로로 변환
 """
 
 import os
+import re
 import logging
-from ccx2paraview import Converter
+
+import numpy as np
+
+import frd_io
+import vtk_xml
+import convert_pool
 
 # 로거 설정
 def setup_auto_frd_to_vtk_logger():
@@ -101,6 +108,7 @@ def fix_vtk_format(vtk_path):
 
 def convert_frd_to_vtk(frd_path, vtk_path):
     """ccx2paraview를 사용하여 FRD → VTK 변환 + 형식 수정"""
+    from ccx2paraview import Converter
     try:
         # vtk 디렉토리 생성
         vtk_dir = os.path.dirname(vtk_path)
@@ -139,6 +147,68 @@ def convert_frd_to_vtk(frd_path, vtk_path):
         return False, f"변환 오류: {str(e)}"
 
 
+def frd_to_grid(frd):
+    """read_frd_arrays 결과를 VTK UnstructuredGrid 배열로 변환
+
+    Returns
+    -------
+    (points, connectivity, offsets, cell_types, point_data)
+    point_data 는 ccx2paraview 와 같은 U / S 이름 사용 (+ S_Mises)
+    """
+    cell_types = []
+    for etype in frd["element_types"]:
+        if etype not in frd_io.FRD_ELEMENT_TYPES:
+            raise ValueError(f"지원하지 않는 요소 타입: {etype}")
+        cell_types.append(frd_io.FRD_ELEMENT_TYPES[etype][1])
+    connectivity = np.concatenate(frd["connectivity"])
+    offsets = np.cumsum([len(c) for c in frd["connectivity"]])
+
+    point_data = {}
+    for name, values in frd["results"].items():
+        if name == "DISP":
+            point_data["U"] = values[:, :3]
+        elif name == "STRESS":
+            point_data["S"] = values[:, :6]
+            point_data["S_Mises"] = frd_io.von_mises(values)
+        else:
+            point_data[name] = values
+    return frd["coords"], connectivity, offsets, np.array(cell_types, dtype=np.uint8), point_data
+
+
+def convert_frd_to_vtu_direct(frd_path, vtu_path, compress=True):
+    """FRD 배열을 직접 읽어 appended binary + zlib 압축 VTU 로 한 번에 기록"""
+    try:
+        frd = frd_io.read_frd_arrays(frd_path)
+        if len(frd["node_ids"]) == 0 or len(frd["element_ids"]) == 0:
+            log_error(f"FRD 에 노드/요소가 없음: {frd_path}")
+            return False, "FRD 에 노드/요소가 없습니다"
+
+        points, connectivity, offsets, cell_types, point_data = frd_to_grid(frd)
+        size = vtk_xml.write_vtu(vtu_path, points, connectivity, offsets, cell_types,
+                                 point_data=point_data, compress=compress)
+        message = f"노드 {len(frd['node_ids'])}개, {size / 1024:.1f}KB"
+        log_vtk_conversion_success(vtu_path, message)
+        return True, f"변환 성공 ({message})"
+
+    except Exception as e:
+        log_error(f"FRD to VTU 변환 오류: {frd_path} - {str(e)}")
+        return False, f"변환 오류: {str(e)}"
+
+
+def validate_vtu_header(vtu_path):
+    """VTU 파일 헤더만 읽어 검증 (전체 파일을 다시 읽지 않음)"""
+    try:
+        header = vtk_xml.read_vtk_header(vtu_path)
+        if not header.startswith('<?xml') or '<UnstructuredGrid>' not in header:
+            return False, "VTU 헤더가 올바르지 않습니다"
+        match = re.search(r'NumberOfPoints="(\d+)"', header)
+        if not match:
+            return False, "Piece 정보가 없습니다"
+        return True, f"검증 통과 (노드: {match.group(1)}개)"
+    except Exception as e:
+        return False, f"파일 읽기 오류: {e}"
+
+
 def validate_vtk_file(vtk_path):
     """VTK 파일이 올바른 형식인지 검증"""
     try:
@@ -185,9 +255,19 @@ def validate_vtk_file(vtk_path):
         return False, f"파일 읽기 오류: {e}"
 
 
-def convert_all_frd_to_vtk(frd_root_dir="frd", vtk_root_dir="assets/vtk"):
-    """frd 폴더의 모든 .frd 파일을 assets/vtk에 동일한 경로로 변환"""
-    
+def convert_all_frd_to_vtk(frd_root_dir="frd", vtk_root_dir="assets/vtk", direct=True,
+                           workers=convert_pool.DEFAULT_WORKERS, concrete_pks=None):
+    """frd 폴더의 모든 .frd 파일을 assets/vtk에 동일한 경로로 변환
+
+    direct=True 이면 convert_pool 로 변경된 파일만 병렬 변환하여 압축 바이너리 .vtu 로 기록
+    (결과 요약 dict 반환, concrete_pks 를 주면 해당 콘크리트만), False 이면 ccx2paraview 로 .vtk 를 순차 생성
+    """
+    if direct:
+        summary = convert_pool.run_frd_stage(frd_root_dir, vtk_root_dir, workers=workers,
+                                             concrete_pks=concrete_pks)
+        convert_pool.print_summary(summary)
+        return summary
+
     if not os.path.exists(frd_root_dir):
         log_error(f"frd 폴더가 없습니다: {frd_root_dir}")
         print(f"❌ frd 폴더가 없습니다: {frd_root_dir}")
@@ -218,11 +298,12 @@ def convert_all_frd_to_vtk(frd_root_dir="frd", vtk_root_dir="assets/vtk"):
             if file.lower().endswith('.frd'):
                 total_files += 1
                 frd_path = os.path.join(root, file)
-                vtk_filename = file[:-4] + '.vtk'  # .frd → .vtk
-                vtk_path = os.path.join(vtk_dir, vtk_filename)
+                base = file[:-4]
+                vtk_path = os.path.join(vtk_dir, base + '.vtk')
                 
-                # 이미 VTK 파일이 존재하면 건너뛰기
-                if os.path.exists(vtk_path):
+                # 이미 VTK/VTU 파일이 존재하면 건너뛰기
+                if (os.path.exists(os.path.join(vtk_dir, base + '.vtk'))
+                        or os.path.exists(os.path.join(vtk_dir, base + '.vtu'))):
                     print(f"⏭️ 건너뛰기 (이미 존재): {vtk_path}")
                     skipped_count += 1
                     continue
@@ -1,94 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-FRD → VTU 변환 스크립트 (ccx2paraview 사용)
-- ccx2paraview 라이브러리를 사용하여 안정적인 변환
+FRD → VTU 변환 스크립트
+- FRD 배열을 직접 읽어 압축 바이너리 VTU 로 기록 (auto_frd_to_vtk.convert_frd_to_vtu_direct)
 - frd 폴더의 모든 파일을 assets/vtu에 동일한 경로로 변환
 """
 
 import os
 import logging
-from ccx2paraview import Converter
+
+from auto_frd_to_vtk import convert_frd_to_vtu_direct, validate_vtu_header
 
 
 def convert_frd_to_vtu(frd_path, vtu_path):
-    """ccx2paraview를 사용하여 FRD → VTU 변환"""
-    try:
-        # vtu 디렉토리 생성
-        vtu_dir = os.path.dirname(vtu_path)
-        os.makedirs(vtu_dir, exist_ok=True)
-        
-        # ccx2paraview 변환기 생성 및 실행
-        converter = Converter(frd_path, ['vtu'])
-        converter.run()
-        
-        # 생성된 vtu 파일을 원하는 위치로 이동
-        # ccx2paraview는 입력 파일과 같은 디렉토리에 출력
-        generated_vtu = frd_path.replace('.frd', '.vtu')
-        if os.path.exists(generated_vtu):
-            # 파일이 이미 존재하면 덮어쓰기
-            if os.path.exists(vtu_path):
-                os.remove(vtu_path)
-            os.rename(generated_vtu, vtu_path)
-            return True, "변환 성공"
-        else:
-            return False, "VTU 파일이 생성되지 않았습니다"
-            
-    except Exception as e:
-        return False, f"변환 오류: {str(e)}"
+    """FRD → VTU 변환 (기존 파일은 덮어쓰기)"""
+    return convert_frd_to_vtu_direct(frd_path, vtu_path)
 
 
 def validate_vtu_file(vtu_path):
-    """VTU 파일이 올바른 형식인지 검증"""
-    try:
-        with open(vtu_path, 'r') as f:
-            lines = f.readlines()
-        
-        if len(lines) < 10:
-            return False, "파일이 너무 짧습니다"
-        
-        # XML 헤더 확인
-        if not lines[0].startswith('<?xml'):
-            return False, "XML 헤더가 없습니다"
-        
-        # VTKFile 태그 확인
-        vtkfile_found = False
-        for line in lines:
-            if '<VTKFile' in line:
-                vtkfile_found = True
-                break
-        
-        if not vtkfile_found:
-            return False, "VTKFile 태그가 없습니다"
-        
-        # UnstructuredGrid 태그 확인
-        grid_found = False
-        for line in lines:
-            if '<UnstructuredGrid' in line:
-                grid_found = True
-                break
-        
-        if not grid_found:
-            return False, "UnstructuredGrid 태그가 없습니다"
-        
-        # Piece 태그에서 노드 개수 확인
-        n_points = 0
-        for line in lines:
-            if '<Piece' in line and 'NumberOfPoints' in line:
-                try:
-                    # NumberOfPoints="486" 형태에서 숫자 추출
-                    import re
-                    match = re.search(r'NumberOfPoints="(\d+)"', line)
-                    if match:
-                        n_points = int(match.group(1))
-                        break
-                except:
-                    pass
-        
-        return True, f"검증 통과 (노드: {n_points}개)"
-        
-    except Exception as e:
-        return False, f"파일 읽기 오류: {e}"
+    """VTU 파일이 올바른 형식인지 검증 (헤더만 읽음)"""
+    return validate_vtu_header(vtu_path)
 
 
 def convert_all_frd_to_vtu(frd_root_dir="frd", vtu_root_dir="assets/vtu"):
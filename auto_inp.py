@@ -1,11 +1,19 @@
 import api_db
+import sensor_rollup
 import os
 from datetime import datetime, timedelta
 import json
 from scipy.interpolate import RBFInterpolator
 from shapely.geometry import Polygon, Point
 import numpy as np
+import pandas as pd
 import logging
+import fem_solver
+import solver_config
+import stage_metrics
+
+# 응력 해석 백엔드: 'ccx' (auto_inp_to_frd 에서 ccx 실행) | 'inprocess' (작은 메쉬는 fem_solver 로 즉시 해석)
+SOLVER_BACKEND = 'ccx'
 
 # 0) 로거 설정
 def setup_auto_inp_logger():
@@ -226,34 +234,46 @@ def calculate_elastic_modulus(concrete_data, analysis_time):
         return 3.0e10  # 기본값 반환 (30 GPa = 3.0e10 Pa)
 
 # 3) INP 파일 생성 함수
-def generate_calculix_inp(nodes, elements, node_temperatures, output_path, concrete_data, analysis_time):
+def get_material_properties(concrete_data, analysis_time):
+    """해석 시점의 콘크리트 물성치 반환: (탄성계수, 포아송비, 밀도, 열팽창계수)"""
+    # 재령에 따른 탄성계수 계산
+    elastic_modulus = calculate_elastic_modulus(concrete_data, analysis_time)
+    
+    # 콘크리트 물성치 가져오기
+    # 포아송비 (Poisson's ratio)
+    poisson_ratio = concrete_data.get('con_v', 0.2)  # 기본값 0.2
+    if not poisson_ratio:
+        logger.warning("포아송비 정보가 없습니다. 기본값 0.2 사용")
+        poisson_ratio = 0.2
+    
+    # 밀도 (Density, kg/m³)
+    density = concrete_data.get('con_d', 2400)  # 기본값 2400 kg/m³
+    if not density:
+        log_warning("밀도 정보가 없습니다. 기본값 2400 kg/m³ 사용")
+        density = 2400
+    
+    # 열팽창계수 (Thermal expansion coefficient, /°C)
+    thermal_expansion = concrete_data.get('con_a', 1.0e-5)  # 기본값 1.0e-5 /°C
+    if not thermal_expansion:
+        log_warning("열팽창계수 정보가 없습니다. 기본값 1.0e-5 /°C 사용")
+        thermal_expansion = 1.0e-5
+    
+    return elastic_modulus, float(poisson_ratio), float(density), float(thermal_expansion)
+
+def generate_calculix_inp(nodes, elements, node_temperatures, output_path, concrete_data, analysis_time,
+                          ccx_config=None):
     try:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # 재령에 따른 탄성계수 계산
-        elastic_modulus = calculate_elastic_modulus(concrete_data, analysis_time)
+        elastic_modulus, poisson_ratio, density, thermal_expansion = get_material_properties(concrete_data, analysis_time)
         
-        # 콘크리트 물성치 가져오기
-        # 포아송비 (Poisson's ratio)
-        poisson_ratio = concrete_data.get('con_v', 0.2)  # 기본값 0.2
-        if not poisson_ratio:
-            logger.warning("포아송비 정보가 없습니다. 기본값 0.2 사용")
-            poisson_ratio = 0.2
-        
-        # 밀도 (Density, kg/m³)
-        density = concrete_data.get('con_d', 2400)  # 기본값 2400 kg/m³
-        if not density:
-            log_warning("밀도 정보가 없습니다. 기본값 2400 kg/m³ 사용")
-            density = 2400
-        
-        # 열팽창계수 (Thermal expansion coefficient, /°C)
-        thermal_expansion = concrete_data.get('con_a', 1.0e-5)  # 기본값 1.0e-5 /°C
-        if not thermal_expansion:
-            log_warning("열팽창계수 정보가 없습니다. 기본값 1.0e-5 /°C 사용")
-            thermal_expansion = 1.0e-5
+        # 크기 등급별 ccx 설정 (솔버, 스레드, 출력 옵션)
+        if ccx_config is None:
+            ccx_config = solver_config.get_solver_config(len(nodes))
         
         with open(output_path, "w") as f:
-            f.write("*HEADING\nConcrete Curing Thermal Stress Analysis\n\n")
+            f.write("*HEADING\nConcrete Curing Thermal Stress Analysis\n")
+            f.write(solver_config.config_comment(ccx_config) + "\n\n")
             f.write("*NODE\n")
             for nid, (x, y, z) in nodes.items():
                 f.write(f"{nid}, {x:.2f}, {y:.2f}, {z:.2f}\n")
@@ -269,7 +289,8 @@ def generate_calculix_inp(nodes, elements, node_temperatures, output_path, concr
             f.write(f"*EXPANSION\n{float(thermal_expansion):.2e}\n")
             f.write("*SOLID SECTION, ELSET=SolidSet, MATERIAL=Conc\n\n")
             f.write("*INITIAL CONDITIONS, TYPE=TEMPERATURE\nALLNODES, 20.0\n")
-            f.write("*STEP\n*STATIC\n")
+            f.write("*STEP\n")
+            f.write(solver_config.static_keyword(ccx_config) + "\n")
             f.write("*BOUNDARY\n")
             for nid, (x, y, z) in nodes.items():
                 if z == 0.0:
@@ -277,8 +298,9 @@ def generate_calculix_inp(nodes, elements, node_temperatures, output_path, concr
             f.write("*TEMPERATURE\n")
             for nid, temp in node_temperatures.items():
                 f.write(f"{nid}, {temp:.2f}\n")
-            f.write("*NODE PRINT, NSET=ALLNODES\nU\n")
-            f.write("*EL PRINT, ELSET=SolidSet\nS\n")
+            if ccx_config.get('node_print', True):
+                f.write("*NODE PRINT, NSET=ALLNODES\nU\n")
+                f.write("*EL PRINT, ELSET=SolidSet\nS\n")
             f.write("*NODE FILE, NSET=ALLNODES\nU\n")
             f.write("*EL FILE, ELSET=SolidSet\nS\n")
             f.write("*END STEP\n")
@@ -305,8 +327,77 @@ def compute_epsilon(sensor_coords, sensor_temps, alpha=1.0):
         log_error(f"compute_epsilon error: {e}")
         return None
 
-# 5) INP 생성 메인 함수
+# 5) 메쉬 생성 함수
+def build_mesh(plan_points, thickness, element_size):
+    """평면 다각형(plan_points)과 두께로 C3D8 격자 메쉬 생성: (nodes, elements)"""
+    # 도메인 내 노드 생성
+    polygon = Polygon(plan_points)
+    nodes = {}
+    node_id = 1
+    z_levels = np.arange(0, thickness + 1e-3, element_size)
+    x_range = np.arange(min([p[0] for p in plan_points]), max([p[0] for p in plan_points]) + element_size, element_size)
+    y_range = np.arange(min([p[1] for p in plan_points]), max([p[1] for p in plan_points]) + element_size, element_size)
+    for z in z_levels:
+        for x in x_range:
+            for y in y_range:
+                if polygon.contains(Point(x, y)):
+                    nodes[node_id] = (x, y, z)
+                    node_id += 1
+
+    # 요소 생성
+    coord_to_node = {v: k for k, v in nodes.items()}
+    elements = {}
+    eid = 1
+    xs = sorted({c[0] for c in coord_to_node})
+    ys = sorted({c[1] for c in coord_to_node})
+    zs = sorted({c[2] for c in coord_to_node})
+    for x in xs[:-1]:
+        for y in ys[:-1]:
+            for z in zs[:-1]:
+                try:
+                    n000 = coord_to_node[(x, y, z)]
+                    n100 = coord_to_node[(x+element_size, y, z)]
+                    n110 = coord_to_node[(x+element_size, y+element_size, z)]
+                    n010 = coord_to_node[(x, y+element_size, z)]
+                    n001 = coord_to_node[(x, y, z+element_size)]
+                    n101 = coord_to_node[(x+element_size, y, z+element_size)]
+                    n111 = coord_to_node[(x+element_size, y+element_size, z+element_size)]
+                    n011 = coord_to_node[(x, y+element_size, z+element_size)]
+                    elements[eid] = [n000, n100, n110, n010, n001, n101, n111, n011]
+                    eid += 1
+                except KeyError:
+                    continue
+
+    return nodes, elements
+
+# 센서 1개의 시간별 온도 (해석 기간 전체를 한 번에 조회)
+def load_sensor_temperatures(sensor, time_list):
+    """시간 집계(sensor_rollup_hourly)에서 기간 전체를 한 번에 읽어 {시각 문자열: 온도} 반환.
+
+    집계가 없으면 sensor_data 기간 조회로 대체 (INP 는 시 단위 값이 필요하므로 hour 해상도 사용)
+    """
+    if not time_list:
+        return {}
+    start, end = time_list[0], time_list[-1]
+    try:
+        _, df = sensor_rollup.get_series(sensor['device_id'], sensor['channel'], start, end, resolution="hour")
+    except Exception as e:
+        log_warning(f"센서 집계 조회 실패 ({sensor['device_id']}/{sensor['channel']}): {e}")
+        df = pd.DataFrame()
+    if df.empty:
+        df = api_db.get_sensor_data(device_id=sensor['device_id'], channel=str(sensor['channel']),
+                                    start=datetime.strptime(start, '%Y-%m-%d %H:%M:%S').strftime('%Y%m%d%H'),
+                                    end=datetime.strptime(end, '%Y-%m-%d %H:%M:%S').strftime('%Y%m%d%H'))
+    if df.empty:
+        return {}
+    df = df.dropna(subset=['temperature'])
+    times = pd.to_datetime(df['time']).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return dict(zip(times, df['temperature'].astype(float)))
+
+# 6) INP 생성 메인 함수
 def make_inp(concrete, sensor_data_list, latest_csv):
+    """시간별 INP 생성. Returns: 생성한 INP 수"""
+    generated = 0
     try:
         cpk = concrete['concrete_pk']
         plan_points = json.loads(concrete['dims'])['nodes']
@@ -315,86 +406,80 @@ def make_inp(concrete, sensor_data_list, latest_csv):
         time_list = get_hourly_time_list(latest_csv)
         sensor_count = len(sensor_data_list)
 
+        # 메쉬는 시간과 무관하므로 한 번만 생성
+        nodes, elements = build_mesh(plan_points, thickness, element_size)
+
+        # 센서별 온도는 시각마다 조회하지 않고 기간 전체를 한 번에 읽음
+        sensor_temps = [load_sensor_temperatures(sensor, time_list) for sensor in sensor_data_list]
+        positions = [json.loads(sensor['dims'])['nodes'] for sensor in sensor_data_list]
+
         for time in time_list:
-            sensors = []
-            num = 1
-            for sensor in sensor_data_list:
-                df_time = api_db.get_sensor_data_by_time(device_id=sensor['device_id'], channel=sensor['channel'], time=time)
-                position = json.loads(sensor['dims'])['nodes']
-                if not df_time.empty:
-                    temp = float(df_time.iloc[0]['temperature'])
-                    sensors.append((num, position[0], position[1], position[2], temp))
-                    num += 1
-
-            # 센서 데이터 검증
-            if len(sensors) != sensor_count or len(sensors) == 0:
-                log_warning(f"Skipping time={time} due to insufficient sensor data: {len(sensors)}/{sensor_count}")
-                continue
+            # 시각 1개 = span 1개 (센서 부족/보간 실패는 skipped/failed)
+            with stage_metrics.span("auto_inp", f"{cpk}/{time}") as span:
+                sensors = []
+                num = 1
+                for temps_by_time, position in zip(sensor_temps, positions):
+                    temp = temps_by_time.get(time)
+                    if temp is not None:
+                        sensors.append((num, position[0], position[1], position[2], temp))
+                        num += 1
+
+                # 센서 데이터 검증
+                if len(sensors) != sensor_count or len(sensors) == 0:
+                    log_warning(f"Skipping time={time} due to insufficient sensor data: {len(sensors)}/{sensor_count}")
+                    span["outcome"] = "skipped"
+                    continue
                 
-            # epsilon 계산 및 보간
-            coords = np.array([[x, y, z] for _, x, y, z, _ in sensors])
-            temps  = np.array([t for *_, t in sensors])
-            epsilon = compute_epsilon(coords, temps)
-            if epsilon is None:
-                log_error(f"Skipping time={time} due to epsilon calculation error - no file will be generated")
-                continue
-
-            # 도메인 내 노드 생성
-            polygon = Polygon(plan_points)
-            nodes = {}
-            node_id = 1
-            z_levels = np.arange(0, thickness + 1e-3, element_size)
-            x_range = np.arange(min([p[0] for p in plan_points]), max([p[0] for p in plan_points]) + element_size, element_size)
-            y_range = np.arange(min([p[1] for p in plan_points]), max([p[1] for p in plan_points]) + element_size, element_size)
-            for z in z_levels:
-                for x in x_range:
-                    for y in y_range:
-                        if polygon.contains(Point(x, y)):
-                            nodes[node_id] = (x, y, z)
-                            node_id += 1
-
-            # 요소 생성
-            coord_to_node = {v: k for k, v in nodes.items()}
-            elements = {}
-            eid = 1
-            xs = sorted({c[0] for c in coord_to_node})
-            ys = sorted({c[1] for c in coord_to_node})
-            zs = sorted({c[2] for c in coord_to_node})
-            for x in xs[:-1]:
-                for y in ys[:-1]:
-                    for z in zs[:-1]:
-                        try:
-                            n000 = coord_to_node[(x, y, z)]
-                            n100 = coord_to_node[(x+element_size, y, z)]
-                            n110 = coord_to_node[(x+element_size, y+element_size, z)]
-                            n010 = coord_to_node[(x, y+element_size, z)]
-                            n001 = coord_to_node[(x, y, z+element_size)]
-                            n101 = coord_to_node[(x+element_size, y, z+element_size)]
-                            n111 = coord_to_node[(x+element_size, y+element_size, z+element_size)]
-                            n011 = coord_to_node[(x, y+element_size, z+element_size)]
-                            elements[eid] = [n000, n100, n110, n010, n001, n101, n111, n011]
-                            eid += 1
-                        except KeyError:
-                            continue
-
-            # 보간 실행
-            interpolator = RBFInterpolator(coords, temps, kernel='gaussian', epsilon=epsilon)
-            interp_vals = interpolator(np.array([nodes[i] for i in sorted(nodes)]))
-            node_temp_map = dict(zip(sorted(nodes), interp_vals))
-
-            time_dt = datetime.strptime(time, '%Y-%m-%d %H:%M:%S')
-            ts_str = time_dt.strftime('%Y%m%d%H')
-            final_path = f"inp/{cpk}/{ts_str}.inp"
-            generate_calculix_inp(nodes, elements, node_temp_map, final_path, concrete, time)
+                # epsilon 계산 및 보간
+                coords = np.array([[x, y, z] for _, x, y, z, _ in sensors])
+                temps  = np.array([t for *_, t in sensors])
+                epsilon = compute_epsilon(coords, temps)
+                if epsilon is None:
+                    log_error(f"Skipping time={time} due to epsilon calculation error - no file will be generated")
+                    span["outcome"] = "failed"
+                    continue
+
+                # 보간 실행
+                interpolator = RBFInterpolator(coords, temps, kernel='gaussian', epsilon=epsilon)
+                interp_vals = interpolator(np.array([nodes[i] for i in sorted(nodes)]))
+                node_temp_map = dict(zip(sorted(nodes), interp_vals))
+
+                time_dt = datetime.strptime(time, '%Y-%m-%d %H:%M:%S')
+                ts_str = time_dt.strftime('%Y%m%d%H')
+                final_path = f"inp/{cpk}/{ts_str}.inp"
+                generate_calculix_inp(nodes, elements, node_temp_map, final_path, concrete, time)
+                generated += 1
+                span["bytes_written"] = stage_metrics.file_size(final_path)
+
+                # In-process 백엔드: ccx 실행 없이 frd/dat 바로 생성 (auto_inp_to_frd 는 건너뜀)
+                if SOLVER_BACKEND == 'inprocess' and fem_solver.can_solve_inprocess(nodes, elements):
+                    elastic_modulus, poisson_ratio, _, thermal_expansion = get_material_properties(concrete, time)
+                    fem_solver.solve_to_frd(cpk, ts_str, nodes, elements, node_temp_map,
+                                            elastic_modulus, poisson_ratio, thermal_expansion)
 
     except Exception as e:
         log_error(f"make_inp error for concrete_pk={concrete.get('concrete_pk')}: {e}")
+        raise
+    return generated
 
-# 6) 전체 실행 함수
-def auto_inp():
+# 7) 전체 실행 함수
+def auto_inp(concrete_pks=None):
+    """분석 중(activate=0)인 콘크리트의 새 시간 INP 생성.
+
+    concrete_pks: 지정하면 해당 콘크리트만 (None 이면 전체)
+    콘크리트 목록 조회 실패는 예외로 전달, 콘크리트별 실패는 failed 에 모아 반환 (파이프라인이 재시도)
+
+    Returns
+    -------
+    dict: concretes(새 INP 가 생긴 콘크리트 목록), failed(INP 생성 중 오류가 난 콘크리트 목록)
+    """
     print("auto_inp started")
+    changed, failed = [], []
     try:
         concrete_list = api_db.get_concrete_data().to_dict(orient='records')
+        if concrete_pks is not None:
+            wanted = {str(c) for c in concrete_pks}
+            concrete_list = [c for c in concrete_list if str(c['concrete_pk']) in wanted]
         existing = get_subfolders('inp')
         for conc in concrete_list:
             # activate가 0인 경우에만 분석 처리
@@ -408,10 +493,19 @@ def auto_inp():
                 os.makedirs(f'inp/{cpk}', exist_ok=True)
             files = get_files(f'inp/{cpk}')
             latest = get_latest_csv(f'inp/{cpk}')
-            sensor_data_list = api_db.get_sensors_data(concrete_pk=cpk).to_dict('records')
-            make_inp(conc, sensor_data_list, latest)
+            try:
+                sensor_data_list = api_db.get_sensors_data(concrete_pk=cpk).to_dict('records')
+                if make_inp(conc, sensor_data_list, latest):
+                    changed.append(cpk)
+            except Exception as e:
+                log_error(f"auto_inp error for concrete_pk={cpk}: {e}")
+                failed.append(cpk)
     except Exception as e:
         log_error(f"auto_inp error: {e}")
+        raise
+    finally:
+        stage_metrics.flush()
+    return {"concretes": changed, "failed": failed}
 
 if __name__ == '__main__':
     auto_inp()
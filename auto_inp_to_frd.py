@@ -1,7 +1,10 @@
 import subprocess
 import shutil
 import os
+import time
 import logging
+import solver_config
+import stage_metrics
 
 # 로거 설정
 def setup_auto_inp_to_frd_logger():
@@ -39,6 +42,11 @@ def log_error(message):
     """오류 로그 기록"""
     logger.error(message)
 
+def get_ccx_env(inp_path):
+    """INP 헤더의 크기 등급 설정에 맞춘 ccx 실행 환경변수"""
+    meta = solver_config.read_config_comment(inp_path)
+    return solver_config.ccx_env(meta.get('threads', 1))
+
 def inp_to_frd(concrete_pk, inp_path):
     """
     ccx 로 inp 를 실행한 뒤,
@@ -46,6 +54,8 @@ def inp_to_frd(concrete_pk, inp_path):
       - dat 는 dat/{concrete_pk}/ 아래로
     옮기고,
       - .cvg, .sta 파일은 삭제
+
+    Returns: "converted" | "skipped"(이미 있음) | "failed"
     """
     base = os.path.splitext(os.path.basename(inp_path))[0]
     work_dir = os.path.dirname(inp_path)
@@ -61,11 +71,11 @@ def inp_to_frd(concrete_pk, inp_path):
     dat_target = os.path.join(dat_dir, f"{base}.dat")
     
     if os.path.exists(frd_target) and os.path.exists(dat_target):
-        return
+        return "skipped"
 
     try:
         # 1) CCX 실행 (.frd, .dat, .cvg, .sta 생성) - 파일명만 사용, 확장자 제외
-        subprocess.run(['ccx', base], cwd=work_dir, check=True)
+        subprocess.run(['ccx', base], cwd=work_dir, check=True, env=get_ccx_env(inp_path))
         
         # 3) .frd, .dat 이동
         frd_src = os.path.join(work_dir, f"{base}.frd")
@@ -83,73 +93,70 @@ def inp_to_frd(concrete_pk, inp_path):
                 
         # FRD 변환 성공 시에만 로그 기록
         log_frd_conversion_success(concrete_pk, base)
+        return "converted"
         
     except Exception as e:
         log_error(f"{concrete_pk}/{base} INP to FRD 변환 오류: {e}")
+        return "failed"
+
+def _file_age(path, now):
+    """now 기준 파일 수정 후 지난 시간 (초, 파일이 없으면 None)"""
+    try:
+        return now - os.path.getmtime(path)
+    except OSError:
+        return None
 
-def convert_all_inp_to_frd():
+def convert_all_inp_to_frd(concrete_pks=None):
     """
     inp/ 하위 모든 .inp 파일을 찾아서:
       1) ccx 로 실행
       2) frd/{concrete_pk}/ 에 .frd
          dat/{concrete_pk}/ 에 .dat
       3) .cvg, .sta 파일 삭제
+
+    concrete_pks: 지정하면 inp/{concrete_pk} 만 처리 (None 이면 inp/ 전체)
+
+    Returns
+    -------
+    dict: total, converted, skipped, failed, concretes(FRD 가 새로 생긴 콘크리트 목록),
+          failed_concretes(변환에 실패한 파일이 있는 콘크리트 목록)
     """
-    total_files = 0
-    converted_files = 0
-    skipped_files = 0
-    error_files = 0
-    
-    for root, dirs, files in os.walk('inp'):
-        for fname in files:
-            if not fname.endswith('.inp'):
-                continue
-
-            total_files += 1
-            inp_path = os.path.join(root, fname)
-            # root 예: inp/C000001
-            concrete_pk = os.path.basename(root)
-            base = os.path.splitext(fname)[0]
-
-            # 대상 디렉토리 생성
-            frd_dir = os.path.join('frd', concrete_pk)
-            dat_dir = os.path.join('dat', concrete_pk)
-            os.makedirs(frd_dir, exist_ok=True)
-            os.makedirs(dat_dir, exist_ok=True)
-
-            # 이미 파일이 존재하는지 확인
-            frd_target = os.path.join(frd_dir, f"{base}.frd")
-            dat_target = os.path.join(dat_dir, f"{base}.dat")
-            
-            if os.path.exists(frd_target) and os.path.exists(dat_target):
-                skipped_files += 1
-                continue
-
-            try:
-                # 1) CCX 실행 (파일명만 사용, 확장자 제외)
-                subprocess.run(['ccx', base], cwd=root, check=True)
-
-                # 3) .frd, .dat 이동
-                frd_src = os.path.join(root, f"{base}.frd")
-                dat_src = os.path.join(root, f"{base}.dat")
-                if os.path.exists(frd_src):
-                    shutil.move(frd_src, frd_target)
-                if os.path.exists(dat_src):
-                    shutil.move(dat_src, dat_target)
-
-                # 4) .cvg, .sta 파일 삭제
-                for ext in ('.cvg', '.sta'):
-                    p = os.path.join(root, f"{base}{ext}")
-                    if os.path.exists(p):
-                        os.remove(p)
-
-                # FRD 변환 성공 시에만 로그 기록
-                log_frd_conversion_success(concrete_pk, base)
-                converted_files += 1
-                
-            except Exception as e:
-                log_error(f"{concrete_pk}/{base} INP to FRD 변환 오류: {e}")
-                error_files += 1
+    summary = {"total": 0, "converted": 0, "skipped": 0, "failed": 0, "concretes": [], "failed_concretes": []}
+    roots = ['inp'] if concrete_pks is None else [os.path.join('inp', str(c)) for c in concrete_pks]
+    changed, failed = set(), set()
+
+    for top in roots:
+        for root, dirs, files in os.walk(top):
+            for fname in sorted(files):
+                if not fname.endswith('.inp'):
+                    continue
+                summary["total"] += 1
+                # root 예: inp/C000001
+                concrete_pk = os.path.basename(root)
+                inp_path = os.path.join(root, fname)
+                inp_bytes = stage_metrics.file_size(inp_path)
+                started, start = time.time(), time.perf_counter()
+                # 대기 시간: INP 가 만들어진 뒤 변환을 시작하기까지
+                queue_wait = _file_age(inp_path, started)
+                result = inp_to_frd(concrete_pk, inp_path)
+                summary[result] += 1
+                if result == "converted":
+                    changed.add(concrete_pk)
+                elif result == "failed":
+                    failed.add(concrete_pk)
+                if result != "skipped":
+                    base = os.path.splitext(fname)[0]
+                    stage_metrics.record_span(
+                        "auto_inp_to_frd", f"{concrete_pk}/{base}", time.perf_counter() - start,
+                        "ok" if result == "converted" else "failed", bytes_read=inp_bytes,
+                        bytes_written=stage_metrics.file_size(os.path.join('frd', concrete_pk, f"{base}.frd"),
+                                                              os.path.join('dat', concrete_pk, f"{base}.dat")),
+                        queue_wait=queue_wait, started=started)
+
+    summary["concretes"] = sorted(changed)
+    summary["failed_concretes"] = sorted(failed)
+    stage_metrics.flush()
+    return summary
 
 # 스크립트 맨 아래나 auto_inp() 호출 직후에 추가:
 if __name__ == "__main__":
@@ -1,8 +1,6 @@
-import auto_inp
-import auto_sensor
-import auto_inp_to_frd
-import auto_frd_to_vtk
-import time
+import argparse
+import pipeline
+import fs_watcher
 import logging
 import os
 
@@ -31,40 +29,38 @@ def setup_auto_run_logger():
     logger.addHandler(file_handler)
     return logger
 
+def parse_cadence(values):
+    """["sensor=120", ...] → {"sensor": 120.0}"""
+    cadence = {}
+    for value in values or []:
+        name, _, seconds = value.partition("=")
+        cadence[name.strip()] = float(seconds)
+    return cadence
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="자동화 파이프라인 (센서 → INP → FRD → VTK/시계열/LOD)")
+    parser.add_argument("--once", action="store_true", help="모든 단계를 한 번 전체 처리하고 종료")
+    parser.add_argument("--cadence", action="append", metavar="단계=초",
+                        help=f"원천 단계 주기 (기본 {pipeline.CADENCE})")
+    parser.add_argument("--full-scan", type=float, default=None,
+                        help=f"후속 단계 전체 처리 주기 (초, 기본 {pipeline.FULL_SCAN_INTERVAL}, "
+                             f"파일 감시 중이면 {fs_watcher.WATCH_FULL_SCAN_INTERVAL})")
+    parser.add_argument("--no-watch", action="store_true",
+                        help="inp/frd 파일 감시를 끄고 전체 처리 주기에만 의존")
+    args = parser.parse_args()
+
     logger = setup_auto_run_logger()
     logger.info("자동화 시스템 시작")
     
-    cycle_count = 0
-    while True:
-        cycle_count += 1
-        logger.info(f"자동화 사이클 {cycle_count} 시작")
-        
-        try:
-            logger.info("센서 데이터 수집 시작")
-            auto_sensor.auto_sensor_data()
-            logger.info("센서 데이터 수집 완료")
-            time.sleep(10)
-            
-            logger.info("INP 파일 생성 시작")
-            auto_inp.auto_inp()
-            logger.info("INP 파일 생성 완료")
-            time.sleep(10)
-            
-            logger.info("INP to FRD 변환 시작")
-            auto_inp_to_frd.convert_all_inp_to_frd()
-            logger.info("INP to FRD 변환 완료")
-            time.sleep(10)
-            
-            logger.info("FRD to VTK 변환 시작")
-            auto_frd_to_vtk.convert_all_frd_to_vtk()
-            logger.info("FRD to VTK 변환 완료")
-            
-            logger.info(f"자동화 사이클 {cycle_count} 완료 - 20분 대기")
-            time.sleep(1200)
-            
-        except Exception as e:
-            logger.error(f"자동화 사이클 {cycle_count} 오류: {e}")
-            logger.info("10분 후 재시도")
-            time.sleep(600)
-
+    if args.once:
+        emitted = pipeline.run_once(full=True)
+        logger.info("한 번 실행 완료: " + ", ".join(f"{k} {len(v)}" for k, v in emitted.items()))
+    else:
+        # 단계별 스레드가 바뀐 콘크리트만 후속 단계로 넘기며 계속 실행 (고정 sleep 없음)
+        # 파일 감시가 새 INP/FRD 를 바로 넘기므로 전체 처리는 안전망으로만 (기본 24시간)
+        watch = not args.no_watch
+        full_scan = args.full_scan
+        if full_scan is None:
+            full_scan = fs_watcher.WATCH_FULL_SCAN_INTERVAL if watch else pipeline.FULL_SCAN_INTERVAL
+        pipeline.run_pipeline(watch=watch, cadence=parse_cadence(args.cadence), full_scan_interval=full_scan)
+    logger.info("자동화 시스템 종료")
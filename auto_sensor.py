@@ -1,11 +1,14 @@
 import pymysql
 from datetime import datetime, timedelta
 import pandas as pd
-import threading
-import time
 import logging
 import os
-from ITS_CLI import config, tcp_client
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from its_session import its_session, get_pool, ITSSessionError
+import sensor_store
+import sensor_rollup
+import stage_metrics
 
 # 0) 로거 설정
 def setup_auto_sensor_logger():
@@ -34,35 +37,37 @@ def setup_auto_sensor_logger():
 
 logger = setup_auto_sensor_logger()
 
+# sensor_data 일괄 저장 설정
+UPSERT_BATCH_SIZE = 500
+
+# 동시 조회 설정: 동시에 조회하는 센서 수 (= 공용 풀의 ITS 세션 수)
+# 요청별 제한 시간은 세션의 REQUEST_TIMEOUT 을 따름
+FETCH_WORKERS = 4
+# 진행 지표 출력 간격 (초)
+PROGRESS_INTERVAL = 10.0
+
+# (device_id, channel, time) 가 이미 있으면 값만 갱신
+# (유니크 키 uq_sensor_data_device_channel_time 은 db_migrate 마이그레이션 2 에서 생성: python db_migrate.py upgrade)
+# pymysql executemany 는 VALUES 가 모두 %s 일 때만 다중 VALUES 한 문장으로 묶어 전송하므로
+# created_at / updated_at 도 NOW() 대신 파라미터로 전달
+UPSERT_SENSOR_DATA_SQL = """
+    INSERT INTO sensor_data
+      (device_id, channel, time, humidity, sv, temperature, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+      humidity = VALUES(humidity), sv = VALUES(sv), temperature = VALUES(temperature),
+      updated_at = VALUES(updated_at)
+"""
+
 # 센서 데이터 조회 및 추출
-def export_sensor_data(deviceid, channel, sd_start=None):
-    # --- 1) ITS 로그인 및 연결 설정 ---
-    user_id = 'cbk4689'
-    user_pass = 'qudrhks7460!@'
-    config.config_load()
-    ITS_CLIENT = tcp_client.TCPClient(
-        config.SERVER_IP, config.SERVER_PORT, config.ITS_NUM, config.certfile
-    )
-    t = threading.Thread(target=ITS_CLIENT.receive_messages)
-    t.daemon = True
-    t.start()
-    time.sleep(1)
-    ITS_CLIENT.set_user_password(user_id, user_pass)
-    res = ITS_CLIENT.message('login')
-    if res.get('result') != 'Success':
-        logger.error(f"ITS 로그인 실패: {res.get('msg')}")
+def _fetch_hourly(session, deviceid, channel, sd_start=None):
+    """세션으로 센서 1개 채널 데이터를 받아 시간 평균으로 집계 (세션 오류는 ITSSessionError 로 전달)"""
+    result = session.query_channel_data(deviceid, channel, start_date=sd_start)
+    if isinstance(result, dict):
+        # 서버가 Fail 응답을 준 경우 (데이터 없음 등)
+        logger.warning(f"{deviceid}/{channel} ITS 응답: {result.get('msg')}")
         return
 
-    result = ITS_CLIENT.message_getdata(
-        'query_device_channel_data',
-        start_date=sd_start,
-        end_date=None,
-        projectid=None,
-        structureid=None,
-        deviceid=deviceid,
-        channel=channel
-    )
-
     df = pd.DataFrame(result)
     if df.empty:
         return
@@ -73,19 +78,125 @@ def export_sensor_data(deviceid, channel, sd_start=None):
     if df.empty:
         return
 
-    df['hour'] = df['time'].dt.floor('h')
-    numeric_cols = df.select_dtypes(include='number').columns.tolist()
-    agg = (
-        df
-        .groupby('hour', as_index=False)[numeric_cols]
-        .mean()
-        .rename(columns={'hour': 'time'})
-    )
+    # 시간별 평균(sensor_data 저장값) + n / min / max (집계 테이블용)
+    return sensor_rollup.hourly_rollup(df)
+
+
+def export_sensor_data(deviceid, channel, sd_start=None, session=None):
+    """ITS 에서 센서 1개 채널 데이터를 받아 시간 평균으로 집계.
+
+    session 을 주지 않으면 공용 세션 풀에서 빌려 사용 (연결/로그인은 세션이 재사용)
+    """
+    try:
+        if session is None:
+            with its_session() as session:
+                return _fetch_hourly(session, deviceid, channel, sd_start)
+        return _fetch_hourly(session, deviceid, channel, sd_start)
+    except ITSSessionError as e:
+        logger.error(f"{deviceid}/{channel} ITS 조회 실패: {e}")
+        return
+
+
+def _fetch_job(device_id, channel, sd_start, submitted=None):
+    """작업자 스레드에서 실행: 풀에서 세션을 빌려 센서 1개 조회.
+
+    submitted: 작업을 제출한 시각(epoch 초) → 대기 시간 계산용
+
+    Returns: (agg 또는 None, 오류 메시지 또는 None, 조회 시간[s], 시작 시각, 대기 시간[s] 또는 None)
+    """
+    started, start = time.time(), time.perf_counter()
+    queue_wait = None if submitted is None else started - submitted
+    try:
+        with its_session() as session:
+            agg = _fetch_hourly(session, device_id, channel, sd_start)
+        return agg, None, time.perf_counter() - start, started, queue_wait
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start, started, queue_wait
+
+def fetch_sensor_watermarks(conn):
+    """모든 (device_id, channel) 의 마지막 저장 시각을 쿼리 1번으로 조회.
+
+    (device_id, channel, time) 유니크 키를 그대로 사용하므로 MySQL 이 인덱스만으로
+    그룹별 MAX 를 찾음 (EXPLAIN: Using index for group-by).
+
+    Returns
+    -------
+    dict: {(str(device_id), str(channel)): datetime}
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT `device_id`, `channel`, MAX(`time`) FROM `sensor_data` GROUP BY `device_id`, `channel`"
+        )
+        watermarks = {}
+        for device_id, channel, last_time in cursor.fetchall():
+            if isinstance(last_time, str):
+                last_time = datetime.strptime(last_time, '%Y-%m-%d %H:%M:%S')
+            watermarks[(str(device_id), str(channel))] = last_time
+    return watermarks
+
+
+def watermark_to_start(last_time):
+    """마지막 저장 시각 → ITS 조회 시작 시각 문자열 (1시간 겹치게, 없으면 None)"""
+    if not last_time:
+        return None
+    return (last_time - timedelta(hours=1)).strftime('%Y%m%d%H')
+
+
+def upsert_sensor_rows(cursor, device_id, channel, agg, batch_size=UPSERT_BATCH_SIZE):
+    """시간별 집계 행을 batch_size 단위로 일괄 저장 (커밋은 호출 측에서).
+
+    affected rows 규칙(신규 1, 값이 바뀐 기존 행 2)으로 신규/갱신 개수 계산.
+    updated_at 을 실행 시각으로 갱신하므로 기존 행은 2 로 집계됨.
+
+    Returns
+    -------
+    (inserted, updated)
+    """
+    # NaN 평균값은 NULL 로 저장
+    values = agg[['humidity', 'sv', 'temperature']]
+    values = values.astype(object).where(values.notna(), None)
+    times = agg['time'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [(device_id, channel, ts, *vals, now, now)
+            for ts, vals in zip(times, values.itertuples(index=False, name=None))]
+    inserted = updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        affected = cursor.executemany(UPSERT_SENSOR_DATA_SQL, batch) or 0
+        batch_updated = min(max(affected - len(batch), 0), len(batch))
+        updated += batch_updated
+        inserted += len(batch) - batch_updated
+    return inserted, updated
+
+
+def _print_progress(metrics, start_time):
+    """센서별 출력 대신 주기적으로 한 줄 진행 지표 출력"""
+    done, total = metrics['done'], metrics['total']
+    elapsed = time.perf_counter() - start_time
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else 0.0
+    print(f"📈 [{done}/{total}] ({done / max(total, 1) * 100:5.1f}%) "
+          f"저장 {metrics['success']} / 신규없음 {metrics['no_data']} / 실패 {metrics['failed']} | "
+          f"행 신규 {metrics['inserted']} 갱신 {metrics['updated']} | "
+          f"{rate:.1f}개/s, 남은 시간 약 {eta:.0f}s")
 
-    return agg
 
 # 센서 데이터 자동 저장 및 업데이트
-def auto_sensor_data():
+def auto_sensor_data(batch_size=UPSERT_BATCH_SIZE, workers=FETCH_WORKERS):
+    """센서별 ITS 조회를 workers 개씩 동시에 실행하고, 조회가 끝나는 순서대로 DB 에 저장.
+
+    조회는 작업자 스레드(각자 공용 풀의 ITS 세션 사용), 저장은 현재 스레드의 DB 연결에서
+    처리하므로 저장하는 동안에도 다음 센서 조회가 계속 진행됨.
+
+    Returns
+    -------
+    dict: total, done, success, no_data, failed, inserted, updated,
+          fetch_time(조회 시간 합), upsert_time, slowest(가장 느린 센서, 초), elapsed,
+          changed([(device_id, channel, 첫 시각, 마지막 시각)] 저장된 센서와 시간 범위)
+    """
+    metrics = {"total": 0, "done": 0, "success": 0, "no_data": 0, "failed": 0,
+               "inserted": 0, "updated": 0, "fetch_time": 0.0, "upsert_time": 0.0,
+               "slowest": None, "elapsed": 0.0, "changed": []}
     conn = pymysql.connect(
         host='localhost', port=3306,
         user='root', password='smart001!',
@@ -94,124 +205,137 @@ def auto_sensor_data():
 
     try:
         # device_id, channel 기준으로 중복 제거 (최신 센서만 선택)
-        sql_query = """
-        SELECT s1.device_id, s1.channel, s1.d_type 
-        FROM sensor s1
-        INNER JOIN (
-            SELECT device_id, channel, MAX(created_at) as max_created_at
-            FROM sensor 
-            GROUP BY device_id, channel
-        ) s2 ON s1.device_id = s2.device_id 
-              AND s1.channel = s2.channel 
-              AND s1.created_at = s2.max_created_at
-        ORDER BY s1.device_id, s1.channel;
-        """
-        df_sensors = pd.read_sql(sql_query, conn)
-        
-        # 중복 제거 결과 확인
-        total_sensors_query = "SELECT COUNT(*) as cnt FROM sensor;"
-        total_sensors = pd.read_sql(total_sensors_query, conn).iloc[0]['cnt']
+        # 전체 행을 한 번 읽어 중복 제거하므로 전체 개수 조회(COUNT)를 따로 하지 않음
+        df_all = pd.read_sql("SELECT device_id, channel, d_type, created_at FROM sensor", conn)
+        df_sensors = (
+            df_all
+            .sort_values('created_at')
+            .drop_duplicates(['device_id', 'channel'], keep='last')
+            .sort_values(['device_id', 'channel'])
+            [['device_id', 'channel', 'd_type']]
+        )
+        total_sensors = len(df_all)
         unique_sensors = len(df_sensors)
         
         if total_sensors != unique_sensors:
             print(f"📊 센서 중복 제거: 전체 {total_sensors}개 → 유니크 {unique_sensors}개")
         
         records = df_sensors.to_dict(orient='records')
-        
-        # 진행도 추적 변수들
-        total_count = len(records)
-        processed_count = 0
-        success_count = 0
-        fail_count = 0
-        start_time = datetime.now()
-        
-        print(f"🚀 센서 데이터 수집 시작 - 총 {total_count}개 센서 (중복 제거 후)")
+
+        # ITS 세션 풀을 작업자 수만큼 확보하고, 사이클 시작 전에 연결/로그인 확인
+        workers = max(1, workers)
+        get_pool(workers)
+        try:
+            with its_session() as session:
+                session.ensure_ready()
+        except ITSSessionError as e:
+            logger.error(f"ITS 세션 준비 실패, 이번 사이클 건너뜀: {e}")
+            print(f"❌ ITS 연결/로그인 실패: {e}")
+            return metrics
+
+        metrics["total"] = len(records)
+        start_time = time.perf_counter()
+        last_progress = start_time
+        print(f"🚀 센서 데이터 수집 시작 - 총 {metrics['total']}개 센서 (중복 제거 후), 동시 조회 {workers}개")
         print("=" * 60)
 
         with conn.cursor() as cursor:
-            for idx, rec in enumerate(records, 1):
-                device_id = rec['device_id']
-                channel = rec['channel']
-                cursor.execute(
-                    "SELECT MAX(`time`) FROM `sensor_data` WHERE `device_id` = %s AND `channel` = %s",
-                    (device_id, channel)
-                )
-                last_time = cursor.fetchone()[0]
-
-                if last_time:
-                    if isinstance(last_time, str):
-                        last_time = datetime.strptime(last_time, '%Y-%m-%d %H:%M:%S')
-                    prev_hour = last_time - timedelta(hours=1)
-                    sd_start = prev_hour.strftime('%Y%m%d%H')
-                else:
-                    sd_start = None
-
-                # 진행도 표시
-                progress = (idx / total_count) * 100
-                print(f"[{idx:3d}/{total_count}] ({progress:5.1f}%) 처리 중: {device_id}/{channel}", end=" ")
-
-                agg = export_sensor_data(device_id, channel, sd_start)
-                if agg is None or agg.empty:
-                    print("⚠️  신규 데이터 없음")
-                    processed_count += 1
-                    continue
-
-                # INSERT/UPDATE 처리
-                insert_count = 0
-                update_count = 0
-                
-                try:
-                    for row in agg.to_dict(orient='records'):
-                        ts = row['time'].strftime('%Y-%m-%d %H:%M:%S')
-                        hmd, sv, tmp = row['humidity'], row['sv'], row['temperature']
-
-                        cursor.execute(
-                            "SELECT COUNT(*) FROM sensor_data WHERE device_id=%s AND channel=%s AND time=%s",
-                            (device_id, channel, ts)
-                        )
-                        exists = cursor.fetchone()[0] > 0
-
-                        if exists:
-                            cursor.execute("""
-                                UPDATE sensor_data
-                                SET humidity=%s, sv=%s, temperature=%s, updated_at=NOW()
-                                WHERE device_id=%s AND channel=%s AND time=%s
-                            """, (hmd, sv, tmp, device_id, channel, ts))
-                            update_count += 1
-                            # UPDATE 시에만 로그 기록
-                            logger.info(f"UPDATED {device_id}/{channel} @ {ts}: hmd={hmd}, sv={sv}, tmp={tmp}")
-                        else:
-                            cursor.execute("""
-                                INSERT INTO sensor_data
-                                  (device_id, channel, time, humidity, sv, temperature, created_at, updated_at)
-                                VALUES (%s, %s, %s, %s, %s, %s, NOW(), NOW())
-                            """, (device_id, channel, ts, hmd, sv, tmp))
-                            insert_count += 1
-                            # INSERT는 로그 기록하지 않음
-
-                    conn.commit()
-                    print(f"✅ 완료 (신규:{insert_count}, 갱신:{update_count})")
-                    success_count += 1
-                    processed_count += 1
-                    
-                except Exception as e:
-                    print(f"❌ 실패: {str(e)[:50]}...")
-                    logger.error(f"{device_id}/{channel} 처리 오류: {e}")
-                    fail_count += 1
-                    processed_count += 1
+            # 센서별 마지막 저장 시각을 한 번에 조회 (1시간 겹치게 다시 조회)
+            watermarks = fetch_sensor_watermarks(conn)
+            jobs = [(rec['device_id'], rec['channel'],
+                     watermark_to_start(watermarks.get((str(rec['device_id']), str(rec['channel'])))))
+                    for rec in records]
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_fetch_job, *job, time.time()): job[:2] for job in jobs}
+                # 먼저 끝난 조회부터 저장 (저장 중에도 나머지 조회는 계속 진행)
+                for future in as_completed(futures):
+                    device_id, channel = futures[future]
+                    agg, error, fetch_elapsed, fetch_started, queue_wait = future.result()
+                    outcome, agg_bytes = "ok", 0
+                    metrics["done"] += 1
+                    metrics["fetch_time"] += fetch_elapsed
+                    if metrics["slowest"] is None or fetch_elapsed > metrics["slowest"][1]:
+                        metrics["slowest"] = (f"{device_id}/{channel}", fetch_elapsed)
+
+                    if error is not None:
+                        logger.error(f"{device_id}/{channel} 조회 오류: {error}")
+                        metrics["failed"] += 1
+                        outcome = "failed"
+                    elif agg is None or agg.empty:
+                        metrics["no_data"] += 1
+                        outcome = "skipped"
+                    else:
+                        agg_bytes = int(agg.memory_usage(index=False).sum())
+                        # 일괄 INSERT ... ON DUPLICATE KEY UPDATE (센서당 1회 커밋)
+                        upsert_start = time.perf_counter()
+                        try:
+                            insert_count, update_count = upsert_sensor_rows(cursor, device_id, channel, agg, batch_size)
+                            conn.commit()
+                            metrics["success"] += 1
+                            metrics["inserted"] += insert_count
+                            metrics["updated"] += update_count
+                            # 마지막 저장 시각 이후 시간이 있거나 신규 행이 있을 때만 로그 기록 + 후속 단계(INP)로 넘김
+                            # (겹쳐 다시 조회한 1시간은 updated_at 때문에 항상 "갱신" 으로 집계됨)
+                            last_time = watermarks.get((str(device_id), str(channel)))
+                            if insert_count > 0 or last_time is None or agg['time'].max() > last_time:
+                                logger.info(f"UPDATED {device_id}/{channel}: 신규 {insert_count}, 갱신 {update_count} "
+                                            f"({agg['time'].min()} ~ {agg['time'].max()})")
+                                metrics["changed"].append((device_id, channel, agg['time'].min(), agg['time'].max()))
+                            # 로컬 시계열 저장소에도 추가 (실패해도 sensor_store 단계에서 DB 기준으로 다시 채움)
+                            try:
+                                sensor_store.append(sensor_store.sensor_key(device_id, channel), agg)
+                            except Exception as e:
+                                logger.warning(f"{device_id}/{channel} 시계열 저장소 추가 실패: {e}")
+                            # 시간/일 집계 갱신 (실패해도 다음 단계 backfill 이 sensor_data 로 채움)
+                            try:
+                                sensor_rollup.update_rollups(device_id, channel, agg)
+                            except Exception as e:
+                                logger.warning(f"{device_id}/{channel} 집계 갱신 실패: {e}")
+                        except Exception as e:
+                            conn.rollback()
+                            logger.error(f"{device_id}/{channel} 처리 오류: {e}")
+                            metrics["failed"] += 1
+                            outcome = "failed"
+                        metrics["upsert_time"] += time.perf_counter() - upsert_start
+
+                    # 센서 1개 = span 1개 (조회 시작 ~ 저장 끝, 바이트는 조회한 시간 집계 행의 크기)
+                    stage_metrics.record_span("auto_sensor", f"{device_id}/{channel}",
+                                              time.time() - fetch_started, outcome,
+                                              bytes_read=agg_bytes,
+                                              bytes_written=agg_bytes if outcome == "ok" else 0,
+                                              queue_wait=queue_wait, started=fetch_started)
+
+                    now = time.perf_counter()
+                    if now - last_progress >= PROGRESS_INTERVAL:
+                        _print_progress(metrics, start_time)
+                        last_progress = now
+
         # 작업 완료 통계 표시
-        elapsed_time = datetime.now() - start_time
+        metrics["elapsed"] = time.perf_counter() - start_time
+        _print_progress(metrics, start_time)
+        slowest = metrics["slowest"]
         print("\n" + "=" * 60)
         print(f"🏁 센서 데이터 수집 완료!")
-        print(f"📊 처리 결과: 총 {processed_count}개 / 성공 {success_count}개 / 실패 {fail_count}개")
-        print(f"⏱️  소요 시간: {elapsed_time}")
+        print(f"📊 처리 결과: 총 {metrics['done']}개 / 성공 {metrics['success']}개 / "
+              f"신규 없음 {metrics['no_data']}개 / 실패 {metrics['failed']}개")
+        print(f"⏱️  소요 시간: {metrics['elapsed']:.1f}s (조회 합계 {metrics['fetch_time']:.1f}s, "
+              f"저장 {metrics['upsert_time']:.1f}s)")
+        if slowest:
+            print(f"🐢 가장 느린 센서: {slowest[0]} ({slowest[1]:.1f}s)")
         print("=" * 60)
+        logger.info(f"수집 사이클 완료: 센서 {metrics['done']}/{metrics['total']}, 성공 {metrics['success']}, "
+                    f"신규없음 {metrics['no_data']}, 실패 {metrics['failed']}, 행 신규 {metrics['inserted']} "
+                    f"갱신 {metrics['updated']}, {metrics['elapsed']:.1f}s (조회 합 {metrics['fetch_time']:.1f}s, "
+                    f"저장 {metrics['upsert_time']:.1f}s, 작업자 {workers})")
         
     except Exception as e:
         logger.error(f"auto_sensor_data 오류: {e}")
         print(f"\n❌ 전체 작업 실패: {e}")
     finally:
         conn.close()
+        stage_metrics.flush()
+    return metrics
 
 
 if __name__ == '__main__':
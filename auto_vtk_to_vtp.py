@@ -1,19 +1,29 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Batch convert all .vtk files under a directory tree to .vtp,
-writing the outputs (preserving relative paths) into assets/vtu.
+Batch convert all .vtk/.vtu files under a directory tree to .vtp,
+writing the outputs (preserving relative paths) into assets/vtp.
 Uses VTK's readers and writers with Update()/Write().
+Batch runs go through convert_pool (worker pool + manifest skip index).
 """
 
 import os
 import sys
-import vtk
 
-def vtk2vtp(invtkfile, outvtpfile, binary=False):
-    """Convert one .vtk UnstructuredGrid to .vtp XML PolyData."""
-    # reader for unstructured grid
-    reader = vtk.vtkUnstructuredGridReader()
+import convert_pool
+
+def vtk2vtp(invtkfile, outvtpfile, binary=True):
+    """Convert one .vtk/.vtu UnstructuredGrid to .vtp XML PolyData.
+
+    binary=True writes appended raw binary with zlib compression.
+    """
+    import vtk
+
+    # reader for unstructured grid (legacy .vtk or XML .vtu)
+    if invtkfile.lower().endswith(".vtu"):
+        reader = vtk.vtkXMLUnstructuredGridReader()
+    else:
+        reader = vtk.vtkUnstructuredGridReader()
     reader.SetFileName(invtkfile)
     reader.Update()
 
@@ -30,50 +40,34 @@ def vtk2vtp(invtkfile, outvtpfile, binary=False):
     writer = vtk.vtkXMLPolyDataWriter()
     writer.SetFileName(outvtpfile)
     if binary:
-        writer.SetDataModeToBinary()
+        writer.SetDataModeToAppended()
+        writer.EncodeAppendedDataOff()
+        writer.SetCompressorTypeToZLib()
     else:
         writer.SetDataModeToAscii()
     writer.SetInputData(polydata)
     writer.Write()
 
-def convert_all_vtk2vtp(vtk_root_dir="assets/vtk", vtp_root_dir="assets/vtp", binary=False):
+def convert_all_vtk2vtp(vtk_root_dir="assets/vtk", vtp_root_dir="assets/vtp", binary=True,
+                        workers=convert_pool.DEFAULT_WORKERS):
     """
-    Walk vtk_root_dir, convert each .vtk found to .vtp under vtp_root_dir,
-    preserving directory structure.
+    Convert every .vtk/.vtu under vtk_root_dir to .vtp under vtp_root_dir,
+    preserving directory structure. Files already recorded in the
+    vtp_root_dir manifest with an unchanged source hash are skipped.
     """
-    if not os.path.isdir(vtk_root_dir):
-        print(f"❌ Input directory not found: {vtk_root_dir}")
-        return
-
-    for root, dirs, files in os.walk(vtk_root_dir):
-        # compute relative path from the vtk root
-        rel = os.path.relpath(root, vtk_root_dir)
-        rel = "" if rel == "." else rel
-
-        # ensure corresponding output directory exists
-        out_dir = os.path.join(vtp_root_dir, rel)
-        os.makedirs(out_dir, exist_ok=True)
-
-        for fname in files:
-            if not fname.lower().endswith(".vtk"):
-                continue
-
-            invtk = os.path.join(root, fname)
-            outvtp = os.path.join(out_dir, fname[:-4] + ".vtp")
-            try:
-                print(f"Converting: {invtk} → {outvtp}")
-                vtk2vtp(invtk, outvtp, binary=binary)
-                print(f"✅ Success: {outvtp}")
-            except Exception as e:
-                print(f"❌ Failed: {invtk} ({e})")
+    summary = convert_pool.run_vtp_stage(vtk_root_dir, vtp_root_dir, workers=workers, binary=binary)
+    convert_pool.print_summary(summary)
+    return summary
 
 if __name__ == "__main__":
-    # parse optional -b flag and optional input/output dirs
+    # parse optional -a (ASCII) / -b (binary, default) flag and optional input/output dirs
     args = sys.argv[1:]
-    binary = False
+    binary = True
+    if "-a" in args:
+        args.remove("-a")
+        binary = False
     if "-b" in args:
         args.remove("-b")
-        binary = True
 
     # allow user to override input/output roots
     if len(args) >= 1:
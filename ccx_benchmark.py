@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ccx 솔버 설정 벤치마크
+- 실제 콘크리트 dims 로 여러 요소 크기(메쉬 크기)의 INP 를 생성
+- 설정(솔버, 스레드 수, 출력 옵션)별로 ccx 를 실행하여 소요 시간, 최대 메모리(RSS), 결과 차이를 기록
+- 결과는 CSV 로 저장하고, 선택한 설정은 solver_config.set_solver_config 로 크기 등급별 저장
+
+사용 예:
+    python ccx_benchmark.py C000001 --sizes 0.2 0.1 0.05 --threads 1 4
+    python ccx_benchmark.py C000001 --ccx "python fem_solver.py"   # ccx 없이 테스트
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import argparse
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import auto_inp
+import frd_io
+import solver_config
+
+
+def default_configs(threads_list=(1,)):
+    """비교할 기본 설정 목록 (솔버 × 스레드 수), 첫 번째가 기준 설정"""
+    configs = []
+    for solver in solver_config.SOLVERS:
+        for threads in threads_list:
+            configs.append({"solver": solver, "threads": threads, "node_print": True})
+    # 출력 옵션 비교 (.dat 출력 생략)
+    configs.append({"solver": None, "threads": threads_list[0], "node_print": False})
+    return configs
+
+
+def config_label(config):
+    solver = config.get("solver") or "DEFAULT"
+    label = f"{solver.replace(' ', '_')}_t{config.get('threads', 1)}"
+    if not config.get("node_print", True):
+        label += "_noprint"
+    return label
+
+
+def synthetic_temperatures(nodes, core_temp=45.0, surface_temp=20.0):
+    """벤치마크용 온도장: 중심부가 높은 수화열 형태의 분포"""
+    coords = np.array([nodes[n] for n in sorted(nodes)])
+    center = (coords.max(axis=0) + coords.min(axis=0)) / 2.0
+    half = np.maximum((coords.max(axis=0) - coords.min(axis=0)) / 2.0, 1e-9)
+    r = np.clip(np.abs((coords - center) / half).max(axis=1), 0.0, 1.0)
+    temps = surface_temp + (core_temp - surface_temp) * (1.0 - r ** 2)
+    return dict(zip(sorted(nodes), temps))
+
+
+def generate_deck(concrete, element_size, config, inp_path, analysis_time=None):
+    """dims 로 메쉬를 만들고 지정한 설정으로 INP 생성. Returns: 노드 수"""
+    dims = concrete["dims"]
+    if isinstance(dims, str):
+        dims = json.loads(dims)
+    nodes, elements = auto_inp.build_mesh(dims["nodes"], float(dims["h"]), element_size)
+    if not elements:
+        raise ValueError(f"요소 크기 {element_size} 로 생성된 요소가 없습니다")
+    temps = synthetic_temperatures(nodes)
+    cfg = dict(config)
+    cfg["size_class"] = solver_config.get_size_class(len(nodes))
+    analysis_time = analysis_time or datetime.now().strftime('%Y-%m-%d %H:00:00')
+    auto_inp.generate_calculix_inp(nodes, elements, temps, inp_path, concrete, analysis_time,
+                                   ccx_config=cfg)
+    if not os.path.exists(inp_path):
+        raise RuntimeError(f"INP 생성 실패: {inp_path}")
+    return len(nodes), len(elements)
+
+
+def run_ccx(inp_path, threads=1, ccx_cmd="ccx"):
+    """ccx 실행 후 (소요 시간[s], 최대 RSS[MB], 종료 코드) 반환"""
+    work_dir = os.path.dirname(os.path.abspath(inp_path))
+    base = os.path.splitext(os.path.basename(inp_path))[0]
+    cmd = shlex.split(ccx_cmd) if isinstance(ccx_cmd, str) else list(ccx_cmd)
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd + [base], cwd=work_dir, env=solver_config.ccx_env(threads),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # wait4 로 해당 자식 프로세스의 자원 사용량만 측정
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+    # Linux 의 ru_maxrss 단위는 KB (macOS 는 byte)
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, rss_mb, proc.returncode
+
+
+def result_delta(frd_path, reference_frd_path):
+    """기준 결과 대비 최대 변위/응력 상대 차이"""
+    deltas = {}
+    for name, key in (("DISP", "disp_delta"), ("STRESS", "stress_delta")):
+        ref = frd_io.read_frd_block(reference_frd_path, name)
+        cur = frd_io.read_frd_block(frd_path, name)
+        ids = sorted(set(ref) & set(cur))
+        if not ids or len(ids) != len(ref):
+            deltas[key] = np.nan
+            continue
+        a = np.array([ref[i] for i in ids])
+        b = np.array([cur[i] for i in ids])
+        scale = np.abs(a).max() or 1.0
+        deltas[key] = float(np.abs(a - b).max() / scale)
+    return deltas
+
+
+def run_benchmark(concrete, element_sizes, configs=None, ccx_cmd="ccx",
+                  work_dir="benchmark", repeat=1, keep_files=False):
+    """메쉬 크기 × 설정 조합으로 ccx 벤치마크 수행.
+
+    Returns
+    -------
+    pd.DataFrame: element_size, n_nodes, n_elements, size_class, config, solver, threads,
+                  node_print, wall_time, peak_rss_mb, returncode, disp_delta, stress_delta
+    """
+    configs = configs or default_configs()
+    os.makedirs(work_dir, exist_ok=True)
+    records = []
+
+    for element_size in element_sizes:
+        size_dir = os.path.join(work_dir, f"size_{element_size:g}")
+        os.makedirs(size_dir, exist_ok=True)
+        reference_frd = None
+
+        for config in configs:
+            label = config_label(config)
+            inp_path = os.path.join(size_dir, f"{label}.inp")
+            try:
+                n_nodes, n_elements = generate_deck(concrete, element_size, config, inp_path)
+            except Exception as e:
+                print(f"❌ INP 생성 실패 (요소 크기 {element_size}): {e}")
+                break
+
+            times, rss, returncode = [], [], 0
+            for _ in range(repeat):
+                elapsed, rss_mb, returncode = run_ccx(inp_path, config.get("threads", 1), ccx_cmd)
+                times.append(elapsed)
+                rss.append(rss_mb)
+                if returncode != 0:
+                    break
+
+            record = {
+                "element_size": element_size,
+                "n_nodes": n_nodes,
+                "n_elements": n_elements,
+                "size_class": solver_config.get_size_class(n_nodes),
+                "config": label,
+                "solver": config.get("solver") or "DEFAULT",
+                "threads": config.get("threads", 1),
+                "node_print": config.get("node_print", True),
+                "wall_time": min(times),
+                "peak_rss_mb": max(rss),
+                "returncode": returncode,
+                "disp_delta": np.nan,
+                "stress_delta": np.nan,
+            }
+
+            frd_path = os.path.join(size_dir, f"{label}.frd")
+            if returncode == 0 and os.path.exists(frd_path):
+                if reference_frd is None:
+                    reference_frd = frd_path
+                    record.update({"disp_delta": 0.0, "stress_delta": 0.0})
+                else:
+                    record.update(result_delta(frd_path, reference_frd))
+
+            records.append(record)
+            print(f"[{element_size:g}m, 노드 {n_nodes}] {label}: {record['wall_time']:.2f}s, "
+                  f"{record['peak_rss_mb']:.1f}MB, 응력 차이 {record['stress_delta']:.2e}")
+
+        if not keep_files:
+            shutil.rmtree(size_dir, ignore_errors=True)
+
+    return pd.DataFrame(records)
+
+
+def best_configs(df, max_stress_delta=1e-3):
+    """크기 등급별로 결과 차이가 허용치 이내인 설정 중 가장 빠른 설정"""
+    ok = df[(df["returncode"] == 0) & (df["stress_delta"] <= max_stress_delta)]
+    best = {}
+    for size_class, group in ok.groupby("size_class"):
+        mean_time = group.groupby(["solver", "threads", "node_print"])["wall_time"].mean()
+        solver, threads, node_print = mean_time.idxmin()
+        best[size_class] = {
+            "solver": None if solver == "DEFAULT" else solver,
+            "threads": int(threads),
+            "node_print": bool(node_print),
+        }
+    return best
+
+
+def apply_best_configs(df, max_stress_delta=1e-3, config_path=solver_config.CONFIG_PATH):
+    """벤치마크 결과로 크기 등급별 설정 저장"""
+    best = best_configs(df, max_stress_delta)
+    for size_class, options in best.items():
+        solver_config.set_solver_config(size_class, config_path=config_path, **options)
+    return best
+
+
+def load_concrete(concrete_pk):
+    """DB 에서 콘크리트 정보(dims 포함) 조회"""
+    import api_db
+    df = api_db.get_concrete_data(concrete_pk=concrete_pk)
+    if df.empty:
+        raise ValueError(f"콘크리트를 찾을 수 없습니다: {concrete_pk}")
+    return df.iloc[0].to_dict()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ccx 솔버 설정 벤치마크")
+    parser.add_argument("concrete_pk", help="dims 를 사용할 콘크리트 PK (예: C000001)")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.2, 0.1],
+                        help="요소 크기 목록 [m]")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1], help="스레드 수 목록")
+    parser.add_argument("--ccx", default="ccx", help="ccx 실행 명령 (스텁 사용 가능)")
+    parser.add_argument("--repeat", type=int, default=1, help="설정별 반복 횟수 (최소 시간 사용)")
+    parser.add_argument("--output", default="benchmark/ccx_benchmark.csv", help="결과 CSV 경로")
+    parser.add_argument("--apply", action="store_true", help="크기 등급별 최적 설정 저장")
+    args = parser.parse_args()
+
+    concrete = load_concrete(args.concrete_pk)
+    result = run_benchmark(concrete, args.sizes, default_configs(args.threads),
+                           ccx_cmd=args.ccx, repeat=args.repeat)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    result.to_csv(args.output, index=False)
+    print(f"\n📊 결과 저장: {args.output}")
+    print(result.to_string(index=False))
+
+    if args.apply:
+        best = apply_best_configs(result)
+        print(f"\n✅ 크기 등급별 설정 저장: {best}")
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+FRD → VTU / VTK(VTU) → VTP 병렬 변환 풀
+- 출력 폴더의 manifest(.convert_manifest.json)에 소스 해시 → 출력 파일 쌍을 기록하여
+  이미 변환한 파일은 다시 읽거나 변환하지 않음 (크기/수정시각이 같으면 해시 계산도 생략)
+- 작업자 수(workers) 지정 가능, 1 이면 풀 없이 현재 프로세스에서 실행
+- VTP 는 기본으로 appended binary + zlib 압축으로 기록
+- 파이프라인 단계로 호출 가능 (run_frd_stage / run_vtp_stage → 결과 요약 dict 반환)
+
+사용 예:
+    python convert_pool.py frd --workers 4
+    python convert_pool.py vtp --ascii
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import stage_metrics
+
+# 기본 작업자 수 (ccx 실행과 CPU 를 나눠 쓰도록 코어의 절반)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+MANIFEST_NAME = ".convert_manifest.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+# 단계별 (소스 확장자, 출력 확장자, 이전 방식 출력 확장자)
+STAGES = {
+    "frd": ((".frd",), ".vtu", (".vtk",)),
+    "vtp": ((".vtu", ".vtk"), ".vtp", ()),
+}
+# 단계별 span 이름 (stage_metrics)
+SPAN_STAGES = {"frd": "auto_frd_to_vtk", "vtp": "auto_vtk_to_vtp"}
+
+
+# 로거 설정
+def setup_convert_pool_logger():
+    """convert_pool 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('convert_pool_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'convert_pool.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | CONVERT_POOL | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_convert_pool_logger()
+
+
+# ---------------------------------------------------------------------------
+# manifest
+# ---------------------------------------------------------------------------
+
+def file_hash(path):
+    """파일 내용 SHA-1"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(output_root):
+    """출력 폴더의 manifest 로드 ({소스 상대경로: {hash, size, mtime, output}})"""
+    path = os.path.join(output_root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"manifest 로드 실패, 새로 생성: {path} - {e}")
+        return {}
+
+
+def save_manifest(output_root, manifest):
+    """manifest 저장 (임시 파일 기록 후 교체)"""
+    os.makedirs(output_root, exist_ok=True)
+    path = os.path.join(output_root, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _is_up_to_date(entry, src_path, stat, output_root):
+    """manifest 항목 기준으로 변환이 필요 없는지 확인 (필요 시 해시 비교)"""
+    if not entry or not os.path.exists(os.path.join(output_root, entry["output"])):
+        return False
+    if entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+        return True
+    # 수정시각만 바뀐 경우(복사, touch) 내용 해시가 같으면 변환 생략
+    if entry.get("hash") == file_hash(src_path):
+        entry.update({"size": stat.st_size, "mtime": stat.st_mtime})
+        return True
+    return False
+
+
+def plan_jobs(stage, source_root, output_root, manifest, subdirs=None):
+    """변환할 작업 목록과 건너뛴 개수 반환 (manifest 는 제자리에서 갱신)
+
+    subdirs: 지정하면 source_root 아래 해당 폴더(콘크리트)만 탐색 (None 이면 전체)
+
+    Returns
+    -------
+    (jobs, skipped): jobs = [(소스 상대경로, 소스 경로, 출력 경로)]
+    """
+    src_exts, out_ext, legacy_exts = STAGES[stage]
+    candidates = {}
+    tops = [source_root] if subdirs is None else [os.path.join(source_root, str(d)) for d in subdirs]
+    for root, files in ((root, files) for top in tops for root, _, files in os.walk(top)):
+        for fname in files:
+            base, ext = os.path.splitext(fname)
+            if ext.lower() not in src_exts:
+                continue
+            rel_dir = os.path.relpath(root, source_root)
+            rel_out = os.path.normpath(os.path.join(rel_dir, base + out_ext))
+            # 같은 프레임의 .vtu/.vtk 가 모두 있으면 앞선 확장자(.vtu) 우선
+            prev = candidates.get(rel_out)
+            if prev and src_exts.index(os.path.splitext(prev)[1].lower()) <= src_exts.index(ext.lower()):
+                continue
+            candidates[rel_out] = os.path.normpath(os.path.join(rel_dir, fname))
+
+    jobs, skipped = [], 0
+    for rel_out, rel_src in sorted(candidates.items()):
+        src_path = os.path.join(source_root, rel_src)
+        out_path = os.path.join(output_root, rel_out)
+        stat = os.stat(src_path)
+        entry = manifest.get(rel_src)
+        if _is_up_to_date(entry, src_path, stat, output_root):
+            skipped += 1
+            continue
+        if entry is None:
+            # manifest 도입 전에 변환된 파일(이전 방식 .vtk 포함)은 변환 없이 등록
+            base = os.path.splitext(rel_out)[0]
+            existing = [base + ext for ext in (out_ext,) + legacy_exts
+                        if os.path.exists(os.path.join(output_root, base + ext))]
+            if existing and os.path.getmtime(os.path.join(output_root, existing[0])) >= stat.st_mtime:
+                manifest[rel_src] = {"hash": file_hash(src_path), "size": stat.st_size,
+                                     "mtime": stat.st_mtime, "output": existing[0]}
+                skipped += 1
+                continue
+        jobs.append((rel_src, src_path, out_path))
+
+    # 소스가 삭제된 항목 정리 (탐색한 폴더 범위 안에서만)
+    sources = set(candidates.values())
+    scope = None if subdirs is None else {os.path.normpath(str(d)) for d in subdirs}
+    for rel_src in [k for k in manifest if k not in sources]:
+        if scope is None or os.path.normpath(rel_src).split(os.sep)[0] in scope:
+            del manifest[rel_src]
+    return jobs, skipped
+
+
+# ---------------------------------------------------------------------------
+# 변환 작업 (작업자 프로세스에서 실행)
+# ---------------------------------------------------------------------------
+
+def _convert_job(stage, src_path, out_path, binary=True):
+    """단일 파일 변환. Returns: (성공 여부, 메시지, 소요 시간[s], 시작 시각[epoch 초])"""
+    started, start = time.time(), time.perf_counter()
+    try:
+        if stage == "frd":
+            from auto_frd_to_vtk import convert_frd_to_vtu_direct, validate_vtu_header
+            success, message = convert_frd_to_vtu_direct(src_path, out_path)
+            if success:
+                success, message = validate_vtu_header(out_path)
+        else:
+            from auto_vtk_to_vtp import vtk2vtp
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            tmp_path = out_path + ".tmp.vtp"
+            vtk2vtp(src_path, tmp_path, binary=binary)
+            os.replace(tmp_path, out_path)
+            success, message = True, f"{os.path.getsize(out_path) / 1024:.1f}KB"
+    except Exception as e:
+        success, message = False, str(e)
+    return success, message, time.perf_counter() - start, started
+
+
+def run_stage(stage, source_root, output_root, workers=DEFAULT_WORKERS, binary=True, subdirs=None):
+    """한 단계의 변경된 파일만 병렬 변환 (subdirs 를 주면 해당 하위 폴더만).
+
+    Returns
+    -------
+    dict: stage, total, converted, skipped, failed, outputs(새로 기록한 출력 경로),
+          failed_sources(실패한 입력의 source_root 기준 상대 경로), elapsed
+    """
+    start = time.perf_counter()
+    summary = {"stage": stage, "total": 0, "converted": 0, "skipped": 0, "failed": 0,
+               "outputs": [], "failed_sources": [], "elapsed": 0.0}
+    if not os.path.isdir(source_root):
+        logger.error(f"입력 폴더가 없습니다: {source_root}")
+        print(f"❌ 입력 폴더가 없습니다: {source_root}")
+        return summary
+
+    manifest = load_manifest(output_root)
+    jobs, skipped = plan_jobs(stage, source_root, output_root, manifest, subdirs)
+    summary.update({"total": len(jobs) + skipped, "skipped": skipped})
+
+    # 변환 전 해시 계산 (작업 중 소스가 바뀌어도 다음 사이클에 다시 변환되도록 먼저 기록)
+    hashes = {}
+    for rel_src, src_path, _ in jobs:
+        stat = os.stat(src_path)
+        hashes[rel_src] = (file_hash(src_path), stat.st_size, stat.st_mtime)
+
+    submitted = {}
+
+    def record(rel_src, out_path, result):
+        success, message, elapsed, started = result
+        # 파일 1개 = span 1개 (대기 시간: 작업 제출 → 작업자에서 시작)
+        stage_metrics.record_span(SPAN_STAGES[stage], rel_src, elapsed, "ok" if success else "failed",
+                                  bytes_read=hashes[rel_src][1],
+                                  bytes_written=stage_metrics.file_size(out_path) if success else 0,
+                                  queue_wait=started - submitted[rel_src] if started else None,
+                                  started=started or None)
+        if success:
+            digest, size, mtime = hashes[rel_src]
+            manifest[rel_src] = {"hash": digest, "size": size, "mtime": mtime,
+                                 "output": os.path.relpath(out_path, output_root)}
+            summary["converted"] += 1
+            summary["outputs"].append(out_path)
+            print(f"✅ {out_path} ({message}, {elapsed:.2f}s)")
+        else:
+            manifest.pop(rel_src, None)
+            summary["failed"] += 1
+            summary["failed_sources"].append(rel_src)
+            logger.error(f"변환 실패: {rel_src} → {out_path} - {message}")
+            print(f"❌ 변환 실패: {rel_src} - {message}")
+
+    try:
+        if workers <= 1 or len(jobs) <= 1:
+            for rel_src, src_path, out_path in jobs:
+                submitted[rel_src] = time.time()
+                record(rel_src, out_path, _convert_job(stage, src_path, out_path, binary))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {}
+                for rel_src, src_path, out_path in jobs:
+                    submitted[rel_src] = time.time()
+                    futures[pool.submit(_convert_job, stage, src_path, out_path, binary)] = (rel_src, out_path)
+                for future in as_completed(futures):
+                    rel_src, out_path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = (False, f"작업자 오류: {e}", 0.0, None)
+                    record(rel_src, out_path, result)
+    finally:
+        save_manifest(output_root, manifest)
+        stage_metrics.flush()
+
+    summary["elapsed"] = time.perf_counter() - start
+    logger.info(f"{stage} 단계 완료: 총 {summary['total']}, 변환 {summary['converted']}, "
+                f"건너뜀 {summary['skipped']}, 실패 {summary['failed']}, {summary['elapsed']:.1f}s")
+    return summary
+
+
+def run_frd_stage(frd_root_dir="frd", vtk_root_dir="assets/vtk", workers=DEFAULT_WORKERS, concrete_pks=None):
+    """파이프라인 단계: FRD → 압축 바이너리 VTU (concrete_pks 를 주면 해당 콘크리트만)"""
+    return run_stage("frd", frd_root_dir, vtk_root_dir, workers, subdirs=concrete_pks)
+
+
+def run_vtp_stage(vtk_root_dir="assets/vtk", vtp_root_dir="assets/vtp", workers=DEFAULT_WORKERS,
+                  binary=True):
+    """파이프라인 단계: VTU/VTK → VTP (기본 압축 바이너리)"""
+    return run_stage("vtp", vtk_root_dir, vtp_root_dir, workers, binary)
+
+
+def print_summary(summary):
+    print(f"\n🎉 {summary['stage']} 변환 완료! ({summary['elapsed']:.1f}s)")
+    print(f"📊 총 파일: {summary['total']}개")
+    print(f"✅ 변환 성공: {summary['converted']}개")
+    print(f"⏭️ 건너뜀: {summary['skipped']}개")
+    print(f"❌ 실패: {summary['failed']}개")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FRD/VTK 병렬 변환")
+    parser.add_argument("stage", choices=["frd", "vtp", "all"], help="변환 단계")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="작업자 수")
+    parser.add_argument("--ascii", action="store_true", help="VTP 를 ASCII 로 기록")
+    args = parser.parse_args()
+
+    if args.stage in ("frd", "all"):
+        print_summary(run_frd_stage(workers=args.workers))
+    if args.stage in ("vtp", "all"):
+        print_summary(run_vtp_stage(workers=args.workers, binary=not args.ascii))
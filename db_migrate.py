@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+로컬 ITS_TS DB 스키마 마이그레이션 / 인덱스 점검
+- 버전별 마이그레이션을 순서대로 적용하고 schema_migrations 테이블에 기록 (이미 적용한 버전은 건너뜀)
+- api_db 의 주요 조회(sensor_data 기간/최근 시각, sensor 콘크리트별·디바이스별, concrete 프로젝트별)에
+  맞는 복합/유니크 인덱스 생성
+- 유니크 인덱스 생성 전 기존 중복 행 정리 (키별로 updated_at 이 가장 최근인 행만 유지)
+- EXPLAIN 으로 주요 조회가 전체 스캔을 하지 않는지 확인 (앱 시작 시 check_schema 로 경고만 기록)
+- MySQL(운영) 과 SQLite(로컬/테스트 대용) 모두 지원
+
+사용 예:
+    python db_migrate.py status
+    python db_migrate.py upgrade
+    python db_migrate.py check --url sqlite:///data/concrete.db
+"""
+
+import os
+import logging
+import argparse
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+# 인덱스 정의: (테이블, 인덱스 이름, 컬럼, 유니크)
+INDEXES = [
+    # 기간/최근 시각/워터마크 조회, auto_sensor 의 ON DUPLICATE KEY UPDATE 기준
+    ("sensor_data", "uq_sensor_data_device_channel_time", ("device_id", "channel", "time"), True),
+    # 콘크리트별 센서 목록, 콘크리트 삭제 시 센서 확인/삭제
+    ("sensor", "idx_sensor_concrete", ("concrete_pk",), False),
+    # 디바이스/채널별 센서 조회, 최신 센서(created_at) 중복 제거
+    ("sensor", "idx_sensor_device_channel", ("device_id", "channel", "created_at"), False),
+    # 프로젝트별 콘크리트 목록 (활성 여부 필터 포함)
+    ("concrete", "idx_concrete_project_activate", ("project_pk", "activate"), False),
+]
+
+# 센서 집계 테이블 (시간 / 일 단위 min·mean·max·count)
+ROLLUP_TABLES = ("sensor_rollup_hourly", "sensor_rollup_daily")
+
+# MySQL 에서 TEXT/BLOB 컬럼은 길이를 지정해야 인덱스에 포함할 수 있음
+MYSQL_TEXT_PREFIX = 64
+
+# EXPLAIN 점검 대상: (이름, 테이블, 조회 SQL, 파라미터)
+EXPLAIN_CHECKS = [
+    ("sensor_data 기간 조회", "sensor_data",
+     "SELECT * FROM sensor_data WHERE device_id = :device_id AND channel = :channel "
+     "AND time >= :start_dt AND time <= :end_dt ORDER BY time ASC",
+     {"device_id": "D", "channel": 1, "start_dt": "2000-01-01 00:00:00", "end_dt": "2000-01-02 00:00:00"}),
+    ("sensor_data 최근 시각", "sensor_data",
+     "SELECT time FROM sensor_data WHERE device_id = :device_id AND channel = :channel "
+     "ORDER BY time DESC LIMIT 1",
+     {"device_id": "D", "channel": 1}),
+    ("sensor_data 워터마크", "sensor_data",
+     "SELECT device_id, channel, MAX(time) FROM sensor_data GROUP BY device_id, channel", {}),
+    ("sensor_rollup 기간 조회", "sensor_rollup_hourly",
+     "SELECT * FROM sensor_rollup_hourly WHERE device_id = :device_id AND channel = :channel "
+     "AND bucket >= :start_dt AND bucket <= :end_dt ORDER BY bucket",
+     {"device_id": "D", "channel": 1, "start_dt": "2000-01-01 00:00:00", "end_dt": "2000-01-02 00:00:00"}),
+    ("sensor 콘크리트별", "sensor",
+     "SELECT * FROM sensor WHERE concrete_pk = :concrete_pk", {"concrete_pk": "C000001"}),
+    ("sensor 디바이스/채널", "sensor",
+     "SELECT * FROM sensor WHERE device_id = :device_id AND channel = :channel",
+     {"device_id": "D", "channel": 1}),
+    ("concrete 프로젝트별", "concrete",
+     "SELECT * FROM concrete WHERE project_pk = :project_pk AND activate = :activate",
+     {"project_pk": "P_000078", "activate": 1}),
+]
+
+
+# 로거 설정
+def setup_db_migrate_logger():
+    """db_migrate 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('db_migrate_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'db_migrate.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | DB_MIGRATE | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_db_migrate_logger()
+
+
+# ---------------------------------------------------------------------------
+# 마이그레이션 단계
+# ---------------------------------------------------------------------------
+
+def _create_base_tables(conn):
+    """기본 테이블 (이미 있으면 그대로 둠 → 운영 MySQL 은 변경 없음, SQLite 대용 DB 는 새로 생성)"""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS concrete (
+            concrete_pk VARCHAR(16) NOT NULL PRIMARY KEY,
+            project_pk  VARCHAR(32),
+            name        VARCHAR(200),
+            dims        TEXT,
+            con_unit    DOUBLE,
+            con_t       VARCHAR(32),
+            con_a       DOUBLE,
+            con_p       DOUBLE,
+            con_d       DOUBLE,
+            `CEB-FIB`   TEXT,
+            activate    INT DEFAULT 1,
+            created_at  DATETIME,
+            updated_at  DATETIME
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS sensor (
+            sensor_pk   VARCHAR(16) NOT NULL PRIMARY KEY,
+            concrete_pk VARCHAR(16),
+            device_id   VARCHAR(64),
+            channel     INT,
+            d_type      INT,
+            dims        TEXT,
+            created_at  DATETIME,
+            updated_at  DATETIME
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS sensor_data (
+            device_id   VARCHAR(64) NOT NULL,
+            channel     INT NOT NULL,
+            time        DATETIME NOT NULL,
+            humidity    DOUBLE,
+            sv          DOUBLE,
+            temperature DOUBLE,
+            created_at  DATETIME,
+            updated_at  DATETIME
+        )
+    """))
+
+
+def _existing_indexes(conn, table):
+    """테이블의 인덱스/유니크 제약/PK 목록 → [(이름, 컬럼 tuple, unique, 삭제 가능한 일반 인덱스 여부)]"""
+    inspector = inspect(conn)
+    found = [(idx["name"], tuple(idx["column_names"]), bool(idx["unique"]), True)
+             for idx in inspector.get_indexes(table)]
+    found += [(uc["name"], tuple(uc["column_names"]), True, False)
+              for uc in inspector.get_unique_constraints(table)]
+    pk = inspector.get_pk_constraint(table).get("constrained_columns") or []
+    if pk:
+        found.append((None, tuple(pk), True, False))
+    return found
+
+
+def _drop_index(conn, table, name):
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"ALTER TABLE `{table}` DROP INDEX `{name}`, ALGORITHM=INPLACE, LOCK=NONE"))
+    else:
+        conn.execute(text(f'DROP INDEX "{name}"'))
+    logger.info(f"인덱스 삭제: {table}.{name}")
+
+
+def _q(conn, name):
+    return f"`{name}`" if conn.dialect.name == "mysql" else f'"{name}"'
+
+
+def dedupe_rows(conn, table, columns):
+    """columns 값이 같은 중복 행을 하나만 남기고 삭제 (updated_at 이 가장 최근인 행 유지)
+
+    유니크 인덱스를 만들기 전에 호출. 키에 NULL 이 있는 행은 유니크 인덱스에 걸리지 않으므로 그대로 둠.
+
+    Returns
+    -------
+    int: 삭제한 행 수
+    """
+    keys = ", ".join(_q(conn, c) for c in columns)
+    groups = [tuple(row[:-1]) for row in conn.execute(text(
+        f"SELECT {keys}, COUNT(*) FROM {_q(conn, table)} GROUP BY {keys} HAVING COUNT(*) > 1"))
+        if None not in row[:-1]]
+    if not groups:
+        return 0
+
+    has_updated = "updated_at" in {c["name"] for c in inspect(conn).get_columns(table)}
+    where = " AND ".join(f"{_q(conn, c)} = :k{i}" for i, c in enumerate(columns))
+    order = f" ORDER BY {_q(conn, 'updated_at')} DESC" if has_updated else ""
+    removed = 0
+    for group in groups:
+        params = {f"k{i}": value for i, value in enumerate(group)}
+        result = conn.execute(text(f"SELECT * FROM {_q(conn, table)} WHERE {where}{order}"), params)
+        names = list(result.keys())
+        rows = result.fetchall()
+        # 키 외에 구분할 컬럼이 없으므로 전부 지우고 남길 행만 다시 넣음
+        conn.execute(text(f"DELETE FROM {_q(conn, table)} WHERE {where}"), params)
+        conn.execute(
+            text(f"INSERT INTO {_q(conn, table)} ({', '.join(_q(conn, c) for c in names)}) "
+                 f"VALUES ({', '.join(f':v{i}' for i in range(len(names)))})"),
+            {f"v{i}": value for i, value in enumerate(rows[0])},
+        )
+        removed += len(rows) - 1
+    logger.warning(f"중복 행 정리: {table} ({', '.join(columns)}) 키 {len(groups)}개, 행 {removed}개 삭제")
+    print(f"⚠️ {table} 중복 행 {removed}개 삭제 (키 {len(groups)}개, 최근 updated_at 행 유지)")
+    return removed
+
+
+def create_index(conn, table, name, columns, unique=False):
+    """인덱스가 없으면 생성. Returns: 새로 만들었으면 True
+
+    이름과 무관하게 같은 컬럼 구성이면 있는 것으로 봄. 단 unique 가 필요한데 일반 인덱스만 있으면
+    유니크 인덱스를 만든 뒤 기존 일반 인덱스는 삭제. 유니크 인덱스를 만들기 전에 중복 행은 정리함
+    """
+    same = [idx for idx in _existing_indexes(conn, table) if idx[1] == tuple(columns)]
+    if any(idx_unique or not unique for _, _, idx_unique, _ in same):
+        return False
+    if unique:
+        dedupe_rows(conn, table, columns)
+    replaced = [idx_name for idx_name, _, _, droppable in same if droppable]
+    if name in replaced:
+        # 같은 이름의 일반 인덱스는 먼저 지워야 만들 수 있음
+        _drop_index(conn, table, name)
+        replaced.remove(name)
+
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if conn.dialect.name == "mysql":
+        col_types = {c["name"]: str(c["type"]).upper() for c in inspect(conn).get_columns(table)}
+        cols = ", ".join(
+            f"`{c}`({MYSQL_TEXT_PREFIX})" if "TEXT" in col_types.get(c, "") or "BLOB" in col_types.get(c, "")
+            else f"`{c}`"
+            for c in columns
+        )
+        # 대용량 테이블도 읽기/쓰기를 막지 않고 생성
+        conn.execute(text(f"ALTER TABLE `{table}` ADD {kind} `{name}` ({cols}), ALGORITHM=INPLACE, LOCK=NONE"))
+    else:
+        cols = ", ".join(f'"{c}"' for c in columns)
+        conn.execute(text(f'CREATE {kind} "{name}" ON "{table}" ({cols})'))
+    logger.info(f"인덱스 생성: {table}.{name} ({', '.join(columns)})")
+    for old in replaced:
+        _drop_index(conn, table, old)
+    return True
+
+
+def _create_indexes(conn):
+    """주요 조회용 복합/유니크 인덱스"""
+    for table, name, columns, unique in INDEXES:
+        create_index(conn, table, name, columns, unique)
+
+
+def _create_rollup_tables(conn):
+    """센서 시간/일 단위 집계 테이블 (sensor_rollup 이 수집 시 증분 갱신)"""
+    for table in ROLLUP_TABLES:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                device_id       VARCHAR(64) NOT NULL,
+                channel         INT NOT NULL,
+                bucket          DATETIME NOT NULL,
+                n               INT,
+                temperature_min DOUBLE,
+                temperature_avg DOUBLE,
+                temperature_max DOUBLE,
+                humidity_min    DOUBLE,
+                humidity_avg    DOUBLE,
+                humidity_max    DOUBLE,
+                sv_min          DOUBLE,
+                sv_avg          DOUBLE,
+                sv_max          DOUBLE,
+                updated_at      DATETIME
+            )
+        """))
+        create_index(conn, table, f"uq_{table}_device_channel_bucket", ("device_id", "channel", "bucket"), True)
+
+
+# (버전, 설명, 적용 함수) — 새 마이그레이션은 끝에 추가
+MIGRATIONS = [
+    (1, "기본 테이블 (concrete / sensor / sensor_data)", _create_base_tables),
+    (2, "조회용 복합/유니크 인덱스", _create_indexes),
+    (3, "센서 시간/일 집계 테이블", _create_rollup_tables),
+]
+
+
+# ---------------------------------------------------------------------------
+# 적용 / 상태
+# ---------------------------------------------------------------------------
+
+def _ensure_migrations_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version     INT NOT NULL PRIMARY KEY,
+            description VARCHAR(200),
+            applied_at  DATETIME
+        )
+    """))
+
+
+def applied_versions(engine):
+    """적용된 마이그레이션 버전 집합"""
+    with engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+def pending_migrations(engine):
+    """아직 적용하지 않은 (버전, 설명) 목록"""
+    done = applied_versions(engine)
+    return [(version, desc) for version, desc, _ in MIGRATIONS if version not in done]
+
+
+def migrate(engine, target=None):
+    """target 버전(기본: 마지막)까지 적용하지 않은 마이그레이션을 순서대로 적용.
+
+    MySQL DDL 은 자동 커밋되므로 단계마다 성공한 뒤에 버전을 기록하고, 각 단계는 다시
+    실행해도 안전하게(IF NOT EXISTS / 인덱스 존재 확인) 작성한다.
+
+    Returns
+    -------
+    list: 새로 적용한 버전
+    """
+    done = applied_versions(engine)
+    applied = []
+    for version, desc, apply in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        print(f"🔧 마이그레이션 {version}: {desc}")
+        try:
+            with engine.begin() as conn:
+                apply(conn)
+                conn.execute(
+                    text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) "
+                         "VALUES (:version, :description, :applied_at)"),
+                    {"version": version, "description": desc,
+                     "applied_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+                )
+        except Exception as e:
+            logger.error(f"마이그레이션 {version} 실패: {e}")
+            print(f"❌ 마이그레이션 {version} 실패: {e}")
+            raise
+        logger.info(f"마이그레이션 {version} 적용: {desc}")
+        applied.append(version)
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# EXPLAIN 점검
+# ---------------------------------------------------------------------------
+
+def explain_query(conn, sql, params=None):
+    """조회 계획과 전체 스캔 여부 반환. Returns: (인덱스 사용 여부, 계획 요약 문자열)"""
+    if conn.dialect.name == "mysql":
+        result = conn.execute(text("EXPLAIN " + sql), params or {})
+        columns = list(result.keys())
+        rows = [dict(zip(columns, row)) for row in result]
+        # type=ALL 이 전체 스캔, type 이 없으면(빈 테이블 등) 옵티마이저가 접근 없이 처리
+        ok = all(r.get("type") is None or (r.get("type") != "ALL" and r.get("key")) for r in rows)
+        plan = "; ".join(f"{r.get('table')}: type={r.get('type')} key={r.get('key')} {r.get('Extra') or ''}".strip()
+                         for r in rows)
+        return ok, plan
+
+    rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params or {}).fetchall()
+    details = [str(row[-1]) for row in rows]
+    # SQLite: 'SCAN <table>' 만 있으면 전체 스캔, 'SEARCH ... USING INDEX' / 'USING COVERING INDEX' 는 인덱스 사용
+    ok = all(not d.startswith("SCAN") or "INDEX" in d for d in details if not d.startswith("USE TEMP"))
+    return ok, "; ".join(details)
+
+
+def check_indexes(engine):
+    """EXPLAIN_CHECKS 의 조회 계획 점검.
+
+    Returns
+    -------
+    list of dict: name, ok, plan (테이블이 없으면 ok=False, plan=오류 메시지)
+    """
+    results = []
+    with engine.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+        for name, table, sql, params in EXPLAIN_CHECKS:
+            if table not in tables:
+                results.append({"name": name, "ok": False, "plan": f"{table} 테이블 없음"})
+                continue
+            try:
+                ok, plan = explain_query(conn, sql, params)
+            except Exception as e:
+                ok, plan = False, f"EXPLAIN 실패: {e}"
+            results.append({"name": name, "ok": ok, "plan": plan})
+    return results
+
+
+def check_schema(engine):
+    """앱 시작 시 점검: 미적용 마이그레이션과 전체 스캔 조회를 경고로 기록 (스키마는 변경하지 않음).
+
+    Returns
+    -------
+    dict: pending(미적용 버전 목록), checks(check_indexes 결과)
+    """
+    pending = pending_migrations(engine)
+    checks = check_indexes(engine)
+    for version, desc in pending:
+        logger.warning(f"미적용 마이그레이션 {version}: {desc} (python db_migrate.py upgrade)")
+    for check in checks:
+        if not check["ok"]:
+            logger.warning(f"인덱스 미사용 조회: {check['name']} - {check['plan']}")
+    if pending or not all(c["ok"] for c in checks):
+        print(f"⚠️ DB 스키마 점검: 미적용 마이그레이션 {len(pending)}개, "
+              f"인덱스 미사용 조회 {sum(not c['ok'] for c in checks)}개 (log/db_migrate.log 참고)")
+    return {"pending": [v for v, _ in pending], "checks": checks}
+
+
+def _default_url():
+    from api_db import DB_URL
+    return DB_URL
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ITS_TS 스키마 마이그레이션")
+    parser.add_argument("command", choices=["upgrade", "status", "check"], help="실행할 작업")
+    parser.add_argument("--url", default=None, help="DB URL (기본: api_db.DB_URL)")
+    parser.add_argument("--target", type=int, default=None, help="upgrade 할 마지막 버전")
+    args = parser.parse_args()
+
+    db_engine = create_engine(args.url or _default_url(), pool_pre_ping=True)
+    if args.command == "upgrade":
+        applied = migrate(db_engine, args.target)
+        print(f"✅ 적용한 마이그레이션: {applied or '없음'}")
+    elif args.command == "status":
+        done = applied_versions(db_engine)
+        for version, desc, _ in MIGRATIONS:
+            print(f"{'✅' if version in done else '⏳'} {version}: {desc}")
+    if args.command in ("upgrade", "check"):
+        for check in check_indexes(db_engine):
+            print(f"{'✅' if check['ok'] else '❌'} {check['name']}: {check['plan']}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+그래프용 시계열 다운샘플링
+- lttb(): Largest-Triangle-Three-Buckets. 구간마다 앞뒤 점과 만드는 삼각형이 가장 큰 점을 골라
+  모양과 피크를 유지하면서 점 수를 줄임
+- minmax_envelope(): 구간별 최소/최대 (줄인 선 아래에 범위 띠로 그려 스파이크가 빠지지 않게 함)
+- 그래프 폭(px)에 맞는 점 수(points_for_width)로 줄이므로 기간이 길어져도 응답 크기/렌더링 시간이 일정
+
+사용 예:
+    x, y = downsample_series(df["time"], df["temperature"], points_for_width(1000))
+"""
+
+import numpy as np
+import pandas as pd
+
+# 그래프 기본 폭(px)과 px 당 점 수
+DEFAULT_WIDTH_PX = 1000
+POINTS_PER_PIXEL = 1
+# 이보다 적은 점 수로는 줄이지 않음
+MIN_POINTS = 3
+
+
+def points_for_width(width_px=DEFAULT_WIDTH_PX, points_per_pixel=POINTS_PER_PIXEL):
+    """그래프 폭에 맞는 최대 점 수"""
+    return max(MIN_POINTS, int(width_px * points_per_pixel))
+
+
+def _as_numeric(x):
+    """x 축 값 → float 배열 (datetime 은 ns 정수)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb(x, y, n_out):
+    """LTTB 로 고른 점의 인덱스 배열 (첫 점/마지막 점 포함, 오름차순).
+
+    x 는 정렬된 값(숫자 또는 datetime64), y 는 결측이 없어야 함
+    """
+    n = len(y)
+    if n_out >= n or n <= MIN_POINTS:
+        return np.arange(n)
+    n_out = max(MIN_POINTS, n_out)
+    xs, ys = _as_numeric(x), np.asarray(y, dtype=np.float64)
+
+    # 첫/마지막 점을 뺀 나머지를 n_out - 2 개 구간으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 구간 평균 (마지막 구간은 마지막 점)
+        if i + 2 < len(edges):
+            nxt_start, nxt_end = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = xs[nxt_start:nxt_end].mean(), ys[nxt_start:nxt_end].mean()
+        else:
+            avg_x, avg_y = xs[-1], ys[-1]
+        area = np.abs((xs[a] - avg_x) * (ys[start:end] - ys[a])
+                      - (xs[a] - xs[start:end]) * (avg_y - ys[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_envelope(x, y, n_buckets):
+    """구간별 (시작 x, 최소 y, 최대 y) — 결측은 무시. 점 수가 n_buckets 이하이면 원래 값 그대로"""
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if len(y) <= n_buckets:
+        return x, y, y
+    edges = np.linspace(0, len(y), n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    return x[starts], np.fmin.reduceat(y, starts), np.fmax.reduceat(y, starts)
+
+
+def downsample_series(x, y, n_out):
+    """결측을 뺀 뒤 LTTB 로 n_out 점 이하로 줄인 (x, y)"""
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    idx = lttb(x, y, n_out)
+    return x[idx], y[idx]
+
+
+def downsample_frame(df, x_col, y_cols, n_out):
+    """DataFrame 의 여러 열을 각각 LTTB 로 줄임. Returns: {열: (x, y)} (없는 열은 제외)"""
+    x = pd.to_datetime(df[x_col]).to_numpy() if x_col == "time" else df[x_col].to_numpy()
+    return {col: downsample_series(x, df[col].to_numpy(dtype=np.float64, na_value=np.nan), n_out)
+            for col in y_cols if col in df.columns}
@@ -0,0 +1,463 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+In-process 열응력 해석 백엔드 (C3D8 선형탄성 + 열변형)
+- auto_inp.generate_calculix_inp 와 동일한 입력(노드, 요소, 노드 온도, 콘크리트 물성)을 사용
+- scipy.sparse 로 강성행렬을 조립하고 spsolve / CG 로 풀이
+- 결과는 ccx 와 동일한 형식의 frd/{concrete_pk}/*.frd, dat/{concrete_pk}/*.dat 로 저장
+- 같은 메쉬에 대해서는 희소 패턴(및 분해 결과)을 재사용하여 시간별 반복 해석 비용을 최소화
+"""
+
+import os
+import hashlib
+import logging
+from datetime import datetime
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve, cg, splu
+
+
+# 로거 설정
+def setup_fem_solver_logger():
+    """fem_solver 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('fem_solver_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'fem_solver.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | FEM_SOLVER | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_fem_solver_logger()
+
+# In-process 백엔드를 사용할 최대 노드 수 (이보다 큰 메쉬는 ccx 사용)
+MAX_INPROCESS_NODES = 20000
+
+# 초기(기준) 온도 - generate_calculix_inp 의 *INITIAL CONDITIONS 와 동일
+REFERENCE_TEMPERATURE = 20.0
+
+# C3D8 자연좌표 (ccx/Abaqus 절점 순서)
+_NODE_NATURAL = np.array([
+    [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1],
+], dtype=float)
+
+# 2x2x2 가우스 적분점 (가중치 1)
+_GAUSS_POINTS = _NODE_NATURAL / np.sqrt(3.0)
+
+
+def _shape_functions(xi):
+    """자연좌표 xi (n, 3) 에서의 형상함수 N (n, 8) 과 미분 dN/dxi (n, 8, 3)"""
+    xi = np.atleast_2d(xi)
+    s = 1.0 + xi[:, None, :] * _NODE_NATURAL[None, :, :]
+    n = 0.125 * s[:, :, 0] * s[:, :, 1] * s[:, :, 2]
+    dn = np.empty((xi.shape[0], 8, 3))
+    dn[:, :, 0] = 0.125 * _NODE_NATURAL[:, 0] * s[:, :, 1] * s[:, :, 2]
+    dn[:, :, 1] = 0.125 * _NODE_NATURAL[:, 1] * s[:, :, 0] * s[:, :, 2]
+    dn[:, :, 2] = 0.125 * _NODE_NATURAL[:, 2] * s[:, :, 0] * s[:, :, 1]
+    return n, dn
+
+
+_N_GP, _DN_GP = _shape_functions(_GAUSS_POINTS)
+# 적분점 → 절점 외삽 행렬 (ccx 와 동일하게 절점 응력은 외삽 후 평균)
+_EXTRAPOLATION = np.linalg.inv(_N_GP)
+
+
+def elasticity_matrix(elastic_modulus, poisson_ratio):
+    """등방성 선형탄성 D 행렬 (Voigt: xx, yy, zz, xy, yz, zx)"""
+    e, v = float(elastic_modulus), float(poisson_ratio)
+    c = e / ((1.0 + v) * (1.0 - 2.0 * v))
+    d = np.zeros((6, 6))
+    d[:3, :3] = c * v
+    d[[0, 1, 2], [0, 1, 2]] = c * (1.0 - v)
+    d[[3, 4, 5], [3, 4, 5]] = c * (1.0 - 2.0 * v) / 2.0
+    return d
+
+
+class ThermoElasticModel:
+    """한 콘크리트 메쉬에 대한 C3D8 열응력 해석 모델.
+
+    메쉬에만 의존하는 값(B 행렬, 희소 패턴, 경계조건, 분해 결과)은 생성 시 한 번만
+    계산하고, 시간별 해석에서는 온도/탄성계수만 바꿔 `solve` 를 반복 호출한다.
+    """
+
+    def __init__(self, nodes, elements, fixed_nodes=None):
+        # 노드/요소 배열화 (노드 ID → 0-based 인덱스)
+        self.node_ids = np.array(sorted(nodes), dtype=np.int64)
+        self.coords = np.array([nodes[n] for n in self.node_ids], dtype=float)
+        index = {nid: i for i, nid in enumerate(self.node_ids)}
+        self.element_ids = np.array(sorted(elements), dtype=np.int64)
+        self.connectivity = np.array(
+            [[index[n] for n in elements[e]] for e in self.element_ids], dtype=np.int64
+        )
+        n_nodes = len(self.node_ids)
+        n_dof = 3 * n_nodes
+
+        # 적분점별 dN/dx 와 detJ (요소, 적분점, 절점, 3)
+        xe = self.coords[self.connectivity]                      # (ne, 8, 3)
+        jac = np.einsum('gni,enj->egij', _DN_GP, xe)             # (ne, 8, 3, 3)
+        self.det_j = np.linalg.det(jac)                          # (ne, 8)
+        if np.any(self.det_j <= 0):
+            raise ValueError("음수 또는 0 의 Jacobian 을 가진 요소가 있습니다")
+        self.dn_dx = np.einsum('egij,gnj->egni', np.linalg.inv(jac), _DN_GP)
+
+        # B 행렬 (ne, 8, 6, 24)
+        ne = len(self.element_ids)
+        b = np.zeros((ne, 8, 6, 24))
+        dx, dy, dz = self.dn_dx[..., 0], self.dn_dx[..., 1], self.dn_dx[..., 2]
+        b[:, :, 0, 0::3] = dx
+        b[:, :, 1, 1::3] = dy
+        b[:, :, 2, 2::3] = dz
+        b[:, :, 3, 0::3] = dy
+        b[:, :, 3, 1::3] = dx
+        b[:, :, 4, 1::3] = dz
+        b[:, :, 4, 2::3] = dy
+        b[:, :, 5, 0::3] = dz
+        b[:, :, 5, 2::3] = dx
+        self.b = b
+
+        # 경계조건: 지정이 없으면 generate_calculix_inp 와 동일하게 z == 0 노드 고정
+        if fixed_nodes is None:
+            fixed_mask = self.coords[:, 2] == 0.0
+        else:
+            fixed_mask = np.isin(self.node_ids, list(fixed_nodes))
+        fixed_dof = np.zeros(n_dof, dtype=bool)
+        for k in range(3):
+            fixed_dof[k::3] = fixed_mask
+        self.free_dof = np.flatnonzero(~fixed_dof)
+        reduced = np.full(n_dof, -1, dtype=np.int64)
+        reduced[self.free_dof] = np.arange(len(self.free_dof))
+        self._reduced = reduced
+
+        # 희소 패턴 (한 번만 계산): 요소 강성 항목 → CSR data 위치
+        edof = (3 * self.connectivity[:, :, None] + np.arange(3)).reshape(ne, 24)
+        self.edof = edof
+        rows = reduced[np.repeat(edof, 24, axis=1)].ravel()
+        cols = reduced[np.tile(edof, (1, 24))].ravel()
+        keep = (rows >= 0) & (cols >= 0)
+        self._keep = keep
+        n_free = len(self.free_dof)
+        pattern = sp.csr_matrix(
+            (np.arange(1, keep.sum() + 1, dtype=float), (rows[keep], cols[keep])),
+            shape=(n_free, n_free),
+        )
+        pattern.sum_duplicates()
+        pattern.sort_indices()
+        coo_keys = rows[keep] * n_free + cols[keep]
+        csr_rows = np.repeat(np.arange(n_free), np.diff(pattern.indptr))
+        csr_keys = csr_rows * n_free + pattern.indices
+        self._scatter = np.searchsorted(csr_keys, coo_keys)
+        self._indices = pattern.indices
+        self._indptr = pattern.indptr
+        self._shape = pattern.shape
+
+        # 포아송비별 단위(E=1) 강성행렬 / LU 분해 캐시
+        self._unit_stiffness = {}
+        self._factor = {}
+
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    def unit_stiffness(self, poisson_ratio):
+        """E=1 기준 축소 강성행렬 (희소 패턴 재사용, 포아송비별 캐시)"""
+        key = round(float(poisson_ratio), 6)
+        if key not in self._unit_stiffness:
+            d = elasticity_matrix(1.0, poisson_ratio)
+            ke = np.einsum('egik,ij,egjl,eg->ekl', self.b, d, self.b, self.det_j)
+            data = np.bincount(self._scatter, weights=ke.ravel()[self._keep],
+                               minlength=len(self._indices))
+            self._unit_stiffness[key] = sp.csr_matrix(
+                (data, self._indices, self._indptr), shape=self._shape
+            )
+        return self._unit_stiffness[key]
+
+    def thermal_load(self, node_temps, poisson_ratio, thermal_expansion,
+                     reference_temp=REFERENCE_TEMPERATURE):
+        """E=1 기준 열하중 벡터 (축소 자유도)"""
+        eps_th = self._thermal_strain(node_temps, thermal_expansion, reference_temp)
+        d = elasticity_matrix(1.0, poisson_ratio)
+        sig = np.einsum('ij,egj->egi', d, eps_th)
+        fe = np.einsum('egik,egi,eg->ek', self.b, sig, self.det_j)
+        f = np.bincount(self.edof.ravel(), weights=fe.ravel(), minlength=3 * self.n_nodes)
+        return f[self.free_dof]
+
+    def _thermal_strain(self, node_temps, thermal_expansion, reference_temp):
+        temps = np.asarray(node_temps, dtype=float)
+        t_gp = np.einsum('gn,en->eg', _N_GP, temps[self.connectivity])
+        eps = np.zeros(t_gp.shape + (6,))
+        eps[..., :3] = (float(thermal_expansion) * (t_gp - reference_temp))[..., None]
+        return eps
+
+    def solve(self, node_temps, elastic_modulus, poisson_ratio, thermal_expansion,
+              reference_temp=REFERENCE_TEMPERATURE, method='direct', tol=1e-10):
+        """열응력 해석 수행.
+
+        node_temps: 노드 순서(self.node_ids)의 온도 배열 또는 {node_id: 온도} 딕셔너리
+        method: 'direct' (LU 분해 재사용) | 'spsolve' | 'cg'
+
+        Returns
+        -------
+        dict: {'node_ids', 'displacements' (n, 3), 'stresses' (n, 6: SXX..SZX)}
+        """
+        if isinstance(node_temps, dict):
+            node_temps = np.array([node_temps[n] for n in self.node_ids], dtype=float)
+        # 순수 열하중이므로 변위는 E 와 무관: K(E) = E·K1, f(E) = E·f1
+        k1 = self.unit_stiffness(poisson_ratio)
+        f1 = self.thermal_load(node_temps, poisson_ratio, thermal_expansion, reference_temp)
+
+        if method == 'direct':
+            key = round(float(poisson_ratio), 6)
+            if key not in self._factor:
+                self._factor[key] = splu(k1.tocsc())
+            u_free = self._factor[key].solve(f1)
+        elif method == 'spsolve':
+            u_free = spsolve(k1.tocsc(), f1)
+        elif method == 'cg':
+            diag = k1.diagonal()
+            precond = sp.diags(1.0 / diag)
+            u_free, info = cg(k1, f1, rtol=tol, M=precond, maxiter=10 * len(f1))
+            if info != 0:
+                raise RuntimeError(f"CG 수렴 실패 (info={info})")
+        else:
+            raise ValueError(f"지원하지 않는 해석 방법: {method}")
+
+        u = np.zeros(3 * self.n_nodes)
+        u[self.free_dof] = u_free
+
+        # 적분점 응력 → 절점 외삽 → 공유 요소 평균
+        d = elasticity_matrix(elastic_modulus, poisson_ratio)
+        eps = np.einsum('egik,ek->egi', self.b, u[self.edof])
+        eps -= self._thermal_strain(node_temps, thermal_expansion, reference_temp)
+        sig_gp = np.einsum('ij,egj->egi', d, eps)
+        sig_nodal = np.einsum('ng,egi->eni', _EXTRAPOLATION, sig_gp)
+        stress = np.zeros((self.n_nodes, 6))
+        count = np.bincount(self.connectivity.ravel(), minlength=self.n_nodes)
+        for i in range(6):
+            stress[:, i] = np.bincount(self.connectivity.ravel(),
+                                       weights=sig_nodal[..., i].ravel(),
+                                       minlength=self.n_nodes)
+        stress /= np.maximum(count, 1)[:, None]
+
+        return {
+            'node_ids': self.node_ids,
+            'displacements': u.reshape(-1, 3),
+            'stresses': stress,
+        }
+
+
+# 메쉬별 모델 캐시 (시간별 반복 해석 시 희소 패턴/분해 재사용): cache_key → (메쉬 서명, 모델)
+_model_cache = {}
+
+
+def _mesh_signature(nodes, elements, fixed_nodes):
+    """좌표, 요소 연결, 고정 노드가 같을 때만 같은 값 (캐시 재사용 판단)"""
+    h = hashlib.sha1()
+    node_ids = sorted(nodes)
+    h.update(np.array(node_ids, dtype=np.int64).tobytes())
+    h.update(np.array([nodes[n] for n in node_ids], dtype=float).tobytes())
+    element_ids = sorted(elements)
+    h.update(np.array(element_ids, dtype=np.int64).tobytes())
+    h.update(np.array([elements[e] for e in element_ids], dtype=np.int64).tobytes())
+    if fixed_nodes is None:
+        h.update(b"z0")
+    else:
+        h.update(np.array(sorted(fixed_nodes), dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+def get_model(cache_key, nodes, elements, fixed_nodes=None):
+    """캐시된 모델을 반환하거나 새로 생성 (메쉬/요소 연결/경계조건이 바뀌면 재생성)"""
+    signature = _mesh_signature(nodes, elements, fixed_nodes)
+    entry = _model_cache.get(cache_key)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    model = ThermoElasticModel(nodes, elements, fixed_nodes)
+    _model_cache.pop(cache_key, None)
+    # 최대 20개 메쉬까지만 캐시
+    if len(_model_cache) >= 20:
+        oldest_key = next(iter(_model_cache))
+        del _model_cache[oldest_key]
+    _model_cache[cache_key] = (signature, model)
+    return model
+
+
+def clear_model_cache():
+    """모델 캐시 정리"""
+    _model_cache.clear()
+
+
+# ───────────────────── FRD / DAT 출력 (ccx 형식) ─────────────────────
+
+def _frd_header(f, n_nodes):
+    f.write("    1C\n")
+    f.write(f"    1U{'Concrete Curing Thermal Stress Analysis':<66}\n")
+    f.write(f"    1U{'DATE':<18}{datetime.now().strftime('%d.%B.%Y').lower():<48}\n")
+    f.write(f"    1U{'PGM':<18}{'SMART_TS fem_solver':<48}\n")
+
+
+def write_frd(frd_path, model, result):
+    """해석 결과를 ccx 와 동일한 형식의 FRD 파일로 저장 (노드, 요소, DISP, STRESS)"""
+    os.makedirs(os.path.dirname(frd_path) or '.', exist_ok=True)
+    n = model.n_nodes
+    tmp_path = frd_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        _frd_header(f, n)
+        f.write(f"    2C{n:>30}{1:>38}\n")
+        for nid, (x, y, z) in zip(model.node_ids, model.coords):
+            f.write(f" -1{nid:10d}{x:12.5E}{y:12.5E}{z:12.5E}\n")
+        f.write(" -3\n")
+        f.write(f"    3C{len(model.element_ids):>30}{1:>38}\n")
+        for eid, conn in zip(model.element_ids, model.connectivity):
+            f.write(f" -1{eid:10d}    1    0    1\n")
+            f.write(" -2" + "".join(f"{model.node_ids[c]:10d}" for c in conn) + "\n")
+        f.write(" -3\n")
+
+        blocks = [
+            ('DISP', 1, result['displacements'],
+             [" -5  D1          1    2    1    0", " -5  D2          1    2    2    0",
+              " -5  D3          1    2    3    0", " -5  ALL         1    2    0    0    1ALL"]),
+            ('STRESS', 2, result['stresses'],
+             [" -5  SXX         1    4    1    1", " -5  SYY         1    4    2    2",
+              " -5  SZZ         1    4    3    3", " -5  SXY         1    4    1    2",
+              " -5  SYZ         1    4    2    3", " -5  SZX         1    4    3    1"]),
+        ]
+        for name, step, values, comp_lines in blocks:
+            f.write(f"    1PSTEP{step:>26}{1:>12}{1:>12}\n")
+            f.write(f"  100CL  101 1.000000000{n:>12}{0:>22}{1:>5}{1:>12}\n")
+            f.write(f" -4  {name:<12}{len(comp_lines) if name == 'STRESS' else 4}    1\n")
+            for line in comp_lines:
+                f.write(line + "\n")
+            for nid, row in zip(result['node_ids'], values):
+                f.write(f" -1{nid:10d}" + "".join(f"{v:12.5E}" for v in row) + "\n")
+            f.write(" -3\n")
+        f.write(" 9999\n")
+    os.replace(tmp_path, frd_path)
+
+
+def write_dat(dat_path, model, result):
+    """*NODE PRINT / *EL PRINT 에 해당하는 DAT 파일 저장 (절점 변위, 절점 응력)"""
+    os.makedirs(os.path.dirname(dat_path) or '.', exist_ok=True)
+    with open(dat_path, 'w') as f:
+        f.write("\n                        S T E P       1\n\n\n")
+        f.write("                                INCREMENT     1\n\n\n")
+        f.write(" displacements (vx,vy,vz) for set ALLNODES and time  0.1000000E+01\n\n")
+        for nid, row in zip(result['node_ids'], result['displacements']):
+            f.write(f"{nid:10d}" + "".join(f"{v:14.6E}" for v in row) + "\n")
+        f.write("\n stresses (nodal, sxx,syy,szz,sxy,sxz,syz) for set SolidSet and time  0.1000000E+01\n\n")
+        for nid, row in zip(result['node_ids'], result['stresses']):
+            sxx, syy, szz, sxy, syz, szx = row
+            f.write(f"{nid:10d}" + "".join(f"{v:14.6E}" for v in (sxx, syy, szz, sxy, szx, syz)) + "\n")
+
+
+# ───────────────────── INP 파싱 / 실행 함수 ─────────────────────
+
+def read_inp_model(inp_path):
+    """generate_calculix_inp 형식의 INP 파일에서 해석 입력을 읽음.
+
+    Returns
+    -------
+    dict: nodes, elements, fixed_nodes, node_temperatures,
+          elastic_modulus, poisson_ratio, thermal_expansion, reference_temp
+    """
+    model = {
+        'nodes': {}, 'elements': {}, 'fixed_nodes': set(), 'node_temperatures': {},
+        'elastic_modulus': None, 'poisson_ratio': None, 'thermal_expansion': None,
+        'reference_temp': REFERENCE_TEMPERATURE,
+    }
+    section = None
+    with open(inp_path, 'r') as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith('**'):
+                continue
+            if line.startswith('*'):
+                keyword = line.split(',')[0].upper()
+                section = {
+                    '*NODE': 'node', '*ELEMENT': 'element', '*ELASTIC': 'elastic',
+                    '*EXPANSION': 'expansion', '*BOUNDARY': 'boundary',
+                    '*TEMPERATURE': 'temperature',
+                    '*INITIAL CONDITIONS': 'initial',
+                }.get(keyword)
+                continue
+            parts = [p.strip() for p in line.split(',')]
+            if section == 'node':
+                model['nodes'][int(parts[0])] = tuple(float(p) for p in parts[1:4])
+            elif section == 'element':
+                model['elements'][int(parts[0])] = [int(p) for p in parts[1:9]]
+            elif section == 'elastic':
+                model['elastic_modulus'] = float(parts[0])
+                model['poisson_ratio'] = float(parts[1])
+            elif section == 'expansion':
+                model['thermal_expansion'] = float(parts[0])
+            elif section == 'boundary':
+                model['fixed_nodes'].add(int(parts[0]))
+            elif section == 'temperature':
+                model['node_temperatures'][int(parts[0])] = float(parts[1])
+            elif section == 'initial':
+                model['reference_temp'] = float(parts[1])
+    return model
+
+
+def can_solve_inprocess(nodes, elements):
+    """In-process 백엔드 사용 가능 여부 (작은 C3D8 메쉬만)"""
+    return 0 < len(nodes) <= MAX_INPROCESS_NODES and len(elements) > 0
+
+
+def solve_to_frd(concrete_pk, base, nodes, elements, node_temperatures, elastic_modulus,
+                 poisson_ratio, thermal_expansion, method='direct', fixed_nodes=None):
+    """In-process 해석 후 frd/{concrete_pk}/{base}.frd, dat/{concrete_pk}/{base}.dat 저장.
+
+    Returns
+    -------
+    (bool, str): (성공 여부, 메시지)
+    """
+    try:
+        model = get_model(concrete_pk, nodes, elements, fixed_nodes)
+        result = model.solve(node_temperatures, elastic_modulus, poisson_ratio,
+                             thermal_expansion, method=method)
+        frd_path = os.path.join('frd', concrete_pk, f"{base}.frd")
+        dat_path = os.path.join('dat', concrete_pk, f"{base}.dat")
+        write_frd(frd_path, model, result)
+        write_dat(dat_path, model, result)
+        logger.info(f"{concrete_pk}/{base} in-process 해석 완료 (노드 {model.n_nodes}개)")
+        return True, "해석 성공"
+    except Exception as e:
+        logger.error(f"{concrete_pk}/{base} in-process 해석 오류: {e}")
+        return False, f"해석 오류: {e}"
+
+
+def solve_inp_file(inp_path, method='direct'):
+    """INP 파일을 읽어 해석하고 같은 위치에 .frd / .dat 저장 (ccx 와 동일한 입출력)"""
+    inp = read_inp_model(inp_path)
+    model = ThermoElasticModel(inp['nodes'], inp['elements'], inp['fixed_nodes'])
+    result = model.solve(inp['node_temperatures'], inp['elastic_modulus'], inp['poisson_ratio'],
+                         inp['thermal_expansion'], inp['reference_temp'], method=method)
+    base = os.path.splitext(inp_path)[0]
+    write_frd(base + '.frd', model, result)
+    write_dat(base + '.dat', model, result)
+    return model, result
+
+
+if __name__ == "__main__":
+    # ccx 대용 실행: python fem_solver.py <base>  (현재 디렉토리의 <base>.inp 해석)
+    import sys
+    if len(sys.argv) < 2:
+        print("사용법: python fem_solver.py <inp 파일명(확장자 제외)>")
+        sys.exit(1)
+    solve_inp_file(sys.argv[1] + '.inp')
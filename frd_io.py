@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CalculiX FRD(ASCII) 파일 파서
+- 노드 좌표(2C), 요소 연결(3C), 결과 블록(-4 DISP / STRESS 등)을 NumPy 배열로 읽음
+- 고정폭 형식을 bytes 배열로 한 번에 변환하여 줄 단위 정규식 파싱보다 빠름
+"""
+
+import numpy as np
+
+# FRD 요소 타입 → (노드 수, VTK 셀 타입)
+FRD_ELEMENT_TYPES = {
+    1: (8, 12),    # he8  → VTK_HEXAHEDRON
+    2: (6, 13),    # pe6  → VTK_WEDGE
+    3: (4, 10),    # te4  → VTK_TETRA
+}
+
+
+def _parse_values(lines, width=12):
+    """' -1' + ID(10) + 값(12자리 고정폭) 형식 라인들을 (ids, values) 배열로 변환"""
+    if not lines:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+    n_values = max((len(line) - 13) // width for line in lines)
+    row = width * n_values
+    ids = np.array([int(line[3:13]) for line in lines], dtype=np.int64)
+    buf = "".join(line[13:13 + row].ljust(row) for line in lines).encode("ascii")
+    values = np.frombuffer(buf, dtype=f"S{width}").astype(float).reshape(len(lines), n_values)
+    return ids, values
+
+
+def read_frd_arrays(frd_path):
+    """FRD 파일 전체를 배열로 읽음.
+
+    Returns
+    -------
+    dict:
+        node_ids     (n,)      노드 ID (오름차순)
+        coords       (n, 3)    노드 좌표
+        element_ids  (ne,)     요소 ID
+        element_types (ne,)    FRD 요소 타입
+        connectivity list[np.ndarray] 요소별 노드 인덱스(0-based, node_ids 기준)
+        results      {블록명: (n, k) 배열 (node_ids 순서, 값이 없는 노드는 NaN)}
+        components   {블록명: [성분명...]}
+    """
+    with open(frd_path, "r") as f:
+        lines = f.read().splitlines()
+
+    node_lines, results, components = [], {}, {}
+    element_ids, element_types, element_nodes = [], [], []
+    section, block_name, block_lines = None, None, []
+
+    for line in lines:
+        key = line[:3]
+        if section is None:
+            if line.startswith("    2C"):
+                section = "nodes"
+            elif line.startswith("    3C"):
+                section = "elements"
+            elif line.startswith(" -4  "):
+                section = "result"
+                block_name = line[5:13].strip()
+                block_lines = []
+                components[block_name] = []
+            continue
+
+        if key == " -3":
+            if section == "result":
+                results[block_name] = _parse_values(block_lines)
+            section = None
+            continue
+
+        if section == "nodes" and key == " -1":
+            node_lines.append(line)
+        elif section == "elements":
+            if key == " -1":
+                element_ids.append(int(line[3:13]))
+                element_types.append(int(line[13:18]))
+                element_nodes.append([])
+            elif key == " -2":
+                text = line[3:].rstrip()
+                element_nodes[-1].extend(int(text[i:i + 10]) for i in range(0, len(text), 10))
+        elif section == "result":
+            if key == " -5":
+                name = line[5:13].strip()
+                if name != "ALL":
+                    components[block_name].append(name)
+            elif key == " -1":
+                block_lines.append(line)
+
+    node_ids, coords = _parse_values(node_lines)
+    order = np.argsort(node_ids)
+    node_ids, coords = node_ids[order], coords[order, :3]
+
+    connectivity = []
+    for nodes in element_nodes:
+        connectivity.append(np.searchsorted(node_ids, nodes))
+
+    point_data = {}
+    for name, (ids, values) in results.items():
+        values = values[:, :len(components[name]) or values.shape[1]]
+        arr = np.full((len(node_ids), values.shape[1]), np.nan)
+        arr[np.searchsorted(node_ids, ids)] = values
+        point_data[name] = arr
+
+    return {
+        "node_ids": node_ids,
+        "coords": coords,
+        "element_ids": np.array(element_ids, dtype=np.int64),
+        "element_types": np.array(element_types, dtype=np.int64),
+        "connectivity": connectivity,
+        "results": point_data,
+        "components": components,
+    }
+
+
+def read_frd_block(frd_path, name):
+    """FRD 결과 블록(DISP, STRESS 등)을 {node_id: [값...]} 으로 읽음"""
+    values = {}
+    in_block = False
+    with open(frd_path, 'r') as f:
+        for line in f:
+            if line.startswith(f' -4  {name} '):
+                in_block = True
+                continue
+            if not in_block:
+                continue
+            if line.startswith(' -3'):
+                break
+            if line.startswith(' -1'):
+                n = (len(line.rstrip()) - 13) // 12
+                values[int(line[3:13])] = [float(line[13 + 12 * i:25 + 12 * i]) for i in range(n)]
+    return values
+
+
+def read_frd_elements(frd_path):
+    """FRD 파일의 3C 블록에서 요소 연결 정보를 읽음 ({element_id: [node ids]})"""
+    elements = {}
+    in_block = False
+    current = None
+    with open(frd_path, 'r') as f:
+        for line in f:
+            if line.startswith('    3C'):
+                in_block = True
+                continue
+            if not in_block:
+                continue
+            if line.startswith(' -3'):
+                break
+            if line.startswith(' -1'):
+                current = int(line[3:13])
+                elements[current] = []
+            elif line.startswith(' -2') and current is not None:
+                elements[current].extend(int(line[i:i + 10]) for i in range(3, len(line.rstrip()), 10))
+    return elements
+
+
+def von_mises(stress):
+    """(n, 6) 응력 배열(SXX, SYY, SZZ, SXY, SYZ, SZX)의 von Mises 응력"""
+    sxx, syy, szz, sxy, syz, szx = (stress[:, i] for i in range(6))
+    return np.sqrt(0.5 * ((sxx - syy) ** 2 + (syy - szz) ** 2 + (szz - sxx) ** 2
+                          + 6.0 * (sxy ** 2 + syz ** 2 + szx ** 2)))
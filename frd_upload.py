@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+FRD 파일 분할(이어 올리기) 업로드
+- 클라이언트가 파일을 CHUNK_SIZE 조각으로 나눠 보내면 요청 본문을 그대로 임시 파일(UPLOAD_DIR/{id}.part)에 이어 씀
+  (dcc.Upload 처럼 base64 data URL 전체를 콜백에서 메모리로 디코딩하지 않음)
+- 연결이 끊겨도 상태 조회(received)로 받은 위치부터 다시 보내면 됨. 이미 받은 위치보다 앞의 offset 이 오면
+  그 위치부터 다시 씀 (조각 재전송)
+- 모든 요청은 로그인(login_user) 필요, 업로드는 시작한 사용자만 이어 올릴 수 있고
+  시작/조각/commit 마다 콘크리트가 속한 프로젝트에 접근 권한이 있는지 확인
+- commit 시 크기를 확인하고 frd/{concrete_pk}/ 로 원자적으로 옮김(os.replace).
+  VTK/VTKHDF 시계열/LOD 후처리는 웹 프로세스에서 하지 않고 자동화 파이프라인에 맡김
+  (auto_run --watch 의 fs_watcher 가 frd/ 에 옮겨진 파일을 감지해 vtk/series/lod 단계에 넘김,
+  감시하지 않을 때는 다음 주기 실행에서 처리)
+
+라우트 (app.py):
+    POST /upload/frd                      concrete_pk, filename, size → upload_id
+    GET  /upload/frd/<id>                 받은 바이트 수 (이어 올리기 위치)
+    PUT  /upload/frd/<id>?offset=N        조각 본문 (offset 대신 index 도 가능: offset = index * chunk_size)
+    POST /upload/frd/<id>/commit          frd/{concrete_pk}/{filename} 로 이동
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import secrets
+import logging
+import threading
+
+from flask import jsonify
+
+import api_db
+
+UPLOAD_DIR = os.path.join("data", "uploads")
+FRD_ROOT = "frd"
+# 클라이언트 권장 조각 크기와 요청 하나의 최대 크기 (bytes)
+CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+MAX_UPLOAD_BYTES = 20 * 1024 ** 3
+# 요청 본문을 파일로 옮기는 단위
+COPY_BUFSIZE = 1024 * 1024
+# 이 시간(초) 동안 진행이 없는 업로드는 정리
+UPLOAD_TTL = 24 * 3600
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.\-]+$")
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+# 로거 설정
+def setup_frd_upload_logger():
+    """frd_upload 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('frd_upload_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'frd_upload.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | FRD_UPLOAD | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_frd_upload_logger()
+
+
+class UploadError(Exception):
+    """업로드 요청 오류 (status: 응답 HTTP 상태 코드)"""
+
+    def __init__(self, msg, status=400, **extra):
+        super().__init__(msg)
+        self.status = status
+        self.extra = extra
+
+
+def _lock(upload_id):
+    with _locks_guard:
+        return _locks.setdefault(upload_id, threading.Lock())
+
+
+def _paths(upload_id, upload_dir):
+    base = os.path.join(upload_dir or UPLOAD_DIR, upload_id)
+    return base + ".json", base + ".part"
+
+
+def has_concrete_access(concrete_pk, user_id):
+    """콘크리트가 속한 프로젝트에 사용자가 접근할 수 있는지 (ITS1 → ITS2 순서로 권한 확인)
+
+    한 ITS 에서 조회에 성공해도 그 ITS 에 프로젝트가 없으면 다음 ITS 도 확인
+    """
+    df_conc = api_db.get_concrete_data(concrete_pk=concrete_pk)
+    if df_conc.empty:
+        return False
+    project_pk = str(df_conc.iloc[0]["project_pk"])
+    for its_num in (1, 2):
+        result = api_db.get_accessible_projects(user_id, its_num=its_num)
+        if result["result"] == "Success" and project_pk in set(result["projects"]["projectid"].astype(str)):
+            return True
+    return False
+
+
+def _check_user(user_id, concrete_pk):
+    if not user_id:
+        raise UploadError("로그인이 필요합니다", 401)
+    if not has_concrete_access(concrete_pk, user_id):
+        logger.warning(f"권한 없는 업로드 요청: user={user_id} concrete={concrete_pk}")
+        raise UploadError("이 콘크리트에 업로드할 권한이 없습니다", 403)
+
+
+def _load(upload_id, user_id, upload_dir):
+    if not user_id:
+        raise UploadError("로그인이 필요합니다", 401)
+    if not upload_id or not _ID_RE.match(upload_id):
+        raise UploadError("잘못된 업로드 ID 입니다", 404)
+    meta_path, part_path = _paths(upload_id, upload_dir)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        raise UploadError("업로드를 찾을 수 없습니다", 404)
+    # 소유자가 없는 업로드는 누구의 것도 아니므로 거부
+    if not meta.get("user") or meta["user"] != user_id:
+        raise UploadError("업로드 권한이 없습니다", 403)
+    _check_user(user_id, meta["concrete_pk"])
+    meta["received"] = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    return meta
+
+
+def _status(upload_id, meta):
+    return {"upload_id": upload_id, "filename": meta["filename"], "concrete_pk": meta["concrete_pk"],
+            "size": meta["size"], "received": meta["received"], "chunk_size": CHUNK_SIZE}
+
+
+def purge_stale(upload_dir=None, max_age=UPLOAD_TTL):
+    """max_age 동안 진행이 없는 업로드 파일 정리. Returns: 정리한 업로드 수"""
+    upload_dir = upload_dir or UPLOAD_DIR
+    if not os.path.isdir(upload_dir):
+        return 0
+    now, removed = time.time(), 0
+    for name in os.listdir(upload_dir):
+        if not name.endswith(".json"):
+            continue
+        meta_path, part_path = _paths(name[:-len(".json")], upload_dir)
+        last = max(os.path.getmtime(p) for p in (meta_path, part_path) if os.path.exists(p))
+        if now - last > max_age:
+            for p in (meta_path, part_path):
+                if os.path.exists(p):
+                    os.remove(p)
+            removed += 1
+    if removed:
+        logger.info(f"오래된 업로드 {removed}개 정리")
+    return removed
+
+
+def start_upload(concrete_pk, filename, size, user_id=None, upload_dir=None, frd_root=None):
+    """업로드 시작 → 상태 dict (upload_id, received=0, chunk_size ...)"""
+    concrete_pk, filename = str(concrete_pk or ""), os.path.basename(filename or "")
+    if not _NAME_RE.match(concrete_pk):
+        raise UploadError("잘못된 콘크리트 ID 입니다")
+    if not _NAME_RE.match(filename) or not filename.lower().endswith(".frd"):
+        raise UploadError("FRD 파일(.frd)만 업로드할 수 있습니다")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("파일 크기(size)가 필요합니다")
+    if not 0 < size <= MAX_UPLOAD_BYTES:
+        raise UploadError(f"파일 크기는 {MAX_UPLOAD_BYTES // 1024 ** 3}GB 이하여야 합니다", 413)
+    _check_user(user_id, concrete_pk)
+    if os.path.exists(os.path.join(frd_root or FRD_ROOT, concrete_pk, filename)):
+        raise UploadError(f"중복된 파일명: {filename}", 409)
+
+    upload_dir = upload_dir or UPLOAD_DIR
+    os.makedirs(upload_dir, exist_ok=True)
+    purge_stale(upload_dir)
+    upload_id = secrets.token_urlsafe(18)
+    meta_path, part_path = _paths(upload_id, upload_dir)
+    meta = {"concrete_pk": concrete_pk, "filename": filename, "size": size, "user": user_id,
+            "created": time.time()}
+    open(part_path, "wb").close()
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    logger.info(f"업로드 시작: {upload_id} user={user_id} {concrete_pk}/{filename} ({size} bytes)")
+    meta["received"] = 0
+    return _status(upload_id, meta)
+
+
+def upload_status(upload_id, user_id=None, upload_dir=None):
+    """이어 올리기용 상태 dict (received: 지금까지 받은 바이트 수)"""
+    return _status(upload_id, _load(upload_id, user_id, upload_dir))
+
+
+def write_chunk(upload_id, stream, offset=None, index=None, length=None, user_id=None, upload_dir=None):
+    """조각 본문(stream)을 offset 위치에 씀 → 상태 dict.
+
+    offset 이 없으면 index * CHUNK_SIZE. 받은 위치보다 뒤(빈 구간)면 409, 앞이면 그 위치부터 다시 씀
+    """
+    if offset is None:
+        if index is None:
+            raise UploadError("offset 또는 index 가 필요합니다")
+        offset = int(index) * CHUNK_SIZE
+    offset = int(offset)
+    if length is not None and length > MAX_CHUNK_BYTES:
+        raise UploadError(f"조각은 {MAX_CHUNK_BYTES // 1024 ** 2}MB 이하여야 합니다", 413)
+
+    with _lock(upload_id):
+        meta = _load(upload_id, user_id, upload_dir)
+        if offset > meta["received"] or offset < 0:
+            raise UploadError("받은 위치와 맞지 않는 조각입니다", 409, received=meta["received"])
+        _, part_path = _paths(upload_id, upload_dir)
+        written = 0
+        with open(part_path, "r+b") as f:
+            f.seek(offset)
+            f.truncate()
+            while True:
+                buf = stream.read(COPY_BUFSIZE)
+                if not buf:
+                    break
+                written += len(buf)
+                if offset + written > meta["size"] or written > MAX_CHUNK_BYTES:
+                    f.truncate(offset)
+                    raise UploadError("파일 크기를 넘는 조각입니다", 413, received=offset)
+                f.write(buf)
+        meta["received"] = offset + written
+    return _status(upload_id, meta)
+
+
+def _atomic_move(src, dst):
+    """src → dst 원자적 이동 (다른 파일시스템이면 대상 폴더에 복사한 뒤 이름 교체)"""
+    try:
+        os.replace(src, dst)
+    except OSError:
+        tmp = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        os.remove(src)
+
+
+def commit_upload(upload_id, user_id=None, upload_dir=None, frd_root=None):
+    """받은 크기를 확인하고 frd/{concrete_pk}/{filename} 로 옮김 → dict(path, size, queued).
+
+    후처리(vtk/series/lod)는 파이프라인이 frd/ 의 새 파일을 보고 실행 (queued=True)
+    """
+    frd_root = frd_root or FRD_ROOT
+    with _lock(upload_id):
+        meta = _load(upload_id, user_id, upload_dir)
+        if meta["received"] != meta["size"]:
+            raise UploadError("아직 모든 조각을 받지 않았습니다", 409, received=meta["received"])
+        target_dir = os.path.join(frd_root, meta["concrete_pk"])
+        target = os.path.join(target_dir, meta["filename"])
+        if os.path.exists(target):
+            raise UploadError(f"중복된 파일명: {meta['filename']}", 409)
+        os.makedirs(target_dir, exist_ok=True)
+        meta_path, part_path = _paths(upload_id, upload_dir)
+        _atomic_move(part_path, target)
+        os.remove(meta_path)
+    with _locks_guard:
+        _locks.pop(upload_id, None)
+    logger.info(f"업로드 완료: {upload_id} → {target} (후처리는 파이프라인)")
+    return {"path": target, "size": meta["size"], "queued": True}
+
+
+# ---------------------------------------------------------------------------
+# Flask 라우트 처리 (UploadError → JSON 오류 응답)
+# ---------------------------------------------------------------------------
+
+def _respond(func, *args, status=200, **kwargs):
+    try:
+        return jsonify({"result": "Success", **func(*args, **kwargs)}), status
+    except UploadError as e:
+        return jsonify({"result": "Fail", "msg": str(e), **e.extra}), e.status
+
+
+def handle_start(form, user_id):
+    """POST /upload/frd"""
+    return _respond(start_upload, form.get("concrete_pk"), form.get("filename"), form.get("size"),
+                    user_id, status=201)
+
+
+def handle_status(upload_id, user_id):
+    """GET /upload/frd/<id>"""
+    return _respond(upload_status, upload_id, user_id)
+
+
+def handle_chunk(upload_id, req, user_id):
+    """PUT /upload/frd/<id>?offset=N (또는 index=i), 본문은 조각 바이트"""
+    try:
+        offset, index = req.args.get("offset"), req.args.get("index")
+        offset = int(offset) if offset is not None else None
+        index = int(index) if index is not None else None
+    except ValueError:
+        return jsonify({"result": "Fail", "msg": "offset/index 는 정수여야 합니다"}), 400
+    return _respond(write_chunk, upload_id, req.stream, offset, index, req.content_length, user_id)
+
+
+def handle_commit(upload_id, user_id):
+    """POST /upload/frd/<id>/commit"""
+    return _respond(commit_upload, upload_id, user_id)
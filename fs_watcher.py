@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+INP/FRD 파일 감시 → 파이프라인 후속 단계 즉시 실행
+- inp/{concrete_pk}/*.inp 가 생기거나 바뀌면 frd 단계(ccx 변환),
+  frd/{concrete_pk}/*.frd 가 생기거나 바뀌면 vtk / series / lod 단계(VTU 변환, 시계열·LOD 캐시)에
+  해당 콘크리트를 바로 넣음 → 주기적인 전체 폴더 탐색(os.walk) 없이 변경된 콘크리트만 처리
+- Linux 는 inotify (ctypes, 추가 패키지 없음), 사용할 수 없거나 감시 개수 한도(ENOSPC)에 걸리면
+  폴링으로 전환: 폴더 수정시각이 바뀐 폴더만 다시 읽어 새로 생긴/바뀐 파일을 찾음
+  (폴링은 제자리 덮어쓰기를 놓칠 수 있음 → 파이프라인의 긴 주기 전체 처리가 보완)
+- 디바운스: 파일의 마지막 이벤트 후 debounce 초 동안 조용해야 처리 (쓰는 중인 파일 제외)
+- 멱등성: 이미 넘긴 파일은 (크기, 수정시각)이 같으면 다시 넘기지 않음 (최근 SEEN_MAX 개 파일만 기억,
+  오래된 것부터 잊음 → 장기 실행 시 메모리 일정). 잊은 파일이 다시 넘어가도 후속 단계도 manifest/기존 파일 확인으로
+  같은 파일을 두 번 변환하지 않음
+- inotify 이벤트 큐가 넘치면(IN_Q_OVERFLOW) 무엇이 바뀌었는지 알 수 없으므로 해당 단계 전체 처리를 요청
+
+사용 예:
+    ctx = pipeline.start_pipeline(full_scan_interval=fs_watcher.WATCH_FULL_SCAN_INTERVAL)
+    fs_watcher.start_watcher(lambda stage, items: pipeline.submit(ctx, stage, items), stop_event=ctx["stop"])
+"""
+
+import os
+import time
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+import threading
+from collections import OrderedDict
+
+# 감시 폴더 → (대상 확장자, 변경 시 실행할 단계)
+WATCH_ROOTS = {
+    "inp": ((".inp",), ("frd",)),
+    "frd": ((".frd",), ("vtk", "series", "lod")),
+}
+# 마지막 이벤트 후 이 시간(초) 동안 변화가 없으면 처리
+DEBOUNCE_SEC = 2.0
+# 폴링 백엔드의 폴더 확인 주기 (초)
+POLL_INTERVAL = 5.0
+# 감시 중일 때 후속 단계 전체 처리 주기 (초) - 놓친 변경을 위한 안전망
+WATCH_FULL_SCAN_INTERVAL = 24 * 3600
+# 멱등성 확인용으로 기억하는 최근 처리 파일 수 (넘으면 가장 오래된 것부터 제거)
+SEEN_MAX = 10000
+# 쓰는 중이거나 임시인 파일
+IGNORE_SUFFIXES = (".tmp", ".part", ".swp")
+
+# inotify 상수 (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+# 로거 설정
+def setup_fs_watcher_logger():
+    """fs_watcher 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('fs_watcher_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'fs_watcher.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | FS_WATCHER | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_fs_watcher_logger()
+
+
+# ---------------------------------------------------------------------------
+# 백엔드: add(폴더), events(timeout) → [(경로, 폴더 여부)] 또는 None(이벤트 유실)
+# ---------------------------------------------------------------------------
+
+class _Inotify:
+    """inotify 감시 (폴더마다 watch 1개, 새 하위 폴더는 생기는 대로 추가)"""
+
+    name = "inotify"
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify 를 지원하지 않는 시스템")
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs = {}
+
+    def add(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch 실패: {path} ({os.strerror(err)})")
+        self._dirs[wd] = path
+
+    def events(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        result, offset = [], 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self._dirs.pop(wd, None)
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            is_dir = bool(mask & IN_ISDIR)
+            # 일반 파일은 쓰기가 끝났을 때(CLOSE_WRITE) 또는 옮겨졌을 때만, 폴더는 생기면 바로
+            if is_dir or mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                result.append((os.path.join(parent, os.fsdecode(name)), is_dir))
+        return result
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _Poller:
+    """폴링 감시: 수정시각이 바뀐 폴더만 다시 읽어 새 파일/바뀐 파일을 찾음"""
+
+    name = "polling"
+
+    def __init__(self, interval=POLL_INTERVAL, stop_event=None):
+        self._interval = interval
+        self._stop = stop_event or threading.Event()
+        self._dirs = {}    # 폴더 → 수정시각(ns)
+        self._files = {}   # 폴더 → {이름: (크기, 수정시각)}
+        self._last = 0.0
+
+    def _snapshot(self, path):
+        files, subdirs = {}, []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat()
+                    files[entry.name] = (st.st_size, st.st_mtime_ns)
+        return files, subdirs
+
+    def add(self, path):
+        self._dirs[path] = os.stat(path).st_mtime_ns
+        self._files[path], _ = self._snapshot(path)
+
+    def events(self, timeout):
+        wait = min(timeout, max(0.0, self._last + self._interval - time.monotonic()))
+        if wait > 0 and self._stop.wait(wait):
+            return []
+        if time.monotonic() < self._last + self._interval:
+            return []
+        self._last = time.monotonic()
+        result = []
+        for path, mtime in list(self._dirs.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+                if current == mtime:
+                    continue
+                files, subdirs = self._snapshot(path)
+            except OSError:
+                self._dirs.pop(path, None)
+                self._files.pop(path, None)
+                continue
+            self._dirs[path] = current
+            old = self._files.get(path, {})
+            self._files[path] = files
+            result += [(os.path.join(path, name), False) for name, key in files.items() if old.get(name) != key]
+            result += [(sub, True) for sub in subdirs if sub not in self._dirs]
+        return result
+
+    def close(self):
+        pass
+
+
+def open_backend(backend="auto", stop_event=None, poll_interval=POLL_INTERVAL):
+    """감시 백엔드 생성. backend: "inotify" | "polling" | "auto"(inotify 를 쓸 수 없으면 폴링)"""
+    if backend in ("auto", "inotify"):
+        try:
+            return _Inotify()
+        except (OSError, AttributeError) as e:
+            if backend == "inotify":
+                raise
+            logger.warning(f"inotify 사용 불가, 폴링으로 전환: {e}")
+    return _Poller(poll_interval, stop_event)
+
+
+# ---------------------------------------------------------------------------
+# 감시 루프
+# ---------------------------------------------------------------------------
+
+def classify(path, roots=None):
+    """파일 경로 → (감시 폴더, 콘크리트) 또는 None (대상이 아닌 파일)"""
+    roots = roots or WATCH_ROOTS
+    name = os.path.basename(path)
+    if name.startswith(".") or name.endswith(IGNORE_SUFFIXES):
+        return None
+    for root, (suffixes, _) in roots.items():
+        rel = os.path.relpath(path, root)
+        parts = rel.split(os.sep)
+        if rel.startswith("..") or len(parts) != 2:
+            continue
+        if name.lower().endswith(suffixes):
+            return root, parts[0]
+    return None
+
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _add_tree(backend, path, found):
+    """폴더와 하위 폴더를 감시에 추가. 추가하기 전에 생긴 파일은 found 에 넣음"""
+    backend.add(path)
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                _add_tree(backend, entry.path, found)
+            elif entry.is_file(follow_symlinks=False):
+                found.append(entry.path)
+
+
+def _add_roots(backend, roots):
+    for root in roots:
+        os.makedirs(root, exist_ok=True)
+        backend.add(root)
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    backend.add(entry.path)
+
+
+def watch_loop(dispatch, roots=None, stop_event=None, debounce=DEBOUNCE_SEC, backend="auto",
+               poll_interval=POLL_INTERVAL, stats=None, seen_max=SEEN_MAX):
+    """stop_event 가 set 될 때까지 감시하며 dispatch(단계, 콘크리트 목록 또는 None=전체) 호출.
+
+    stats: 넘겨주면 backend, ready(감시 등록 완료), events, dispatched, skipped 를 갱신 (상태 확인/테스트용)
+    seen_max: 멱등성 확인용으로 기억할 최근 파일 수
+    """
+    roots = roots or WATCH_ROOTS
+    stop_event = stop_event or threading.Event()
+    stats = stats if stats is not None else {}
+    stats.update({"backend": None, "ready": False, "events": 0, "dispatched": 0, "skipped": 0})
+    watcher = open_backend(backend, stop_event, poll_interval)
+    try:
+        _add_roots(watcher, roots)
+    except OSError as e:
+        # 감시 개수 한도(ENOSPC) 등 → 폴링으로 다시 시작
+        if watcher.name == "polling" or backend == "inotify":
+            raise
+        logger.warning(f"inotify 감시 추가 실패, 폴링으로 전환: {e}")
+        watcher.close()
+        watcher = _Poller(poll_interval, stop_event)
+        _add_roots(watcher, roots)
+    stats["backend"] = watcher.name
+    stats["ready"] = True
+    logger.info(f"파일 감시 시작 ({watcher.name}): {', '.join(roots)}")
+
+    pending = {}   # 경로 → 마지막 이벤트 시각
+    seen = OrderedDict()   # 경로 → 넘긴 시점의 (크기, 수정시각), 최근에 넘긴 순서
+    try:
+        while not stop_event.is_set():
+            events = watcher.events(min(debounce, 1.0) if pending else 1.0)
+            if events is None:
+                logger.warning("이벤트 큐 넘침 → 감시 단계 전체 처리 요청")
+                for _, stages in roots.values():
+                    for stage in stages:
+                        dispatch(stage, None)
+                continue
+
+            now = time.monotonic()
+            for path, is_dir in events:
+                stats["events"] += 1
+                if is_dir:
+                    found = []
+                    try:
+                        _add_tree(watcher, path, found)
+                    except OSError as e:
+                        logger.warning(f"새 폴더 감시 추가 실패: {path} ({e})")
+                    for file_path in found:
+                        pending[file_path] = now
+                elif classify(path, roots):
+                    pending[path] = now
+
+            ready = [p for p, t in pending.items() if now - t >= debounce]
+            if not ready:
+                continue
+            by_stage = {}
+            for path in ready:
+                del pending[path]
+                target = classify(path, roots)
+                key = _file_key(path)
+                if target is None or key is None:
+                    continue
+                if seen.get(path) == key:
+                    stats["skipped"] += 1
+                    continue
+                seen[path] = key
+                seen.move_to_end(path)
+                while len(seen) > seen_max:
+                    seen.popitem(last=False)
+                root, concrete_pk = target
+                for stage in roots[root][1]:
+                    by_stage.setdefault(stage, set()).add(concrete_pk)
+                stats["dispatched"] += 1
+            for stage, pks in by_stage.items():
+                logger.info(f"{stage} 단계 요청: 콘크리트 {', '.join(sorted(pks))}")
+                dispatch(stage, sorted(pks))
+    finally:
+        watcher.close()
+        logger.info("파일 감시 종료")
+
+
+def start_watcher(dispatch, roots=None, stop_event=None, **kwargs):
+    """감시 루프를 데몬 스레드로 시작.
+
+    Returns
+    -------
+    dict: thread, stop(Event), stats(backend, ready, events, dispatched, skipped)
+    """
+    stop_event = stop_event or threading.Event()
+    stats = {}
+    thread = threading.Thread(target=watch_loop, args=(dispatch, roots, stop_event),
+                              kwargs={**kwargs, "stats": stats}, name="fs-watcher", daemon=True)
+    thread.start()
+    return {"thread": thread, "stop": stop_event, "stats": stats}
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ITS1/ITS2 메타데이터 테이블 로컬 미러 (SQLite)
+- 프로젝트/그룹/구조/디바이스/센서/사용자 권한 테이블을 ITS 별 SQLite 파일로 주기적으로 복제
+- 원격 테이블을 한 번 읽어 행 해시(_row_hash)를 비교하고 바뀐 행만 반영 (추가/변경/삭제)
+- 동기화는 ITS 단위 트랜잭션 + WAL 모드라 읽는 쪽은 항상 완전한 이전/이후 상태만 봄
+- mirror_engine(): 모든 테이블이 MIRROR_MAX_AGE 이내에 동기화되었을 때만 미러 엔진 반환
+  (api_db 의 ITS 조회는 미러가 최신이면 미러, 아니면 ITS 서버로 조회)
+- 비밀번호(tb_user.userpw)는 복제하지 않음 → 로그인 인증은 항상 ITS 서버에서
+
+사용 예:
+    python its_mirror.py            # ITS1, ITS2 동기화
+    python its_mirror.py --its 1
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+MIRROR_ROOT = "data/its_mirror"
+# 마지막 동기화 후 이 시간(초)이 지나면 미러를 쓰지 않고 ITS 서버로 조회
+MIRROR_MAX_AGE = 3600
+ITS_NUMS = (1, 2)
+META_TABLE = "_mirror_meta"
+
+# 복제 테이블: {테이블: (키 컬럼, 복제 컬럼)}
+MIRROR_TABLES = {
+    "tb_project": (("projectid",), ("projectid", "projectname", "regdate", "closedate")),
+    "tb_group": (("groupid",), ("groupid", "projectid")),
+    "tb_structure": (("stid",), ("stid", "stname", "staddr", "groupid")),
+    "tb_device": (("deviceid",), ("deviceid", "stid", "devicetype", "modelidx", "manageyn")),
+    "tb_sensor": (("deviceid", "channel"), ("deviceid", "channel", "manageyn")),
+    "tb_device_data_type": (("device_type",), ("device_type", "data_type")),
+    "tb_device_catalog": (("idx",), ("idx", "modelname")),
+    "tb_sensor_auth_mapping": (("userid", "id"), ("userid", "id")),
+    "tb_user": (("userid",), ("userid", "grade", "authstartdate", "authenddate")),
+}
+
+# 미러 조회에 쓰는 인덱스: (테이블, 컬럼)
+MIRROR_INDEXES = [
+    ("tb_group", ("projectid",)),
+    ("tb_structure", ("groupid",)),
+    ("tb_device", ("stid",)),
+]
+
+
+# 로거 설정
+def setup_its_mirror_logger():
+    """its_mirror 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('its_mirror_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'its_mirror.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | ITS_MIRROR | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_its_mirror_logger()
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def mirror_path(its_num, mirror_root=None):
+    return os.path.join(mirror_root or MIRROR_ROOT, f"ITS{its_num}.db")
+
+
+def get_mirror_engine(its_num, mirror_root=None):
+    """ITS 번호별 미러 SQLite 엔진 (WAL 모드, 여러 스레드에서 읽기)"""
+    path = mirror_path(its_num, mirror_root)
+    with _engines_lock:
+        eng = _engines.get(path)
+        if eng is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            eng = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+            @event.listens_for(eng, "connect")
+            def _set_wal(dbapi_conn, _):
+                dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+            _engines[path] = eng
+        return eng
+
+
+def _ensure_schema(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {META_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            synced_at  REAL,
+            row_count  INTEGER,
+            changed    INTEGER
+        )
+    """))
+    for table, (keys, columns) in MIRROR_TABLES.items():
+        cols = ", ".join(f'"{c}"' for c in columns)
+        pk = ", ".join(f'"{k}"' for k in keys)
+        conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{table}" ({cols}, _row_hash TEXT, PRIMARY KEY ({pk}))'))
+    for table, columns in MIRROR_INDEXES:
+        name = f"idx_{table}_{'_'.join(columns)}"
+        conn.execute(text(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({", ".join(columns)})'))
+
+
+def _plain(value):
+    """SQLite 에 넣을 값 (Timestamp → 문자열, NaN → None)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _row_hash(values):
+    return hashlib.sha1(json.dumps(values, default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def sync_table(conn, source_engine, table):
+    """원격 테이블을 읽어 바뀐 행만 미러에 반영. Returns: (전체 행 수, 변경 행 수)"""
+    keys, columns = MIRROR_TABLES[table]
+    remote = pd.read_sql(text(f"SELECT {', '.join(columns)} FROM {table}"), source_engine)
+    remote_rows = {}
+    for values in remote.itertuples(index=False, name=None):
+        values = [_plain(v) for v in values]
+        row = dict(zip(columns, values))
+        remote_rows[tuple(str(row[k]) for k in keys)] = (row, _row_hash(values))
+
+    local_hashes = {
+        tuple(str(v) for v in r[:-1]): r[-1]
+        for r in conn.execute(text(f'SELECT {", ".join(keys)}, _row_hash FROM "{table}"'))
+    }
+
+    deleted = [dict(zip(keys, key)) for key in local_hashes if key not in remote_rows]
+    upserts = [dict(row, _row_hash=h) for key, (row, h) in remote_rows.items() if local_hashes.get(key) != h]
+    if deleted:
+        where = " AND ".join(f'CAST("{k}" AS TEXT) = :{k}' for k in keys)
+        conn.execute(text(f'DELETE FROM "{table}" WHERE {where}'), deleted)
+    if upserts:
+        cols = list(columns) + ["_row_hash"]
+        conn.execute(
+            text(f'INSERT OR REPLACE INTO "{table}" ({", ".join(cols)}) VALUES ({", ".join(":" + c for c in cols)})'),
+            upserts,
+        )
+    return len(remote_rows), len(deleted) + len(upserts)
+
+
+def sync_its(its_num, source_engine, mirror_root=None):
+    """ITS 하나의 모든 메타데이터 테이블 동기화 (한 트랜잭션).
+
+    Returns
+    -------
+    dict: {테이블: {"rows", "changed"}}
+    """
+    start = time.perf_counter()
+    result = {}
+    with get_mirror_engine(its_num, mirror_root).begin() as conn:
+        _ensure_schema(conn)
+        synced_at = time.time()
+        for table in MIRROR_TABLES:
+            rows, changed = sync_table(conn, source_engine, table)
+            conn.execute(
+                text(f"INSERT OR REPLACE INTO {META_TABLE} (table_name, synced_at, row_count, changed) "
+                     "VALUES (:t, :s, :r, :c)"),
+                {"t": table, "s": synced_at, "r": rows, "c": changed},
+            )
+            result[table] = {"rows": rows, "changed": changed}
+    changed = sum(r["changed"] for r in result.values())
+    logger.info(f"ITS{its_num} 동기화 완료: 변경 {changed}행, {time.perf_counter() - start:.1f}s")
+    return result
+
+
+def mirror_age(its_num, mirror_root=None):
+    """가장 오래 전에 동기화된 테이블 기준 경과 시간(초). 미러가 없거나 테이블이 빠져 있으면 None"""
+    if not os.path.exists(mirror_path(its_num, mirror_root)):
+        return None
+    try:
+        with get_mirror_engine(its_num, mirror_root).connect() as conn:
+            rows = conn.execute(text(f"SELECT table_name, synced_at FROM {META_TABLE}")).fetchall()
+    except Exception:
+        return None
+    synced = {name: ts for name, ts in rows}
+    if any(table not in synced for table in MIRROR_TABLES):
+        return None
+    return time.time() - min(synced[table] for table in MIRROR_TABLES)
+
+
+def mirror_engine(its_num, max_age=None, mirror_root=None):
+    """미러가 max_age(기본 MIRROR_MAX_AGE) 이내로 최신이면 미러 엔진, 아니면 None (호출 측에서 ITS 서버로 조회)"""
+    age = mirror_age(its_num, mirror_root)
+    if age is None or age > (MIRROR_MAX_AGE if max_age is None else max_age):
+        return None
+    return get_mirror_engine(its_num, mirror_root)
+
+
+def run_mirror_stage(its_nums=ITS_NUMS, mirror_root=None):
+    """파이프라인 단계: 설정된 ITS 의 메타데이터 미러 갱신.
+
+    Returns
+    -------
+    dict: stage, synced(ITS 번호 목록), changed(ITS 별 변경 행 수), failed
+    """
+    from api_db import _get_its_engine
+
+    summary = {"stage": "its_mirror", "synced": [], "changed": {}, "failed": []}
+    for its_num in its_nums:
+        try:
+            source = _get_its_engine(its_num)
+        except ValueError:
+            continue  # secret.ini 에 설정이 없는 ITS
+        try:
+            result = sync_its(its_num, source, mirror_root)
+            summary["synced"].append(its_num)
+            summary["changed"][its_num] = sum(r["changed"] for r in result.values())
+        except Exception as e:
+            logger.error(f"ITS{its_num} 동기화 실패: {e}")
+            summary["failed"].append(its_num)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ITS 메타데이터 미러 동기화")
+    parser.add_argument("--its", type=int, action="append", help="ITS 번호 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    summary = run_mirror_stage(tuple(args.its) if args.its else ITS_NUMS)
+    for its_num in summary["synced"]:
+        print(f"✅ ITS{its_num} 동기화 (변경 {summary['changed'][its_num]}행)")
+    for its_num in summary["failed"]:
+        print(f"❌ ITS{its_num} 동기화 실패 (log/its_mirror.log 참고)")
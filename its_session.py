@@ -0,0 +1,413 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ITS 서버 공유 세션 관리
+- 인증된 TCPClient 를 한 번 만들어 여러 센서 조회에 재사용 (센서마다 연결/로그인 반복 제거)
+- 고정 1초 대기 대신 연결 완료(connected 플래그)를 짧은 간격으로 확인
+- 요청마다 응답 제한 시간(REQUEST_TIMEOUT) 적용, 연결 끊김/시간 초과 시 재연결 후 1회 재시도
+- 재연결되었거나 HEALTH_CHECK_INTERVAL 동안 사용하지 않은 세션은 login 명령으로 상태 확인
+- 여러 작업자가 동시에 쓸 수 있도록 작은 세션 풀(get_pool / its_session) 제공
+- 센서 채널 조회는 세션마다 자체 InfluxDB 클라이언트를 재사용 (센서마다 만들고 닫지 않음).
+  ITS_CLI 의 query_data 는 잠금 안에서 이 클라이언트를 잠시 전역으로 지정해 실행
+
+사용 예:
+    from its_session import its_session
+    with its_session() as session:
+        df = session.query_channel_data(deviceid, channel, start_date=sd_start)
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from ITS_CLI import config, tcp_client
+
+# 연결/요청 제한 시간 (초)
+CONNECT_TIMEOUT = 15.0
+REQUEST_TIMEOUT = 120.0
+POLL_INTERVAL = 0.05
+# 마지막 정상 응답 후 이 시간이 지나면 사용 전에 login 으로 상태 확인
+HEALTH_CHECK_INTERVAL = 300.0
+# 연결 끊김/시간 초과 시 재시도 횟수
+MAX_RETRIES = 1
+DEFAULT_POOL_SIZE = 1
+
+# 계정 정보: secret.ini 의 USER / PW, 없으면 환경 변수 ITS_USER / ITS_PASSWORD
+SECRET_PATH = "secret.ini"
+ENV_USER = "ITS_USER"
+ENV_PASSWORD = "ITS_PASSWORD"
+_RE_KV = re.compile(r"^\s*([A-Za-z_]+)\s*=\s*(.+?)\s*$")
+
+
+# 로거 설정
+def setup_its_session_logger():
+    """its_session 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('its_session_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'its_session.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | ITS_SESSION | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_its_session_logger()
+
+
+class ITSSessionError(RuntimeError):
+    """연결/로그인 실패 등 세션을 사용할 수 없는 상태"""
+
+
+# 전역 InfluxDB 클라이언트(timeseriesdb.TSDB_CLIENT/BUCKET)를 쓰는 ITS_CLI 조회는 한 번에 하나씩
+_TSDB_LOCK = threading.Lock()
+
+
+def _query_tsdb(influx, bucket, deviceid, channel, range_start, range_end, d_type, sample_count=1):
+    """timeseriesdb.query_data 를 주어진 InfluxDB 클라이언트/버킷으로 실행해 DataFrame 반환.
+
+    ITS_CLI 의 query_data 는 모듈 전역 TSDB_CLIENT/BUCKET 만 쓰므로 _TSDB_LOCK 안에서 잠시 바꿔 끼우고
+    원래 값으로 되돌림 (Flux 질의는 ITS_CLI 한 곳에만 둠). 결과가 없으면 빈 DataFrame
+    """
+    tsdb = tcp_client.tsdb
+    with _TSDB_LOCK:
+        saved = (tsdb.TSDB_CLIENT, tsdb.BUCKET)
+        tsdb.TSDB_CLIENT, tsdb.BUCKET = influx, bucket
+        try:
+            return tsdb.query_data(deviceid, channel, range_start, range_end, d_type, sample_count)
+        except KeyError:
+            # 조회 결과가 비면 query_data 가 '_time' 컬럼 접근에서 KeyError 를 냄
+            return pd.DataFrame()
+        finally:
+            tsdb.TSDB_CLIENT, tsdb.BUCKET = saved
+
+
+def load_credentials(secret_path=SECRET_PATH):
+    """secret.ini 의 USER / PW (없으면 환경 변수 ITS_USER / ITS_PASSWORD) 를 읽어 (user, password) 반환.
+
+    둘 다 없으면 ITSSessionError
+    """
+    values = {}
+    if os.path.exists(secret_path):
+        with open(secret_path, "r", encoding="utf-8") as f:
+            for line in f:
+                m = _RE_KV.match(line)
+                if m:
+                    values[m.group(1).upper()] = m.group(2)
+    user = values.get("USER") or os.environ.get(ENV_USER)
+    password = values.get("PW") or os.environ.get(ENV_PASSWORD)
+    if not user or not password:
+        raise ITSSessionError(f"ITS 계정 정보가 없습니다 ({secret_path} 의 USER/PW 또는 {ENV_USER}/{ENV_PASSWORD})")
+    return user, password
+
+
+class _SessionClient(tcp_client.TCPClient):
+    """TCPClient 에 응답 제한 시간과 종료 처리를 추가한 클라이언트"""
+
+    def __init__(self, *args, request_timeout=REQUEST_TIMEOUT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_timeout = request_timeout
+        self.closed = False
+        self.generation = 0          # 연결될 때마다 증가 (재연결 감지용)
+        self.transport_error = None  # 마지막 요청의 연결/시간 초과 오류
+        self._influx = None          # (dbinfo 키, InfluxDBClient)
+
+    def connect(self):
+        # 세션 종료 후에는 수신 스레드의 자동 재연결 루프를 끝냄 (SystemExit 은 스레드만 조용히 종료)
+        if self.closed:
+            raise SystemExit
+        super().connect()
+        if self.connected:
+            self.generation += 1
+
+    def disconnect(self):
+        if self.client_socket is not None:
+            try:
+                self.client_socket.close()
+            except OSError:
+                pass
+        self.connected = False
+
+    def close_influx(self):
+        if self._influx is not None:
+            self._influx[1].close()
+            self._influx = None
+
+    def _influx_client(self, dbinfo):
+        key = tuple(dbinfo[k] for k in ('host', 'port', 'token', 'org', 'bucket'))
+        if self._influx is None or self._influx[0] != key:
+            self.close_influx()
+            host, port, token, org, _ = key
+            self._influx = (key, tcp_client.tsdb.InfluxDBClient(
+                url=f"http://{host}:{port}", token=token, org=org, debug=False, timeout=10000))
+        return self._influx[1]
+
+    def message_getdata(self, command, start_date, end_date, projectid=None, structureid=None,
+                        deviceid=None, channel=None):
+        if command.lower() != 'query_device_channel_data':
+            with _TSDB_LOCK:
+                return super().message_getdata(command, start_date, end_date, projectid, structureid,
+                                               deviceid, channel)
+
+        # 원본과 같은 흐름이지만 세션 전용 InfluxDB 클라이언트 사용 (동시 조회 안전, 센서마다 재생성 안 함)
+        message = json.dumps({
+            "command": command,
+            "its": self.its,
+            "user": self.user,
+            "password": self.password,
+            "deviceid": deviceid,
+            "channel": channel,
+        })
+        try:
+            response = self.send_and_wait_for_response(message)
+        except socket.error as e:
+            return {'result': 'Fail', 'msg': str(e)}
+        if response.get('result') != 'Success':
+            return response
+
+        row = pd.DataFrame(response['data']).iloc[0]
+        influx = self._influx_client(response['dbinfo'])
+        start, end = tcp_client.api.date_formatted_flexible(start_date, end_date)
+        df = _query_tsdb(influx, response['dbinfo']['bucket'], row['deviceid'], row['channel'],
+                         start, end, row['d_type'], sample_count=1)
+        if df.empty:
+            return pd.DataFrame()
+        df['device_id'] = row['deviceid']
+        df['channel'] = row['channel']
+        df['d_type'] = row['d_type']
+        return df
+
+    def send_and_wait_for_response(self, message):
+        # 원본은 응답이 올 때까지 무한 대기하므로 제한 시간과 연결 끊김을 확인
+        self.response = None
+        self.transport_error = None
+        if not self.connected:
+            self.transport_error = "ITS 서버에 연결되어 있지 않습니다"
+            raise socket.error(self.transport_error)
+        self.send_message(message)
+        deadline = time.monotonic() + self.request_timeout
+        while self.response is None:
+            if not self.connected:
+                self.transport_error = "응답 대기 중 연결이 끊어졌습니다"
+                raise socket.error(self.transport_error)
+            if time.monotonic() > deadline:
+                self.transport_error = f"응답 시간 초과 ({self.request_timeout:.0f}s)"
+                raise socket.timeout(self.transport_error)
+            time.sleep(POLL_INTERVAL)
+        return self.response
+
+
+class ITSSession:
+    """인증된 ITS 연결 1개. 한 번에 하나의 요청만 처리 (TCPClient 응답 슬롯이 1개)"""
+
+    def __init__(self, user=None, password=None, connect_timeout=CONNECT_TIMEOUT,
+                 request_timeout=REQUEST_TIMEOUT):
+        if user is None or password is None:
+            user, password = load_credentials()
+        self.user = user
+        self.password = password
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        self.client = None
+        self._lock = threading.RLock()
+        self._login_generation = None
+        self._last_ok = 0.0
+
+    # ── 연결 / 로그인 ────────────────────────────────────────
+    def _start_client(self):
+        config.config_load()
+        client = _SessionClient(config.SERVER_IP, config.SERVER_PORT, config.ITS_NUM, config.certfile,
+                                request_timeout=self.request_timeout)
+        client.set_user_password(self.user, self.password)
+        thread = threading.Thread(target=client.receive_messages, daemon=True)
+        thread.start()
+        self.client = client
+        self._login_generation = None
+        logger.info(f"ITS 클라이언트 시작: {config.SERVER_IP}:{config.SERVER_PORT}")
+
+    def _wait_connected(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while not self.client.connected:
+            if time.monotonic() > deadline:
+                raise ITSSessionError(f"ITS 서버 연결 시간 초과 ({self.connect_timeout:.0f}s)")
+            time.sleep(POLL_INTERVAL)
+
+    def _login(self):
+        try:
+            res = self.client.message('login')
+        except socket.error:
+            res = None
+        if not res or res.get('result') != 'Success':
+            msg = self.client.transport_error or (res or {}).get('msg')
+            raise ITSSessionError(f"ITS 로그인 실패: {msg}")
+        self._login_generation = self.client.generation
+        self._last_ok = time.monotonic()
+        logger.info(f"ITS 로그인 성공 (연결 #{self.client.generation})")
+
+    def ensure_ready(self):
+        """연결/로그인 상태 확인. 재연결되었거나 오래 쉬었으면 login 으로 다시 확인"""
+        with self._lock:
+            if self.client is None or self.client.closed:
+                self._start_client()
+            self._wait_connected()
+            stale = time.monotonic() - self._last_ok > HEALTH_CHECK_INTERVAL
+            if self._login_generation != self.client.generation or stale:
+                try:
+                    self._login()
+                except ITSSessionError:
+                    # 계정 오류 등 서버 응답이 온 실패는 재연결해도 같으므로 그대로 전달
+                    if self.client.transport_error is None:
+                        raise
+                    # 연결이 끊겼거나 응답이 없으면 재연결 후 한 번 더 확인
+                    self.reconnect()
+                    self._wait_connected()
+                    self._login()
+
+    def is_healthy(self):
+        """연결되어 있고 현재 연결에서 로그인된 상태인지 (네트워크 요청 없이 확인)"""
+        client = self.client
+        return (client is not None and client.connected
+                and self._login_generation == client.generation)
+
+    def reconnect(self):
+        """현재 연결을 끊고 재연결 (수신 스레드가 자동으로 다시 연결)"""
+        with self._lock:
+            if self.client is not None:
+                logger.warning(f"ITS 재연결 요청 (연결 #{self.client.generation})")
+                self.client.disconnect()
+            self._login_generation = None
+
+    def close(self):
+        with self._lock:
+            if self.client is not None:
+                self.client.closed = True
+                self.client.disconnect()
+                self.client.close_influx()
+                self.client = None
+            self._login_generation = None
+
+    # ── 요청 ─────────────────────────────────────────────────
+    def call(self, method, *args, **kwargs):
+        """client.<method>(...) 실행. 연결 끊김/시간 초과면 재연결 후 MAX_RETRIES 회 재시도"""
+        with self._lock:
+            for attempt in range(MAX_RETRIES + 1):
+                self.ensure_ready()
+                try:
+                    result = getattr(self.client, method)(*args, **kwargs)
+                except socket.error:
+                    result = None
+                error = self.client.transport_error
+                if error is None:
+                    self._last_ok = time.monotonic()
+                    return result
+                logger.warning(f"{method} 실패 (시도 {attempt + 1}/{MAX_RETRIES + 1}): {error}")
+                self.reconnect()
+            raise ITSSessionError(f"ITS 요청 실패: {method} - {error}")
+
+    def message(self, command, projectid=None, structureid=None):
+        return self.call('message', command, projectid=projectid, structureid=structureid)
+
+    def message_getdata(self, command, start_date, end_date, projectid=None, structureid=None,
+                        deviceid=None, channel=None):
+        return self.call('message_getdata', command, start_date, end_date, projectid=projectid,
+                         structureid=structureid, deviceid=deviceid, channel=channel)
+
+    def query_channel_data(self, deviceid, channel, start_date=None, end_date=None):
+        """센서 1개 채널 원시 데이터 조회 (query_device_channel_data)"""
+        return self.message_getdata('query_device_channel_data', start_date, end_date,
+                                    deviceid=deviceid, channel=channel)
+
+
+class ITSSessionPool:
+    """ITSSession 여러 개를 빌려 쓰는 풀 (세션은 처음 필요할 때 생성)"""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, **session_kwargs):
+        self.size = max(1, size)
+        self._session_kwargs = session_kwargs
+        self._idle = queue.LifoQueue()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._sessions) < self.size:
+                session = ITSSession(**self._session_kwargs)
+                self._sessions.append(session)
+                return session
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ITSSessionError("사용 가능한 ITS 세션이 없습니다")
+
+    def release(self, session):
+        self._idle.put(session)
+
+    @contextmanager
+    def session(self, timeout=None):
+        session = self.acquire(timeout)
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self._idle = queue.LifoQueue()
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool(size=DEFAULT_POOL_SIZE):
+    """프로세스 공용 세션 풀. 더 큰 size 로 호출하면 풀 크기를 늘림"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ITSSessionPool(size)
+        elif size > _POOL.size:
+            _POOL.size = size
+        return _POOL
+
+
+@contextmanager
+def its_session(timeout=None):
+    """공용 풀에서 세션 하나를 빌려 사용"""
+    with get_pool().session(timeout) as session:
+        yield session
+
+
+def close_all():
+    """공용 풀의 모든 세션 종료"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+메타데이터 조회 캐시 (api_db 의 콘크리트/센서/ITS 프로젝트 목록 조회용)
+- 함수별 TTL, 인자 정규화(기본값 채움, 숫자/문자 통일, 목록 순서 무시)로 같은 조회를 한 번만 실행
+- 테이블 그룹(concrete, sensor, its 등) 단위로 명시적 무효화 (add_* / update_* / delete_* 에서 호출)
+- 반환값은 복사본을 돌려주므로 호출 측에서 DataFrame 을 수정해도 캐시는 그대로
+- 함수별 hit / miss / 만료 / 무효화 횟수 집계 (cache_stats)
+
+사용 예:
+    @cached("concrete", ttl=60)
+    def get_concrete_data(...): ...
+
+    invalidate("concrete")
+"""
+
+import copy
+import time
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# 함수별 최대 항목 수 (넘으면 가장 오래 쓰지 않은 항목부터 제거)
+MAX_ENTRIES = 256
+
+_lock = threading.RLock()
+_caches = {}      # {함수 이름: OrderedDict(key → (만료 시각, 값))}
+_groups = {}      # {그룹: {함수 이름, ...}}
+_stats = {}       # {함수 이름: {hits, misses, expired, invalidated}}
+
+
+def _normalize(value):
+    """캐시 키용 값 정규화 ('1' 과 1, [a, b] 와 [b, a] 를 같은 키로)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted((_normalize(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return repr(value)
+
+
+def _copy(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+def _cacheable(value, cache_empty):
+    """실패 응답/빈 결과(조회 오류일 수 있음)는 저장하지 않음"""
+    if isinstance(value, dict) and value.get("result") not in (None, "Success"):
+        return False
+    if not cache_empty and isinstance(value, pd.DataFrame) and value.empty:
+        return False
+    return True
+
+
+def cached(*groups, ttl=60.0, cache_empty=True):
+    """조회 함수 결과 캐시 데코레이터.
+
+    groups:      무효화 그룹 이름 (invalidate(group) 시 함께 비워짐)
+    ttl:         유효 시간 (초)
+    cache_empty: False 면 빈 DataFrame 은 저장하지 않음 (오류 시 빈 결과를 주는 ITS 조회용)
+    """
+    def decorator(func):
+        name = func.__name__
+        signature = inspect.signature(func)
+        with _lock:
+            _caches[name] = OrderedDict()
+            _stats[name] = {"hits": 0, "misses": 0, "expired": 0, "invalidated": 0}
+            for group in groups:
+                _groups.setdefault(group, set()).add(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((k, _normalize(v)) for k, v in bound.arguments.items())
+            now = time.monotonic()
+            with _lock:
+                cache, stats = _caches[name], _stats[name]
+                entry = cache.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        cache.move_to_end(key)
+                        stats["hits"] += 1
+                        return _copy(entry[1])
+                    del cache[key]
+                    stats["expired"] += 1
+                stats["misses"] += 1
+
+            value = func(*args, **kwargs)
+            if _cacheable(value, cache_empty):
+                with _lock:
+                    cache = _caches[name]
+                    cache[key] = (now + ttl, _copy(value))
+                    cache.move_to_end(key)
+                    while len(cache) > MAX_ENTRIES:
+                        cache.popitem(last=False)
+            return value
+
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
+
+
+def invalidate(*groups):
+    """그룹에 속한 함수들의 캐시 비우기 (인자가 없으면 전체)"""
+    with _lock:
+        names = set(_caches) if not groups else set().union(*(_groups.get(g, set()) for g in groups))
+        for name in names:
+            _stats[name]["invalidated"] += len(_caches[name])
+            _caches[name].clear()
+
+
+def cache_stats():
+    """함수별 캐시 통계. Returns: {함수 이름: {hits, misses, expired, invalidated, entries, hit_rate}}"""
+    with _lock:
+        result = {}
+        for name, stats in _stats.items():
+            total = stats["hits"] + stats["misses"]
+            result[name] = dict(stats, entries=len(_caches[name]),
+                                hit_rate=stats["hits"] / total if total else 0.0)
+        return result
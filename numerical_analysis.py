@@ -25,14 +25,14 @@ import pyvista as pv  # PyVista: WebGL용 HTML 렌더링
 
 import api_concrete   # 내부 API: concrete_id/name/dims/created
 import api_sensor     # 내부 API: sensor_id/concrete_id/dims(위치 포함)...
+import sensor_store   # 센서 시계열 Parquet 저장소
 
 # ─────────────────────────────────────────────────────────────────────────────
 def load_sensor_hourly(sensor_id: str) -> pd.Series:
-    """CSV → 시(시 단위)별 평균 온도 시계열 반환"""
-    csv_path = Path("sensors") / f"{sensor_id}.csv"
-    if not csv_path.is_file():
-        raise FileNotFoundError(f"센서 CSV가 없습니다: {csv_path}")
-    df = pd.read_csv(csv_path, parse_dates=["time"])
+    """센서 시계열 저장소(CSV 가 바뀐 경우에만 다시 가져옴) → 시(시 단위)별 평균 온도 시계열 반환"""
+    df = sensor_store.load_csv_sensor(sensor_id, columns=["temperature"])
+    if df is None:
+        raise FileNotFoundError(f"센서 CSV가 없습니다: {Path('sensors') / f'{sensor_id}.csv'}")
     df["hour"] = df["time"].dt.floor("h")
     hourly = df.groupby("hour")["temperature"].mean().sort_index()
     return hourly
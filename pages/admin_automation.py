@@ -1,12 +1,15 @@
 import dash
 from dash import dcc, html, Input, Output, callback
 import dash_bootstrap_components as dbc
+import plotly.graph_objs as go
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
 import re
 
+import stage_metrics
+
 dash.register_page(__name__, path="/admin_automation", title="자동화 로그")
 
 # 상수 정의
@@ -33,6 +36,17 @@ LOG_FILES = [
     ('auto_frd_to_vtk.log', 'AUTO_FRD_TO_VTK')
 ]
 
+# 단계 지표 조회 기간 (시간) → 집계 구간
+METRIC_WINDOWS = {1: "1min", 6: "5min", 24: "15min", 168: "1h"}
+
+STAGE_LABELS = {
+    'auto_sensor': '센서 수집',
+    'auto_inp': 'INP 생성',
+    'auto_inp_to_frd': 'FRD 변환',
+    'auto_frd_to_vtk': 'VTK 변환',
+    'auto_vtk_to_vtp': 'VTP 변환',
+}
+
 def parse_automation_log_line(line):
     """자동화 로그 라인을 파싱하여 구조화된 데이터로 변환"""
     line = line.strip()
@@ -202,6 +216,48 @@ def create_table_component(filtered_logs):
     
     return [header] + rows
 
+def _format_bytes(num):
+    """바이트 수를 읽기 쉬운 단위로"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num) < 1024:
+            return f"{num:.0f}{unit}" if unit == "B" else f"{num:.1f}{unit}"
+        num /= 1024.0
+    return f"{num:.1f}TB"
+
+def create_stage_figures(timeseries):
+    """단계별 처리량(항목/분)과 p95 처리 시간 그래프"""
+    throughput_fig, latency_fig = go.Figure(), go.Figure()
+    for stage, g in timeseries.groupby("stage"):
+        name = STAGE_LABELS.get(stage, stage)
+        throughput_fig.add_trace(go.Scatter(x=g["time"], y=g["throughput"], mode="lines+markers", name=name))
+        latency_fig.add_trace(go.Scatter(x=g["time"], y=g["p95"], mode="lines+markers", name=name))
+    throughput_fig.update_layout(title="단계별 처리량", yaxis_title="항목/분", height=320,
+                                 margin=dict(l=40, r=20, t=40, b=30), legend=dict(orientation="h"))
+    latency_fig.update_layout(title="단계별 p95 처리 시간", yaxis_title="초", height=320,
+                              margin=dict(l=40, r=20, t=40, b=30), legend=dict(orientation="h"))
+    return throughput_fig, latency_fig
+
+def create_stage_summary_component(summary):
+    """단계별 합계 표 (p95 가 큰 단계부터 → 병목 단계가 맨 위)"""
+    if summary.empty:
+        return dbc.Alert("기간 내 단계 기록이 없습니다.", color="info")
+
+    header = html.Thead(html.Tr([html.Th(h) for h in
+                                 ("단계", "처리", "실패", "p50", "p95", "평균 대기", "읽음", "씀")]))
+    rows = []
+    for r in summary.itertuples(index=False):
+        rows.append(html.Tr([
+            html.Td(STAGE_LABELS.get(r.stage, r.stage)),
+            html.Td(f"{r.items:,}"),
+            html.Td(dbc.Badge(str(r.failed), color="danger") if r.failed else "0"),
+            html.Td(f"{r.p50:.2f}s"),
+            html.Td(f"{r.p95:.2f}s"),
+            html.Td("-" if r.queue_wait is None or pd.isna(r.queue_wait) else f"{r.queue_wait:.1f}s"),
+            html.Td(_format_bytes(r.bytes_read)),
+            html.Td(_format_bytes(r.bytes_written)),
+        ]))
+    return dbc.Table([header, html.Tbody(rows)], bordered=False, hover=True, size="sm", className="mb-0")
+
 def layout(**kwargs):
     """자동화 로그 페이지 레이아웃"""
     return dbc.Container([
@@ -226,6 +282,51 @@ def layout(**kwargs):
             ])
         ]),
         
+        # 단계별 처리량 / 지연 (stage_metrics span 기록)
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader([
+                        html.H4("⏱️ 단계별 처리량 / 지연", className="mb-0")
+                    ]),
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                dbc.Label("기간"),
+                                dbc.Select(
+                                    id="automation-metrics-window",
+                                    options=[
+                                        {"label": "최근 1시간", "value": 1},
+                                        {"label": "최근 6시간", "value": 6},
+                                        {"label": "최근 24시간", "value": 24},
+                                        {"label": "최근 7일", "value": 168},
+                                    ],
+                                    value=24
+                                )
+                            ], width=3),
+                            dbc.Col([
+                                dbc.Label("기준"),
+                                dbc.RadioItems(
+                                    id="automation-metrics-scope",
+                                    options=[
+                                        {"label": "항목별 (센서/시각/파일)", "value": "item"},
+                                        {"label": "파이프라인 단계 실행", "value": "pipeline"},
+                                    ],
+                                    value="item",
+                                    inline=True
+                                )
+                            ], width=6),
+                        ], className="mb-3"),
+                        dbc.Row([
+                            dbc.Col(dcc.Graph(id="automation-throughput-graph"), width=6),
+                            dbc.Col(dcc.Graph(id="automation-latency-graph"), width=6),
+                        ]),
+                        html.Div(id="automation-stage-summary")
+                    ])
+                ], className="mb-4")
+            ])
+        ]),
+
         # 필터 옵션
         dbc.Row([
             dbc.Col([
@@ -364,6 +465,25 @@ def update_automation_logs(n_intervals, module_filter, level_filter, count_filte
     
     return stats_component, table_component
 
+@callback(
+    [Output("automation-throughput-graph", "figure"),
+     Output("automation-latency-graph", "figure"),
+     Output("automation-stage-summary", "children")],
+    [Input("automation-logs-interval", "n_intervals"),
+     Input("automation-metrics-window", "value"),
+     Input("automation-metrics-scope", "value")]
+)
+def update_stage_metrics(n_intervals, window, scope):
+    """span 기록을 읽어 단계별 처리량 / p95 그래프와 합계 표시"""
+    hours = int(window or 24)
+    df = stage_metrics.read_spans(since=datetime.now() - timedelta(hours=hours))
+    is_pipeline = df["stage"].str.startswith("pipeline.")
+    df = df[is_pipeline] if scope == "pipeline" else df[~is_pipeline]
+
+    timeseries = stage_metrics.stage_timeseries(df, freq=METRIC_WINDOWS.get(hours, "15min"))
+    throughput_fig, latency_fig = create_stage_figures(timeseries)
+    return throughput_fig, latency_fig, create_stage_summary_component(stage_metrics.stage_summary(df))
+
 @callback(
     [Output("automation-date-filter", "start_date"),
      Output("automation-date-filter", "end_date")],
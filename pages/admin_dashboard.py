@@ -5,6 +5,8 @@ from api_db import get_accessible_projects
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objs as go
+import numpy as np
+import downsample
 
 register_page(__name__, path="/admin_dashboard", title="관리자 대시보드")
 
@@ -475,6 +477,14 @@ def create_enhanced_status_card(title, value, subtitle, icon, color, progress=No
     ], className="h-100 shadow-sm border-0", 
        style={"borderLeft": f"4px solid var(--bs-{color})"})
 
+# 관리자 차트 폭(px) 기준 최대 점 수 (기간이 길어져도 응답 크기 일정)
+CHART_MAX_POINTS = downsample.points_for_width(400)
+
+def downsample_chart_points(display_dates, data, max_points=CHART_MAX_POINTS):
+    """선 차트 점 수 제한 (LTTB, x 는 순서 위치 기준)"""
+    idx = downsample.lttb(np.arange(len(data)), np.asarray(data, dtype=float), max_points)
+    return [display_dates[i] for i in idx], [data[i] for i in idx]
+
 def create_mini_chart(dates, data, title, color, chart_type='line', unit='개'):
     """미니 차트 생성 (시스템 현황용)"""
     try:
@@ -504,6 +514,7 @@ def create_mini_chart(dates, data, title, color, chart_type='line', unit='개'):
         fig = go.Figure()
         
         if chart_type == 'line':
+            display_dates, data = downsample_chart_points(display_dates, data)
             fig.add_trace(go.Scatter(
                 x=display_dates,
                 y=data,
@@ -604,6 +615,7 @@ def create_analysis_chart(dates, data, title, color, unit='회'):
         fig = go.Figure()
         
         # 안전한 데이터 변환
+        # (일별 건수 막대 차트는 막대를 빼면 날짜가 사라지므로 점 수를 줄이지 않음)
         safe_data = [int(x) if x is not None else 0 for x in data]
         
         # 그라데이션 효과를 위한 바 차트
@@ -756,6 +768,7 @@ def create_simple_chart(dates, data, title, color="#007bff", unit="개"):
         
         # 데이터 안전성 확인
         safe_data = [int(x) if x is not None else 0 for x in data]
+        display_dates, safe_data = downsample_chart_points(display_dates, safe_data)
         
         fig.add_trace(go.Scatter(
             x=display_dates,
@@ -28,6 +28,7 @@ import shutil
 import api_db
 import auto_sensor
 import auto_inp
+import surface_lod
 from utils.encryption import parse_project_key_from_url
 
 register_page(__name__, path="/stress", title="응력 분석")
@@ -381,6 +382,9 @@ _material_info_cache = {}
 # 전체 응력 범위 저장 (페이지 로딩 시 미리 계산)
 _global_stress_ranges = {}  # {concrete_pk: {component: (min, max), ...}}
 
+# LOD 표면의 S 배열 성분 순서
+STRESS_COMPONENT_INDEX = {'SXX': 0, 'SYY': 1, 'SZZ': 2, 'SXY': 3, 'SYZ': 4, 'SZX': 5}
+
 def read_frd_stress_data(frd_path):
     """FRD 파일에서 응력 데이터를 읽어옵니다. (캐싱 적용)"""
     # 캐시 확인
@@ -1874,6 +1878,34 @@ def create_3d_stress_figure(stress_data, selected_component="von_mises"):
 
 
 
+def create_stress_lod_trace(lod_mesh, selected_component, coords, stress_min, stress_max, component_name):
+    """LOD 표면 메쉬로 응력 Mesh3d 트레이스 생성 (좌표는 원본 노드 범위로 정규화)"""
+    if selected_component in STRESS_COMPONENT_INDEX:
+        values = lod_mesh["point_data"]["S"][:, STRESS_COMPONENT_INDEX[selected_component]]
+    else:
+        values = lod_mesh["point_data"]["S_Mises"]
+    values_gpa = np.asarray(values, dtype=float) / 1e9
+
+    points = np.asarray(lod_mesh["points"], dtype=float)
+    lo, hi = coords.min(axis=0), coords.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    points = np.where(hi > lo, (points - lo) / span, points)
+    triangles = lod_mesh["triangles"]
+
+    return go.Mesh3d(
+        x=points[:, 0], y=points[:, 1], z=points[:, 2],
+        i=triangles[:, 0], j=triangles[:, 1], k=triangles[:, 2],
+        intensity=values_gpa,
+        colorscale=[[0, 'blue'], [1, 'red']],
+        colorbar=dict(title=f'{component_name} (GPa)', thickness=10),
+        cmin=stress_min,
+        cmax=stress_max,
+        showscale=True,
+        hoverinfo='skip',
+        name=f'{component_name} 표면 (LOD {int(lod_mesh["level"] * 100)}%)'
+    )
+
+
 def create_node_tab_content_stress(concrete_pk):
     """노드별 탭 콘텐츠를 생성합니다."""
     # 기본값 계산용
@@ -2189,9 +2221,10 @@ def create_node_tab_content_stress(concrete_pk):
     State("tbl-concrete-stress", "selected_rows"),
     State("tbl-concrete-stress", "data"),
     State("unified-stress-colorbar-state", "data"),
+    State("play-state-stress", "data"),
     prevent_initial_call=True,
 )
-def update_3d_stress_viewer(time_idx, unified_colorbar, selected_component, selected_rows, tbl_data, unified_state):
+def update_3d_stress_viewer(time_idx, unified_colorbar, selected_component, selected_rows, tbl_data, unified_state, play_state=None):
     """3D 응력 시각화를 업데이트합니다."""
     if not selected_rows or not tbl_data:
         return go.Figure().add_annotation(
@@ -2437,45 +2470,52 @@ def update_3d_stress_viewer(time_idx, unified_colorbar, selected_component, sele
         if axis_max > axis_min:
             coords_normalized[:, axis] = (coords[:, axis] - axis_min) / (axis_max - axis_min)
     
-    # 3D 시각화 생성 (Volume 또는 Scatter3d 선택)
-    # Volume이 보이지 않는 경우를 대비해 Scatter3d도 준비
-    try:
-        # 먼저 Volume으로 시도
-        fig = go.Figure(data=go.Volume(
-            x=coords_normalized[:, 0], 
-            y=coords_normalized[:, 1], 
-            z=coords_normalized[:, 2], 
-            value=stress_values_gpa,
-            opacity=0.1, 
-            surface_count=15, 
-            colorscale=[[0, 'blue'], [1, 'red']],
-            colorbar=dict(title=f'{component_name} (GPa)', thickness=10),
-            cmin=stress_min, 
-            cmax=stress_max,
-            showscale=True,
-            hoverinfo='skip',
-            name=f'{component_name} 볼륨'
-        ))
-    except Exception:
-        # Volume이 실패하면 Scatter3d로 대체
-        fig = go.Figure(data=go.Scatter3d(
-            x=coords_normalized[:, 0],
-            y=coords_normalized[:, 1],
-            z=coords_normalized[:, 2],
-            mode='markers',
-            marker=dict(
-                size=3,
-                color=stress_values_gpa,
+    # 3D 시각화 생성
+    # LOD 표면(surface_lod)이 있으면 재생 상태에 맞는 단계의 표면 메쉬 사용 (브라우저 전송량 감소)
+    playing = bool(play_state and play_state.get("playing", False))
+    lod_mesh = surface_lod.load_lod_mesh(concrete_pk, filename.split(".")[0], playing=playing)
+    if lod_mesh is not None:
+        fig = go.Figure(data=create_stress_lod_trace(
+            lod_mesh, selected_component, coords, stress_min, stress_max, component_name))
+    else:
+        # Volume 또는 Scatter3d 선택 (Volume이 보이지 않는 경우를 대비해 Scatter3d도 준비)
+        try:
+            # 먼저 Volume으로 시도
+            fig = go.Figure(data=go.Volume(
+                x=coords_normalized[:, 0], 
+                y=coords_normalized[:, 1], 
+                z=coords_normalized[:, 2], 
+                value=stress_values_gpa,
+                opacity=0.1, 
+                surface_count=15, 
                 colorscale=[[0, 'blue'], [1, 'red']],
                 colorbar=dict(title=f'{component_name} (GPa)', thickness=10),
-                cmin=stress_min,
+                cmin=stress_min, 
                 cmax=stress_max,
-                showscale=True
-            ),
-            text=[f"노드 {i+1}<br>{component_name}: {val:.4f} GPa" for i, val in enumerate(stress_values_gpa)],
-            hoverinfo='text',
-            name=f'{component_name} 산점도'
-        ))
+                showscale=True,
+                hoverinfo='skip',
+                name=f'{component_name} 볼륨'
+            ))
+        except Exception:
+            # Volume이 실패하면 Scatter3d로 대체
+            fig = go.Figure(data=go.Scatter3d(
+                x=coords_normalized[:, 0],
+                y=coords_normalized[:, 1],
+                z=coords_normalized[:, 2],
+                mode='markers',
+                marker=dict(
+                    size=3,
+                    color=stress_values_gpa,
+                    colorscale=[[0, 'blue'], [1, 'red']],
+                    colorbar=dict(title=f'{component_name} (GPa)', thickness=10),
+                    cmin=stress_min,
+                    cmax=stress_max,
+                    showscale=True
+                ),
+                text=[f"노드 {i+1}<br>{component_name}: {val:.4f} GPa" for i, val in enumerate(stress_values_gpa)],
+                hoverinfo='text',
+                name=f'{component_name} 산점도'
+            ))
     
     fig.update_layout(
         uirevision='constant',
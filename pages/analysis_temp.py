@@ -36,6 +36,7 @@ from dash import html
 import dash_vtk
 
 import api_db
+import zip_stream
 from utils.encryption import parse_project_key_from_url
 
 register_page(__name__, path="/temp", title="온도 분석")
@@ -336,7 +337,11 @@ layout = dbc.Container(
         dcc.Download(id="download-section-inp-tmp"),
         dcc.Download(id="download-temp-image-tmp"),
         dcc.Download(id="download-temp-data-tmp"),
-        
+        # 전체 파일 ZIP 은 콜백이 돌려준 /files/zip/<token> 으로 이동해 스트리밍으로 받음
+        dcc.Location(id="inp-file-download", refresh=True),
+        dcc.Location(id="vtk-file-download", refresh=True),
+        dcc.Location(id="vtp-file-download", refresh=True),
+
         # 키보드 이벤트 처리 스크립트
         html.Div([
             html.Script("""
@@ -2702,7 +2707,7 @@ def switch_tab_tmp(active_tab, selected_rows, pathname, tbl_data, viewer_data, c
 
 # 선택 파일 zip 다운로드 콜백
 @callback(
-    Output("inp-file-download", "data"),
+    Output("inp-file-download", "href"),
     Input("btn-inp-download", "n_clicks"),
     State("inp-file-table", "selected_rows"),
     State("inp-file-table", "data"),
@@ -2712,7 +2717,8 @@ def switch_tab_tmp(active_tab, selected_rows, pathname, tbl_data, viewer_data, c
 )
 def download_selected_inp_files_tmp(n_clicks, selected_rows, table_data, selected_conc_rows, tbl_data):
     from dash.exceptions import PreventUpdate
-    import io, zipfile, os
+    from flask import request
+    import os
     if not n_clicks or not selected_rows or not selected_conc_rows or not tbl_data:
         raise PreventUpdate
     row = pd.DataFrame(tbl_data).iloc[selected_conc_rows[0]]
@@ -2721,15 +2727,12 @@ def download_selected_inp_files_tmp(n_clicks, selected_rows, table_data, selecte
     files = [table_data[i]["filename"] for i in selected_rows]
     if not files:
         raise PreventUpdate
-    # zip 파일 메모리 생성
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w") as zf:
-        for fname in files:
-            fpath = os.path.join(inp_dir, fname)
-            if os.path.exists(fpath):
-                zf.write(fpath, arcname=fname)
-    zip_buffer.seek(0)
-    return dcc.send_bytes(zip_buffer.getvalue(), filename=f"inp_files_{concrete_pk}.zip")
+    # zip 은 /files/zip/<토큰> 라우트에서 파일 단위로 스트리밍 (dcc.Location 으로 이동)
+    token = zip_stream.issue_token([(os.path.join(inp_dir, fname), fname) for fname in files],
+                                   f"inp_files_{concrete_pk}.zip", request.cookies.get("login_user"))
+    if not token:
+        raise PreventUpdate
+    return zip_stream.download_url(token)
 
 # 전체 선택/해제 콜백
 @callback(
@@ -3674,6 +3677,8 @@ def save_frd_files_tmp(contents, filenames, selected_rows, tbl_data):
             saved_files.append(fname)
         except Exception as e:
             return html.Div([f"업로드 실패: {fname} ({e})"], style={"color": "red"})
+    # 큰 파일은 /upload/frd 분할 업로드 사용 (assets/frd_upload.js).
+    # 후처리(vtk/series/lod)는 파이프라인(fs_watcher)이 frd/ 의 새 파일을 보고 실행
     return html.Div([
         html.Span(f"{len(saved_files)}개 파일 업로드 완료: "),
         html.Ul([html.Li(f) for f in saved_files])
@@ -3681,7 +3686,7 @@ def save_frd_files_tmp(contents, filenames, selected_rows, tbl_data):
 
 # vtk 파일 다운로드 콜백
 @callback(
-    Output("vtk-file-download", "data"),
+    Output("vtk-file-download", "href"),
     Input("btn-vtk-download", "n_clicks"),
     State("vtk-file-table", "selected_rows"),
     State("vtk-file-table", "data"),
@@ -3691,7 +3696,8 @@ def save_frd_files_tmp(contents, filenames, selected_rows, tbl_data):
 )
 def download_selected_vtk_files_tmp(n_clicks, selected_rows, table_data, selected_conc_rows, tbl_data):
     from dash.exceptions import PreventUpdate
-    import io, zipfile, os
+    from flask import request
+    import os
     if not n_clicks or not selected_rows or not selected_conc_rows or not tbl_data:
         raise PreventUpdate
     row = pd.DataFrame(tbl_data).iloc[selected_conc_rows[0]]
@@ -3700,15 +3706,12 @@ def download_selected_vtk_files_tmp(n_clicks, selected_rows, table_data, selecte
     files = [table_data[i]["filename"] for i in selected_rows]
     if not files:
         raise PreventUpdate
-    # zip 파일 메모리 생성
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w") as zf:
-        for fname in files:
-            fpath = os.path.join(vtk_dir, fname)
-            if os.path.exists(fpath):
-                zf.write(fpath, arcname=fname)
-    zip_buffer.seek(0)
-    return dcc.send_bytes(zip_buffer.getvalue(), filename=f"vtk_files_{concrete_pk}.zip")
+    # zip 은 /files/zip/<토큰> 라우트에서 파일 단위로 스트리밍 (dcc.Location 으로 이동)
+    token = zip_stream.issue_token([(os.path.join(vtk_dir, fname), fname) for fname in files],
+                                   f"vtk_files_{concrete_pk}.zip", request.cookies.get("login_user"))
+    if not token:
+        raise PreventUpdate
+    return zip_stream.download_url(token)
 
 # 전체 선택/해제 콜백 (vtk)
 @callback(
@@ -3732,7 +3735,7 @@ def select_deselect_all_vtk_tmp(n_all, n_none, table_data):
 
 # vtp 파일 다운로드 콜백
 @callback(
-    Output("vtp-file-download", "data"),
+    Output("vtp-file-download", "href"),
     Input("btn-vtp-download", "n_clicks"),
     State("vtp-file-table", "selected_rows"),
     State("vtp-file-table", "data"),
@@ -3742,7 +3745,8 @@ def select_deselect_all_vtk_tmp(n_all, n_none, table_data):
 )
 def download_selected_vtp_files_tmp(n_clicks, selected_rows, table_data, selected_conc_rows, tbl_data):
     from dash.exceptions import PreventUpdate
-    import io, zipfile, os
+    from flask import request
+    import os
     if not n_clicks or not selected_rows or not selected_conc_rows or not tbl_data:
         raise PreventUpdate
     row = pd.DataFrame(tbl_data).iloc[selected_conc_rows[0]]
@@ -3751,15 +3755,12 @@ def download_selected_vtp_files_tmp(n_clicks, selected_rows, table_data, selecte
     files = [table_data[i]["filename"] for i in selected_rows]
     if not files:
         raise PreventUpdate
-    # zip 파일 메모리 생성
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w") as zf:
-        for fname in files:
-            fpath = os.path.join(vtp_dir, fname)
-            if os.path.exists(fpath):
-                zf.write(fpath, arcname=fname)
-    zip_buffer.seek(0)
-    return dcc.send_bytes(zip_buffer.getvalue(), filename=f"vtp_files_{concrete_pk}.zip")
+    # zip 은 /files/zip/<토큰> 라우트에서 파일 단위로 스트리밍 (dcc.Location 으로 이동)
+    token = zip_stream.issue_token([(os.path.join(vtp_dir, fname), fname) for fname in files],
+                                   f"vtp_files_{concrete_pk}.zip", request.cookies.get("login_user"))
+    if not token:
+        raise PreventUpdate
+    return zip_stream.download_url(token)
 
 # 전체 선택/해제 콜백 (vtp)
 @callback(
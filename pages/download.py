@@ -6,7 +6,7 @@
 
 from __future__ import annotations
 
-import os, glob, io, zipfile
+import os, glob
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import defaultdict
@@ -17,6 +17,7 @@ import dash_bootstrap_components as dbc
 from dash.exceptions import PreventUpdate
 
 import api_db
+import zip_stream
 from utils.encryption import parse_project_key_from_url
 from flask import request as flask_request
 
@@ -569,7 +570,7 @@ def update_file_data(active_tab, sel_rows, tbl_data, project_pk):
         ext = ".frd"
     else:
         folder = f"assets/vtk/{concrete_pk}"
-        ext = ".vtk"
+        ext = (".vtk", ".vtu")
     
     grouped_files = get_file_info_grouped(folder, ext)
     return {
@@ -683,7 +684,8 @@ def dl_switch_tab(file_data, start_date, end_date):
                              style={"fontSize": "0.8rem", "fontWeight": "600"},
                              n_clicks=0,
                              disabled=False),
-                    dcc.Download(id=f"dl-{active_tab.split('-')[1]}-download")
+                    # ZIP 은 /files/zip/<토큰> 에서 스트리밍 (refresh=True: 받은 URL 로 바로 이동 → 다운로드)
+                    dcc.Location(id=f"dl-{active_tab.split('-')[1]}-download", refresh=True)
                 ], className="d-flex justify-content-between align-items-center")
             ], className="py-2")
         ], className="mb-3", style={"backgroundColor": "#f8f9fa", "border": "1px solid #dee2e6"})
@@ -805,7 +807,7 @@ def dl_switch_tab(file_data, start_date, end_date):
 
 # ───────────────────── ⑥ 파일 다운로드 콜백 (새로운 구조) ────────────────────
 @dash.callback(
-    Output("dl-inp-download", "data"),
+    Output("dl-inp-download", "href"),
     Input("btn-dl-inp", "n_clicks"),
     State("file-data-store", "data"),
     State({"type": "all-files-table", "index": "tab-inp"}, "selected_rows"),
@@ -816,7 +818,7 @@ def dl_download_inp(n_clicks, file_data, selected_rows, table_data):
     return _download_selected_files(n_clicks, file_data, "inp", selected_rows, table_data)
 
 @dash.callback(
-    Output("dl-frd-download", "data"),
+    Output("dl-frd-download", "href"),
     Input("btn-dl-frd", "n_clicks"),
     State("file-data-store", "data"),
     State({"type": "all-files-table", "index": "tab-frd"}, "selected_rows"),
@@ -827,7 +829,7 @@ def dl_download_frd(n_clicks, file_data, selected_rows, table_data):
     return _download_selected_files(n_clicks, file_data, "frd", selected_rows, table_data)
 
 @dash.callback(
-    Output("dl-vtk-download", "data"),
+    Output("dl-vtk-download", "href"),
     Input("btn-dl-vtk", "n_clicks"),
     State("file-data-store", "data"),
     State({"type": "all-files-table", "index": "tab-vtk"}, "selected_rows"),
@@ -897,20 +899,23 @@ def _download_selected_files(n_clicks, file_data, ftype, selected_rows, table_da
     if not existing_files:
         raise PreventUpdate
     
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w") as zf:
-        for fname in existing_files:
-            path = os.path.join(folder, fname)
-            # 날짜별 폴더 구조로 압축
-            dt = parse_filename_datetime(fname)
-            if dt:
-                date_folder = dt.strftime("%Y-%m-%d")
-                archive_path = f"{date_folder}/{fname}"
-            else:
-                archive_path = f"기타/{fname}"
-            zf.write(path, arcname=archive_path)
+    entries = []
+    for fname in existing_files:
+        path = os.path.join(folder, fname)
+        # 날짜별 폴더 구조로 압축
+        dt = parse_filename_datetime(fname)
+        if dt:
+            date_folder = dt.strftime("%Y-%m-%d")
+            archive_path = f"{date_folder}/{fname}"
+        else:
+            archive_path = f"기타/{fname}"
+        entries.append((path, archive_path))
     
-    buf.seek(0)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_count = len(existing_files)
-    return dcc.send_bytes(buf.getvalue(), filename=f"{ftype}_{download_type}파일_{file_count}개_{timestamp}.zip") 
\ No newline at end of file
+    # ZIP 은 Flask 라우트가 파일 단위로 스트리밍 (콜백은 토큰이 담긴 URL 만 반환)
+    token = zip_stream.issue_token(entries, f"{ftype}_{download_type}파일_{file_count}개_{timestamp}.zip",
+                                   flask_request.cookies.get("login_user"))
+    if not token:
+        raise PreventUpdate
+    return zip_stream.download_url(token)
@@ -3,6 +3,7 @@ import dash_bootstrap_components as dbc
 from flask import request
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import api_db
 from utils.encryption import create_project_url
@@ -52,41 +53,44 @@ def calculate_elapsed_time(created_at):
         return "N/A"
 
 
-def check_sensor_data_status(device_id: str, channel: str, its_num: int = 1):
-    """센서 데이터 수집 상태를 확인합니다.
-    
-    Args:
-        device_id: 디바이스 ID
-        channel: 채널 번호
-        its_num: ITS 번호 (1 또는 2)
-    
-    Returns:
-        tuple: (status_text, badge_color)
-    """
-    try:
-        result = api_db.get_latest_sensor_data_time(device_id, channel)
-        
-        if result["status"] == "fail":
-            return ("데이터없음", "secondary")
-        
-        latest_time = result["time"]
-        now = datetime.now()
-        
-        # 시간 차이 계산 (시간 단위)
-        time_diff = (now - latest_time).total_seconds() / 3600
-        
-        if time_diff <= 2:  # 2시간 이하
-            return ("수집중", "success")
-        else:  # 2시간 초과
-            return ("수집불가", "danger")
-            
-    except Exception as e:
-        print(f"Error checking sensor status for {device_id}/{channel}: {e}")
-        return ("오류", "warning")
+# 수집 상태 → (표시 문구, 배지 색)
+SENSOR_STATUS_LABELS = {
+    "fresh": ("수집중", "success"),
+    "stale": ("수집불가", "danger"),
+    "none": ("데이터없음", "secondary"),
+    "error": ("오류", "warning"),
+}
+# ITS1/ITS2 조회를 동시에 실행할 작업자 수
+ITS_LOOKUP_WORKERS = 8
+
 
+def load_accessible_projects(user_id: str) -> dict:
+    """ITS1/ITS2 의 접근 가능 프로젝트를 동시에 조회하고 ITS1 결과를 우선 사용"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        its1 = executor.submit(api_db.get_accessible_projects, user_id, its_num=1)
+        its2 = executor.submit(api_db.get_accessible_projects, user_id, its_num=2)
+        result = its1.result()
+        if result["result"] != "Success":
+            result = its2.result()
+    return result
 
 
+def load_project_sensors(project_ids) -> dict:
+    """프로젝트별 ITS 센서 목록을 ITS1/ITS2 에서 동시에 조회 (ITS1 에 없으면 ITS2 사용)
 
+    Returns:
+        dict: {project_id: 센서 DataFrame}
+    """
+    with ThreadPoolExecutor(max_workers=ITS_LOOKUP_WORKERS) as executor:
+        futures = {
+            (proj_pk, its_num): executor.submit(api_db.get_sensor_list_for_project, proj_pk, its_num=its_num)
+            for proj_pk in project_ids for its_num in (1, 2)
+        }
+        sensors = {}
+        for proj_pk in project_ids:
+            df = futures[(proj_pk, 1)].result()
+            sensors[proj_pk] = df if not df.empty else futures[(proj_pk, 2)].result()
+    return sensors
 
 
 def layout(**kwargs):
@@ -98,12 +102,8 @@ def layout(**kwargs):
 
     # get_accessible_projects 함수를 사용하여 접근 가능한 프로젝트 조회 (ITS1과 ITS2 모두에서)
     try:
-        # ITS1에서 먼저 시도
-        accessible_projects_result = api_db.get_accessible_projects(user_info['user_id'], its_num=1)
-        
-        # ITS1에서 실패하면 ITS2에서 시도
-        if accessible_projects_result["result"] != "Success":
-            accessible_projects_result = api_db.get_accessible_projects(user_info['user_id'], its_num=2)
+        # ITS1/ITS2 동시 조회 (ITS1 성공 시 ITS1 결과 사용)
+        accessible_projects_result = load_accessible_projects(user_info['user_id'])
         
         if accessible_projects_result["result"] == "Success":
             its_projects_df = accessible_projects_result["projects"]
@@ -142,16 +142,20 @@ def layout(**kwargs):
 
     # ITS 프로젝트 생성
     if not local_projects_df.empty:
+        # 프로젝트별 센서 목록(ITS1/ITS2 동시 조회)과 전체 센서 수집 상태(쿼리 1회)를 먼저 조회
+        project_sensors = load_project_sensors(local_projects_df["project_pk"].tolist())
+        sensor_keys = [
+            (device_id, channel)
+            for df in project_sensors.values() if not df.empty
+            for device_id, channel in zip(df["deviceid"], df["channel"])
+        ]
+        sensor_status = api_db.get_sensor_status_batch(sensor_keys)
+
         for _, row in local_projects_df.iterrows():
             proj_pk = row["project_pk"]
             s_code = row["s_code"]
             
-            # 해당 프로젝트의 ITS 센서 리스트 조회 (프로젝트 ID 기반) - ITS1에서 먼저 시도
-            its_sensors_df = api_db.get_sensor_list_for_project(proj_pk, its_num=1)
-            
-            # ITS1에서 센서가 없으면 ITS2에서 시도
-            if its_sensors_df.empty:
-                its_sensors_df = api_db.get_sensor_list_for_project(proj_pk, its_num=2)
+            its_sensors_df = project_sensors[proj_pk]
 
             # 콘크리트 리스트는 내부 DB를 사용하지 않으므로 빈 리스트
             concrete_data = []
@@ -164,12 +168,9 @@ def layout(**kwargs):
                     device_id = sensor["deviceid"]
                     channel = sensor["channel"]
                     
-                    # 실제 센서 데이터 수집 상태 확인 (ITS1에서 먼저 시도)
-                    status_text, badge_color = check_sensor_data_status(device_id, channel, 1)
-                    
-                    # ITS1에서 데이터가 없으면 ITS2에서 시도
-                    if status_text == "데이터없음":
-                        status_text, badge_color = check_sensor_data_status(device_id, channel, 2)
+                    # 실제 센서 데이터 수집 상태 (일괄 조회 결과)
+                    state = sensor_status[(str(device_id), str(channel))]["state"]
+                    status_text, badge_color = SENSOR_STATUS_LABELS[state]
                     
                     sensor_data.append({
                         "device_id": device_id,
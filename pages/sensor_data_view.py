@@ -27,23 +27,31 @@ from datetime import datetime, timedelta
 import base64
 import io
 import json
+from urllib.parse import urlencode
 from flask import request
 
 import api_db
+import sensor_store
+import sensor_rollup
+import downsample
 from utils.encryption import parse_project_key_from_url
 
 register_page(__name__, path="/sensor_data_view", title="센서 데이터 확인")
 
+# 그래프 조회 기간 (라벨, 일)
+GRAPH_RANGES = [("1일", 1), ("7일", 7), ("30일", 30), ("90일", 90)]
+RESOLUTION_LABELS = {"raw": "원본", "hour": "시간 평균", "day": "일 평균"}
+GRAPH_WIDTH_PX = 1000   # 다운샘플링 기준 그래프 폭
+
 # ────────────────────────────── 데이터 로딩 함수 ────────────────────────────
 def load_sensor_data(sensor_id: str) -> pd.DataFrame:
     """센서 데이터를 로드하는 함수"""
     try:
-        file_path = f"sensors/{sensor_id}.csv"
-        if not os.path.exists(file_path):
+        # CSV 는 바뀐 경우에만 저장소로 다시 가져오고, 조회는 저장소(Parquet)에서
+        df = sensor_store.load_csv_sensor(sensor_id)
+        if df is None:
             return pd.DataFrame()
-        
-        df = pd.read_csv(file_path)
-        df['time'] = pd.to_datetime(df['time'])
+        df.insert(0, 'sensor_id', sensor_id)
         return df
     except Exception as e:
         print(f"센서 데이터 로드 오류: {e}")
@@ -51,94 +59,12 @@ def load_sensor_data(sensor_id: str) -> pd.DataFrame:
 
 def get_available_sensors() -> list:
     """사용자가 접근 가능한 ITS 센서 목록을 반환하는 함수"""
-    try:
-        # 로그인된 사용자 정보 가져오기
-        user_id = request.cookies.get("login_user")
-        if not user_id:
-            return []
-        
-        # 사용자 권한 정보 조회
-        from api_db import _get_its_engine, text
-        
-        eng = _get_its_engine(1)
-        user_query = text("SELECT userid, grade FROM tb_user WHERE userid = :uid LIMIT 1")
-        df_user = pd.read_sql(user_query, eng, params={"uid": user_id})
-        
-        if df_user.empty:
-            return []
-        
-        grade = df_user.iloc[0]["grade"]
-        
-        # AD 권한이면 모든 구조의 센서 반환
-        if grade == "AD":
-            # 모든 구조 조회
-            structure_query = text("""
-                SELECT DISTINCT st.stid AS s_code
-                FROM tb_structure st
-                JOIN tb_group g ON g.groupid = st.groupid 
-                JOIN tb_project p ON p.projectid = g.projectid 
-                WHERE p.projectid = 'P_000078'
-                ORDER BY st.stid
-            """)
-            df_structures = pd.read_sql(structure_query, eng)
-            s_codes = df_structures['s_code'].tolist()
-        else:
-            # 일반 사용자의 경우 접근 가능한 구조만
-            auth_query = text("SELECT id FROM tb_sensor_auth_mapping WHERE userid = :uid")
-            df_auth = pd.read_sql(auth_query, eng, params={"uid": user_id})
-            
-            if df_auth.empty:
-                return []
-            
-            auth_list = df_auth["id"].tolist()
-            
-            # P_000078에 접근 가능하면 모든 구조 반환
-            if "P_000078" in auth_list:
-                structure_query = text("""
-                    SELECT DISTINCT st.stid AS s_code
-                    FROM tb_structure st
-                    JOIN tb_group g ON g.groupid = st.groupid 
-                    JOIN tb_project p ON p.projectid = g.projectid 
-                    WHERE p.projectid = 'P_000078'
-                    ORDER BY st.stid
-                """)
-                df_structures = pd.read_sql(structure_query, eng)
-                s_codes = df_structures['s_code'].tolist()
-            else:
-                # 접근 가능한 구조 ID만
-                s_codes = [auth_id for auth_id in auth_list if auth_id.startswith('S_')]
-        
-        # 각 구조별 센서 목록 수집
-        all_sensors = []
-        for s_code in s_codes:
-            try:
-                sensors_df = api_db.get_sensor_list_for_structure(s_code)
-                if not sensors_df.empty:
-                    for _, sensor in sensors_df.iterrows():
-                        device_id = sensor["deviceid"]
-                        channel = sensor["channel"]
-                        sensor_key = f"{device_id}_Ch{channel}"
-                        
-                        # 중복 제거
-                        if sensor_key not in [s['sensor_key'] for s in all_sensors]:
-                            all_sensors.append({
-                                'sensor_key': sensor_key,
-                                'device_id': device_id,
-                                'channel': channel,
-                                'device_type': sensor.get('device_type', ''),
-                                'data_type': sensor.get('data_type', ''),
-                                'is3axis': sensor.get('is3axis', 'N'),
-                                'structure_id': s_code
-                            })
-            except Exception as e:
-                print(f"Error getting sensors for structure {s_code}: {e}")
-                continue
-        
-        return all_sensors
-        
-    except Exception as e:
-        print(f"Error getting available sensors: {e}")
+    # 로그인된 사용자 정보 가져오기
+    user_id = request.cookies.get("login_user")
+    if not user_id:
         return []
+    # 권한 판단은 CSV 내보내기 라우트와 같은 함수 사용
+    return api_db.get_accessible_sensors(user_id)
 
 def get_sensor_info(sensor_data: dict) -> dict:
     """센서 정보를 반환하는 함수"""
@@ -376,8 +302,9 @@ layout = html.Div([
                             # 액션 버튼들
                             html.Div([
                                 dbc.Button("데이터 수집", id="collect-data-btn", color="success", size="sm", className="px-3", disabled=True),
-                                dbc.Button("CSV 다운로드", id="download-csv-btn", color="primary", size="sm", className="px-3", disabled=True),
-                                dcc.Download(id="download-csv"),
+                                # 서버가 조각 단위로 바로 내려보내는 CSV 링크 (sensor_export)
+                                dbc.Button("CSV 다운로드", id="download-csv-btn", color="primary", size="sm", className="px-3", disabled=True,
+                                           href="", external_link=True, download=""),
                             ], className="d-flex justify-content-center gap-2 mt-2"),
                         ])
                     ])
@@ -555,6 +482,15 @@ def update_sensor_tab_content(active_tab, sensor_key):
                 # 센서 정보 카드
                 html.Div(id="selected-sensor-info", className="mb-4"),
                 
+                # 조회 기간 (기간이 길면 시간/일 집계로 조회)
+                dbc.RadioItems(
+                    id="sensor-range",
+                    options=[{"label": label, "value": days} for label, days in GRAPH_RANGES],
+                    value=1,
+                    inline=True,
+                    className="mb-2"
+                ),
+                
                 # 데이터 그래프
                 dcc.Graph(
                     id="sensor-data-graph",
@@ -577,9 +513,10 @@ def update_sensor_tab_content(active_tab, sensor_key):
     Output("selected-sensor-info", "children"),
     Output("sensor-stats", "children"),
     Input("selected-sensor-store", "data"),
+    Input("sensor-range", "value"),
     prevent_initial_call=True
 )
-def load_sensor_data_and_create_graph(sensor_key):
+def load_sensor_data_and_create_graph(sensor_key, range_days=1):
     """센서 데이터를 로드하고 그래프를 생성하는 콜백"""
     if not sensor_key:
         empty_graph = go.Figure().add_annotation(
@@ -593,19 +530,30 @@ def load_sensor_data_and_create_graph(sensor_key):
         device_id, channel_part = sensor_key.split('_Ch')
         channel = channel_part
         
-        # ITS 센서 데이터 조회 (최근 24시간)
-        df = api_db.get_its_sensor_data(
-            device_id=device_id, 
-            channel=channel, 
-            its_num=1,
-            hours=24
-        )
+        # 조회 기간에 맞는 해상도 선택 (짧으면 ITS 원본, 길면 시간/일 집계)
+        range_days = range_days or 1
+        end_dt = datetime.now()
+        start_dt = end_dt - timedelta(days=range_days)
+        resolution = sensor_rollup.choose_resolution(start_dt, end_dt)
+        
+        if resolution == "raw":
+            # ITS 센서 데이터 조회 (원본)
+            df = api_db.get_its_sensor_data(
+                device_id=device_id, 
+                channel=channel, 
+                its_num=1,
+                hours=range_days * 24
+            )
+        else:
+            resolution, df = sensor_rollup.get_series(device_id, channel, start_dt, end_dt, resolution)
         
-        # ITS DB에서 데이터가 없으면 로컬 DB에서 확인
+        # 데이터가 없으면 로컬 DB에서 확인
         if df.empty:
             df = api_db.get_sensor_data(
                 device_id=device_id, 
                 channel=channel, 
+                start=start_dt.strftime('%Y%m%d%H'),
+                end=end_dt.strftime('%Y%m%d%H'),
                 use_its=False,  # 로컬 DB에서 확인
                 its_num=1
             )
@@ -635,11 +583,28 @@ def load_sensor_data_and_create_graph(sensor_key):
             # 서브플롯 생성
             fig = go.Figure()
             
+            # 그래프 폭에 맞게 점 수를 줄임 (LTTB, 통계는 전체 데이터로 계산)
+            max_points = downsample.points_for_width(GRAPH_WIDTH_PX)
+            series = downsample.downsample_frame(df, 'time', ['temperature', 'humidity', 'sv'], max_points)
+            
+            # 줄인 경우 온도 최소/최대 범위를 띠로 표시 (스파이크 유지, 집계 데이터는 min/max 컬럼 사용)
+            if 'temperature' in df.columns and len(df) > max_points:
+                times = df['time'].to_numpy()
+                low_col = 'temperature_min' if 'temperature_min' in df.columns else 'temperature'
+                high_col = 'temperature_max' if 'temperature_max' in df.columns else 'temperature'
+                env_x, env_low, _ = downsample.minmax_envelope(times, df[low_col], max_points // 2)
+                _, _, env_high = downsample.minmax_envelope(times, df[high_col], max_points // 2)
+                fig.add_trace(go.Scatter(x=env_x, y=env_high, mode='lines', line=dict(width=0),
+                                         hoverinfo='skip', showlegend=False, yaxis='y'))
+                fig.add_trace(go.Scatter(x=env_x, y=env_low, mode='lines', line=dict(width=0),
+                                         fill='tonexty', fillcolor='rgba(255, 107, 107, 0.15)',
+                                         name='온도 범위', hoverinfo='skip', yaxis='y'))
+            
             # 사용 가능한 컬럼들에 따라 그래프 생성
-            if 'temperature' in df.columns:
+            if 'temperature' in series:
                 fig.add_trace(go.Scatter(
-                    x=df['time'],
-                    y=df['temperature'],
+                    x=series['temperature'][0],
+                    y=series['temperature'][1],
                     mode='lines+markers',
                     name='온도 (°C)',
                     line=dict(color='#FF6B6B', width=2),
@@ -648,10 +613,10 @@ def load_sensor_data_and_create_graph(sensor_key):
                     hovertemplate='<b>시간:</b> %{x}<br><b>온도:</b> %{y:.1f}°C<extra></extra>'
                 ))
             
-            if 'humidity' in df.columns:
+            if 'humidity' in series:
                 fig.add_trace(go.Scatter(
-                    x=df['time'],
-                    y=df['humidity'],
+                    x=series['humidity'][0],
+                    y=series['humidity'][1],
                     mode='lines+markers',
                     name='습도 (%)',
                     line=dict(color='#4ECDC4', width=2),
@@ -660,10 +625,10 @@ def load_sensor_data_and_create_graph(sensor_key):
                     hovertemplate='<b>시간:</b> %{x}<br><b>습도:</b> %{y:.1f}%<extra></extra>'
                 ))
             
-            if 'sv' in df.columns:
+            if 'sv' in series:
                 fig.add_trace(go.Scatter(
-                    x=df['time'],
-                    y=df['sv'],
+                    x=series['sv'][0],
+                    y=series['sv'][1],
                     mode='lines+markers',
                     name='SV',
                     line=dict(color='#45B7D1', width=2),
@@ -808,7 +773,7 @@ def load_sensor_data_and_create_graph(sensor_key):
                                 html.H4(f"{len(df)}개", className="text-info mb-2"),
                                 html.Small([
                                     html.I(className="fas fa-chart-line me-1"),
-                                    "24시간 데이터"
+                                    f"{range_days}일 데이터 ({RESOLUTION_LABELS.get(resolution, resolution)})"
                                 ], className="text-muted")
                             ])
                         ], className="h-100")
@@ -1052,40 +1017,15 @@ def collect_sensor_data(n_clicks, sensor_key):
         return True, f"❌ 데이터 수집 중 오류 발생: {str(e)}", "danger"
 
 @callback(
-    Output("download-csv", "data"),
-    Input("download-csv-btn", "n_clicks"),
-    State("selected-sensor-store", "data"),
-    prevent_initial_call=True
+    Output("download-csv-btn", "href"),
+    Input("selected-sensor-store", "data"),
+    Input("sensor-range", "value"),
 )
-def download_csv(n_clicks, sensor_key):
-    """CSV 다운로드 콜백"""
-    if not sensor_key or not n_clicks:
-        raise PreventUpdate
-    
-    try:
-        device_id, channel_part = sensor_key.split('_Ch')
-        channel = channel_part
-        
-        # 실제 센서 데이터 조회
-        df = api_db.get_sensor_data(
-            device_id=device_id, 
-            channel=channel, 
-            use_its=True,  # ITS 데이터베이스에서 직접 조회
-            its_num=1
-        )
-        
-        if df.empty:
-            raise PreventUpdate
-        
-        # CSV 데이터 생성
-        csv_string = df.to_csv(index=False, encoding='utf-8-sig')
-        
-        return dict(
-            content=csv_string,
-            filename=f"{device_id}_Ch{channel}_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        )
-    except Exception as e:
-        print(f"Error downloading CSV: {e}")
-        raise PreventUpdate
+def update_download_link(sensor_key, range_days):
+    """CSV 다운로드 링크 (선택한 센서 + 그래프 기간)"""
+    if not sensor_key:
+        return ""
+    query = urlencode({"sensor": sensor_key, "days": range_days or 1})
+    return f"/export/sensor_csv?{query}"
 
  
\ No newline at end of file
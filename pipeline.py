@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+자동화 파이프라인 DAG 실행기 (auto_run 의 고정 sleep 순차 실행을 대체)
+- 단계마다 선행 단계(deps)를 정의하고, 각 단계는 "바뀐 콘크리트" 집합을 반환
+  → 후속 단계는 그 콘크리트만 처리 (전체 재탐색 없음)
+- 단계마다 작업 스레드 하나: 선행 단계가 항목을 넘기면 바로 깨어나 처리하므로
+  센서 수집 중에도 앞 사이클의 INP/FRD/VTK 변환이 함께 진행됨 (파이프라인 겹침)
+- 원천 단계(선행 단계 없음)는 CADENCE 주기로, 후속 단계는 FULL_SCAN_INTERVAL 주기로 전체 처리
+  (수동으로 넣은 파일 등 항목으로 전달되지 않은 변경을 놓치지 않도록)
+- 실패한 단계의 항목은 다시 대기열에 넣고 RETRY_DELAY 후 재시도. 단계 함수는 일부 항목만 실패하면
+  StageFailed(changed, failed) 를 던짐 → 성공한 항목은 후속 단계로 넘기고 실패한 항목만 재시도
+- 실행 중 외부에서 항목 넣기: submit(ctx, 단계, 항목) (fs_watcher 가 새 INP/FRD 파일의 콘크리트를 넣음)
+- 단계 실행마다 stage_metrics span(pipeline.{단계}) 기록: 대기 시간 = 첫 항목 도착 → 실행 시작
+  (항목별 span 은 각 단계 모듈이 기록)
+
+사용 예:
+    python auto_run.py                       # 계속 실행
+    python auto_run.py --once                # 전체 한 번 실행 후 종료
+    python auto_run.py --cadence sensor=120  # 센서 수집 주기 변경
+    python auto_run.py --no-watch            # 파일 감시 없이 (후속 단계는 FULL_SCAN_INTERVAL 주기 전체 처리)
+"""
+
+import os
+import time
+import logging
+import threading
+
+import fs_watcher
+import stage_metrics
+
+# 원천 단계 실행 주기 (초)
+CADENCE = {"mirror": 3600, "sensor": 300, "store": 3600, "rollup": 3600}
+# 후속 단계 전체 처리 주기 (초)
+FULL_SCAN_INTERVAL = 6 * 3600
+# 첫 항목이 도착한 뒤 더 모아서 한 번에 처리하는 시간 (초)
+DEBOUNCE_SEC = 5.0
+RETRY_DELAY = 60.0
+
+
+# 로거 설정
+def setup_pipeline_logger():
+    """pipeline 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('pipeline_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'pipeline.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | PIPELINE | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_pipeline_logger()
+
+
+class StageFailed(Exception):
+    """단계 일부 실패: changed(후속 단계로 넘길 항목), failed(재시도할 항목)"""
+
+    def __init__(self, changed, failed):
+        self.changed, self.failed = set(changed), set(failed)
+        super().__init__(f"실패 {len(self.failed)}개: {', '.join(sorted(map(str, self.failed))[:10])}")
+
+
+def _check_failed(changed, failed):
+    """단계 모듈 요약의 실패 항목이 있으면 StageFailed. Returns: changed"""
+    if failed:
+        raise StageFailed(changed, failed)
+    return set(changed)
+
+
+# ---------------------------------------------------------------------------
+# 단계 함수: items(콘크리트 목록, None 이면 전체) → 바뀐 콘크리트 집합
+# (auto_sensor 는 ITS_CLI 가 필요하므로 각 단계 모듈은 실행 시점에 import)
+# ---------------------------------------------------------------------------
+
+def concretes_for_sensors(changed):
+    """저장된 센서 [(device_id, channel, 첫 시각, 마지막 시각)] → 해당 센서가 붙은 콘크리트 집합"""
+    import api_db
+
+    if not changed:
+        return set()
+    df = api_db.get_sensors_data()
+    if df.empty:
+        return set()
+    owners = {}
+    for device_id, channel, concrete_pk in df[["device_id", "channel", "concrete_pk"]].itertuples(index=False):
+        owners.setdefault((str(device_id), str(channel)), set()).add(str(concrete_pk))
+    result = set()
+    for device_id, channel, first, last in changed:
+        pks = owners.get((str(device_id), str(channel)), set())
+        result |= pks
+        if pks:
+            logger.info(f"센서 {device_id}/{channel} {first} ~ {last} → 콘크리트 {', '.join(sorted(pks))}")
+    return result
+
+
+def _stage_mirror(items):
+    import its_mirror
+    its_mirror.run_mirror_stage()
+    return set()
+
+
+def _stage_sensor(items):
+    import auto_sensor
+    metrics = auto_sensor.auto_sensor_data()
+    return concretes_for_sensors(metrics.get("changed", []))
+
+
+def _stage_store(items):
+    import sensor_store
+    sensor_store.run_store_stage()
+    return set()
+
+
+def _stage_rollup(items):
+    import sensor_rollup
+    sensor_rollup.backfill_from_sensor_data()
+    return set()
+
+
+def _stage_inp(items):
+    import auto_inp
+    summary = auto_inp.auto_inp(items)
+    return _check_failed(summary["concretes"], summary["failed"])
+
+
+def _stage_frd(items):
+    import auto_inp_to_frd
+    summary = auto_inp_to_frd.convert_all_inp_to_frd(items)
+    failed = set(summary["failed_concretes"])
+    # in-process 백엔드는 INP 단계에서 FRD 까지 만들므로 받은 콘크리트도 그대로 넘김
+    return _check_failed(set(summary["concretes"]) | (set(items or ()) - failed), failed)
+
+
+def _stage_vtk(items, vtk_root="assets/vtk"):
+    import auto_frd_to_vtk
+    summary = auto_frd_to_vtk.convert_all_frd_to_vtk(vtk_root_dir=vtk_root, concrete_pks=items)
+    changed = {os.path.relpath(p, vtk_root).split(os.sep)[0] for p in summary["outputs"]}
+    return _check_failed(changed, {rel.split(os.sep)[0] for rel in summary["failed_sources"]})
+
+
+def _stage_series(items):
+    import vtkhdf_series
+    summary = vtkhdf_series.run_series_stage(concrete_pks=items)
+    return _check_failed(summary["updated"], summary["failed"])
+
+
+def _stage_lod(items):
+    import surface_lod
+    summary = surface_lod.run_lod_stage(concrete_pks=items)
+    return _check_failed(summary["updated"], summary["failed"])
+
+
+# 단계 정의: deps(선행 단계), run(단계 함수)
+STAGES = {
+    "mirror": {"deps": (), "run": _stage_mirror},
+    "sensor": {"deps": (), "run": _stage_sensor},
+    "store": {"deps": (), "run": _stage_store},
+    "rollup": {"deps": (), "run": _stage_rollup},
+    "inp": {"deps": ("sensor",), "run": _stage_inp},
+    "frd": {"deps": ("inp",), "run": _stage_frd},
+    "vtk": {"deps": ("frd",), "run": _stage_vtk},
+    "series": {"deps": ("frd",), "run": _stage_series},
+    "lod": {"deps": ("frd",), "run": _stage_lod},
+}
+
+
+def topological_order(stages):
+    """선행 단계가 먼저 오도록 정렬한 단계 이름 목록 (순환이나 없는 단계를 참조하면 ValueError)"""
+    order, done, visiting = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"단계 순환: {name}")
+        if name not in stages:
+            raise ValueError(f"정의되지 않은 단계: {name}")
+        visiting.add(name)
+        for dep in stages[name]["deps"]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+def _children(stages):
+    children = {name: [] for name in stages}
+    for name, spec in stages.items():
+        for dep in spec["deps"]:
+            children[dep].append(name)
+    return children
+
+
+def _run_stage(name, spec, items, queue_wait=None):
+    """단계 실행 + 기록 (단계 실행 1회 = stage_metrics span "pipeline.{name}" 1개).
+
+    queue_wait: 첫 항목이 대기열에 들어온 뒤 실행까지 기다린 시간 (초)
+
+    Returns: 바뀐 항목 집합
+    """
+    scope = "전체" if items is None else f"{len(items)}개"
+    with stage_metrics.span(f"pipeline.{name}", scope, queue_wait):
+        start = time.perf_counter()
+        changed = set(spec["run"](items) or ())
+        logger.info(f"{name}: 대상 {scope} → 변경 {len(changed)}개 ({time.perf_counter() - start:.1f}s)")
+    return changed
+
+
+def run_once(stages=None, full=False):
+    """DAG 를 선행 순서대로 한 번 실행.
+
+    원천 단계는 전체 처리, 후속 단계는 선행 단계가 넘긴 항목만 처리 (없으면 건너뜀).
+    full=True 이면 모든 단계를 전체 처리.
+
+    Returns
+    -------
+    dict: {단계: 바뀐 항목 집합}
+    """
+    stages = stages or STAGES
+    emitted = {}
+    for name in topological_order(stages):
+        spec = stages[name]
+        if full or not spec["deps"]:
+            items = None
+        else:
+            incoming = set().union(*(emitted.get(dep, set()) for dep in spec["deps"]))
+            if not incoming:
+                emitted[name] = set()
+                continue
+            items = sorted(incoming)
+        try:
+            emitted[name] = _run_stage(name, spec, items)
+        except StageFailed as e:
+            logger.error(f"{name} 단계 일부 실패: {e}")
+            print(f"❌ {name} 단계 일부 실패: {e}")
+            emitted[name] = e.changed
+        except Exception as e:
+            logger.error(f"{name} 단계 오류: {e}")
+            print(f"❌ {name} 단계 오류: {e}")
+            emitted[name] = set()
+    return emitted
+
+
+def _stage_loop(name, spec, ctx):
+    """단계 작업 스레드: 항목이 오거나 주기가 되면 실행하고 바뀐 항목을 후속 단계로 전달"""
+    st, stop, lock = ctx["state"][name], ctx["stop"], ctx["lock"]
+    while not stop.is_set():
+        st["wake"].wait(max(0.0, st["next_due"] - time.monotonic()))
+        if stop.is_set():
+            break
+        # 선행 단계에서 연달아 들어오는 항목을 잠깐 모음
+        if st["pending"] and time.monotonic() < st["next_due"]:
+            stop.wait(ctx["debounce"])
+        with lock:
+            st["wake"].clear()
+            items, st["pending"] = st["pending"], set()
+            queued_at, st["queued_at"] = st["queued_at"], None
+            full = time.monotonic() >= st["next_due"]
+            if full:
+                st["next_due"] = time.monotonic() + st["interval"]
+        if not items and not full:
+            continue
+
+        try:
+            changed = _run_stage(name, spec, None if full else sorted(items),
+                                 None if queued_at is None else time.monotonic() - queued_at)
+        except Exception as e:
+            # 일부 실패면 성공한 항목은 후속 단계로, 실패한 항목만 재시도
+            changed, retry = (e.changed, e.failed) if isinstance(e, StageFailed) else (set(), items)
+            logger.error(f"{name} 단계 오류 ({len(retry)}개 항목 재시도 예정): {e}")
+            with lock:
+                if retry:
+                    st["pending"] |= retry
+                    st["queued_at"] = st["queued_at"] or queued_at or time.monotonic()
+                st["errors"] += 1
+                for child in ctx["children"][name]:
+                    if changed:
+                        _enqueue(ctx["state"][child], changed)
+            if not stop.wait(ctx["retry_delay"]):
+                st["wake"].set()
+            continue
+
+        with lock:
+            st["runs"] += 1
+            for child in ctx["children"][name]:
+                if changed:
+                    _enqueue(ctx["state"][child], changed)
+
+
+def _enqueue(st, items):
+    """단계 대기열에 항목 추가 후 깨움 (ctx["lock"] 을 잡은 상태에서 호출)"""
+    if not st["pending"]:
+        st["queued_at"] = time.monotonic()
+    st["pending"] |= set(items)
+    st["wake"].set()
+
+
+def submit(ctx, stage, items=None):
+    """실행 중인 파이프라인 단계에 외부(파일 감시 등)에서 항목을 넣음.
+
+    items 가 None 이면 다음 실행을 전체 처리로 앞당김. 없는 단계는 무시
+    """
+    st = ctx["state"].get(stage)
+    if st is None:
+        return
+    with ctx["lock"]:
+        if items is None:
+            st["next_due"] = time.monotonic()
+            st["wake"].set()
+        elif items:
+            _enqueue(st, items)
+
+
+def start_pipeline(stages=None, cadence=None, full_scan_interval=FULL_SCAN_INTERVAL,
+                   debounce=DEBOUNCE_SEC, retry_delay=RETRY_DELAY, stop_event=None):
+    """단계별 작업 스레드를 시작. 시작 직후 모든 단계가 한 번 전체 처리됨.
+
+    cadence: {원천 단계: 주기(초)} (CADENCE 를 덮어씀)
+
+    Returns
+    -------
+    dict: stop(Event, set 하면 종료), threads, state({단계: pending, queued_at, runs, errors, ...})
+    """
+    stages = stages or STAGES
+    topological_order(stages)
+    cadence = {**CADENCE, **(cadence or {})}
+    now = time.monotonic()
+    ctx = {
+        "stop": stop_event or threading.Event(),
+        "lock": threading.Lock(),
+        "children": _children(stages),
+        "debounce": debounce,
+        "retry_delay": retry_delay,
+        "state": {name: {"pending": set(), "wake": threading.Event(), "next_due": now,
+                         "interval": cadence.get(name, full_scan_interval) if not spec["deps"]
+                         else full_scan_interval,
+                         "queued_at": None, "runs": 0, "errors": 0}
+                  for name, spec in stages.items()},
+    }
+    ctx["threads"] = [threading.Thread(target=_stage_loop, args=(name, spec, ctx), name=f"stage-{name}",
+                                       daemon=True)
+                      for name, spec in stages.items()]
+    for thread in ctx["threads"]:
+        thread.start()
+    logger.info(f"파이프라인 시작: 단계 {', '.join(topological_order(stages))} "
+                f"(원천 주기 {cadence}, 전체 처리 {full_scan_interval}s)")
+    return ctx
+
+
+def run_pipeline(watch=False, **kwargs):
+    """파이프라인을 시작하고 Ctrl+C 까지 실행.
+
+    watch=True 이면 fs_watcher 가 inp/frd 폴더의 새 파일을 감시해 해당 콘크리트를 바로 후속 단계에 넣음
+    """
+    ctx = start_pipeline(**kwargs)
+    if watch:
+        ctx["watcher"] = fs_watcher.start_watcher(lambda stage, items: submit(ctx, stage, items),
+                                                  stop_event=ctx["stop"])
+    try:
+        while any(t.is_alive() for t in ctx["threads"]):
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        print("🛑 파이프라인 종료 중...")
+    finally:
+        ctx["stop"].set()
+        for state in ctx["state"].values():
+            state["wake"].set()
+        for thread in ctx["threads"]:
+            thread.join(timeout=30)
+        logger.info("파이프라인 종료")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+센서 원본 데이터 CSV 내보내기 (Flask 스트리밍)
+- ITS tb_sensor_data 를 서버 측 커서(stream_results)로 CHUNK_ROWS 행씩 읽어 CSV 조각을 바로 응답으로 보냄
+  (DataFrame 전체를 메모리에 올려 문자열로 만든 뒤 dcc.Download 로 보내던 방식을 대체)
+- gzip=1 이면 조각을 이어서 압축해 .csv.gz 로 보냄
+- 기간은 센서 데이터 페이지와 같음: days (그래프 기간 1/7/30/90일) 또는 start/end (YYYYMMDDHH)
+- 권한은 페이지 센서 목록과 같은 api_db.get_accessible_sensors() 로 확인
+
+사용 예 (app.py 라우트):
+    GET /export/sensor_csv?sensor=D1_Ch1&days=7&gzip=1
+"""
+
+import os
+import io
+import csv
+import zlib
+import logging
+from datetime import datetime, timedelta
+
+from flask import Response
+from sqlalchemy import text
+
+import api_db
+
+# 한 번에 가져와 CSV 로 쓰는 행 수
+CHUNK_ROWS = 5000
+# 한 번에 내보낼 수 있는 최대 기간 (일)
+MAX_EXPORT_DAYS = 366
+DEFAULT_DAYS = 1
+GZIP_LEVEL = 6
+EXPORT_COLUMNS = ["device_id", "channel", "time", "temperature", "humidity", "sv",
+                  "x_accel", "y_accel", "z_accel", "x_gyro", "y_gyro", "z_gyro"]
+
+
+# 로거 설정
+def setup_sensor_export_logger():
+    """sensor_export 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('sensor_export_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'sensor_export.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | SENSOR_EXPORT | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_sensor_export_logger()
+
+
+def parse_range(args, now=None):
+    """요청 인자 → (start_dt, end_dt).
+
+    start/end (YYYYMMDDHH) 가 둘 다 있으면 그 기간, 없으면 now 기준 days 일 전부터 (기본 1일).
+    잘못된 값이거나 MAX_EXPORT_DAYS 를 넘으면 ValueError
+    """
+    start, end = args.get("start"), args.get("end")
+    if start and end:
+        start_dt, end_dt = api_db.parse_ymdh(start), api_db.parse_ymdh(end)
+    else:
+        days = int(args.get("days") or DEFAULT_DAYS)
+        end_dt = now or datetime.now()
+        start_dt = end_dt - timedelta(days=days)
+    if end_dt <= start_dt:
+        raise ValueError("종료 시간이 시작 시간보다 빨라야 합니다")
+    if end_dt - start_dt > timedelta(days=MAX_EXPORT_DAYS):
+        raise ValueError(f"최대 {MAX_EXPORT_DAYS}일까지 내보낼 수 있습니다")
+    return start_dt, end_dt
+
+
+def _csv_text(rows, header=False):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        buf.write("\ufeff")   # 엑셀에서 한글이 깨지지 않도록 BOM (기존 utf-8-sig 와 동일)
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def iter_csv(device_id, channel, start_dt, end_dt, its_num=1, engine=None, chunk_rows=CHUNK_ROWS):
+    """ITS 원본 측정값을 CSV 조각(str)으로 내보내는 제너레이터 (첫 조각은 헤더).
+
+    연결은 제너레이터가 끝나거나 닫힐 때(클라이언트 연결 끊김 포함) 반환됨
+    """
+    eng = engine or api_db._get_its_engine(its_num)
+    params = {"device_id": device_id, "channel": channel, "start_time": start_dt, "end_time": end_dt}
+    yield _csv_text([], header=True)
+    rows = 0
+    with eng.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=chunk_rows).execute(
+            text(api_db.ITS_SENSOR_DATA_SQL), params)
+        for part in result.partitions(chunk_rows):
+            rows += len(part)
+            yield _csv_text(part)
+    logger.info(f"{device_id}/Ch{channel} {start_dt:%Y-%m-%d %H:%M} ~ {end_dt:%Y-%m-%d %H:%M}: {rows}행 내보냄")
+
+
+def iter_gzip(chunks, level=GZIP_LEVEL):
+    """str 조각 → gzip 바이트 조각 (조각마다 압축기에 이어 넣음)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # wbits=31: gzip 헤더/트레일러
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_sensor_csv(args, user_id, engine=None):
+    """내보내기 요청 처리 → flask Response (권한/인자 오류는 403/400).
+
+    args: sensor (예: D1_Ch1), days 또는 start/end, gzip, its
+    """
+    sensor_key = args.get("sensor", "")
+    if "_Ch" not in sensor_key:
+        return Response("sensor 인자가 필요합니다 (예: D1_Ch1)", status=400)
+    try:
+        its_num = int(args.get("its") or 1)
+        start_dt, end_dt = parse_range(args)
+    except ValueError as e:
+        return Response(str(e), status=400)
+
+    allowed = {s["sensor_key"] for s in api_db.get_accessible_sensors(user_id, its_num)}
+    if sensor_key not in allowed:
+        logger.warning(f"권한 없는 내보내기 요청: user={user_id} sensor={sensor_key}")
+        return Response("센서 데이터에 접근할 권한이 없습니다", status=403)
+
+    device_id, channel = sensor_key.split("_Ch", 1)
+    filename = f"{device_id}_Ch{channel}_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    chunks = iter_csv(device_id, channel, start_dt, end_dt, its_num, engine)
+    if args.get("gzip") in ("1", "true"):
+        body, mimetype, filename = iter_gzip(chunks), "application/gzip", filename + ".gz"
+    else:
+        body, mimetype = (c.encode("utf-8") for c in chunks), "text/csv; charset=utf-8"
+    return Response(body, mimetype=mimetype, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    })
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+센서 시간/일 단위 집계 (sensor_rollup_hourly / sensor_rollup_daily)
+- 센서별 bucket 마다 n(원본 측정 수), temperature / humidity / sv 의 min·avg·max 저장
+- 수집(auto_sensor)에서 원본 측정값으로 시간 집계를 만들고, 바뀐 시간/날짜 bucket 만 교체
+  (일 집계는 해당 날짜의 시간 집계에서 n 가중 평균으로 다시 계산)
+- 집계가 없던 기간(첫 bucket 이전 / 마지막 bucket 이후)은 sensor_data(시간 평균) 로 채움
+  (backfill_from_sensor_data, n=1)
+- 조회 측은 choose_resolution() 으로 기간에 맞는 가장 거친 해상도를 골라 get_series() 로 읽음
+  (한 달 그래프 ≈ 720점, 석 달 이상은 일 단위)
+- 테이블은 db_migrate 마이그레이션 3 에서 생성
+
+사용 예:
+    python sensor_rollup.py backfill
+"""
+
+import os
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import api_db
+
+METRICS = ("temperature", "humidity", "sv")
+TABLES = {"hour": "sensor_rollup_hourly", "day": "sensor_rollup_daily"}
+FREQ = {"hour": "h", "day": "D"}
+# 그래프 한 계열의 최대 점 수 (이 안에 들어가는 가장 세밀한 집계 해상도를 사용)
+MAX_POINTS = 1500
+# 이 기간(시간) 이하는 집계 없이 원본 측정값 조회
+RAW_MAX_HOURS = 48
+
+
+# 로거 설정
+def setup_sensor_rollup_logger():
+    """sensor_rollup 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('sensor_rollup_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'sensor_rollup.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | SENSOR_ROLLUP | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_sensor_rollup_logger()
+
+
+def _rollup_columns():
+    return [f"{m}_{stat}" for m in METRICS for stat in ("min", "avg", "max")]
+
+
+def hourly_rollup(raw):
+    """원본 측정값(time + 측정 컬럼) → 시간 집계.
+
+    Returns
+    -------
+    DataFrame: time(시 단위), n, {m}(평균), {m}_min, {m}_max  (m = temperature / humidity / sv)
+    """
+    raw = raw.copy()
+    raw["time"] = pd.to_datetime(raw["time"]).dt.floor("h")
+    for m in METRICS:
+        if m not in raw:
+            raw[m] = np.nan
+    grouped = raw.groupby("time")
+    result = grouped.size().rename("n").to_frame()
+    for m in METRICS:
+        result[m] = grouped[m].mean()
+        result[f"{m}_min"] = grouped[m].min()
+        result[f"{m}_max"] = grouped[m].max()
+    return result.reset_index()
+
+
+def _daily_from_hourly(hourly):
+    """시간 집계 → 일 집계 (평균은 n 가중)"""
+    hourly = hourly.copy()
+    hourly["day"] = hourly["time"].dt.floor("D")
+    grouped = hourly.groupby("day")
+    result = grouped["n"].sum().to_frame()
+    for m in METRICS:
+        weight = hourly["n"].where(hourly[m].notna(), 0)
+        weighted = (hourly[m].fillna(0) * weight).groupby(hourly["day"]).sum()
+        total = weight.groupby(hourly["day"]).sum()
+        result[m] = (weighted / total.replace(0, np.nan))
+        result[f"{m}_min"] = grouped[f"{m}_min"].min()
+        result[f"{m}_max"] = grouped[f"{m}_max"].max()
+    return result.reset_index().rename(columns={"day": "time"})
+
+
+def _replace_buckets(conn, table, device_id, channel, frame):
+    """frame 의 bucket 들을 새 값으로 교체 (DELETE 후 INSERT, MySQL/SQLite 공통)"""
+    if frame.empty:
+        return 0
+    buckets = frame["time"].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    conn.execute(
+        text(f"DELETE FROM {table} WHERE device_id = :device_id AND channel = :channel AND bucket = :bucket"),
+        [{"device_id": device_id, "channel": channel, "bucket": b} for b in buckets],
+    )
+    values = frame[[c for m in METRICS for c in (f"{m}_min", m, f"{m}_max")]]
+    values = values.astype(object).where(values.notna(), None)
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    columns = ["device_id", "channel", "bucket", "n"] + _rollup_columns() + ["updated_at"]
+    rows = [dict(zip(columns, (device_id, channel, b, int(n), *vals, now)))
+            for b, n, vals in zip(buckets, frame["n"], values.itertuples(index=False, name=None))]
+    conn.execute(
+        text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+        rows,
+    )
+    return len(rows)
+
+
+def _read_rollup(conn, resolution, device_id, channel, start=None, end=None):
+    """집계 테이블 조회 → DataFrame(time, n, {m}, {m}_min, {m}_max)"""
+    sql = (f"SELECT bucket, n, {', '.join(_rollup_columns())} FROM {TABLES[resolution]} "
+           "WHERE device_id = :device_id AND channel = :channel")
+    params = {"device_id": device_id, "channel": channel}
+    if start is not None:
+        sql += " AND bucket >= :start_dt"
+        params["start_dt"] = pd.Timestamp(start).strftime('%Y-%m-%d %H:%M:%S')
+    if end is not None:
+        sql += " AND bucket <= :end_dt"
+        params["end_dt"] = pd.Timestamp(end).strftime('%Y-%m-%d %H:%M:%S')
+    df = pd.read_sql(text(sql + " ORDER BY bucket"), conn, params=params)
+    df = df.rename(columns={"bucket": "time", **{f"{m}_avg": m for m in METRICS}})
+    df["time"] = pd.to_datetime(df["time"])
+    return df
+
+
+def update_rollups(device_id, channel, hourly, engine=None):
+    """시간 집계를 반영하고, 해당 날짜의 일 집계를 다시 계산 (한 트랜잭션).
+
+    hourly: hourly_rollup() 결과 형식
+
+    Returns
+    -------
+    (교체한 시간 bucket 수, 교체한 일 bucket 수)
+    """
+    if hourly is None or hourly.empty:
+        return 0, 0
+    hourly = hourly.copy()
+    hourly["time"] = pd.to_datetime(hourly["time"])
+    with (engine or api_db.engine).begin() as conn:
+        hours = _replace_buckets(conn, TABLES["hour"], device_id, channel, hourly)
+        first_day = hourly["time"].min().floor("D")
+        last_day = hourly["time"].max().floor("D") + timedelta(days=1) - timedelta(seconds=1)
+        stored = _read_rollup(conn, "hour", device_id, channel, first_day, last_day)
+        days = _replace_buckets(conn, TABLES["day"], device_id, channel, _daily_from_hourly(stored))
+    return hours, days
+
+
+def backfill_from_sensor_data(engine=None):
+    """시간 집계가 없는 sensor_data 구간을 sensor_data(시간 평균, n=1) 로 채움.
+
+    센서별 집계의 첫 bucket 이전과 마지막 bucket 이후를 읽음. 수집 단계가 최근 시간 집계를 먼저 만든
+    센서도 그 이전 이력을 채우고, 수집에서 만든 (min/max 가 있는) 집계 bucket 은 덮어쓰지 않음.
+
+    Returns
+    -------
+    dict: sensors, hours, elapsed
+    """
+    engine = engine or api_db.engine
+    start = time.perf_counter()
+    summary = {"sensors": 0, "hours": 0, "elapsed": 0.0}
+    with engine.connect() as conn:
+        data_range = pd.read_sql(text(
+            "SELECT device_id, channel, MIN(time) AS first_time, MAX(time) AS last_time FROM sensor_data "
+            "GROUP BY device_id, channel"), conn)
+        rollup_range = pd.read_sql(text(
+            f"SELECT device_id, channel, MIN(bucket) AS first_bucket, MAX(bucket) AS last_bucket "
+            f"FROM {TABLES['hour']} GROUP BY device_id, channel"), conn)
+    done = {(str(d), str(c)): (pd.Timestamp(first), pd.Timestamp(last))
+            for d, c, first, last in rollup_range.itertuples(index=False, name=None)}
+
+    for device_id, channel, data_first, data_last in data_range.itertuples(index=False, name=None):
+        sql = ("SELECT time, temperature, humidity, sv FROM sensor_data "
+               "WHERE device_id = :device_id AND channel = :channel")
+        params = {"device_id": device_id, "channel": channel}
+        covered = done.get((str(device_id), str(channel)))
+        if covered is not None:
+            first_bucket, last_bucket = covered
+            gaps = []
+            if pd.Timestamp(data_first) < first_bucket:
+                gaps.append("time < :before")
+                params["before"] = first_bucket.strftime('%Y-%m-%d %H:%M:%S')
+            if pd.Timestamp(data_last) >= last_bucket + timedelta(hours=1):
+                gaps.append("time >= :after")
+                params["after"] = (last_bucket + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+            if not gaps:
+                continue
+            sql += f" AND ({' OR '.join(gaps)})"
+        df = pd.read_sql(text(sql + " ORDER BY time"), engine, params=params)
+        hours, _ = update_rollups(device_id, channel, hourly_rollup(df), engine)
+        summary["sensors"] += 1
+        summary["hours"] += hours
+    summary["elapsed"] = time.perf_counter() - start
+    logger.info(f"sensor_data 집계 채우기: 센서 {summary['sensors']}개, {summary['hours']}시간, "
+                f"{summary['elapsed']:.1f}s")
+    return summary
+
+
+def choose_resolution(start, end, max_points=MAX_POINTS, raw_max_hours=RAW_MAX_HOURS):
+    """기간에 맞는 해상도: "raw" (짧은 기간) → "hour" → "day" (max_points 를 넘지 않는 가장 세밀한 집계)"""
+    hours = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds() / 3600
+    if hours <= raw_max_hours:
+        return "raw"
+    if hours <= max_points:
+        return "hour"
+    return "day"
+
+
+def get_series(device_id, channel, start, end, resolution=None, engine=None):
+    """집계 시계열 조회.
+
+    resolution: "hour" | "day" (None 이면 기간으로 선택, "raw" 가 나오면 "hour" 사용)
+
+    Returns
+    -------
+    (해상도, DataFrame(time, n, {m}, {m}_min, {m}_max))
+    """
+    if resolution is None:
+        resolution = choose_resolution(start, end)
+        if resolution == "raw":
+            resolution = "hour"
+    with (engine or api_db.engine).connect() as conn:
+        return resolution, _read_rollup(conn, resolution, device_id, channel, start, end)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="센서 시간/일 집계")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="집계가 없는 기간을 sensor_data 로 채움")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        summary = backfill_from_sensor_data()
+        print(f"✅ 집계 채우기 완료: 센서 {summary['sensors']}개, {summary['hours']}시간 ({summary['elapsed']:.1f}s)")
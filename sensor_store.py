@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+센서 시계열 로컬 저장소 (Parquet, 센서/월 단위 파티션)
+- data/sensor_store/sensor={센서 키}/month=YYYY-MM/part.parquet
+  센서 키: ITS 센서는 "{device_id}_{channel}", sensors/*.csv 는 파일 이름(S001 등)
+- 컬럼 타입 고정: time(timestamp[s]), humidity / sv / temperature(float64)
+- 기간 조회는 필요한 월 파티션 파일만 열고, time 조건은 Parquet row group 통계로 걸러 읽음
+- 추가(append)는 바뀐 월 파티션만 다시 쓰며 같은 시각은 새 값으로 교체 (임시 파일 → os.replace)
+- read_arrays(): Arrow 버퍼를 복사 없이 NumPy 배열로 반환 (결측이 없을 때)
+- 입력 경로: auto_sensor 수집 결과(append), sensor_data 테이블 증분 동기화(sync_from_db),
+  sensors/*.csv (ingest_csv, 파일이 바뀐 경우에만 다시 읽음)
+- 기간 조회 가능 여부(covers): sensor_data 전체 이력을 동기화했거나 저장된 첫 시각이 시작 시각 이전인 경우
+
+사용 예:
+    python sensor_store.py sync          # sensor_data 테이블 → 저장소 증분 동기화
+    python sensor_store.py csv sensors   # CSV 폴더 가져오기
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_ROOT = "data/sensor_store"
+VALUE_COLUMNS = ("humidity", "sv", "temperature")
+SCHEMA = pa.schema([("time", pa.timestamp("s"))] + [(c, pa.float64()) for c in VALUE_COLUMNS])
+PART_FILE = "part.parquet"
+SOURCES_FILE = "_sources.json"
+# sensor_data 동기화 시 이미 저장한 마지막 시각보다 이만큼 앞에서부터 다시 읽음 (수집 겹침 구간 갱신 반영)
+SYNC_OVERLAP = timedelta(hours=1)
+# _sources.json 에서 sensor_data 테이블 동기화 위치를 기록하는 항목 (CSV 항목은 파일 절대 경로)
+DB_SOURCE = "sensor_data"
+
+
+# 로거 설정
+def setup_sensor_store_logger():
+    """sensor_store 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('sensor_store_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'sensor_store.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | SENSOR_STORE | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_sensor_store_logger()
+
+_write_lock = threading.Lock()
+
+
+def sensor_key(device_id, channel=None):
+    """저장소 센서 키 (경로에 쓸 수 없는 문자는 '_' 로 바꿈)"""
+    key = str(device_id).strip() if channel is None else f"{str(device_id).strip()}_{str(channel).strip()}"
+    return re.sub(r"[^0-9A-Za-z가-힣._-]", "_", key)
+
+
+def _sensor_dir(key, root=None):
+    return os.path.join(root or STORE_ROOT, f"sensor={key}")
+
+
+def _month_path(key, month, root=None):
+    return os.path.join(_sensor_dir(key, root), f"month={month}", PART_FILE)
+
+
+def _months(key, root=None):
+    """저장된 월 파티션 목록 (오름차순, 'YYYY-MM')"""
+    paths = glob.glob(os.path.join(_sensor_dir(key, root), "month=*", PART_FILE))
+    return sorted(os.path.basename(os.path.dirname(p))[len("month="):] for p in paths)
+
+
+def list_sensors(root=None):
+    """저장소에 있는 센서 키 목록"""
+    keys = [os.path.basename(d)[len("sensor="):] for d in glob.glob(os.path.join(root or STORE_ROOT, "sensor=*"))]
+    return sorted(key for key in keys if _months(key, root))
+
+
+def _to_table(df):
+    """DataFrame → 저장 스키마 Table (없는 값 컬럼은 결측으로 채움)"""
+    frame = pd.DataFrame({"time": pd.to_datetime(df["time"]).astype("datetime64[s]")})
+    for col in VALUE_COLUMNS:
+        frame[col] = pd.to_numeric(df[col], errors="coerce").astype("float64") if col in df else np.nan
+    return pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+
+
+def _write_atomic(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def append(key, df, root=None):
+    """시계열 행 추가. 같은 시각이 이미 있으면 새 값으로 교체하고, 바뀐 월 파티션만 다시 씀.
+
+    Returns
+    -------
+    int: 입력 행 수 (시각 중복 제거 후)
+    """
+    if df is None or len(df) == 0:
+        return 0
+    table = _to_table(df)
+    frame = table.to_pandas().dropna(subset=["time"]).drop_duplicates("time", keep="last")
+    months = frame["time"].dt.strftime("%Y-%m")
+    with _write_lock:
+        for month, part in frame.groupby(months):
+            path = _month_path(key, month, root)
+            if os.path.exists(path):
+                old = pq.read_table(path, schema=SCHEMA).to_pandas()
+                part = pd.concat([old[~old["time"].isin(part["time"])], part], ignore_index=True)
+            part = part.sort_values("time")
+            _write_atomic(pa.Table.from_pandas(part, schema=SCHEMA, preserve_index=False), path)
+    return len(frame)
+
+
+def _time_bound(key, first, root=None):
+    """첫(first=True) 또는 마지막 월 파티션의 Parquet 통계로 가장 이른/늦은 시각 (없으면 None)"""
+    months = _months(key, root)
+    if not months:
+        return None
+    meta = pq.ParquetFile(_month_path(key, months[0] if first else months[-1], root)).metadata
+    bounds = []
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(0).statistics
+        if stats is not None and stats.has_min_max:
+            bounds.append(stats.min if first else stats.max)
+    if not bounds:
+        return None
+    return pd.Timestamp(min(bounds) if first else max(bounds)).to_pydatetime()
+
+
+def first_time(key, root=None):
+    """저장된 가장 이른 시각 (첫 월 파티션의 Parquet 통계만 읽음, 없으면 None)"""
+    return _time_bound(key, True, root)
+
+
+def last_time(key, root=None):
+    """저장된 마지막 시각 (마지막 월 파티션의 Parquet 통계만 읽음, 없으면 None)"""
+    return _time_bound(key, False, root)
+
+
+def read_table(key, start=None, end=None, columns=None, root=None):
+    """기간 [start, end] 의 행을 Arrow Table 로 반환 (필요한 월 파티션만 읽음)"""
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    months = [m for m in _months(key, root)
+              if (start is None or m >= start.strftime("%Y-%m")) and (end is None or m <= end.strftime("%Y-%m"))]
+    columns = ["time"] + [c for c in (columns or VALUE_COLUMNS) if c != "time"]
+    if not months:
+        return SCHEMA.empty_table().select(columns)
+
+    condition = None
+    if start is not None:
+        condition = ds.field("time") >= pa.scalar(start.to_pydatetime(), pa.timestamp("s"))
+    if end is not None:
+        upper = ds.field("time") <= pa.scalar(end.to_pydatetime(), pa.timestamp("s"))
+        condition = upper if condition is None else condition & upper
+    dataset = ds.dataset([_month_path(key, m, root) for m in months], schema=SCHEMA, format="parquet")
+    return dataset.to_table(columns=columns, filter=condition).sort_by("time")
+
+
+def read_frame(key, start=None, end=None, columns=None, root=None):
+    """기간 조회 결과를 DataFrame 으로 (time 오름차순)"""
+    frame = read_table(key, start, end, columns, root).to_pandas()
+    frame["time"] = frame["time"].astype("datetime64[ns]")
+    return frame
+
+
+def read_arrays(key, column="temperature", start=None, end=None, root=None):
+    """(시각 datetime64[s] 배열, 값 float64 배열). 결측이 없으면 Arrow 버퍼를 복사 없이 공유"""
+    table = read_table(key, start, end, [column], root).combine_chunks()
+    times = table.column("time")
+    values = table.column(column)
+    if table.num_rows == 0:
+        return np.array([], dtype="datetime64[s]"), np.array([], dtype="float64")
+    times, values = times.chunk(0), values.chunk(0)
+    return (times.to_numpy(zero_copy_only=times.null_count == 0),
+            values.to_numpy(zero_copy_only=values.null_count == 0))
+
+
+def _load_sources(key, root=None):
+    path = os.path.join(_sensor_dir(key, root), SOURCES_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_sources(key, sources, root=None):
+    path = os.path.join(_sensor_dir(key, root), SOURCES_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sources, f, ensure_ascii=False)
+
+
+def synced_until(key, root=None):
+    """sensor_data 테이블에서 전체 이력을 가져온 마지막 시각 (한 번도 동기화하지 않았으면 None)"""
+    value = _load_sources(key, root).get(DB_SOURCE)
+    return pd.Timestamp(value).to_pydatetime() if value else None
+
+
+def covers(key, start, root=None):
+    """start 이후 기간을 저장소만으로 조회할 수 있는지.
+
+    sensor_data 에서 전체 이력을 동기화한 센서이거나, 저장된 첫 시각이 start 이전이면 True
+    (수집 단계의 append 만 있는 센서는 최근 구간만 있을 수 있음)
+    """
+    if synced_until(key, root) is not None:
+        return True
+    first = first_time(key, root)
+    return first is not None and first <= pd.Timestamp(start).to_pydatetime()
+
+
+def ingest_csv(csv_path, key=None, root=None):
+    """센서 CSV(time, humidity, sv, temperature) 가져오기. 파일이 마지막 가져온 뒤 바뀌지 않았으면 건너뜀.
+
+    Returns
+    -------
+    int: 추가한 행 수 (건너뛰면 0)
+    """
+    key = key or sensor_key(os.path.splitext(os.path.basename(csv_path))[0])
+    stat = os.stat(csv_path)
+    signature = [stat.st_mtime_ns, stat.st_size]
+    sources = _load_sources(key, root)
+    source_id = os.path.abspath(csv_path)
+    if sources.get(source_id) == signature:
+        return 0
+    df = pd.read_csv(csv_path, usecols=lambda c: c == "time" or c in VALUE_COLUMNS)
+    rows = append(key, df, root)
+    sources[source_id] = signature
+    _save_sources(key, sources, root)
+    logger.info(f"CSV 가져오기 {csv_path} → {key}: {rows}행")
+    return rows
+
+
+def ingest_csv_dir(csv_dir="sensors", root=None):
+    """폴더의 *.csv 를 모두 가져오기 (바뀐 파일만). Returns: {센서 키: 추가 행 수}"""
+    result = {}
+    for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+        try:
+            result[sensor_key(os.path.splitext(os.path.basename(path))[0])] = ingest_csv(path, root=root)
+        except Exception as e:
+            logger.error(f"CSV 가져오기 실패 {path}: {e}")
+    return result
+
+
+def load_csv_sensor(sensor_id, csv_dir="sensors", columns=None, root=None):
+    """sensors/{sensor_id}.csv 기반 센서 시계열 (CSV 가 바뀌었으면 먼저 가져옴). 둘 다 없으면 None"""
+    key = sensor_key(sensor_id)
+    csv_path = os.path.join(csv_dir, f"{sensor_id}.csv")
+    if os.path.isfile(csv_path):
+        ingest_csv(csv_path, key, root)
+    elif not _months(key, root):
+        return None
+    return read_frame(key, columns=columns, root=root)
+
+
+def sync_from_db(engine, root=None):
+    """sensor_data 테이블에서 저장소보다 새로운 행만 가져오기.
+
+    센서별 MAX(time) 을 쿼리 1번으로 비교해, 마지막 동기화 위치(synced_until)보다 새 행이 있는 센서만
+    (동기화 위치 - SYNC_OVERLAP) 이후를 조회. 동기화 위치는 저장소의 마지막 시각과 따로 기록하므로
+    수집 단계가 최근 시각을 먼저 append 한 센서도 처음 동기화할 때 전체 이력을 가져옴.
+
+    Returns
+    -------
+    dict: sensors(갱신 센서 수), rows(가져온 행 수), elapsed
+    """
+    from sqlalchemy import text
+
+    start = time.perf_counter()
+    summary = {"sensors": 0, "rows": 0, "elapsed": 0.0}
+    watermarks = pd.read_sql(
+        text("SELECT device_id, channel, MAX(time) AS last_time FROM sensor_data GROUP BY device_id, channel"),
+        engine,
+    )
+    for device_id, channel, db_last in watermarks.itertuples(index=False, name=None):
+        key = sensor_key(device_id, channel)
+        stored = synced_until(key, root)
+        db_last = pd.Timestamp(db_last)
+        if stored is not None and pd.Timestamp(stored) >= db_last:
+            continue
+        params = {"device_id": device_id, "channel": channel}
+        sql = "SELECT time, humidity, sv, temperature FROM sensor_data WHERE device_id = :device_id AND channel = :channel"
+        if stored is not None:
+            sql += " AND time >= :since"
+            params["since"] = (stored - SYNC_OVERLAP).strftime('%Y-%m-%d %H:%M:%S')
+        df = pd.read_sql(text(sql + " ORDER BY time"), engine, params=params)
+        summary["rows"] += append(key, df, root)
+        summary["sensors"] += 1
+        sources = _load_sources(key, root)
+        sources[DB_SOURCE] = db_last.strftime('%Y-%m-%d %H:%M:%S')
+        _save_sources(key, sources, root)
+    summary["elapsed"] = time.perf_counter() - start
+    logger.info(f"sensor_data 동기화: 센서 {summary['sensors']}개, {summary['rows']}행, {summary['elapsed']:.1f}s")
+    return summary
+
+
+def run_store_stage(root=None):
+    """파이프라인 단계: sensor_data 테이블과 sensors/*.csv 를 저장소에 증분 반영"""
+    import api_db
+
+    summary = sync_from_db(api_db.engine, root)
+    summary["csv"] = sum(ingest_csv_dir(root=root).values())
+    return dict(summary, stage="sensor_store")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="센서 시계열 Parquet 저장소")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="sensor_data 테이블 → 저장소 증분 동기화")
+    p_csv = sub.add_parser("csv", help="CSV 폴더 가져오기")
+    p_csv.add_argument("csv_dir", nargs="?", default="sensors")
+    sub.add_parser("list", help="저장된 센서와 마지막 시각")
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        import api_db
+        summary = sync_from_db(api_db.engine)
+        print(f"✅ 동기화 완료: 센서 {summary['sensors']}개, {summary['rows']}행 ({summary['elapsed']:.1f}s)")
+    elif args.command == "csv":
+        result = ingest_csv_dir(args.csv_dir)
+        print(f"✅ CSV {len(result)}개 확인, {sum(result.values())}행 추가")
+    else:
+        for key in list_sensors():
+            print(f"📈 {key}: {last_time(key)}")
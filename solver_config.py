@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ccx 해석 설정 (콘크리트 크기 등급별)
+- 등급은 메쉬 노드 수로 결정 (small / medium / large)
+- 등급별로 방정식 솔버(*STATIC, SOLVER=...), 스레드 수, 출력 옵션을 지정
+- ccx_benchmark.py 로 비교한 뒤 선택한 설정을 solver_config.json 에 저장
+"""
+
+import os
+import json
+
+CONFIG_PATH = "solver_config.json"
+
+# (등급, 최대 노드 수) - 마지막 등급은 상한 없음
+SIZE_CLASSES = [
+    ("small", 5000),
+    ("medium", 50000),
+    ("large", None),
+]
+
+# 지원 솔버 (None 이면 ccx 기본 솔버)
+SOLVERS = [None, "SPOOLES", "PARDISO", "ITERATIVE SCALING", "ITERATIVE CHOLESKY"]
+
+DEFAULT_CONFIG = {
+    "solver": None,        # *STATIC, SOLVER=...
+    "threads": 1,          # OMP_NUM_THREADS / CCX_NPROC_EQUATION_SOLVER
+    "node_print": True,    # *NODE PRINT / *EL PRINT (.dat 출력)
+}
+
+
+def get_size_class(n_nodes):
+    """노드 수로 크기 등급 반환"""
+    for name, max_nodes in SIZE_CLASSES:
+        if max_nodes is None or n_nodes <= max_nodes:
+            return name
+    return SIZE_CLASSES[-1][0]
+
+
+def load_configs(config_path=CONFIG_PATH):
+    """등급별 설정 로드 ({등급: 설정}), 파일이 없으면 기본값"""
+    configs = {name: dict(DEFAULT_CONFIG) for name, _ in SIZE_CLASSES}
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            for name, cfg in saved.items():
+                if name in configs:
+                    configs[name].update(cfg)
+        except Exception as e:
+            print(f"solver_config 로드 오류: {e}")
+    return configs
+
+
+def get_solver_config(n_nodes, config_path=CONFIG_PATH):
+    """메쉬 노드 수에 해당하는 설정 반환 (size_class 키 포함)"""
+    size_class = get_size_class(n_nodes)
+    config = load_configs(config_path)[size_class]
+    config["size_class"] = size_class
+    return config
+
+
+def set_solver_config(size_class, config_path=CONFIG_PATH, **options):
+    """크기 등급별 설정 저장 (예: set_solver_config('large', solver='PARDISO', threads=8))"""
+    if size_class not in dict(SIZE_CLASSES):
+        raise ValueError(f"알 수 없는 크기 등급: {size_class}")
+    unknown = set(options) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"알 수 없는 설정 항목: {sorted(unknown)}")
+    if options.get("solver") not in SOLVERS:
+        raise ValueError(f"지원하지 않는 솔버: {options.get('solver')}")
+
+    configs = load_configs(config_path)
+    configs[size_class].update(options)
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(configs, f, ensure_ascii=False, indent=2)
+    return configs[size_class]
+
+
+def static_keyword(config):
+    """*STATIC 키워드 라인"""
+    solver = config.get("solver")
+    return f"*STATIC, SOLVER={solver}" if solver else "*STATIC"
+
+
+def config_comment(config):
+    """INP 헤더에 기록하는 설정 주석 (ccx 는 ** 라인을 무시)"""
+    return f"** SMART_TS size_class={config.get('size_class', '')} threads={int(config.get('threads', 1))}"
+
+
+def read_config_comment(inp_path):
+    """INP 헤더의 설정 주석에서 {'size_class', 'threads'} 읽기 (없으면 빈 dict)"""
+    try:
+        with open(inp_path, "r") as f:
+            for line in f:
+                if line.startswith("*NODE"):
+                    break
+                if line.startswith("** SMART_TS"):
+                    return dict(item.split("=", 1) for item in line.split()[2:])
+    except Exception:
+        pass
+    return {}
+
+
+def ccx_env(threads):
+    """ccx 실행 환경변수 (스레드 수 지정)"""
+    env = os.environ.copy()
+    env["OMP_NUM_THREADS"] = str(int(threads))
+    env["CCX_NPROC_EQUATION_SOLVER"] = str(int(threads))
+    return env
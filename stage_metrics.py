@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+자동화 단계 계측 (항목별 span → JSON lines + Prometheus)
+- 단계(auto_sensor, auto_inp, auto_inp_to_frd, auto_frd_to_vtk ...)가 항목 하나를 처리할 때마다
+  span 1개 기록: 단계, 항목, 시작 시각, 소요 시간, 읽은/쓴 바이트, 대기 시간(queue wait), 결과
+- span 은 SPANS_PATH 에 JSON 한 줄씩 추가 (SPANS_MAX_BYTES 를 넘으면 .1 로 넘기고 새로 씀)
+  → 관리자 자동화 페이지가 읽어 단계별 처리량 / p95 지연 차트를 그림
+- 프로세스별 누적값(단계·결과별 개수, 지연 히스토그램, 바이트, 대기 시간)은 METRICS_DIR 에
+  {SOURCE}-{pid}.json(상태) 와 {SOURCE}-{pid}.prom(node_exporter textfile 형식, pid 라벨 포함)으로
+  FLUSH_INTERVAL 마다 기록 (gunicorn 작업자처럼 SOURCE 가 같은 프로세스끼리 덮어쓰지 않도록 pid 포함)
+  → app.py 의 /metrics 가 모든 프로세스의 상태를 SOURCE 별로 합쳐 Prometheus 텍스트로 응답
+- /metrics 는 METRICS_TOKEN(Bearer) 또는 관리자 쿠키가 있어야 함 (프록시 뒤에서는 remote_addr 가
+  항상 로컬로 보이므로 접속 주소로는 허용하지 않음)
+- 대기 시간은 항목이 실제로 줄을 서는 곳에서 측정 (작업자 풀 제출 → 시작, 입력 파일 생성 → 변환 시작).
+  해당 없는 단계는 None (Prometheus 대기 시간 합/개수에 포함하지 않음)
+
+사용 예:
+    with stage_metrics.span("auto_inp", f"{cpk}/{ts}") as s:
+        ...
+        s["bytes_written"] = os.path.getsize(path)
+    stage_metrics.record_span("auto_frd_to_vtk", rel_src, 1.2, "ok", bytes_read=..., queue_wait=0.3)
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from flask import Response
+
+SPANS_PATH = os.path.join("log", "pipeline_spans.jsonl")
+SPANS_MAX_BYTES = 50 * 1024 * 1024
+# 관리자 페이지에서 읽는 최대 크기 (파일 끝에서부터)
+SPANS_READ_BYTES = 16 * 1024 * 1024
+METRICS_DIR = os.path.join("data", "metrics")
+# 누적값 파일 기록 주기 (초), 단계가 끝날 때는 flush() 로 바로 기록
+FLUSH_INTERVAL = 15.0
+# 프로세스 이름 (auto_run, app ...) → 누적값 파일명과 Prometheus source 라벨
+SOURCE = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "python"
+# 지연 히스토그램 구간 (초)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# /metrics 인증 토큰 (없으면 관리자만 허용)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+_lock = threading.Lock()
+_state = {}
+_last_flush = [0.0]
+
+
+# 로거 설정
+def setup_stage_metrics_logger():
+    """stage_metrics 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('stage_metrics_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'stage_metrics.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | STAGE_METRICS | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_stage_metrics_logger()
+
+
+# ---------------------------------------------------------------------------
+# 기록
+# ---------------------------------------------------------------------------
+
+def _new_series():
+    return {"count": 0, "duration_sum": 0.0, "buckets": [0] * len(DURATION_BUCKETS),
+            "bytes_read": 0, "bytes_written": 0, "queue_wait_sum": 0.0, "queue_wait_count": 0}
+
+
+def _append_line(line, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        if os.path.getsize(path) >= SPANS_MAX_BYTES:
+            os.replace(path, path + ".1")
+    except OSError:
+        pass
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def record_span(stage, item, duration, outcome="ok", bytes_read=0, bytes_written=0, queue_wait=None,
+                started=None):
+    """처리한 항목 하나를 기록 (JSON 한 줄 + 프로세스 누적값). 기록 실패는 처리에 영향을 주지 않음.
+
+    started: 처리 시작 시각(epoch 초, 없으면 지금 - duration)
+    """
+    started = time.time() - duration if started is None else started
+    record = {"ts": round(started, 3), "stage": stage, "item": str(item), "duration": round(duration, 4),
+              "bytes_read": int(bytes_read or 0), "bytes_written": int(bytes_written or 0),
+              "queue_wait": None if queue_wait is None else round(max(0.0, queue_wait), 4),
+              "outcome": outcome, "source": SOURCE}
+    try:
+        with _lock:
+            series = _state.setdefault(f"{stage}|{outcome}", _new_series())
+            series["count"] += 1
+            series["duration_sum"] += duration
+            for i, bound in enumerate(DURATION_BUCKETS):   # 누적 구간 (le)
+                if duration <= bound:
+                    series["buckets"][i] += 1
+            series["bytes_read"] += record["bytes_read"]
+            series["bytes_written"] += record["bytes_written"]
+            if record["queue_wait"] is not None:
+                series["queue_wait_sum"] += record["queue_wait"]
+                series["queue_wait_count"] += 1
+            _append_line(json.dumps(record, ensure_ascii=False) + "\n", SPANS_PATH)
+            due = time.monotonic() - _last_flush[0] >= FLUSH_INTERVAL
+        if due:
+            flush()
+    except Exception as e:
+        logger.warning(f"span 기록 실패 ({stage} {item}): {e}")
+    return record
+
+
+@contextmanager
+def span(stage, item, queue_wait=None):
+    """with 블록 하나를 span 으로 기록.
+
+    블록 안에서 s["bytes_read"], s["bytes_written"], s["outcome"] 을 채움.
+    예외가 나면 outcome="error" 로 기록하고 예외는 그대로 전달
+    """
+    s = {"outcome": "ok", "bytes_read": 0, "bytes_written": 0}
+    started, start = time.time(), time.perf_counter()
+    try:
+        yield s
+    except BaseException:
+        s["outcome"] = "error"
+        raise
+    finally:
+        record_span(stage, item, time.perf_counter() - start, s["outcome"], s["bytes_read"],
+                    s["bytes_written"], queue_wait, started)
+
+
+def file_size(*paths):
+    """존재하는 파일들의 크기 합 (bytes)"""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def snapshot():
+    """현재 프로세스 누적값 복사본 {"단계|결과": {...}}"""
+    with _lock:
+        return json.loads(json.dumps(_state))
+
+
+def flush(metrics_dir=None):
+    """누적값을 {SOURCE}-{pid}.json / .prom 으로 기록 (원자적 교체)"""
+    metrics_dir = metrics_dir or METRICS_DIR
+    state = snapshot()
+    # pid 는 기록할 때 확인 (gunicorn 처럼 import 후 fork 한 작업자도 각자 파일에 기록)
+    pid = os.getpid()
+    with _lock:
+        _last_flush[0] = time.monotonic()
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for ext, body in ((".json", json.dumps({"updated": time.time(), "source": SOURCE, "pid": pid,
+                                                "series": state})),
+                          (".prom", render_prometheus({SOURCE: state}, pid=pid))):
+            path = os.path.join(metrics_dir, f"{SOURCE}-{pid}{ext}")
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(path + ".tmp", path)
+    except OSError as e:
+        logger.warning(f"누적값 기록 실패: {e}")
+
+
+def reset():
+    """현재 프로세스 누적값 초기화 (테스트용)"""
+    with _lock:
+        _state.clear()
+        _last_flush[0] = 0.0
+
+
+# ---------------------------------------------------------------------------
+# Prometheus 텍스트
+# ---------------------------------------------------------------------------
+
+def _merge_series(into, series):
+    """누적값 series 를 into 에 더함 (같은 SOURCE 의 여러 프로세스 합산)"""
+    for key, s in series.items():
+        total = into.setdefault(key, _new_series())
+        for field, value in s.items():
+            if field == "buckets":
+                total["buckets"] = [a + b for a, b in zip(total["buckets"], value)]
+            else:
+                total[field] += value
+
+
+def load_states(metrics_dir=None):
+    """METRICS_DIR 의 모든 프로세스 누적값을 SOURCE 별로 합친 {source: {"단계|결과": {...}}}"""
+    metrics_dir = metrics_dir or METRICS_DIR
+    states = {}
+    if not os.path.isdir(metrics_dir):
+        return states
+    for name in sorted(os.listdir(metrics_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(metrics_dir, name), encoding="utf-8") as f:
+                data = json.load(f)
+            source = data.get("source") or name[:-5]
+            _merge_series(states.setdefault(source, {}), data["series"])
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return states
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(states=None, pid=None):
+    """누적값 → Prometheus text exposition (0.0.4). states 가 없으면 load_states()
+
+    pid: 주면 모든 샘플에 pid 라벨 추가 (프로세스별 .prom 파일을 textfile collector 가 합칠 때 중복 방지)
+    """
+    states = load_states() if states is None else states
+    rows = []
+    for source, series in sorted(states.items()):
+        for key, s in sorted(series.items()):
+            stage, outcome = key.split("|", 1)
+            rows.append((source, stage, outcome, s))
+
+    families = [
+        ("pipeline_items_total", "counter", "단계별 처리 항목 수",
+         lambda r: [("", {}, r[3]["count"])]),
+        ("pipeline_item_duration_seconds", "histogram", "항목 처리 시간 (초)",
+         lambda r: [("_bucket", {"le": str(b)}, r[3]["buckets"][i])
+                    for i, b in enumerate(DURATION_BUCKETS)]
+         + [("_bucket", {"le": "+Inf"}, r[3]["count"]),
+            ("_sum", {}, float(r[3]["duration_sum"])), ("_count", {}, r[3]["count"])]),
+        ("pipeline_bytes_read_total", "counter", "단계가 읽은 바이트",
+         lambda r: [("", {}, r[3]["bytes_read"])]),
+        ("pipeline_bytes_written_total", "counter", "단계가 쓴 바이트",
+         lambda r: [("", {}, r[3]["bytes_written"])]),
+        ("pipeline_queue_wait_seconds", "summary", "항목이 처리되기 전 대기한 시간 (초)",
+         lambda r: [("_sum", {}, float(r[3]["queue_wait_sum"])), ("_count", {}, r[3]["queue_wait_count"])]),
+    ]
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for row in rows:
+            base = {"source": row[0], "stage": row[1], "outcome": row[2]}
+            if pid is not None:
+                base["pid"] = pid
+            for suffix, extra, value in samples(row):
+                lines.append(f"{name}{suffix}{_labels(**base, **extra)} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response(req):
+    """/metrics 응답. METRICS_TOKEN(Bearer) 또는 관리자 쿠키가 있어야 함"""
+    auth = req.headers.get("Authorization", "")
+    allowed = ((METRICS_TOKEN and hmac.compare_digest(auth, f"Bearer {METRICS_TOKEN}"))
+               or req.cookies.get("admin_user"))
+    if not allowed:
+        return Response("forbidden", status=403)
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4; charset=utf-8",
+                    headers={"Cache-Control": "no-store"})
+
+
+# ---------------------------------------------------------------------------
+# 조회 (관리자 페이지)
+# ---------------------------------------------------------------------------
+
+def read_spans(since=None, path=None, max_bytes=SPANS_READ_BYTES):
+    """span 기록 → DataFrame (time 열은 로컬 시각). 파일 끝 max_bytes 만 읽음
+
+    since: 이 시각(로컬 datetime) 이후 시작한 span 만
+    """
+    path = path or SPANS_PATH
+    columns = ["ts", "stage", "item", "duration", "bytes_read", "bytes_written", "queue_wait", "outcome",
+               "source"]
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_bytes))
+            data = f.read()
+    except OSError:
+        return pd.DataFrame(columns=columns + ["time"])
+    if size > max_bytes:
+        data = data[data.find(b"\n") + 1:]   # 잘린 첫 줄 버림
+
+    records = []
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    df = pd.DataFrame.from_records(records, columns=columns)
+    if since is not None:
+        df = df[df["ts"] >= time.mktime(since.timetuple())]
+    offset = datetime.now().astimezone().utcoffset()
+    df = df.assign(time=pd.to_datetime(df["ts"].astype(float), unit="s") + offset)
+    return df.reset_index(drop=True)
+
+
+def stage_timeseries(df, freq="5min"):
+    """단계·시간 구간별 처리량(항목/분)과 p95 처리 시간(초)"""
+    if df.empty:
+        return pd.DataFrame(columns=["time", "stage", "items", "throughput", "p95"])
+    grouped = df.groupby(["stage", pd.Grouper(key="time", freq=freq)])["duration"]
+    out = grouped.agg(items="count", p95=lambda d: float(np.percentile(d, 95))).reset_index()
+    out["throughput"] = out["items"] / (pd.Timedelta(freq).total_seconds() / 60.0)
+    return out[out["items"] > 0][["time", "stage", "items", "throughput", "p95"]].reset_index(drop=True)
+
+
+def stage_summary(df):
+    """단계별 합계: 항목 수, 실패 수, p50/p95 처리 시간, 평균 대기 시간, 읽은/쓴 바이트"""
+    if df.empty:
+        return pd.DataFrame(columns=["stage", "items", "failed", "p50", "p95", "queue_wait", "bytes_read",
+                                     "bytes_written"])
+    rows = []
+    for stage, g in df.groupby("stage"):
+        waits = pd.to_numeric(g["queue_wait"], errors="coerce").dropna()
+        rows.append({"stage": stage, "items": len(g),
+                     "failed": int(g["outcome"].isin(["failed", "error"]).sum()),
+                     "p50": float(np.percentile(g["duration"], 50)),
+                     "p95": float(np.percentile(g["duration"], 95)),
+                     "queue_wait": float(waits.mean()) if len(waits) else None,
+                     "bytes_read": int(g["bytes_read"].sum()), "bytes_written": int(g["bytes_written"].sum())})
+    return pd.DataFrame(rows).sort_values("p95", ascending=False).reset_index(drop=True)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+웹 3D 뷰용 표면 LOD(Level of Detail) 생성
+- 해석 메쉬(UnstructuredGrid)에서 외곽 표면만 추출 (한 셀에만 속한 면)
+- 정점 클러스터링으로 삼각형 수를 줄인 단계(기본 100% / 25% / 5%)를 생성
+  (클러스터 내 노드 값의 평균으로 스칼라를 보간)
+- assets/lod/{concrete_pk}/{시간}_{비율}.vtp 로 FRD 프레임마다 저장
+- 화면에서는 choose_level 로 재생 상태에 맞는 단계를 선택
+"""
+
+import os
+import re
+import glob
+import logging
+
+import numpy as np
+
+import frd_io
+import vtk_xml
+from auto_frd_to_vtk import frd_to_grid
+
+LOD_ROOT = "assets/lod"
+# 저장할 단계 (원본 표면 대비 삼각형 비율)
+LOD_LEVELS = (1.0, 0.25, 0.05)
+# 화면 상태별 삼각형 수 상한 (정지 화면 / 재생 중)
+TRIANGLE_BUDGET = 60000
+PLAYBACK_TRIANGLE_BUDGET = 8000
+# 단순화 단계의 최소 삼각형 수 (작은 메쉬가 형태를 잃지 않도록)
+MIN_LOD_TRIANGLES = 200
+
+# VTK 셀 타입별 면 (VTK 노드 순서, 바깥쪽 법선 방향)
+CELL_FACES = {
+    12: [[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4], [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]],  # 육면체
+    13: [[0, 1, 2], [3, 5, 4], [0, 3, 4, 1], [1, 4, 5, 2], [2, 5, 3, 0]],                      # 쐐기
+    10: [[0, 2, 1], [0, 1, 3], [1, 2, 3], [0, 3, 2]],                                          # 사면체
+}
+
+
+# 로거 설정
+def setup_surface_lod_logger():
+    """surface_lod 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('surface_lod_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'surface_lod.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | SURFACE_LOD | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_surface_lod_logger()
+
+
+# ---------------------------------------------------------------------------
+# 표면 추출 / 단순화
+# ---------------------------------------------------------------------------
+
+def extract_surface(connectivity, offsets, cell_types):
+    """외곽 표면 삼각형 추출.
+
+    Returns
+    -------
+    (node_index, triangles): 표면 노드의 원본 인덱스 (k,), 표면 노드 기준 삼각형 (m, 3)
+    """
+    connectivity = np.asarray(connectivity)
+    offsets = np.asarray(offsets)
+    cell_types = np.asarray(cell_types)
+    starts = np.concatenate([[0], offsets[:-1]])
+
+    faces = {3: [], 4: []}
+    for cell_type, local_faces in CELL_FACES.items():
+        cells = np.nonzero(cell_types == cell_type)[0]
+        if not len(cells):
+            continue
+        n_nodes = max(max(face) for face in local_faces) + 1
+        cell_nodes = connectivity[starts[cells][:, None] + np.arange(n_nodes)]
+        for face in local_faces:
+            faces[len(face)].append(cell_nodes[:, face])
+
+    triangles = []
+    for size, face_list in faces.items():
+        if not face_list:
+            continue
+        all_faces = np.concatenate(face_list)
+        # 정렬한 노드 조합이 한 번만 나오는 면이 외곽면
+        _, inverse, counts = np.unique(np.sort(all_faces, axis=1), axis=0,
+                                       return_inverse=True, return_counts=True)
+        boundary = all_faces[counts[inverse.ravel()] == 1]
+        if size == 4:
+            boundary = np.concatenate([boundary[:, [0, 1, 2]], boundary[:, [0, 2, 3]]])
+        triangles.append(boundary)
+
+    if not triangles:
+        return np.empty(0, dtype=np.int64), np.empty((0, 3), dtype=np.int64)
+    triangles = np.concatenate(triangles)
+    node_index, local = np.unique(triangles, return_inverse=True)
+    return node_index, local.reshape(-1, 3)
+
+
+def _cluster(points, triangles, resolution):
+    """격자 해상도(긴 축 기준 셀 수)로 정점 클러스터링. Returns: (cluster, new_triangles)"""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    cell = max((hi - lo).max(), 1e-12) / resolution
+    grid = np.floor((points - lo) / cell).astype(np.int64)
+    # 격자 좌표를 정수 키 하나로 묶어 1차원 unique 사용 (axis=0 unique 보다 훨씬 빠름)
+    dims = grid.max(axis=0) + 1
+    _, cluster = np.unique((grid[:, 0] * dims[1] + grid[:, 1]) * dims[2] + grid[:, 2], return_inverse=True)
+
+    tris = cluster[triangles]
+    keep = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])
+    tris = tris[keep]
+    if len(tris):
+        n = int(cluster.max()) + 1
+        ordered = np.sort(tris, axis=1)
+        if n < (1 << 21):
+            _, first = np.unique((ordered[:, 0] * n + ordered[:, 1]) * n + ordered[:, 2], return_index=True)
+        else:
+            _, first = np.unique(ordered, axis=0, return_index=True)
+        tris = tris[np.sort(first)]
+    return cluster, tris
+
+
+def decimate(points, triangles, ratio):
+    """삼각형 수가 ratio 배 이하가 되도록 정점 클러스터링 단순화.
+
+    Returns
+    -------
+    (cluster, triangles): 원래 표면 노드 → 새 노드 번호 (k,), 새 삼각형 (m', 3)
+    """
+    n_points = len(points)
+    target = max(MIN_LOD_TRIANGLES, int(len(triangles) * ratio))
+    if ratio >= 1.0 or target >= len(triangles):
+        return np.arange(n_points), triangles
+
+    # 해상도에 대해 이분 탐색 (삼각형 수는 해상도에 대해 대체로 단조 증가)
+    lo, hi = 1, 2
+    while _cluster(points, triangles, hi)[1].shape[0] < target and hi < 4096:
+        lo, hi = hi, hi * 2
+    best = _cluster(points, triangles, lo)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        result = _cluster(points, triangles, mid)
+        if len(result[1]) <= target:
+            lo, best = mid, result
+        else:
+            hi = mid
+    return best
+
+
+def build_levels(points, connectivity, offsets, cell_types, levels=LOD_LEVELS):
+    """메쉬에 대한 LOD 단계별 표면 구성 (시간 단계와 무관하므로 메쉬마다 한 번만 계산)
+
+    Returns
+    -------
+    list[dict]: level, node_index(원본 노드 인덱스), cluster, counts, points, triangles
+    """
+    points = np.asarray(points, dtype=np.float64)
+    node_index, triangles = extract_surface(connectivity, offsets, cell_types)
+    surface_points = points[node_index]
+
+    result = []
+    for level in levels:
+        cluster, tris = decimate(surface_points, triangles, level)
+        n_clusters = int(cluster.max()) + 1 if len(cluster) else 0
+        counts = np.bincount(cluster, minlength=n_clusters).astype(np.float64)
+        merged = np.stack([np.bincount(cluster, surface_points[:, i], n_clusters) for i in range(3)], axis=1)
+        result.append({
+            "level": level,
+            "node_index": node_index,
+            "cluster": cluster,
+            "counts": counts,
+            "points": merged / counts[:, None],
+            "triangles": tris,
+        })
+    return result
+
+
+def level_point_data(lod, point_data):
+    """원본 노드 값을 LOD 노드 값으로 보간 (클러스터 평균)"""
+    cluster, counts = lod["cluster"], lod["counts"]
+    result = {}
+    for name, values in point_data.items():
+        values = np.asarray(values, dtype=np.float64)[lod["node_index"]]
+        if values.ndim == 1:
+            result[name] = np.bincount(cluster, values, len(counts)) / counts
+        else:
+            result[name] = np.stack([np.bincount(cluster, values[:, i], len(counts))
+                                     for i in range(values.shape[1])], axis=1) / counts[:, None]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 저장 / 선택
+# ---------------------------------------------------------------------------
+
+def lod_path(concrete_pk, label, level, lod_root=LOD_ROOT):
+    return os.path.join(lod_root, str(concrete_pk), f"{label}_{int(round(level * 100)):03d}.vtp")
+
+
+def write_frame_lods(concrete_pk, label, levels, point_data, lod_root=LOD_ROOT):
+    """시간 단계 하나의 LOD 단계별 .vtp 기록. Returns: 기록한 경로 목록"""
+    paths = []
+    for lod in levels:
+        path = lod_path(concrete_pk, label, lod["level"], lod_root)
+        vtk_xml.write_vtp(path, lod["points"], lod["triangles"], level_point_data(lod, point_data))
+        paths.append(path)
+    return paths
+
+
+def available_levels(concrete_pk, label, lod_root=LOD_ROOT):
+    """저장된 단계별 삼각형 수 ({level: n_triangles}), 헤더만 읽음"""
+    levels = {}
+    for path in glob.glob(os.path.join(lod_root, str(concrete_pk), f"{label}_*.vtp")):
+        match = re.search(r"_(\d{3})\.vtp$", path)
+        polys = re.search(r'NumberOfPolys="(\d+)"', vtk_xml.read_vtk_header(path, 1024))
+        if match and polys:
+            levels[int(match.group(1)) / 100.0] = int(polys.group(1))
+    return levels
+
+
+def choose_level(levels, playing=False):
+    """화면 상태에 맞는 단계 선택 (상한 이하 중 가장 정밀한 단계, 없으면 가장 거친 단계)
+
+    levels: {level: n_triangles}
+    playing: 재생 중이면 PLAYBACK_TRIANGLE_BUDGET 사용
+    """
+    if not levels:
+        return None
+    budget = PLAYBACK_TRIANGLE_BUDGET if playing else TRIANGLE_BUDGET
+    fitting = [level for level, n in levels.items() if n <= budget]
+    return max(fitting) if fitting else min(levels)
+
+
+def load_lod_mesh(concrete_pk, label, playing=False, lod_root=LOD_ROOT):
+    """화면 상태에 맞는 단계의 표면 메쉬 읽기 (없으면 None)
+
+    Returns
+    -------
+    dict: level, points, triangles, point_data
+    """
+    level = choose_level(available_levels(concrete_pk, label, lod_root), playing)
+    if level is None:
+        return None
+    mesh = vtk_xml.read_vtp(lod_path(concrete_pk, label, level, lod_root))
+    mesh["level"] = level
+    return mesh
+
+
+# ---------------------------------------------------------------------------
+# 파이프라인 단계
+# ---------------------------------------------------------------------------
+
+def update_concrete_lods(concrete_pk, frd_root="frd", lod_root=LOD_ROOT, levels=LOD_LEVELS):
+    """frd/{concrete_pk} 의 프레임 중 LOD 가 없거나 FRD 보다 오래된 것만 생성. Returns: 생성한 라벨"""
+    frd_files = sorted(glob.glob(os.path.join(frd_root, str(concrete_pk), "*.frd")))
+    built, cache_key, lods = [], None, None
+    for frd_path in frd_files:
+        label = os.path.splitext(os.path.basename(frd_path))[0]
+        paths = [lod_path(concrete_pk, label, level, lod_root) for level in levels]
+        frd_mtime = os.path.getmtime(frd_path)
+        if all(os.path.exists(p) and os.path.getmtime(p) >= frd_mtime for p in paths):
+            continue
+
+        frd = frd_io.read_frd_arrays(frd_path)
+        points, connectivity, offsets, cell_types, point_data = frd_to_grid(frd)
+        # 같은 메쉬면 표면/클러스터 구성을 재사용
+        key = (len(points), len(connectivity), float(np.asarray(points).sum()))
+        if key != cache_key:
+            lods = build_levels(points, connectivity, offsets, cell_types, levels)
+            cache_key = key
+        write_frame_lods(concrete_pk, label, lods, point_data, lod_root)
+        built.append(label)
+
+    if built:
+        counts = ", ".join(f"{int(l['level'] * 100)}%={len(l['triangles'])}" for l in lods)
+        logger.info(f"{concrete_pk}: {len(built)}개 프레임 LOD 생성 (삼각형 {counts})")
+    return built
+
+
+def run_lod_stage(frd_root="frd", lod_root=LOD_ROOT, concrete_pks=None):
+    """파이프라인 단계: 콘크리트별 LOD 표면 생성
+
+    Returns
+    -------
+    dict: stage, updated({concrete_pk: [라벨]}), failed([concrete_pk])
+    """
+    summary = {"stage": "lod", "updated": {}, "failed": []}
+    if not os.path.isdir(frd_root):
+        return summary
+    if concrete_pks is None:
+        concrete_pks = sorted(d for d in os.listdir(frd_root) if os.path.isdir(os.path.join(frd_root, d)))
+    for concrete_pk in concrete_pks:
+        try:
+            built = update_concrete_lods(concrete_pk, frd_root, lod_root)
+            if built:
+                summary["updated"][concrete_pk] = built
+                print(f"✅ {concrete_pk}: {len(built)}개 프레임 LOD 생성")
+        except Exception as e:
+            summary["failed"].append(concrete_pk)
+            logger.error(f"LOD 생성 실패: {concrete_pk} - {e}")
+            print(f"❌ {concrete_pk} LOD 생성 실패: {e}")
+    return summary
+
+
+if __name__ == "__main__":
+    print("🚀 표면 LOD 생성 시작...")
+    result = run_lod_stage()
+    print(f"🎉 완료: 갱신 {len(result['updated'])}개, 실패 {len(result['failed'])}개")
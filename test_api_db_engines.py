@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# test_api_db_engines.py
+# ITS 엔진 레지스트리 재사용 / 풀 설정 / 쿼리 시간 집계 검증 (DB 연결 없이)
+
+from sqlalchemy import create_engine, text
+
+import api_db
+
+TEST_CONFIG = {"host": "localhost", "port": 3306, "db": "its", "user": "u", "pwd": "p"}
+
+
+def test_engine_is_created_once_per_its():
+    """같은 ITS 번호는 같은 엔진(풀)을 재사용하고, 설정을 바꾸면 새로 생성"""
+    saved = dict(api_db._its_configs)
+    api_db._its_configs.update(ITS8=TEST_CONFIG, ITS9=TEST_CONFIG)
+    try:
+        eng = api_db._get_its_engine(8)
+        assert api_db._get_its_engine(8) is eng
+        assert api_db._get_its_engine(9) is not eng
+        assert eng.pool.size() == api_db.ITS_POOL_SIZE
+
+        old_size = api_db.ITS_POOL_SIZE
+        api_db.configure_its_pool(pool_size=2)
+        try:
+            new_eng = api_db._get_its_engine(8)
+            assert new_eng is not eng
+            assert new_eng.pool.size() == 2
+            stats = api_db.get_engine_stats()
+            assert stats["ITS8"]["pool_size"] == 2
+            assert stats["ITS8"]["checked_out"] == 0
+        finally:
+            api_db.configure_its_pool(pool_size=old_size)
+    finally:
+        api_db._its_configs.clear()
+        api_db._its_configs.update(saved)
+
+
+def test_query_timing_is_recorded():
+    """이벤트로 연결한 쿼리 시간 통계가 쌓임"""
+    eng = create_engine("sqlite://")
+    api_db._attach_query_timing(eng, "test_sqlite")
+    try:
+        with eng.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        stats = api_db._engine_stats["test_sqlite"]
+        assert stats["queries"] == 3
+        assert stats["total_time"] >= stats["max_time"] > 0
+    finally:
+        api_db._engine_stats.pop("test_sqlite", None)
+        eng.dispose()
+
+
+if __name__ == "__main__":
+    test_engine_is_created_once_per_its()
+    test_query_timing_is_recorded()
+    print("✅ 모든 테스트 통과")
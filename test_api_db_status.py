@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# test_api_db_status.py
+# 센서 수집 상태 일괄 조회 검증 (SQLite 대용 DB)
+
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+import api_db
+import db_migrate
+
+
+def test_sensor_status_batch(tmp_path):
+    """디바이스/채널별 마지막 시각과 fresh/stale/none 상태"""
+    saved_engine = api_db.engine
+    api_db.engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+    try:
+        db_migrate.migrate(api_db.engine)
+        rows = [("D1", 1, "2025-06-12 10:00:00"), ("D1", 1, "2025-06-12 11:00:00"),
+                ("D1", 2, "2025-06-12 05:00:00"), ("D2", 1, "2025-06-12 11:30:00")]
+        with api_db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO sensor_data (device_id, channel, time) VALUES (:d, :c, :t)"),
+                         [{"d": d, "c": c, "t": t} for d, c, t in rows])
+
+        status = api_db.get_sensor_status_batch(
+            [("D1", "1"), ("D1", 2), ("D2", "1"), ("D3", "1")], now=datetime(2025, 6, 12, 12, 0))
+        assert status[("D1", "1")] == {"time": datetime(2025, 6, 12, 11, 0), "state": "fresh"}
+        assert status[("D1", "2")]["state"] == "stale"
+        assert status[("D2", "1")]["state"] == "fresh"
+        assert status[("D3", "1")] == {"time": None, "state": "none"}
+        assert api_db.get_sensor_status_batch([]) == {}
+    finally:
+        api_db.engine.dispose()
+        api_db.engine = saved_engine
+
+
+if __name__ == "__main__":
+    test_sensor_status_batch(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# test_auth_service.py
+# ITS1/ITS2 동시 인증, 사용자 → ITS 캐시, bcrypt 1회 실행 검증 (SQLite 대용 ITS)
+
+import os
+import tempfile
+
+import bcrypt
+from sqlalchemy import create_engine, text
+
+import api_db
+import auth_service
+from metadata_cache import invalidate
+
+
+def _make_its(path, users, auth):
+    eng = create_engine(f"sqlite:///{path}")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE tb_user (userid TEXT, userpw TEXT, grade TEXT)"))
+        conn.execute(text("CREATE TABLE tb_sensor_auth_mapping (userid TEXT, id TEXT)"))
+        for user_id, pw, grade in users:
+            conn.execute(text("INSERT INTO tb_user VALUES (:u, :p, :g)"),
+                         {"u": user_id, "p": bcrypt.hashpw(pw.encode(), bcrypt.gensalt(4)).decode(), "g": grade})
+        for user_id, auth_id in auth:
+            conn.execute(text("INSERT INTO tb_sensor_auth_mapping VALUES (:u, :i)"), {"u": user_id, "i": auth_id})
+    return eng
+
+
+def test_parallel_lookup_and_route_cache(tmp_path):
+    """ITS2 사용자도 bcrypt 1회로 인증되고, 다음 로그인은 해당 ITS 만 조회"""
+    engines = {
+        1: _make_its(os.path.join(tmp_path, "its1.db"), [("admin", "pw1", "AD")], []),
+        2: _make_its(os.path.join(tmp_path, "its2.db"), [("user2", "pw2", "CM")], [("user2", "P_000002")]),
+    }
+    saved_get, saved_checkpw = api_db._get_its_engine, auth_service.bcrypt.checkpw
+    lookups, bcrypt_calls = [], []
+
+    def _engine(its_num):
+        lookups.append(its_num)
+        return engines[its_num]
+
+    def _checkpw(password, hashed):
+        bcrypt_calls.append(hashed)
+        return saved_checkpw(password, hashed)
+
+    api_db._get_its_engine = _engine
+    auth_service.bcrypt.checkpw = _checkpw
+    auth_service.clear_routes()
+    invalidate()
+    try:
+        auth = auth_service.authenticate("user2", "pw2")
+        assert (auth["result"], auth["grade"], auth["auth"], auth["its"]) == ("Success", "CM", ["P_000002"], 2)
+        assert len(bcrypt_calls) == 1
+        assert sorted(set(lookups)) == [1, 2]
+        assert auth_service.get_route("user2") == 2
+
+        lookups.clear()
+        assert auth_service.authenticate("user2", "pw2")["result"] == "Success"
+        assert set(lookups) == {2}
+
+        assert auth_service.authenticate("user2", "wrong")["msg"] == "비밀번호 불일치"
+        assert auth_service.get_route("user2") == 2
+
+        # 두 ITS 에 같은 아이디가 있고 비밀번호가 다르면, 캐시된 ITS 에서 불일치 시 다른 ITS 로 인증
+        with engines[1].begin() as conn:
+            conn.execute(text("INSERT INTO tb_user VALUES ('user2', :p, 'CM')"),
+                         {"p": bcrypt.hashpw(b"pw1", bcrypt.gensalt(4)).decode()})
+        lookups.clear()
+        other = auth_service.authenticate("user2", "pw1")
+        assert (other["result"], other["its"]) == ("Success", 1)
+        assert sorted(set(lookups)) == [1, 2]
+        assert auth_service.get_route("user2") == 1
+        assert auth_service.authenticate("user2", "pw2")["its"] == 2
+        with engines[1].begin() as conn:
+            conn.execute(text("DELETE FROM tb_user WHERE userid = 'user2'"))
+        assert auth_service.authenticate("nobody", "x")["msg"] == "존재하지 않는 아이디"
+        admin = auth_service.authenticate("admin", "pw1", its_nums=(1,))
+        assert (admin["grade"], admin["auth"], admin["its"]) == ("AD", [], 1)
+        assert auth_service.authenticate("admin", "pw1", its_nums=(2,))["result"] == "Fail"
+
+        # 캐시된 ITS 에서 사용자가 사라지면 다른 ITS 를 다시 조회
+        with engines[2].begin() as conn:
+            conn.execute(text("DELETE FROM tb_user WHERE userid = 'user2'"))
+        assert auth_service.authenticate("user2", "pw2")["msg"] == "존재하지 않는 아이디"
+        assert auth_service.get_route("user2") is None
+    finally:
+        api_db._get_its_engine = saved_get
+        auth_service.bcrypt.checkpw = saved_checkpw
+        auth_service.clear_routes()
+        invalidate()
+        for eng in engines.values():
+            eng.dispose()
+
+
+def test_unreachable_its_is_reported():
+    """모든 ITS 조회가 실패하면 DB 연결 실패 메시지"""
+    saved_get = api_db._get_its_engine
+
+    def _down(its_num):
+        raise ValueError(f"ITS{its_num} 연결 불가")
+
+    api_db._get_its_engine = _down
+    auth_service.clear_routes()
+    try:
+        auth = auth_service.authenticate("user2", "pw2")
+        assert auth["result"] == "Fail"
+        assert auth["msg"].startswith("DB 연결 실패")
+    finally:
+        api_db._get_its_engine = saved_get
+
+
+if __name__ == "__main__":
+    test_parallel_lookup_and_route_cache(tempfile.mkdtemp())
+    test_unreachable_its_is_reported()
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# test_auto_sensor.py
+# 센서 데이터 수집: 일괄 저장의 신규/갱신 개수 계산, 동시 조회 작업, 워터마크 조회 검증
+# (ITS 대신 가짜 세션, MySQL 대신 가짜 커서/SQLite 사용)
+
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing, contextmanager
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import auto_sensor
+import db_migrate
+
+
+class _FakeCursor:
+    """executemany 호출을 기록하고, 배치마다 정해진 갱신 행 수에 맞는 affected rows 를 돌려줌"""
+
+    def __init__(self, updated_per_batch):
+        self.updated_per_batch = list(updated_per_batch)
+        self.batches = []
+
+    def executemany(self, sql, rows):
+        self.batches.append((sql, rows))
+        updated = self.updated_per_batch.pop(0)
+        # MySQL: 신규 1, 값이 바뀐 기존 행 2
+        return (len(rows) - updated) + 2 * updated
+
+
+def _agg(hours):
+    times = pd.date_range("2025-06-01 00:00", periods=hours, freq="h")
+    return pd.DataFrame({"time": times, "humidity": 60.0, "sv": 1.0,
+                         "temperature": [20.0 + i for i in range(hours)]})
+
+
+def test_upsert_counts_from_affected_rows():
+    """affected rows 로 배치별 신규/갱신 개수를 나누고, batch_size 단위로 executemany"""
+    agg = _agg(5)
+    agg.loc[1, "humidity"] = float("nan")
+    cursor = _FakeCursor([1, 0, 1])
+    inserted, updated = auto_sensor.upsert_sensor_rows(cursor, "D1", "1", agg, batch_size=2)
+    assert (inserted, updated) == (3, 2)
+    assert [len(rows) for _, rows in cursor.batches] == [2, 2, 1]
+    assert all(sql is auto_sensor.UPSERT_SENSOR_DATA_SQL for sql, _ in cursor.batches)
+
+    first = cursor.batches[0][1]
+    assert first[0][:6] == ("D1", "1", "2025-06-01 00:00:00", 60.0, 1.0, 20.0)
+    assert first[1][3] is None          # NaN 평균값은 NULL
+    assert all(len(row) == 8 and row[6] == row[7] for row in first)   # created_at = updated_at = 실행 시각
+
+
+def test_upsert_counts_edge_cases():
+    """모두 갱신 / 드라이버가 affected rows 를 주지 않는 경우"""
+    cursor = _FakeCursor([3])
+    assert auto_sensor.upsert_sensor_rows(cursor, "D1", "1", _agg(3)) == (0, 3)
+
+    class _NoCount(_FakeCursor):
+        def executemany(self, sql, rows):
+            super().executemany(sql, rows)
+            return None
+    assert auto_sensor.upsert_sensor_rows(_NoCount([0]), "D1", "1", _agg(2)) == (2, 0)
+
+
+def test_fetch_jobs_run_concurrently():
+    """작업자마다 풀에서 세션을 빌려 동시에 조회, 오류는 작업 결과로 돌려주고 세션은 반납"""
+    raw = pd.DataFrame({"time": pd.date_range("2025-06-01 00:00", periods=6, freq="20min"),
+                        "humidity": 60.0, "sv": 1.0, "temperature": [20.0, 21.0, 22.0, 99.0, 24.0, 25.0]})
+    state = {"active": 0, "peak": 0, "borrowed": 0}
+    lock = threading.Lock()
+
+    class _Session:
+        def query_channel_data(self, deviceid, channel, start_date=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.2)
+            with lock:
+                state["active"] -= 1
+            if deviceid == "BAD":
+                raise auto_sensor.ITSSessionError("ITS 요청 실패")
+            return raw.assign(device_id=deviceid, channel=channel)
+
+    @contextmanager
+    def _its_session(timeout=None):
+        with lock:
+            state["borrowed"] += 1
+        try:
+            yield _Session()
+        finally:
+            with lock:
+                state["borrowed"] -= 1
+
+    saved = auto_sensor.its_session
+    auto_sensor.its_session = _its_session
+    try:
+        jobs = [("D1", "1", None), ("D2", "1", "2025060100"), ("BAD", "1", None), ("D3", "2", None)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda job: auto_sensor._fetch_job(*job, time.time()), jobs))
+        assert time.perf_counter() - start < 0.6 and state["peak"] == 4
+        assert state["borrowed"] == 0
+
+        agg, error, elapsed, started, queue_wait = results[0]
+        assert error is None and elapsed >= 0.2 and queue_wait >= 0
+        assert agg["time"].tolist() == list(pd.to_datetime(["2025-06-01 00:00", "2025-06-01 01:00"]))
+        assert agg["temperature"].tolist() == [21.0, 24.5]      # 80 이상 값은 제외 후 시간 평균
+        bad_agg, bad_error = results[2][:2]
+        assert bad_agg is None and "ITS 요청 실패" in bad_error
+    finally:
+        auto_sensor.its_session = saved
+
+
+class _SQLiteConn:
+    """pymysql 연결처럼 cursor() 를 with 로 쓸 수 있게 감싼 sqlite3 연결"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def cursor(self):
+        return closing(self.conn.cursor())
+
+
+def test_watermarks_single_grouped_query(tmp_path):
+    """모든 센서의 마지막 시각을 GROUP BY 쿼리 1번으로 읽고, 유니크 키 인덱스만으로 처리"""
+    path = os.path.join(tmp_path, "its_ts.db")
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        db_migrate.migrate(engine)
+        with engine.begin() as conn:
+            for device_id, channel, hour in [("D1", "1", 0), ("D1", "1", 5), ("D1", "2", 3), ("D2", "1", 7)]:
+                conn.execute(text("INSERT INTO sensor_data (device_id, channel, time, temperature) "
+                                  "VALUES (:d, :c, :t, 20.0)"),
+                             {"d": device_id, "c": channel, "t": f"2025-06-01 {hour:02d}:00:00"})
+    finally:
+        engine.dispose()
+
+    conn = _SQLiteConn(path)
+    try:
+        watermarks = auto_sensor.fetch_sensor_watermarks(conn)
+        assert watermarks == {("D1", "1"): datetime(2025, 6, 1, 5), ("D1", "2"): datetime(2025, 6, 1, 3),
+                              ("D2", "1"): datetime(2025, 6, 1, 7)}
+        assert len(conn.statements) == 1 and "GROUP BY" in conn.statements[0]
+        plan = " ".join(row[-1] for row in conn.conn.execute("EXPLAIN QUERY PLAN " + conn.statements[0]))
+        assert "COVERING INDEX uq_sensor_data_device_channel_time" in plan
+    finally:
+        conn.conn.close()
+
+    assert auto_sensor.watermark_to_start(datetime(2025, 6, 1, 5)) == "2025060104"
+    assert auto_sensor.watermark_to_start(None) is None
+
+
+if __name__ == "__main__":
+    test_upsert_counts_from_affected_rows()
+    test_upsert_counts_edge_cases()
+    test_fetch_jobs_run_concurrently()
+    test_watermarks_single_grouped_query(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# test_ccx_benchmark.py
+# ccx 벤치마크 하네스 테스트 (실제 ccx 대신 fem_solver 를 스텁으로 사용)
+
+import os
+import sys
+import tempfile
+
+import ccx_benchmark
+import solver_config
+
+STUB_CCX = [sys.executable, os.path.abspath("fem_solver.py")]
+
+CONCRETE = {
+    "concrete_pk": "C_TEST",
+    "dims": '{"nodes": [[0, 0], [1, 0], [1, 0.8], [0, 0.8]], "h": 0.4}',
+    "con_t": "2025-06-01 00:00:00",
+    "con_v": 0.2,
+    "con_a": 1.0e-5,
+}
+
+
+def test_run_benchmark_with_stub_ccx(tmp_path):
+    configs = [
+        {"solver": None, "threads": 1, "node_print": True},
+        {"solver": "PARDISO", "threads": 2, "node_print": True},
+        {"solver": "SPOOLES", "threads": 1, "node_print": False},
+    ]
+    df = ccx_benchmark.run_benchmark(CONCRETE, [0.2, 0.1], configs,
+                                     ccx_cmd=STUB_CCX, work_dir=str(tmp_path))
+
+    assert len(df) == 6
+    assert (df["returncode"] == 0).all()
+    assert (df["wall_time"] > 0).all()
+    assert (df["peak_rss_mb"] > 0).all()
+    # 스텁은 솔버 옵션과 무관하게 같은 결과 → 차이 0
+    assert (df["stress_delta"] < 1e-6).all()
+    assert df.groupby("element_size")["n_nodes"].nunique().eq(1).all()
+    assert df[df["element_size"] == 0.1]["n_nodes"].iloc[0] > df[df["element_size"] == 0.2]["n_nodes"].iloc[0]
+
+
+def test_generated_deck_uses_config(tmp_path):
+    inp_path = os.path.join(tmp_path, "deck.inp")
+    config = {"solver": "ITERATIVE CHOLESKY", "threads": 4, "node_print": False}
+    ccx_benchmark.generate_deck(CONCRETE, 0.2, config, inp_path)
+    text = open(inp_path).read()
+    assert "*STATIC, SOLVER=ITERATIVE CHOLESKY" in text
+    assert "*NODE PRINT" not in text
+    assert solver_config.read_config_comment(inp_path) == {"size_class": "small", "threads": "4"}
+
+
+def test_size_class_config_roundtrip(tmp_path):
+    config_path = os.path.join(tmp_path, "solver_config.json")
+    solver_config.set_solver_config("large", config_path=config_path, solver="PARDISO", threads=8)
+    assert solver_config.get_solver_config(10, config_path)["solver"] is None
+    large = solver_config.get_solver_config(10 ** 6, config_path)
+    assert large["solver"] == "PARDISO" and large["threads"] == 8
+    assert large["size_class"] == "large"
+
+
+if __name__ == "__main__":
+    test_run_benchmark_with_stub_ccx(tempfile.mkdtemp())
+    test_generated_deck_uses_config(tempfile.mkdtemp())
+    test_size_class_config_roundtrip(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# test_convert_pool.py
+# 병렬 변환 풀 manifest 건너뛰기 / 파일별 span 기록 검증
+
+import os
+import shutil
+import tempfile
+import importlib.util
+
+import convert_pool
+import stage_metrics
+
+FRD_PATH = "2025061215.frd"
+
+
+def _make_tree(tmp_path):
+    frd_dir = os.path.join(tmp_path, "frd", "C000001")
+    os.makedirs(frd_dir, exist_ok=True)
+    for name in ("2025061215.frd", "2025061216.frd"):
+        shutil.copy(FRD_PATH, os.path.join(frd_dir, name))
+    return os.path.join(tmp_path, "frd"), os.path.join(tmp_path, "vtk"), os.path.join(tmp_path, "vtp")
+
+
+def _metrics_to(tmp_path):
+    """span/누적값 기록 위치를 테스트 폴더로 바꿈 (실제 log/, data/metrics 에 쓰지 않도록). Returns: 원래 값"""
+    saved = (stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR)
+    stage_metrics.SPANS_PATH = os.path.join(tmp_path, "spans.jsonl")
+    stage_metrics.METRICS_DIR = os.path.join(tmp_path, "metrics")
+    return saved
+
+
+def test_manifest_skips_unchanged(tmp_path):
+    """두 번째 실행은 변환 없이 건너뛰고, 내용이 바뀐 파일만 다시 변환"""
+    frd_root, vtk_root, _ = _make_tree(tmp_path)
+    saved = _metrics_to(tmp_path)
+    try:
+        first = convert_pool.run_frd_stage(frd_root, vtk_root, workers=2)
+        assert first["converted"] == 2 and first["failed"] == 0
+        assert os.path.exists(os.path.join(vtk_root, "C000001", "2025061215.vtu"))
+        # 변환한 파일마다 span (읽은/쓴 바이트, 작업자 풀 대기 시간)
+        spans = stage_metrics.read_spans()
+        assert sorted(spans["item"]) == [os.path.join("C000001", "2025061215.frd"),
+                                         os.path.join("C000001", "2025061216.frd")]
+        assert set(spans["stage"]) == {"auto_frd_to_vtk"} and set(spans["outcome"]) == {"ok"}
+        assert (spans["bytes_read"] == os.path.getsize(FRD_PATH)).all() and (spans["bytes_written"] > 0).all()
+        assert (spans["queue_wait"] >= 0).all()
+
+        second = convert_pool.run_frd_stage(frd_root, vtk_root, workers=2)
+        assert second["converted"] == 0 and second["skipped"] == 2
+
+        # 수정시각만 바뀐 경우 → 해시가 같으므로 건너뜀
+        src = os.path.join(frd_root, "C000001", "2025061216.frd")
+        os.utime(src, None)
+        third = convert_pool.run_frd_stage(frd_root, vtk_root, workers=1)
+        assert third["converted"] == 0 and third["skipped"] == 2
+
+        # 내용이 바뀐 경우 → 해당 파일만 다시 변환
+        with open(src, "a") as f:
+            f.write("\n")
+        fourth = convert_pool.run_frd_stage(frd_root, vtk_root, workers=1)
+        assert fourth["converted"] == 1 and fourth["skipped"] == 1
+        assert fourth["outputs"] == [os.path.join(vtk_root, "C000001", "2025061216.vtu")]
+        assert len(stage_metrics.read_spans()) == 3   # 건너뛴 파일은 기록하지 않음
+    finally:
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+def test_concrete_subset_keeps_other_manifest_entries(tmp_path):
+    """콘크리트를 지정하면 그 폴더만 변환하고, 다른 콘크리트의 manifest 항목은 유지"""
+    frd_root, vtk_root, _ = _make_tree(tmp_path)
+    other = os.path.join(frd_root, "C000002")
+    os.makedirs(other, exist_ok=True)
+    shutil.copy(FRD_PATH, os.path.join(other, "2025061215.frd"))
+    saved = _metrics_to(tmp_path)
+    try:
+        first = convert_pool.run_frd_stage(frd_root, vtk_root, workers=1, concrete_pks=["C000002"])
+        assert first["converted"] == 1
+        assert first["outputs"] == [os.path.join(vtk_root, "C000002", "2025061215.vtu")]
+        convert_pool.run_frd_stage(frd_root, vtk_root, workers=1, concrete_pks=["C000001"])
+        assert len(convert_pool.load_manifest(vtk_root)) == 3
+        assert convert_pool.run_frd_stage(frd_root, vtk_root, workers=1)["skipped"] == 3
+    finally:
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+def test_vtp_stage_binary(tmp_path):
+    """VTU → VTP 단계 (vtk 패키지가 있을 때만)"""
+    if importlib.util.find_spec("vtk") is None:
+        return
+    frd_root, vtk_root, vtp_root = _make_tree(tmp_path)
+    saved = _metrics_to(tmp_path)
+    try:
+        convert_pool.run_frd_stage(frd_root, vtk_root, workers=1)
+        summary = convert_pool.run_vtp_stage(vtk_root, vtp_root, workers=2)
+        assert summary["converted"] == 2 and summary["failed"] == 0
+        vtp_path = os.path.join(vtp_root, "C000001", "2025061215.vtp")
+        with open(vtp_path, "rb") as f:
+            content = f.read()
+        assert b"vtkZLibDataCompressor" in content and b'encoding="raw"' in content
+        assert convert_pool.run_vtp_stage(vtk_root, vtp_root)["skipped"] == 2
+    finally:
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+if __name__ == "__main__":
+    test_manifest_skips_unchanged(tempfile.mkdtemp())
+    test_concrete_subset_keeps_other_manifest_entries(tempfile.mkdtemp())
+    test_vtp_stage_binary(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
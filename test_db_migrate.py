@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# test_db_migrate.py
+# SQLite 대용 DB 로 마이그레이션 적용/재실행과 EXPLAIN 점검 검증
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine, inspect, text
+
+import db_migrate
+
+
+def _engine(tmp_path):
+    return create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+
+
+def test_migrate_creates_indexes_once(tmp_path):
+    """모든 마이그레이션 적용 후 다시 실행하면 아무것도 하지 않음"""
+    engine = _engine(tmp_path)
+    try:
+        assert db_migrate.migrate(engine) == [v for v, _, _ in db_migrate.MIGRATIONS]
+        assert db_migrate.migrate(engine) == []
+        assert db_migrate.pending_migrations(engine) == []
+
+        inspector = inspect(engine)
+        for table, name, columns, unique in db_migrate.INDEXES:
+            indexes = {idx["name"]: idx for idx in inspector.get_indexes(table)}
+            assert tuple(indexes[name]["column_names"]) == columns
+            assert bool(indexes[name]["unique"]) == unique
+    finally:
+        engine.dispose()
+
+
+def test_explain_detects_full_scans(tmp_path):
+    """인덱스 적용 전에는 전체 스캔으로, 적용 후에는 모두 인덱스 사용으로 판정"""
+    engine = _engine(tmp_path)
+    try:
+        db_migrate.migrate(engine, target=1)
+        before = db_migrate.check_schema(engine)
+        assert before["pending"] == [2, 3]
+        assert not any(c["ok"] for c in before["checks"])
+
+        db_migrate.migrate(engine)
+        after = db_migrate.check_schema(engine)
+        assert after["pending"] == []
+        assert all(c["ok"] for c in after["checks"]), after["checks"]
+    finally:
+        engine.dispose()
+
+
+def test_existing_equivalent_index_is_reused(tmp_path):
+    """같은 컬럼 구성의 인덱스가 다른 이름으로 이미 있으면 새로 만들지 않음"""
+    engine = _engine(tmp_path)
+    try:
+        db_migrate.migrate(engine, target=1)
+        with engine.begin() as conn:
+            db_migrate.create_index(conn, "sensor_data", "legacy_uq", ("device_id", "channel", "time"), True)
+        db_migrate.migrate(engine)
+        names = [idx["name"] for idx in inspect(engine).get_indexes("sensor_data")]
+        assert names == ["legacy_uq"]
+    finally:
+        engine.dispose()
+
+
+def test_non_unique_index_replaced_by_unique(tmp_path):
+    """같은 컬럼의 일반 인덱스만 있으면 유니크 인덱스로 교체 (일반 인덱스 요청이면 그대로 재사용)"""
+    engine = _engine(tmp_path)
+    try:
+        db_migrate.migrate(engine, target=1)
+        columns = ("device_id", "channel", "time")
+        with engine.begin() as conn:
+            assert db_migrate.create_index(conn, "sensor_data", "legacy_idx", columns)
+            assert not db_migrate.create_index(conn, "sensor_data", "other_idx", columns)
+        db_migrate.migrate(engine)
+        indexes = {idx["name"]: idx for idx in inspect(engine).get_indexes("sensor_data")}
+        assert "legacy_idx" not in indexes
+        assert [bool(idx["unique"]) for idx in indexes.values()] == [True]
+
+        # 같은 이름의 일반 인덱스도 교체
+        with engine.begin() as conn:
+            db_migrate.create_index(conn, "concrete", "idx_same", ("name",))
+            assert db_migrate.create_index(conn, "concrete", "idx_same", ("name",), True)
+        indexes = {idx["name"]: idx for idx in inspect(engine).get_indexes("concrete")}
+        assert indexes["idx_same"]["unique"]
+    finally:
+        engine.dispose()
+
+
+def test_duplicates_removed_before_unique_index(tmp_path):
+    """기존 sensor_data 에 중복 (device_id, channel, time) 행이 있어도 upgrade 가 끝까지 적용됨 (최근 updated_at 유지)"""
+    engine = _engine(tmp_path)
+    try:
+        db_migrate.migrate(engine, target=1)
+        rows = [("D1", 1, "2025-06-01 00:00:00", 20.0, "2025-06-01 01:00:00"),
+                ("D1", 1, "2025-06-01 00:00:00", 21.5, "2025-06-01 03:00:00"),
+                ("D1", 1, "2025-06-01 00:00:00", 19.0, None),
+                ("D1", 1, "2025-06-01 01:00:00", 22.0, "2025-06-01 02:00:00"),
+                ("D2", 1, "2025-06-01 00:00:00", 18.0, "2025-06-01 01:00:00")]
+        with engine.begin() as conn:
+            for device_id, channel, time, temperature, updated_at in rows:
+                conn.execute(text("INSERT INTO sensor_data (device_id, channel, time, temperature, updated_at) "
+                                  "VALUES (:d, :c, :t, :temp, :u)"),
+                             {"d": device_id, "c": channel, "t": time, "temp": temperature, "u": updated_at})
+
+        assert db_migrate.migrate(engine) == [2, 3]
+        with engine.connect() as conn:
+            kept = conn.execute(text("SELECT device_id, time, temperature FROM sensor_data "
+                                     "ORDER BY device_id, time")).fetchall()
+        assert [tuple(r) for r in kept] == [("D1", "2025-06-01 00:00:00", 21.5),
+                                            ("D1", "2025-06-01 01:00:00", 22.0),
+                                            ("D2", "2025-06-01 00:00:00", 18.0)]
+        indexes = {idx["name"]: idx for idx in inspect(engine).get_indexes("sensor_data")}
+        assert indexes["uq_sensor_data_device_channel_time"]["unique"]
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_migrate_creates_indexes_once(tempfile.mkdtemp())
+    test_explain_detects_full_scans(tempfile.mkdtemp())
+    test_existing_equivalent_index_is_reused(tempfile.mkdtemp())
+    test_non_unique_index_replaced_by_unique(tempfile.mkdtemp())
+    test_duplicates_removed_before_unique_index(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# test_downsample.py
+# LTTB / 최소·최대 범위 다운샘플링: 점 수 제한, 끝점·피크 유지, 결측 처리 검증
+
+import numpy as np
+import pandas as pd
+
+import downsample
+
+
+def test_lttb_bounds_points_and_keeps_peaks():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500.0)
+    y[4321] = 25.0                       # 한 점짜리 스파이크
+    idx = downsample.lttb(x, y, 500)
+    assert len(idx) == 500
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+    # 점 수가 목표 이하이면 그대로
+    assert downsample.lttb(x[:100], y[:100], 500).tolist() == list(range(100))
+
+
+def test_envelope_and_frame_with_datetimes():
+    times = pd.date_range("2025-06-01", periods=2_000, freq="min")
+    temps = np.full(len(times), 20.0)
+    temps[1500] = 35.0
+    temps[10] = np.nan
+    df = pd.DataFrame({"time": times, "temperature": temps, "humidity": 60.0})
+
+    series = downsample.downsample_frame(df, "time", ["temperature", "humidity", "sv"], 200)
+    assert set(series) == {"temperature", "humidity"}
+    x, y = series["temperature"]
+    assert len(y) == 200 and not np.isnan(y).any()
+    assert x.dtype.kind == "M" and y.max() == 35.0
+
+    env_x, low, high = downsample.minmax_envelope(times.to_numpy(), temps, 100)
+    assert len(env_x) == len(low) == len(high) == 100
+    assert high.max() == 35.0 and low.min() == 20.0
+    assert downsample.points_for_width(0) == downsample.MIN_POINTS
+
+
+if __name__ == "__main__":
+    test_lttb_bounds_points_and_keeps_peaks()
+    test_envelope_and_frame_with_datetimes()
+    print("✅ 모든 테스트 통과")
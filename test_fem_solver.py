@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# test_fem_solver.py
+# In-process 열응력 해석 백엔드 검증 (ccx 결과와 비교)
+
+import os
+import tempfile
+import numpy as np
+
+import fem_solver
+import frd_io
+
+INP_PATH = "concrete_model_ordered_elements.inp"
+FRD_PATH = "2025061215.frd"
+
+
+def solve_reference_model():
+    inp = fem_solver.read_inp_model(INP_PATH)
+    # 저장된 INP 에는 요소가 없으므로 ccx 결과(FRD)의 요소 연결 정보를 사용
+    elements = frd_io.read_frd_elements(FRD_PATH)
+    model = fem_solver.ThermoElasticModel(inp['nodes'], elements, inp['fixed_nodes'])
+    result = model.solve(inp['node_temperatures'], inp['elastic_modulus'], inp['poisson_ratio'],
+                         inp['thermal_expansion'], inp['reference_temp'])
+    return model, result
+
+
+def test_matches_ccx_reference():
+    """ccx 결과(2025061215.frd)와 변위/응력 비교"""
+    _, result = solve_reference_model()
+    disp = frd_io.read_frd_block(FRD_PATH, 'DISP')
+    stress = frd_io.read_frd_block(FRD_PATH, 'STRESS')
+    ids = result['node_ids']
+    disp_ccx = np.array([disp[i] for i in ids])
+    stress_ccx = np.array([stress[i] for i in ids])
+
+    disp_err = np.abs(result['displacements'] - disp_ccx).max() / np.abs(disp_ccx).max()
+    stress_err = np.abs(result['stresses'] - stress_ccx).max() / np.abs(stress_ccx).max()
+    assert disp_err < 0.02, f"변위 상대오차 {disp_err:.2e}"
+    assert stress_err < 0.03, f"응력 상대오차 {stress_err:.2e}"
+
+
+def test_solver_methods_agree():
+    """direct / spsolve / cg 결과 일치"""
+    inp = fem_solver.read_inp_model(INP_PATH)
+    elements = frd_io.read_frd_elements(FRD_PATH)
+    model = fem_solver.ThermoElasticModel(inp['nodes'], elements, inp['fixed_nodes'])
+    args = (inp['node_temperatures'], inp['elastic_modulus'], inp['poisson_ratio'], inp['thermal_expansion'])
+    direct = model.solve(*args, method='direct')
+    for method in ('spsolve', 'cg'):
+        other = model.solve(*args, method=method)
+        assert np.allclose(direct['displacements'], other['displacements'], rtol=1e-6, atol=1e-12)
+
+
+def test_stress_scales_with_elastic_modulus():
+    """순수 열하중: 변위는 E 와 무관, 응력은 E 에 비례 (시간별 재령 변화 시 분해 재사용 근거)"""
+    inp = fem_solver.read_inp_model(INP_PATH)
+    elements = frd_io.read_frd_elements(FRD_PATH)
+    model = fem_solver.ThermoElasticModel(inp['nodes'], elements, inp['fixed_nodes'])
+    temps = inp['node_temperatures']
+    low = model.solve(temps, 1.0e10, 0.2, 1.0e-5)
+    high = model.solve(temps, 3.0e10, 0.2, 1.0e-5)
+    assert np.allclose(low['displacements'], high['displacements'])
+    assert np.allclose(3.0 * low['stresses'], high['stresses'])
+    # 기준 온도와 같은 균일 온도 → 변위/응력 0
+    zero = model.solve({n: inp['reference_temp'] for n in inp['nodes']}, 3.0e10, 0.2, 1.0e-5)
+    assert np.allclose(zero['stresses'], 0.0)
+
+
+def test_model_cache_checks_connectivity_and_fixed_nodes():
+    """같은 cache_key 라도 요소 연결이나 고정 노드가 바뀌면 모델을 다시 만듦"""
+    inp = fem_solver.read_inp_model(INP_PATH)
+    elements = frd_io.read_frd_elements(FRD_PATH)
+    fem_solver.clear_model_cache()
+    try:
+        model = fem_solver.get_model("C_TEST", inp['nodes'], elements, inp['fixed_nodes'])
+        assert fem_solver.get_model("C_TEST", inp['nodes'], elements, inp['fixed_nodes']) is model
+
+        fixed = sorted(inp['fixed_nodes'])[:-1]
+        other = fem_solver.get_model("C_TEST", inp['nodes'], elements, fixed)
+        assert other is not model and len(other.free_dof) == len(model.free_dof) + 3
+
+        # 요소 하나의 절점 순서를 돌려도 (개수/좌표 동일) 연결 정보가 다르므로 재생성
+        eid = sorted(elements)[0]
+        nodes8 = list(elements[eid])
+        rotated = dict(elements)
+        rotated[eid] = nodes8[1:4] + nodes8[:1] + nodes8[5:8] + nodes8[4:5]
+        assert fem_solver.get_model("C_TEST", inp['nodes'], rotated, fixed) is not other
+    finally:
+        fem_solver.clear_model_cache()
+
+
+def test_write_frd_roundtrip(tmp_path):
+    """write_frd 로 저장한 결과를 다시 읽었을 때 동일"""
+    model, result = solve_reference_model()
+    frd_path = os.path.join(tmp_path, "2025061215.frd")
+    fem_solver.write_frd(frd_path, model, result)
+    stress = frd_io.read_frd_block(frd_path, 'STRESS')
+    assert len(stress) == model.n_nodes
+    assert frd_io.read_frd_elements(frd_path) == frd_io.read_frd_elements(FRD_PATH)
+
+
+if __name__ == "__main__":
+    test_matches_ccx_reference()
+    test_solver_methods_agree()
+    test_stress_scales_with_elastic_modulus()
+    test_model_cache_checks_connectivity_and_fixed_nodes()
+    test_write_frd_roundtrip(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
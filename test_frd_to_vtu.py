@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# test_frd_to_vtu.py
+# FRD → VTU 직접 변환 검증 (frd_io 파싱 결과와 비교)
+
+import os
+import tempfile
+import numpy as np
+
+import frd_io
+import vtk_xml
+from auto_frd_to_vtk import convert_frd_to_vtu_direct, validate_vtu_header
+
+FRD_PATH = "2025061215.frd"
+
+
+def test_direct_vtu_matches_frd(tmp_path):
+    """변환된 VTU 의 좌표/셀/응력이 FRD 와 동일하고 크기가 더 작음"""
+    vtu_path = os.path.join(tmp_path, "2025061215.vtu")
+    assert convert_frd_to_vtu_direct(FRD_PATH, vtu_path)[0]
+    assert validate_vtu_header(vtu_path)[0]
+    frd = frd_io.read_frd_arrays(FRD_PATH)
+    vtu = vtk_xml.read_vtu(vtu_path)
+
+    assert np.allclose(vtu["points"], frd["coords"], atol=1e-6)
+    assert len(vtu["types"]) == len(frd["element_ids"])
+    assert np.array_equal(vtu["connectivity"], np.concatenate(frd["connectivity"]))
+    assert np.allclose(vtu["point_data"]["S"], frd["results"]["STRESS"], rtol=1e-6, atol=1e-6)
+    assert np.allclose(vtu["point_data"]["S_Mises"],
+                       frd_io.von_mises(frd["results"]["STRESS"]), rtol=1e-5, atol=1e-6)
+    assert os.path.getsize(vtu_path) < os.path.getsize(FRD_PATH)
+
+
+def test_uncompressed_roundtrip(tmp_path):
+    """비압축 appended 형식도 동일하게 읽힘"""
+    vtu_path = os.path.join(tmp_path, "raw.vtu")
+    assert convert_frd_to_vtu_direct(FRD_PATH, vtu_path, compress=False)[0]
+    vtu = vtk_xml.read_vtu(vtu_path)
+    frd = frd_io.read_frd_arrays(FRD_PATH)
+    assert np.allclose(vtu["point_data"]["U"], frd["results"]["DISP"], rtol=1e-6, atol=1e-9)
+
+
+if __name__ == "__main__":
+    test_direct_vtu_matches_frd(tempfile.mkdtemp())
+    test_uncompressed_roundtrip(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# test_frd_upload.py
+# FRD 분할 업로드: 로그인/권한 확인, 조각 이어 쓰기/재전송, 잘못된 위치 거부, commit 원자적 이동 검증
+
+import os
+import json
+import tempfile
+
+import pandas as pd
+
+from flask import Flask, request
+
+import frd_upload
+
+
+def _app():
+    app = Flask(__name__)
+
+    @app.route("/upload/frd", methods=["POST"])
+    def start():
+        return frd_upload.handle_start(request.get_json(silent=True) or request.form,
+                                       request.cookies.get("login_user"))
+
+    @app.route("/upload/frd/<upload_id>", methods=["GET", "PUT"])
+    def chunk(upload_id):
+        user_id = request.cookies.get("login_user")
+        if request.method == "GET":
+            return frd_upload.handle_status(upload_id, user_id)
+        return frd_upload.handle_chunk(upload_id, request, user_id)
+
+    @app.route("/upload/frd/<upload_id>/commit", methods=["POST"])
+    def commit(upload_id):
+        return frd_upload.handle_commit(upload_id, request.cookies.get("login_user"))
+
+    return app
+
+
+# 테스트용 권한: user1, user2 는 C001 에 접근 가능, user3 은 불가
+ACCESS = {("C001", "user1"), ("C001", "user2")}
+
+
+def _swap(tmp_path):
+    saved = (frd_upload.UPLOAD_DIR, frd_upload.FRD_ROOT, frd_upload.CHUNK_SIZE, frd_upload.has_concrete_access)
+    frd_upload.UPLOAD_DIR = os.path.join(str(tmp_path), "uploads")
+    frd_upload.FRD_ROOT = os.path.join(str(tmp_path), "frd")
+    frd_upload.CHUNK_SIZE = 1000
+    frd_upload.has_concrete_access = lambda concrete_pk, user_id: (concrete_pk, user_id) in ACCESS
+    return saved
+
+
+def _restore(saved):
+    (frd_upload.UPLOAD_DIR, frd_upload.FRD_ROOT, frd_upload.CHUNK_SIZE, frd_upload.has_concrete_access) = saved
+
+
+def test_chunked_upload_resume_and_commit(tmp_path):
+    saved = _swap(tmp_path)
+    data = os.urandom(2500)
+    try:
+        # 로그인하지 않은 요청, 권한 없는 콘크리트는 거부
+        anon = _app().test_client()
+        assert anon.post("/upload/frd", json={"concrete_pk": "C001", "filename": "2025060100.frd",
+                                              "size": 10}).status_code == 401
+        outsider = _app().test_client()
+        outsider.set_cookie("login_user", "user3")
+        assert outsider.post("/upload/frd", json={"concrete_pk": "C001", "filename": "2025060100.frd",
+                                                  "size": 10}).status_code == 403
+
+        client = _app().test_client()
+        client.set_cookie("login_user", "user1")
+        assert client.post("/upload/frd", json={"concrete_pk": "C001", "filename": "a.inp", "size": 10}).status_code == 400
+        resp = client.post("/upload/frd", json={"concrete_pk": "C001", "filename": "2025060100.frd", "size": len(data)})
+        assert resp.status_code == 201
+        upload_id = resp.get_json()["upload_id"]
+        assert resp.get_json()["chunk_size"] == 1000
+
+        assert client.put(f"/upload/frd/{upload_id}?index=0", data=data[:1000]).get_json()["received"] == 1000
+        # 빈 구간이 생기는 조각은 거부, 받은 위치를 알려줌
+        resp = client.put(f"/upload/frd/{upload_id}?offset=2000", data=data[2000:])
+        assert resp.status_code == 409 and resp.get_json()["received"] == 1000
+        # 중간에 끊긴 조각(일부만 도착) → 같은 offset 으로 재전송하면 덮어씀
+        client.put(f"/upload/frd/{upload_id}?offset=1000", data=data[1000:1300])
+        assert client.post(f"/upload/frd/{upload_id}/commit").status_code == 409
+        client.put(f"/upload/frd/{upload_id}?offset=1000", data=data[1000:2000])
+        assert client.get(f"/upload/frd/{upload_id}").get_json()["received"] == 2000
+        assert client.put(f"/upload/frd/{upload_id}?offset=2000", data=data[2000:] + b"x").status_code == 413
+        client.put(f"/upload/frd/{upload_id}?index=2", data=data[2000:])
+
+        other = _app().test_client()
+        other.set_cookie("login_user", "user2")
+        assert other.get(f"/upload/frd/{upload_id}").status_code == 403
+        assert anon.put(f"/upload/frd/{upload_id}?offset=2500", data=b"x").status_code == 401
+
+        resp = client.post(f"/upload/frd/{upload_id}/commit")
+        assert resp.status_code == 200 and resp.get_json()["queued"] is True
+        target = os.path.join(frd_upload.FRD_ROOT, "C001", "2025060100.frd")
+        with open(target, "rb") as f:
+            assert f.read() == data
+        assert os.listdir(frd_upload.UPLOAD_DIR) == []
+
+        # 같은 이름은 다시 올릴 수 없음, 끝난 업로드 ID 는 404
+        assert client.post("/upload/frd", json={"concrete_pk": "C001", "filename": "2025060100.frd",
+                                                "size": 1}).status_code == 409
+        assert client.get(f"/upload/frd/{upload_id}").status_code == 404
+    finally:
+        _restore(saved)
+
+
+def test_ownerless_upload_rejected(tmp_path):
+    saved = _swap(tmp_path)
+    try:
+        status = frd_upload.start_upload("C001", "2025060100.frd", 10, "user1")
+        meta_path, _ = frd_upload._paths(status["upload_id"], None)
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["user"] = None
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        for user_id in ("user1", "user2"):
+            try:
+                frd_upload.upload_status(status["upload_id"], user_id)
+                assert False
+            except frd_upload.UploadError as e:
+                assert e.status == 403
+    finally:
+        _restore(saved)
+
+
+def test_purge_stale(tmp_path):
+    saved = _swap(tmp_path)
+    upload_dir = frd_upload.UPLOAD_DIR
+    try:
+        status = frd_upload.start_upload("C001", "2025060100.frd", 10, "user1", upload_dir)
+        assert frd_upload.purge_stale(upload_dir, max_age=3600) == 0
+        assert frd_upload.purge_stale(upload_dir, max_age=-1) == 1
+        assert os.listdir(upload_dir) == []
+        try:
+            frd_upload.upload_status(status["upload_id"], "user1", upload_dir)
+            assert False
+        except frd_upload.UploadError as e:
+            assert e.status == 404
+    finally:
+        _restore(saved)
+
+
+def test_access_checks_both_its():
+    """ITS1 에서 조회에 성공해도 프로젝트가 ITS2 에만 있으면 ITS2 까지 확인"""
+    projects = {1: ["P_000001"], 2: ["P_000078"]}
+    saved = (frd_upload.api_db.get_concrete_data, frd_upload.api_db.get_accessible_projects)
+    frd_upload.api_db.get_concrete_data = lambda concrete_pk=None: (
+        pd.DataFrame({"project_pk": ["P_000078" if concrete_pk == "C002" else "P_000099"]}))
+    frd_upload.api_db.get_accessible_projects = lambda user_id, its_num=1: {
+        "result": "Success", "projects": pd.DataFrame({"projectid": projects[its_num]})}
+    try:
+        assert frd_upload.has_concrete_access("C002", "user1")
+        assert not frd_upload.has_concrete_access("C003", "user1")
+        # ITS1 조회 실패여도 ITS2 에서 확인
+        frd_upload.api_db.get_accessible_projects = lambda user_id, its_num=1: (
+            {"result": "Fail", "msg": "사용자 없음"} if its_num == 1 else
+            {"result": "Success", "projects": pd.DataFrame({"projectid": projects[2]})})
+        assert frd_upload.has_concrete_access("C002", "user1")
+    finally:
+        frd_upload.api_db.get_concrete_data, frd_upload.api_db.get_accessible_projects = saved
+
+
+if __name__ == "__main__":
+    test_chunked_upload_resume_and_commit(tempfile.mkdtemp())
+    test_ownerless_upload_rejected(tempfile.mkdtemp())
+    test_purge_stale(tempfile.mkdtemp())
+    test_access_checks_both_its()
+    print("✅ 모든 테스트 통과")
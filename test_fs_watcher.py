@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# test_fs_watcher.py
+# 파일 감시: 새 INP/FRD → 콘크리트별 단계 요청, 디바운스/중복 방지, 새 폴더 감시, 파이프라인 submit 검증
+
+import os
+import time
+import tempfile
+import threading
+
+import fs_watcher
+import pipeline
+import stage_metrics
+
+
+def _roots(tmp_dir):
+    return {os.path.join(tmp_dir, "inp"): ((".inp",), ("frd",)),
+            os.path.join(tmp_dir, "frd"): ((".frd",), ("vtk", "series", "lod"))}
+
+
+def _write(path, text="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _wait(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not cond():
+        time.sleep(0.02)
+    return cond()
+
+
+def _run_backend(backend, tmp_dir):
+    roots = _roots(tmp_dir)
+    inp_root, frd_root = list(roots)
+    os.makedirs(os.path.join(inp_root, "C1"))
+    os.makedirs(frd_root)
+    calls, lock = [], threading.Lock()
+
+    def dispatch(stage, items):
+        with lock:
+            calls.append((stage, items))
+
+    watcher = fs_watcher.start_watcher(dispatch, roots, backend=backend, debounce=0.1, poll_interval=0.05)
+    try:
+        assert _wait(lambda: watcher["stats"].get("ready"))
+        assert watcher["stats"]["backend"] == backend
+
+        # 같은 파일을 연달아 써도 디바운스 후 한 번만, 임시 파일/다른 확장자는 무시
+        path = os.path.join(inp_root, "C1", "2025060100.inp")
+        for i in range(3):
+            _write(path, "x" * (i + 1))
+        _write(os.path.join(inp_root, "C1", "2025060100.sta"))
+        _write(os.path.join(inp_root, "C1", "2025060101.inp.tmp"))
+        assert _wait(lambda: ("frd", ["C1"]) in calls)
+        time.sleep(0.3)
+        assert calls == [("frd", ["C1"])]
+
+        # 새 콘크리트 폴더와 그 안의 FRD → vtk/series/lod
+        _write(os.path.join(frd_root, "C2", "2025060100.frd"))
+        assert _wait(lambda: ("lod", ["C2"]) in calls)
+        assert ("vtk", ["C2"]) in calls and ("series", ["C2"]) in calls
+
+        # 내용이 같은 파일은 다시 넘기지 않고, 바뀐 파일만 넘김
+        with lock:
+            calls.clear()
+        open(path, "a").close()   # 쓰기로 열었다 닫기만 함 (inotify 는 이벤트 발생, 크기/수정시각 동일)
+        if backend == "inotify":
+            assert _wait(lambda: watcher["stats"]["skipped"] == 1)
+        _write(os.path.join(inp_root, "C1", "2025060102.inp"))
+        assert _wait(lambda: ("frd", ["C1"]) in calls)
+        time.sleep(0.3)
+        assert calls == [("frd", ["C1"])]
+    finally:
+        watcher["stop"].set()
+        watcher["thread"].join(timeout=5)
+
+
+def test_polling_backend(tmp_path):
+    _run_backend("polling", tmp_path)
+
+
+def test_inotify_backend(tmp_path):
+    try:
+        fs_watcher.open_backend("inotify").close()
+    except OSError:
+        print("inotify 사용 불가 - 건너뜀")
+        return
+    _run_backend("inotify", tmp_path)
+
+
+def test_seen_is_bounded(tmp_path):
+    """멱등성 확인용 기록은 최근 seen_max 개만 유지 (오래된 파일은 잊고 다시 넘김)"""
+    try:
+        fs_watcher.open_backend("inotify").close()
+    except OSError:
+        print("inotify 사용 불가 - 건너뜀")
+        return
+    roots = {os.path.join(str(tmp_path), "inp"): ((".inp",), ("frd",))}
+    folder = os.path.join(str(tmp_path), "inp", "C1")
+    os.makedirs(folder)
+    watcher = fs_watcher.start_watcher(lambda stage, items: None, roots, backend="inotify",
+                                       debounce=0.1, seen_max=1)
+    try:
+        assert _wait(lambda: watcher["stats"].get("ready"))
+        first, second = os.path.join(folder, "a.inp"), os.path.join(folder, "b.inp")
+        _write(first)
+        assert _wait(lambda: watcher["stats"]["dispatched"] == 1)
+        _write(second)
+        assert _wait(lambda: watcher["stats"]["dispatched"] == 2)
+        open(first, "a").close()    # 기록에서 밀려난 파일 → 다시 넘김
+        assert _wait(lambda: watcher["stats"]["dispatched"] == 3)
+        open(first, "a").close()    # 방금 넘긴 파일 → 건너뜀
+        assert _wait(lambda: watcher["stats"]["skipped"] == 1)
+        assert watcher["stats"]["dispatched"] == 3
+    finally:
+        watcher["stop"].set()
+        watcher["thread"].join(timeout=5)
+
+
+def test_classify_and_pipeline_submit(tmp_path):
+    roots = {"inp": ((".inp",), ("frd",))}
+    assert fs_watcher.classify(os.path.join("inp", "C1", "a.inp"), roots) == ("inp", "C1")
+    assert fs_watcher.classify(os.path.join("inp", "a.inp"), roots) is None
+    assert fs_watcher.classify(os.path.join("inp", "C1", "a.frd"), roots) is None
+
+    # submit: 항목은 대기열에 추가, None 은 다음 실행을 전체 처리로
+    calls = []
+    stages = {"frd": {"deps": (), "run": lambda items: calls.append(items) or set()}}
+    # 단계 실행 span 은 테스트 폴더에 기록
+    saved = (stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR)
+    stage_metrics.SPANS_PATH = os.path.join(tmp_path, "spans.jsonl")
+    stage_metrics.METRICS_DIR = os.path.join(tmp_path, "metrics")
+    ctx = pipeline.start_pipeline(stages, cadence={"frd": 3600}, debounce=0.01)
+    try:
+        assert _wait(lambda: ctx["state"]["frd"]["runs"] == 1)
+        pipeline.submit(ctx, "frd", ["C2", "C1"])
+        pipeline.submit(ctx, "unknown", ["C1"])
+        assert _wait(lambda: ctx["state"]["frd"]["runs"] == 2)
+        pipeline.submit(ctx, "frd", None)
+        assert _wait(lambda: ctx["state"]["frd"]["runs"] == 3)
+        assert calls == [None, ["C1", "C2"], None]
+    finally:
+        ctx["stop"].set()
+        ctx["state"]["frd"]["wake"].set()
+        for thread in ctx["threads"]:
+            thread.join(timeout=5)
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+if __name__ == "__main__":
+    test_polling_backend(tempfile.mkdtemp())
+    test_inotify_backend(tempfile.mkdtemp())
+    test_seen_is_bounded(tempfile.mkdtemp())
+    test_classify_and_pipeline_submit(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# test_its_mirror.py
+# ITS 메타데이터 미러 동기화(변경 감지/삭제), 신선도 판단, api_db 조회 전환 검증 (SQLite 대용 ITS)
+
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import its_mirror
+
+SOURCE_TABLES = """
+CREATE TABLE tb_project (projectid TEXT, projectname TEXT, regdate TEXT, closedate TEXT);
+CREATE TABLE tb_group (groupid TEXT, projectid TEXT);
+CREATE TABLE tb_structure (stid TEXT, stname TEXT, staddr TEXT, groupid TEXT);
+CREATE TABLE tb_device (deviceid TEXT, stid TEXT, devicetype TEXT, modelidx INTEGER, manageyn TEXT);
+CREATE TABLE tb_sensor (deviceid TEXT, channel INTEGER, manageyn TEXT);
+CREATE TABLE tb_device_data_type (device_type TEXT, data_type TEXT);
+CREATE TABLE tb_device_catalog (idx INTEGER, modelname TEXT);
+CREATE TABLE tb_sensor_auth_mapping (userid TEXT, id TEXT);
+CREATE TABLE tb_user (userid TEXT, userpw TEXT, grade TEXT, authstartdate TEXT, authenddate TEXT);
+INSERT INTO tb_project VALUES ('P_000001', '교량', '2025-01-01 00:00:00', NULL);
+INSERT INTO tb_project VALUES ('P_000002', '터널', '2025-02-01 00:00:00', NULL);
+INSERT INTO tb_group VALUES ('G1', 'P_000001');
+INSERT INTO tb_structure VALUES ('S_000001', '상판', '서울', 'G1');
+INSERT INTO tb_device VALUES ('D1', 'S_000001', 'TEMP', 7, 'Y');
+INSERT INTO tb_sensor VALUES ('D1', 1, 'Y');
+INSERT INTO tb_sensor VALUES ('D1', 2, 'Y');
+INSERT INTO tb_device_data_type VALUES ('TEMP', 'temperature');
+INSERT INTO tb_device_catalog VALUES (7, 'SSC-320(3.0g)');
+INSERT INTO tb_sensor_auth_mapping VALUES ('user1', 'P_000001');
+INSERT INTO tb_user VALUES ('user1', 'hash', 'CM', '2025-01-01', '2026-01-01');
+"""
+
+
+def _make_source(tmp_path):
+    source = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_source.db')}")
+    with source.begin() as conn:
+        for stmt in SOURCE_TABLES.strip().split(";\n"):
+            conn.execute(text(stmt))
+    return source
+
+
+def test_sync_detects_changes_and_deletes(tmp_path):
+    """두 번째 동기화는 바뀐 행만 반영하고, 원격에서 지운 행은 미러에서도 삭제"""
+    mirror_root = os.path.join(tmp_path, "mirror")
+    source = _make_source(tmp_path)
+    try:
+        first = its_mirror.sync_its(7, source, mirror_root)
+        assert first["tb_sensor"] == {"rows": 2, "changed": 2}
+        assert its_mirror.sync_its(7, source, mirror_root)["tb_project"]["changed"] == 0
+
+        with source.begin() as conn:
+            conn.execute(text("UPDATE tb_project SET projectname = '교량A' WHERE projectid = 'P_000001'"))
+            conn.execute(text("DELETE FROM tb_sensor WHERE channel = 2"))
+        result = its_mirror.sync_its(7, source, mirror_root)
+        assert result["tb_project"]["changed"] == 1
+        assert result["tb_sensor"] == {"rows": 1, "changed": 1}
+
+        mirror = its_mirror.get_mirror_engine(7, mirror_root)
+        with mirror.connect() as conn:
+            names = dict(conn.execute(text("SELECT projectid, projectname FROM tb_project")).fetchall())
+            channels = conn.execute(text("SELECT channel FROM tb_sensor")).fetchall()
+            user_cols = [r[1] for r in conn.execute(text("PRAGMA table_info(tb_user)"))]
+        assert names["P_000001"] == "교량A"
+        assert channels == [(1,)]
+        assert "userpw" not in user_cols
+    finally:
+        source.dispose()
+        for eng in its_mirror._engines.values():
+            eng.dispose()
+        its_mirror._engines.clear()
+
+
+def test_freshness_and_api_db_readers(tmp_path):
+    """미러가 최신이면 api_db ITS 조회가 미러를 쓰고, 오래되면 ITS 서버로 조회"""
+    import api_db
+    from metadata_cache import invalidate
+
+    mirror_root = os.path.join(tmp_path, "mirror")
+    source = _make_source(tmp_path)
+    saved_root, saved_age, saved_get = its_mirror.MIRROR_ROOT, its_mirror.MIRROR_MAX_AGE, api_db._get_its_engine
+    its_mirror.MIRROR_ROOT = mirror_root
+    invalidate()
+    try:
+        assert its_mirror.mirror_engine(7, mirror_root=mirror_root) is None
+        its_mirror.sync_its(7, source, mirror_root)
+        assert its_mirror.mirror_engine(7, mirror_root=mirror_root) is not None
+        assert its_mirror.mirror_engine(7, max_age=-1, mirror_root=mirror_root) is None
+
+        # ITS 서버로 가면 실패하도록 막고 미러에서만 조회되는지 확인
+        def _no_server(its_num):
+            raise AssertionError("ITS 서버 조회가 발생함")
+        api_db._get_its_engine = _no_server
+
+        sensors = api_db.get_sensor_list_for_project("P_000001", its_num=7)
+        assert sensors[["deviceid", "channel", "is3axis"]].values.tolist() == [["D1", "1", "Y"], ["D1", "2", "Y"]]
+        projects = api_db.get_accessible_projects("user1", its_num=7)
+        assert projects["result"] == "Success"
+        assert projects["projects"]["projectid"].tolist() == ["P_000001"]
+        assert isinstance(projects["projects"]["regdate"].iloc[0], pd.Timestamp)
+        structures = api_db.get_project_structure_list(7, None, "AD")
+        assert structures["stid"].tolist() == ["S_000001"]
+        assert api_db.get_user_data(its_num=7)["user_id"].tolist() == ["user1"]
+
+        # 오래된 미러는 쓰지 않고 ITS 서버 엔진으로 대체
+        its_mirror.MIRROR_MAX_AGE = -1
+        api_db._get_its_engine = lambda its_num: source
+        assert api_db._its_read_engine(7) is source
+    finally:
+        its_mirror.MIRROR_ROOT, its_mirror.MIRROR_MAX_AGE = saved_root, saved_age
+        api_db._get_its_engine = saved_get
+        invalidate()
+        source.dispose()
+        for eng in its_mirror._engines.values():
+            eng.dispose()
+        its_mirror._engines.clear()
+
+
+if __name__ == "__main__":
+    test_sync_detects_changes_and_deletes(tempfile.mkdtemp())
+    test_freshness_and_api_db_readers(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
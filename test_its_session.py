@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# test_its_session.py
+# ITS 공유 세션: InfluxDB 조회, 계정 정보 읽기, 응답 제한 시간, 상태 확인 실패 시 재연결, 요청 재시도, 풀 반납 검증
+# (ITS 서버 대신 가짜 클라이언트 사용)
+
+import os
+import json
+import socket
+import tempfile
+import threading
+import time
+
+import its_session
+
+
+class _FakeClient:
+    """_SessionClient 대용: login/message_getdata 응답을 순서대로 돌려주고, 끊으면 잠시 뒤 자동 재연결"""
+
+    def __init__(self, logins=(), answers=()):
+        self.connected = True
+        self.generation = 1
+        self.closed = False
+        self.transport_error = None
+        self.logins = list(logins)
+        self.answers = list(answers)
+        self.calls = []
+
+    def _next(self, script, default):
+        self.transport_error = None
+        item = script.pop(0) if script else default
+        if isinstance(item, Exception):
+            self.transport_error = str(item)
+            raise item
+        return item
+
+    def message(self, command, projectid=None, structureid=None):
+        self.calls.append(command)
+        try:
+            return self._next(self.logins, {"result": "Success"})
+        except socket.error:
+            return None   # ITS_CLI 의 message 는 소켓 오류를 None 으로 돌려줌
+
+    def message_getdata(self, command, start_date, end_date, **kwargs):
+        self.calls.append(command)
+        return self._next(self.answers, {"result": "Success"})
+
+    def disconnect(self):
+        self.connected = False
+
+        def _reconnect():
+            self.generation += 1
+            self.connected = True
+        threading.Timer(0.05, _reconnect).start()
+
+    def close_influx(self):
+        pass
+
+
+class _FakeSession(its_session.ITSSession):
+    clients = []
+
+    def __init__(self, **kwargs):
+        super().__init__(user="u", password="p", connect_timeout=2.0, **kwargs)
+
+    def _start_client(self):
+        self.client = _FakeSession.clients.pop(0) if _FakeSession.clients else _FakeClient()
+        self._login_generation = None
+
+
+class _FakeInflux:
+    """InfluxDBClient 대용: 받은 Flux 질의를 기록하고 정해진 행을 돌려줌"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def query_api(self):
+        return self
+
+    def query(self, statement):
+        self.statements.append(statement)
+        rows = self.rows
+        return type("Records", (), {"to_json": lambda self, indent=0: json.dumps(rows)})()
+
+
+def test_query_tsdb_uses_given_client():
+    """ITS_CLI query_data 를 세션 클라이언트/버킷으로 실행하고 전역 값은 원래대로 되돌림"""
+    tsdb = its_session.tcp_client.tsdb
+    saved = (tsdb.TSDB_CLIENT, tsdb.BUCKET)
+    influx = _FakeInflux([{"result": "_result", "table": 0, "_time": "2025-06-01T00:00:00+00:00",
+                           "sv": 1.0, "temperature": 20.0, "humidity": 55.0}])
+    df = its_session._query_tsdb(influx, "session_bucket", "D1", "2", "2025-06-01 09:00:00",
+                                 "2025-06-02 09:00:00", "2")
+    assert list(df.columns) == ["time", "sv", "temperature", "humidity"]
+    assert str(df["time"].iloc[0]) == "2025-06-01 09:00:00"   # KST
+    assert 'from(bucket:"session_bucket")' in influx.statements[0]
+    assert 'r.id == "D1" and r.channel == "2"' in influx.statements[0]
+    assert (tsdb.TSDB_CLIENT, tsdb.BUCKET) == saved
+    # 결과가 없으면 빈 DataFrame
+    assert its_session._query_tsdb(_FakeInflux([]), "b", "D1", "2", "2025-06-01 09:00:00",
+                                   "2025-06-02 09:00:00", "2").empty
+    assert (tsdb.TSDB_CLIENT, tsdb.BUCKET) == saved
+
+
+def test_load_credentials(tmp_path):
+    """secret.ini 의 USER/PW 우선, 없으면 환경 변수, 둘 다 없으면 ITSSessionError"""
+    secret = os.path.join(tmp_path, "secret.ini")
+    with open(secret, "w", encoding="utf-8") as f:
+        f.write("[ITS]\nUSER = its_user\npw=s3cret = x\n")
+    saved = {k: os.environ.pop(k, None) for k in (its_session.ENV_USER, its_session.ENV_PASSWORD)}
+    try:
+        assert its_session.load_credentials(secret) == ("its_user", "s3cret = x")
+
+        missing = os.path.join(tmp_path, "none.ini")
+        try:
+            its_session.load_credentials(missing)
+            assert False, "계정 정보가 없으면 ITSSessionError"
+        except its_session.ITSSessionError:
+            pass
+        os.environ[its_session.ENV_USER] = "env_user"
+        os.environ[its_session.ENV_PASSWORD] = "env_pw"
+        assert its_session.load_credentials(missing) == ("env_user", "env_pw")
+        # secret.ini 에 일부만 있으면 나머지는 환경 변수
+        with open(secret, "w", encoding="utf-8") as f:
+            f.write("USER=file_user\n")
+        assert its_session.load_credentials(secret) == ("file_user", "env_pw")
+    finally:
+        for key, value in saved.items():
+            os.environ.pop(key, None)
+            if value is not None:
+                os.environ[key] = value
+
+
+def test_request_timeout():
+    """응답이 없으면 request_timeout 후 socket.timeout, 연결이 끊기면 socket.error"""
+    client = its_session._SessionClient("127.0.0.1", 0, 1, None, request_timeout=0.2)
+    client.connected = True
+    client.send_message = lambda message: None
+    start = time.monotonic()
+    try:
+        client.send_and_wait_for_response("{}")
+        assert False, "응답이 없으면 시간 초과"
+    except socket.timeout:
+        pass
+    assert 0.2 <= time.monotonic() - start < 1.0
+    assert client.transport_error.startswith("응답 시간 초과")
+
+    client.connected = False
+    try:
+        client.send_and_wait_for_response("{}")
+        assert False, "연결이 없으면 socket.error"
+    except socket.error:
+        pass
+    assert client.transport_error == "ITS 서버에 연결되어 있지 않습니다"
+
+
+def test_reconnect_after_failed_health_check():
+    """오래 쉰 세션의 login 확인이 시간 초과되면 재연결 후 다시 로그인, 계정 오류는 그대로 실패"""
+    client = _FakeClient(logins=[{"result": "Success"}, socket.timeout("응답 시간 초과"), {"result": "Success"}])
+    _FakeSession.clients = [client]
+    session = _FakeSession()
+    session.ensure_ready()
+    assert session.is_healthy() and client.generation == 1
+
+    session._last_ok = time.monotonic() - its_session.HEALTH_CHECK_INTERVAL - 1
+    session.ensure_ready()
+    assert client.calls == ["login", "login", "login"]
+    assert client.generation == 2 and session.is_healthy()
+
+    # 서버가 응답한 로그인 실패는 재연결하지 않음
+    client.logins = [{"result": "Fail", "msg": "비밀번호 오류"}]
+    session._last_ok = 0.0
+    try:
+        session.ensure_ready()
+        assert False, "로그인 실패는 ITSSessionError"
+    except its_session.ITSSessionError as e:
+        assert "비밀번호 오류" in str(e)
+    assert client.generation == 2
+
+
+def test_call_retries_after_transport_error():
+    """요청 중 연결이 끊기면 재연결/재로그인 후 한 번 더 시도, 계속 실패하면 ITSSessionError"""
+    client = _FakeClient(answers=[socket.error("연결 끊김"), {"result": "Success", "data": 1}])
+    _FakeSession.clients = [client]
+    session = _FakeSession()
+    assert session.query_channel_data("D1", "1") == {"result": "Success", "data": 1}
+    assert client.calls == ["login", "query_device_channel_data", "login", "query_device_channel_data"]
+
+    client.answers = [socket.timeout("t1"), socket.timeout("t2")]
+    try:
+        session.query_channel_data("D1", "1")
+        assert False, "재시도 후에도 실패하면 ITSSessionError"
+    except its_session.ITSSessionError as e:
+        assert "t2" in str(e)
+
+
+def test_pool_returns_session_on_error():
+    """with 블록에서 예외가 나도 세션은 풀로 돌아가 다음 사용자가 다시 씀"""
+    saved_cls = its_session.ITSSession
+    its_session.ITSSession = _FakeSession
+    _FakeSession.clients = []
+    pool = its_session.ITSSessionPool(1)
+    try:
+        try:
+            with pool.session() as session:
+                first = session
+                raise ValueError("처리 중 오류")
+        except ValueError:
+            pass
+        with pool.session(timeout=0.5) as session:
+            assert session is first
+        assert len(pool._sessions) == 1
+
+        # 빌려 간 세션이 반납되지 않으면 timeout 후 ITSSessionError
+        held = pool.acquire()
+        try:
+            pool.acquire(timeout=0.1)
+            assert False, "빈 풀은 ITSSessionError"
+        except its_session.ITSSessionError:
+            pass
+        pool.release(held)
+    finally:
+        its_session.ITSSession = saved_cls
+        pool.close()
+
+
+if __name__ == "__main__":
+    test_query_tsdb_uses_given_client()
+    test_load_credentials(tempfile.mkdtemp())
+    test_request_timeout()
+    test_reconnect_after_failed_health_check()
+    test_call_retries_after_transport_error()
+    test_pool_returns_session_on_error()
+    print("✅ 모든 테스트 통과")
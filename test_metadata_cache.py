@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# test_metadata_cache.py
+# 메타데이터 캐시 hit/miss, 인자 정규화, TTL, 무효화, api_db 쓰기 연동 검증
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+import metadata_cache
+from metadata_cache import cached, invalidate, cache_stats
+
+
+def test_hits_and_key_normalization():
+    """같은 조회(숫자/문자, 목록 순서 차이 포함)는 한 번만 실행되고 복사본을 반환"""
+    calls = []
+
+    @cached("test_group_a", ttl=60)
+    def lookup_a(device_id, channel=None, allow=None):
+        calls.append((device_id, channel))
+        return pd.DataFrame({"device_id": [device_id], "channel": [channel]})
+
+    first = lookup_a("D1", 1, allow=["P2", "P1"])
+    first.loc[0, "device_id"] = "changed"
+    second = lookup_a(" D1", channel="1", allow=("P1", "P2"))
+    assert len(calls) == 1
+    assert second.loc[0, "device_id"] == "D1"
+
+    stats = cache_stats()["lookup_a"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_ttl_and_invalidation():
+    """TTL 이 지나거나 그룹이 무효화되면 다시 조회"""
+    calls = []
+
+    @cached("test_group_b", ttl=0.05)
+    def lookup_b(key):
+        calls.append(key)
+        return {"result": "Success", "value": len(calls)}
+
+    lookup_b("x")
+    lookup_b("x")
+    time.sleep(0.06)
+    lookup_b("x")
+    assert len(calls) == 2
+    invalidate("test_group_b")
+    lookup_b("x")
+    assert len(calls) == 3
+    assert cache_stats()["lookup_b"]["expired"] == 1
+
+
+def test_failures_and_empty_results_are_not_cached():
+    calls = []
+
+    @cached("test_group_c", ttl=60, cache_empty=False)
+    def lookup_c(key):
+        calls.append(key)
+        return {"result": "Fail", "msg": "err"} if key == "fail" else pd.DataFrame()
+
+    lookup_c("fail")
+    lookup_c("fail")
+    lookup_c("empty")
+    lookup_c("empty")
+    assert len(calls) == 4
+    assert metadata_cache._caches["lookup_c"] == {}
+
+
+def test_api_db_writes_invalidate(tmp_path):
+    """api_db 의 콘크리트/센서 추가·삭제 후 조회에 바로 반영됨 (SQLite 대용 DB)"""
+    import api_db
+    import db_migrate
+
+    saved_engine = api_db.engine
+    api_db.engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+    invalidate()
+    try:
+        db_migrate.migrate(api_db.engine)
+        assert api_db.get_concrete_data(project_pk="P_000001").empty
+        api_db.add_concrete_data("P_000001", "slab", {"nodes": [], "h": 1.0}, 1.0, "t", 1.0, 1.0, 1.0, 1)
+        df = api_db.get_concrete_data(project_pk="P_000001")
+        assert df["concrete_pk"].tolist() == ["C000001"]
+
+        api_db.add_sensors_data("C000001", "D1", 1, 0, {"nodes": [0, 0, 0]})
+        assert len(api_db.get_sensors_data(concrete_pk="C000001")) == 1
+        assert len(api_db.get_sensors_data(concrete_pk="C000001")) == 1
+        assert cache_stats()["get_sensors_data"]["hits"] >= 1
+
+        api_db.delete_concrete_data("C000001")
+        assert api_db.get_concrete_data(project_pk="P_000001").empty
+        assert api_db.get_sensors_data(concrete_pk="C000001").empty
+    finally:
+        api_db.engine.dispose()
+        api_db.engine = saved_engine
+        invalidate()
+
+
+if __name__ == "__main__":
+    test_hits_and_key_normalization()
+    test_ttl_and_invalidation()
+    test_failures_and_empty_results_are_not_cached()
+    test_api_db_writes_invalidate(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
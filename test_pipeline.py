@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# test_pipeline.py
+# 파이프라인 DAG: 선행 순서, 바뀐 항목만 후속 단계로 전달, 스레드 실행/재시도 검증
+
+import os
+import time
+import tempfile
+import threading
+
+import pipeline
+import stage_metrics
+
+
+def _stages(calls, fail_once=None):
+    """sensor → inp → (frd, lod) 가짜 단계. sensor 는 첫 실행에만 C1 을 넘김"""
+    lock = threading.Lock()
+
+    def stage(name, emit):
+        def run(items):
+            with lock:
+                calls.append((name, None if items is None else list(items)))
+                if fail_once is not None and name == fail_once[0] and fail_once[1]:
+                    fail_once[1] = False
+                    raise RuntimeError("일시 오류")
+            return emit(items)
+        return run
+
+    first = [True]
+
+    def sensor_emit(items):
+        if first[0]:
+            first[0] = False
+            return {"C1"}
+        return set()
+
+    return {
+        "lod": {"deps": ("frd",), "run": stage("lod", lambda items: set(items or ()))},
+        "frd": {"deps": ("inp",), "run": stage("frd", lambda items: set(items or ()))},
+        "inp": {"deps": ("sensor",), "run": stage("inp", lambda items: set(items or ()))},
+        "sensor": {"deps": (), "run": stage("sensor", sensor_emit)},
+    }
+
+
+def _metrics_to(tmp_path):
+    """span/누적값 기록 위치를 테스트 폴더로 바꿈 (실제 log/, data/metrics 에 쓰지 않도록). Returns: 원래 값"""
+    saved = (stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR)
+    stage_metrics.SPANS_PATH = os.path.join(tmp_path, "spans.jsonl")
+    stage_metrics.METRICS_DIR = os.path.join(tmp_path, "metrics")
+    return saved
+
+
+def _stop(ctx):
+    """단계 스레드를 멈추고 끝날 때까지 기다림 (기록 위치를 되돌리기 전에)"""
+    ctx["stop"].set()
+    for state in ctx["state"].values():
+        state["wake"].set()
+    for thread in ctx["threads"]:
+        thread.join(timeout=5)
+
+
+def test_order_and_run_once(tmp_path):
+    assert pipeline.topological_order(_stages([])) == ["sensor", "inp", "frd", "lod"]
+    assert pipeline.topological_order(pipeline.STAGES)[:4] == ["mirror", "sensor", "store", "rollup"]
+    try:
+        pipeline.topological_order({"a": {"deps": ("b",)}, "b": {"deps": ("a",)}})
+        assert False
+    except ValueError:
+        pass
+
+    saved = _metrics_to(tmp_path)
+    try:
+        calls = []
+        emitted = pipeline.run_once(_stages(calls))
+        assert calls == [("sensor", None), ("inp", ["C1"]), ("frd", ["C1"]), ("lod", ["C1"])]
+        assert emitted["lod"] == {"C1"}
+        # 단계 실행마다 span 1개
+        spans = stage_metrics.read_spans()
+        assert list(spans["stage"]) == ["pipeline.sensor", "pipeline.inp", "pipeline.frd", "pipeline.lod"]
+        assert list(spans["item"]) == ["전체", "1개", "1개", "1개"]
+        # 바뀐 항목이 없으면 후속 단계는 건너뜀
+        calls.clear()
+        stages = _stages(calls)
+        stages["sensor"]["run"]([])
+        calls.clear()
+        pipeline.run_once(stages)
+        assert calls == [("sensor", None)]
+    finally:
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+def test_threaded_pipeline_forwards_changes_and_retries(tmp_path):
+    """시작 시 전체 처리 후, 센서가 넘긴 C1 만 후속 단계로 전달. 실패한 단계는 같은 항목으로 재시도"""
+    saved = _metrics_to(tmp_path)
+    try:
+        calls = []
+        ctx = pipeline.start_pipeline(_stages(calls, fail_once=["frd", False]), cadence={"sensor": 0.2},
+                                      full_scan_interval=3600, debounce=0.01, retry_delay=0.05)
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline and ("lod", ["C1"]) not in calls:
+                time.sleep(0.02)
+            assert ("inp", ["C1"]) in calls and ("frd", ["C1"]) in calls and ("lod", ["C1"]) in calls
+            # 후속 단계의 전체 처리는 시작 시 한 번뿐
+            assert [c for c in calls if c[0] == "frd" and c[1] is None] == [("frd", None)]
+            time.sleep(0.5)
+            assert ctx["state"]["sensor"]["runs"] >= 2
+            assert sum(1 for c in calls if c[0] == "inp" and c[1] is not None) == 1
+        finally:
+            _stop(ctx)
+
+        calls = []
+        ctx = pipeline.start_pipeline(_stages(calls, fail_once=["frd", True]), cadence={"sensor": 3600},
+                                      full_scan_interval=3600, debounce=0.01, retry_delay=0.05)
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline and ctx["state"]["lod"]["runs"] < 2:
+                time.sleep(0.02)
+            # 시작 시 frd 전체 처리가 실패 → 재시도, 이후 C1 처리
+            assert ctx["state"]["frd"]["errors"] == 1
+            assert ("lod", ["C1"]) in calls
+        finally:
+            _stop(ctx)
+    finally:
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+def test_partial_failure_forwards_success_and_retries_failed(tmp_path):
+    """StageFailed: 성공한 항목은 후속 단계로, 실패한 항목만 재시도"""
+    saved = _metrics_to(tmp_path)
+    try:
+        calls = []
+        attempts = {"inp": 0}
+
+        def inp(items):
+            attempts["inp"] += 1
+            if attempts["inp"] == 1:
+                raise pipeline.StageFailed({"C1"}, {"C2"})
+            return set(items or ())
+
+        stages = {
+            "sensor": {"deps": (), "run": lambda items: {"C1", "C2"}},
+            "inp": {"deps": ("sensor",), "run": inp},
+            "frd": {"deps": ("inp",), "run": lambda items: calls.append(list(items or ())) or set(items or ())},
+        }
+        assert pipeline.run_once(stages)["inp"] == {"C1"}
+        assert calls == [["C1"]]
+        assert pipeline.run_once(stages)["frd"] == {"C1", "C2"}
+
+        calls.clear()
+        attempts["inp"] = 0
+        stages["sensor"]["run"] = lambda items: set()
+        ctx = pipeline.start_pipeline(stages, cadence={"sensor": 3600}, full_scan_interval=3600,
+                                      debounce=0.01, retry_delay=0.3)
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline and ["C2"] not in calls:
+                time.sleep(0.02)
+            # 시작 시 전체 처리(실패: C1 만 전달) → C2 재시도 후 전달
+            assert ctx["state"]["inp"]["errors"] == 1
+            assert ["C1"] in calls and ["C2"] in calls
+        finally:
+            _stop(ctx)
+    finally:
+        stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR = saved
+
+
+if __name__ == "__main__":
+    test_order_and_run_once(tempfile.mkdtemp())
+    test_threaded_pipeline_forwards_changes_and_retries(tempfile.mkdtemp())
+    test_partial_failure_forwards_success_and_retries_failed(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
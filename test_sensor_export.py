@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# test_sensor_export.py
+# 센서 CSV 스트리밍 내보내기: 조각 단위 출력, gzip, 기간 인자, 권한 확인 검증
+
+import os
+import csv
+import gzip
+import tempfile
+from datetime import datetime
+
+from flask import Flask, request
+from sqlalchemy import create_engine, text
+
+import api_db
+import sensor_export
+
+
+def _its_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its.db')}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE tb_sensor_data (deviceid TEXT, channel TEXT, timestamp TEXT, temperature REAL, "
+            "humidity REAL, sv REAL, x_accel REAL, y_accel REAL, z_accel REAL, "
+            "x_gyro REAL, y_gyro REAL, z_gyro REAL)"))
+        conn.execute(text("INSERT INTO tb_sensor_data (deviceid, channel, timestamp, temperature) "
+                          "VALUES (:d, :c, :t, :v)"),
+                     [{"d": "D1", "c": "1", "t": f"2025-06-01 {h:02d}:00:00", "v": 20.0 + h} for h in range(24)])
+    return engine
+
+
+def test_parse_range():
+    now = datetime(2025, 6, 8, 12)
+    assert sensor_export.parse_range({"days": "7"}, now) == (datetime(2025, 6, 1, 12), now)
+    assert sensor_export.parse_range({"start": "2025060100", "end": "2025060200"}) == (
+        datetime(2025, 6, 1), datetime(2025, 6, 2))
+    for bad in ({"days": "x"}, {"days": "400"}, {"start": "2025060200", "end": "2025060100"}):
+        try:
+            sensor_export.parse_range(bad, now)
+            assert False, bad
+        except ValueError:
+            pass
+
+
+def test_streaming_export_route(tmp_path):
+    """조각 단위 CSV, gzip, 권한 없는 센서 403"""
+    engine = _its_engine(tmp_path)
+    saved_access = api_db.get_accessible_sensors
+    api_db.get_accessible_sensors = lambda user_id, its_num=1: (
+        [{"sensor_key": "D1_Ch1"}] if user_id == "user1" else [])
+    app = Flask(__name__)
+
+    @app.route("/export/sensor_csv")
+    def export():
+        return sensor_export.export_sensor_csv(request.args, request.cookies.get("login_user"), engine)
+
+    try:
+        chunks = list(sensor_export.iter_csv("D1", "1", datetime(2025, 6, 1), datetime(2025, 6, 1, 9),
+                                             engine=engine, chunk_rows=4))
+        assert len(chunks) == 1 + 3   # 헤더 + 10행을 4행씩
+        assert chunks[0].startswith("\ufeffdevice_id,channel,time")
+
+        client = app.test_client()
+        client.set_cookie("login_user", "user1")
+        query = "sensor=D1_Ch1&start=2025060100&end=2025060200"
+        resp = client.get(f"/export/sensor_csv?{query}")
+        assert resp.status_code == 200 and resp.is_streamed
+        assert 'filename="D1_Ch1_data_' in resp.headers["Content-Disposition"]
+        rows = list(csv.DictReader(resp.get_data().decode("utf-8-sig").splitlines()))
+        assert len(rows) == 24 and rows[-1]["temperature"] == "43.0"
+
+        resp = client.get(f"/export/sensor_csv?{query}&gzip=1")
+        assert resp.mimetype == "application/gzip"
+        assert resp.headers["Content-Disposition"].endswith('.csv.gz"')
+        assert gzip.decompress(resp.get_data()).decode("utf-8-sig").count("\n") == 25
+
+        assert client.get("/export/sensor_csv?sensor=D2_Ch1").status_code == 403
+        assert client.get("/export/sensor_csv?sensor=D1_Ch1&days=999").status_code == 400
+        client.set_cookie("login_user", "user2")
+        assert client.get(f"/export/sensor_csv?{query}").status_code == 403
+    finally:
+        api_db.get_accessible_sensors = saved_access
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_parse_range()
+    test_streaming_export_route(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# test_sensor_rollup.py
+# 센서 시간/일 집계: 원본 → 시간 집계, 일 집계 n 가중 평균, 증분 교체, sensor_data 채우기, 해상도 선택 검증
+
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import db_migrate
+import sensor_rollup
+
+
+def _raw(start, minutes, temperature):
+    times = pd.date_range(start, periods=len(minutes), freq="20min")
+    return pd.DataFrame({"time": times, "temperature": temperature, "humidity": 50.0, "sv": minutes})
+
+
+def test_hourly_rollup_and_resolution():
+    raw = _raw("2025-06-01 00:00", [1.0, 2.0, 3.0, 4.0], [10.0, 20.0, 30.0, 40.0])
+    hourly = sensor_rollup.hourly_rollup(raw)
+    assert hourly["n"].tolist() == [3, 1]
+    assert hourly["temperature"].tolist() == [20.0, 40.0]
+    assert hourly[["temperature_min", "temperature_max"]].iloc[0].tolist() == [10.0, 30.0]
+
+    start = datetime(2025, 6, 1)
+    assert sensor_rollup.choose_resolution(start, datetime(2025, 6, 2)) == "raw"
+    assert sensor_rollup.choose_resolution(start, datetime(2025, 7, 1)) == "hour"
+    assert sensor_rollup.choose_resolution(start, datetime(2025, 9, 1)) == "day"
+
+
+def test_incremental_rollups_and_backfill(tmp_path):
+    """수집 집계 교체 → 일 집계 재계산, 집계가 없는 센서는 sensor_data 로 채움"""
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+    try:
+        db_migrate.migrate(engine)
+        first = sensor_rollup.hourly_rollup(_raw("2025-06-01 00:00", [1.0] * 6, [10.0, 10.0, 10.0, 40.0, 40.0, 40.0]))
+        assert sensor_rollup.update_rollups("D1", 1, first, engine) == (2, 1)
+        # 두 번째 시간 bucket 을 다시 수집 (값 교체) + 다음 시간 추가
+        again = sensor_rollup.hourly_rollup(_raw("2025-06-01 01:00", [1.0] * 6, [20.0] * 6))
+        sensor_rollup.update_rollups("D1", 1, again, engine)
+
+        res, hourly = sensor_rollup.get_series("D1", 1, "2025-06-01", "2025-06-02", resolution="hour", engine=engine)
+        assert hourly["temperature"].tolist() == [10.0, 20.0, 20.0]
+        res, daily = sensor_rollup.get_series("D1", 1, "2025-06-01", "2025-06-02", resolution="day", engine=engine)
+        assert daily["n"].tolist() == [9]
+        assert abs(daily["temperature"].iloc[0] - (10 * 3 + 20 * 6) / 9) < 1e-9
+        assert (daily["temperature_min"].iloc[0], daily["temperature_max"].iloc[0]) == (10.0, 20.0)
+
+        rows = [("D2", 1, f"2025-06-{d:02d} {h:02d}:00:00", 20.0 + h) for d in range(1, 31) for h in range(24)]
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO sensor_data (device_id, channel, time, temperature) VALUES (:d, :c, :t, :v)"),
+                         [{"d": d, "c": c, "t": t, "v": v} for d, c, t, v in rows])
+        summary = sensor_rollup.backfill_from_sensor_data(engine)
+        assert (summary["sensors"], summary["hours"]) == (1, 720)
+        assert sensor_rollup.backfill_from_sensor_data(engine)["sensors"] == 0
+
+        # 한 달 그래프는 시간 집계 720점 이하
+        res, month = sensor_rollup.get_series("D2", 1, datetime(2025, 6, 1), datetime(2025, 7, 1), engine=engine)
+        assert res == "hour" and len(month) == 720
+        res, quarter = sensor_rollup.get_series("D2", 1, datetime(2025, 4, 1), datetime(2025, 7, 1), engine=engine)
+        assert res == "day" and len(quarter) == 30
+        assert quarter["temperature"].iloc[0] == 20.0 + 11.5
+    finally:
+        engine.dispose()
+
+
+def test_backfill_after_ingest(tmp_path):
+    """수집 단계가 최근 시간 집계를 먼저 만들어도 backfill 이 그 이전 이력을 채우고 수집 집계는 유지"""
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+    try:
+        db_migrate.migrate(engine)
+        rows = [(f"2025-{m:02d}-{d:02d} {h:02d}:00:00", 20.0) for m in (5, 6) for d in range(1, 31) for h in range(24)]
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO sensor_data (device_id, channel, time, temperature) "
+                              "VALUES ('D1', 1, :t, :v)"), [{"t": t, "v": v} for t, v in rows])
+        # 수집: 마지막 2시간만 원본 측정값으로 집계 (min/max 포함)
+        recent = sensor_rollup.hourly_rollup(_raw("2025-06-30 22:00", [1.0] * 6, [18.0, 20.0, 22.0] * 2))
+        sensor_rollup.update_rollups("D1", 1, recent, engine)
+
+        summary = sensor_rollup.backfill_from_sensor_data(engine)
+        assert (summary["sensors"], summary["hours"]) == (1, 60 * 24 - 2)
+        assert sensor_rollup.backfill_from_sensor_data(engine)["sensors"] == 0
+
+        res, series = sensor_rollup.get_series("D1", 1, datetime(2025, 5, 1), datetime(2025, 7, 1),
+                                               resolution="hour", engine=engine)
+        assert len(series) == 60 * 24
+        last = series.iloc[-1]
+        assert (last["n"], last["temperature_min"], last["temperature_max"]) == (3, 18.0, 22.0)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_hourly_rollup_and_resolution()
+    test_incremental_rollups_and_backfill(tempfile.mkdtemp())
+    test_backfill_after_ingest(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
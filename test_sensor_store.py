@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# test_sensor_store.py
+# 센서 시계열 Parquet 저장소: 월 파티션 추가/교체, 기간 조회 파티션 선택, CSV/DB 증분 가져오기 검증
+
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import sensor_store
+
+
+def _hourly(start, periods, temperature=20.0):
+    times = pd.date_range(start, periods=periods, freq="h")
+    return pd.DataFrame({"time": times, "humidity": 60.0, "sv": 1.0,
+                         "temperature": temperature + np.arange(periods, dtype=float)})
+
+
+def test_append_and_range_read(tmp_path):
+    """월 경계를 넘는 추가, 같은 시각 교체, 필요한 파티션만 읽는 기간 조회"""
+    root = os.path.join(tmp_path, "store")
+    assert sensor_store.append("D1_1", _hourly("2025-05-31 20:00", 10), root=root) == 10
+    assert sensor_store._months("D1_1", root) == ["2025-05", "2025-06"]
+    # 겹치는 구간은 새 값으로 교체
+    sensor_store.append("D1_1", _hourly("2025-06-01 05:00", 3, temperature=50.0), root=root)
+    assert sensor_store.last_time("D1_1", root) == datetime(2025, 6, 1, 7, 0)
+
+    opened = []
+    saved_dataset = sensor_store.ds.dataset
+
+    def _dataset(paths, **kwargs):
+        opened.extend(paths)
+        return saved_dataset(paths, **kwargs)
+
+    sensor_store.ds.dataset = _dataset
+    try:
+        df = sensor_store.read_frame("D1_1", "2025-06-01 04:00", "2025-06-01 06:00", root=root)
+    finally:
+        sensor_store.ds.dataset = saved_dataset
+    assert [os.path.basename(os.path.dirname(p)) for p in opened] == ["month=2025-06"]
+    assert df["temperature"].tolist() == [28.0, 50.0, 51.0]
+    assert df["time"].dtype == "datetime64[ns]"
+    assert len(sensor_store.read_frame("D1_1", root=root)) == 12
+
+    times, values = sensor_store.read_arrays("D1_1", "temperature", root=root)
+    assert times.dtype == np.dtype("datetime64[s]") and len(values) == 12
+    assert not values.flags.writeable   # Arrow 버퍼를 그대로 공유
+    assert sensor_store.read_frame("D9_1", root=root).empty
+    assert sensor_store.list_sensors(root) == ["D1_1"]
+
+
+def test_csv_and_db_ingest(tmp_path):
+    """CSV 는 바뀐 경우에만 다시 읽고, sensor_data 는 저장소보다 새로운 센서만 가져옴"""
+    import api_db
+    import db_migrate
+
+    root = os.path.join(tmp_path, "store")
+    csv_path = os.path.join(tmp_path, "S001.csv")
+    _hourly("2025-05-29 00:00", 5).assign(sensor_id="S001").to_csv(csv_path, index=False)
+    saved_engine, saved_root = api_db.engine, sensor_store.STORE_ROOT
+    api_db.engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+    sensor_store.STORE_ROOT = root
+    try:
+        assert sensor_store.ingest_csv(csv_path, root=root) == 5
+        assert sensor_store.ingest_csv(csv_path, root=root) == 0
+        df = sensor_store.load_csv_sensor("S001", csv_dir=tmp_path, columns=["temperature"], root=root)
+        assert list(df.columns) == ["time", "temperature"] and len(df) == 5
+
+        db_migrate.migrate(api_db.engine)
+        rows = [("D1", 1, f"2025-06-0{d} 00:00:00", float(d)) for d in range(1, 4)]
+        with api_db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO sensor_data (device_id, channel, time, temperature) "
+                              "VALUES (:d, :c, :t, :v)"),
+                         [{"d": d, "c": c, "t": t, "v": v} for d, c, t, v in rows])
+        assert sensor_store.sync_from_db(api_db.engine, root)["rows"] == 3
+        assert sensor_store.sync_from_db(api_db.engine, root)["sensors"] == 0
+
+        # api_db 기간 조회는 저장소에서 읽음
+        df = api_db.get_sensor_data("D1", "1", start="2025060200", end="2025060300")
+        assert df["temperature"].tolist() == [2.0, 3.0]
+        assert df["device_id"].tolist() == ["D1", "D1"]
+    finally:
+        api_db.engine.dispose()
+        api_db.engine, sensor_store.STORE_ROOT = saved_engine, saved_root
+
+
+def test_sync_after_ingest_append(tmp_path):
+    """수집 단계가 최근 시각을 먼저 append 해도 첫 동기화에서 sensor_data 전체 이력을 가져옴"""
+    import api_db
+    import db_migrate
+
+    root = os.path.join(tmp_path, "store")
+    saved_engine, saved_root = api_db.engine, sensor_store.STORE_ROOT
+    api_db.engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'its_ts.db')}")
+    sensor_store.STORE_ROOT = root
+    try:
+        db_migrate.migrate(api_db.engine)
+        history = _hourly("2025-05-01 00:00", 24 * 60)
+        with api_db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO sensor_data (device_id, channel, time, temperature) "
+                              "VALUES ('D1', 1, :t, :v)"),
+                         [{"t": t.strftime('%Y-%m-%d %H:%M:%S'), "v": v}
+                          for t, v in zip(history["time"], history["temperature"])])
+        # auto_sensor 수집 단계: 마지막 1시간만 저장소에 먼저 추가
+        sensor_store.append("D1_1", history.tail(1), root=root)
+        assert not sensor_store.covers("D1_1", "2025-06-01 00:00", root)
+        # 동기화 전에는 저장소가 기간 시작을 갖고 있지 않으므로 sensor_data 테이블에서 조회
+        df = api_db.get_sensor_data("D1", "1", start="2025060100", end="2025060200")
+        assert len(df) == 25
+
+        summary = sensor_store.sync_from_db(api_db.engine, root)
+        assert summary["sensors"] == 1 and summary["rows"] == 24 * 60
+        assert len(sensor_store.read_frame("D1_1", root=root)) == 24 * 60
+        assert sensor_store.synced_until("D1_1", root) == datetime(2025, 6, 29, 23, 0)
+        assert sensor_store.covers("D1_1", "2025-01-01 00:00", root)
+        assert sensor_store.sync_from_db(api_db.engine, root)["sensors"] == 0
+
+        df = api_db.get_sensor_data("D1", "1", start="2025050100", end="2025050200")
+        assert len(df) == 25 and df["temperature"].iloc[0] == 20.0
+    finally:
+        api_db.engine.dispose()
+        api_db.engine, sensor_store.STORE_ROOT = saved_engine, saved_root
+
+
+if __name__ == "__main__":
+    test_append_and_range_read(tempfile.mkdtemp())
+    test_csv_and_db_ingest(tempfile.mkdtemp())
+    test_sync_after_ingest_append(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# test_stage_metrics.py
+# 단계 계측: span 기록(JSON lines), 누적값 → Prometheus 텍스트, 처리량/p95 집계 검증
+
+import os
+import json
+import tempfile
+from datetime import datetime
+
+from flask import Flask, request
+
+import stage_metrics
+
+
+def _swap_paths(tmp_dir):
+    saved = (stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR, stage_metrics.SOURCE)
+    stage_metrics.SPANS_PATH = os.path.join(tmp_dir, "spans.jsonl")
+    stage_metrics.METRICS_DIR = os.path.join(tmp_dir, "metrics")
+    stage_metrics.SOURCE = "test"
+    stage_metrics.reset()
+    return saved
+
+
+def _restore_paths(saved):
+    stage_metrics.SPANS_PATH, stage_metrics.METRICS_DIR, stage_metrics.SOURCE = saved
+    stage_metrics.reset()
+
+
+def test_span_records_jsonl_and_prometheus(tmp_path):
+    saved = _swap_paths(str(tmp_path))
+    try:
+        with stage_metrics.span("auto_inp", "C1/2025-06-01 00:00:00") as s:
+            s["bytes_written"] = 1234
+        try:
+            with stage_metrics.span("auto_inp", "C1/2025-06-01 01:00:00"):
+                raise RuntimeError("보간 실패")
+        except RuntimeError:
+            pass
+        stage_metrics.record_span("auto_frd_to_vtk", "C1/2025060100.frd", 3.0, "ok",
+                                  bytes_read=10, bytes_written=20, queue_wait=0.5)
+        stage_metrics.flush()
+
+        with open(stage_metrics.SPANS_PATH, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [r["outcome"] for r in lines] == ["ok", "error", "ok"]
+        assert lines[0]["bytes_written"] == 1234 and lines[0]["queue_wait"] is None
+        assert lines[2]["queue_wait"] == 0.5 and lines[2]["source"] == "test"
+
+        # 파일로 기록한 상태를 다시 읽어 렌더링 (/metrics 와 같은 경로). 파일명은 프로세스별
+        prom_path = os.path.join(stage_metrics.METRICS_DIR, f"test-{os.getpid()}.prom")
+        with open(prom_path, encoding="utf-8") as f:
+            assert f'pid="{os.getpid()}"' in f.read()
+        # 같은 SOURCE 의 다른 작업자 프로세스 파일은 덮어쓰지 않고 합산
+        with open(os.path.join(stage_metrics.METRICS_DIR, f"test-{os.getpid()}.json"), encoding="utf-8") as f:
+            other = json.load(f)
+        other["pid"] = 1
+        with open(os.path.join(stage_metrics.METRICS_DIR, "test-1.json"), "w", encoding="utf-8") as f:
+            json.dump(other, f)
+        merged = stage_metrics.load_states()
+        assert list(merged) == ["test"] and merged["test"]["auto_inp|error"]["count"] == 2
+        os.remove(os.path.join(stage_metrics.METRICS_DIR, "test-1.json"))
+        text = stage_metrics.render_prometheus(stage_metrics.load_states())
+        assert '# TYPE pipeline_item_duration_seconds histogram' in text
+        assert 'pipeline_items_total{source="test",stage="auto_inp",outcome="error"} 1' in text
+        assert ('pipeline_item_duration_seconds_bucket{source="test",stage="auto_frd_to_vtk",'
+                'outcome="ok",le="2.5"} 0') in text
+        assert ('pipeline_item_duration_seconds_bucket{source="test",stage="auto_frd_to_vtk",'
+                'outcome="ok",le="5.0"} 1') in text
+        assert 'pipeline_bytes_written_total{source="test",stage="auto_inp",outcome="ok"} 1234' in text
+        assert 'pipeline_queue_wait_seconds_count{source="test",stage="auto_frd_to_vtk",outcome="ok"} 1' in text
+        # HELP/TYPE 는 지표마다 한 번
+        assert text.count("# TYPE pipeline_items_total") == 1
+
+        # /metrics: 토큰이나 관리자 쿠키가 있어야 함 (프록시 뒤의 로컬 주소는 허용하지 않음)
+        app = Flask(__name__)
+        saved_token = stage_metrics.METRICS_TOKEN
+        stage_metrics.METRICS_TOKEN = "secret"
+        try:
+            with app.test_request_context("/metrics", environ_base={"REMOTE_ADDR": "127.0.0.1"}):
+                assert stage_metrics.metrics_response(request).status_code == 403
+            with app.test_request_context("/metrics", headers={"Authorization": "Bearer wrong"}):
+                assert stage_metrics.metrics_response(request).status_code == 403
+            with app.test_request_context("/metrics", headers={"Authorization": "Bearer secret"}):
+                resp = stage_metrics.metrics_response(request)
+                assert resp.status_code == 200 and b"pipeline_items_total" in resp.get_data()
+            with app.test_request_context("/metrics", headers={"Cookie": "admin_user=admin"}):
+                assert stage_metrics.metrics_response(request).status_code == 200
+        finally:
+            stage_metrics.METRICS_TOKEN = saved_token
+    finally:
+        _restore_paths(saved)
+
+
+def test_read_spans_timeseries_and_summary(tmp_path):
+    saved = _swap_paths(str(tmp_path))
+    try:
+        base = datetime(2025, 6, 1, 12, 0).timestamp()
+        for i in range(100):
+            stage_metrics.record_span("auto_sensor", f"D1/{i}", 0.1 + i * 0.01, "ok", started=base + i * 6)
+        for i in range(10):
+            stage_metrics.record_span("auto_inp_to_frd", f"C1/{i}", 20.0, "failed" if i == 0 else "ok",
+                                      queue_wait=60.0, started=base + i * 60)
+
+        df = stage_metrics.read_spans(since=datetime(2025, 6, 1, 12, 0))
+        assert len(df) == 110
+        assert df["time"].min() == datetime(2025, 6, 1, 12, 0)
+        assert len(stage_metrics.read_spans(since=datetime(2025, 6, 1, 12, 9))) == 10 + 1
+
+        ts = stage_metrics.stage_timeseries(df, freq="5min")
+        sensor = ts[ts["stage"] == "auto_sensor"]
+        assert sensor["items"].sum() == 100 and len(sensor) == 2
+        assert abs(sensor["throughput"].iloc[0] - 10.0) < 1e-9   # 5분에 50개
+
+        summary = stage_metrics.stage_summary(df).set_index("stage")
+        assert summary.index[0] == "auto_inp_to_frd"   # p95 가 가장 큰 단계가 먼저
+        assert summary.loc["auto_inp_to_frd", "failed"] == 1
+        assert summary.loc["auto_inp_to_frd", "queue_wait"] == 60.0
+        assert abs(summary.loc["auto_sensor", "p95"] - 1.0405) < 1e-6
+        # 파일 끝 일부만 읽어도 잘린 첫 줄은 버림
+        assert len(stage_metrics.read_spans(max_bytes=500)) >= 1
+    finally:
+        _restore_paths(saved)
+
+
+if __name__ == "__main__":
+    test_span_records_jsonl_and_prometheus(tempfile.mkdtemp())
+    test_read_spans_timeseries_and_summary(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# test_surface_lod.py
+# 외곽 표면 추출 / LOD 단순화 검증
+
+import os
+import shutil
+import tempfile
+import numpy as np
+
+import frd_io
+import surface_lod
+from auto_frd_to_vtk import frd_to_grid
+
+FRD_PATH = "2025061215.frd"
+
+
+def _box_mesh(nx, ny, nz):
+    """nx*ny*nz 육면체 격자 (VTK 노드 순서)"""
+    grid = np.stack(np.meshgrid(np.arange(nx + 1), np.arange(ny + 1), np.arange(nz + 1), indexing="ij"), -1)
+    points = grid.reshape(-1, 3).astype(float)
+    idx = np.arange(len(points)).reshape(nx + 1, ny + 1, nz + 1)
+    cells = []
+    for i in range(nx):
+        for j in range(ny):
+            for k in range(nz):
+                cells.append([idx[i, j, k], idx[i + 1, j, k], idx[i + 1, j + 1, k], idx[i, j + 1, k],
+                              idx[i, j, k + 1], idx[i + 1, j, k + 1], idx[i + 1, j + 1, k + 1], idx[i, j + 1, k + 1]])
+    cells = np.array(cells)
+    return points, cells.ravel(), np.arange(8, 8 * len(cells) + 1, 8), np.full(len(cells), 12)
+
+
+def test_extract_surface_box():
+    """격자 상자의 외곽면 삼각형 수 = 2 × 외곽 사각형 수, 내부 노드 제외"""
+    nx, ny, nz = 6, 5, 4
+    points, connectivity, offsets, types = _box_mesh(nx, ny, nz)
+    node_index, triangles = surface_lod.extract_surface(connectivity, offsets, types)
+    assert len(triangles) == 4 * (nx * ny + ny * nz + nz * nx)
+    assert len(node_index) == len(points) - (nx - 1) * (ny - 1) * (nz - 1)
+
+
+def test_decimated_levels_and_scalars():
+    """단순화 단계의 삼각형 수가 비율 이하이고 스칼라는 원본 범위 안에서 보간됨"""
+    points, connectivity, offsets, types = _box_mesh(40, 30, 10)
+    levels = surface_lod.build_levels(points, connectivity, offsets, types)
+    full = len(levels[0]["triangles"])
+    for lod in levels[1:]:
+        assert len(lod["triangles"]) <= max(surface_lod.MIN_LOD_TRIANGLES, full * lod["level"])
+        assert len(lod["triangles"]) > 0
+    values = surface_lod.level_point_data(levels[2], {"T": points[:, 0]})["T"]
+    assert values.min() >= 0.0 and values.max() <= 40.0
+    # 클러스터 평균이므로 좌표 x 와 보간된 값이 일치
+    assert np.allclose(values, levels[2]["points"][:, 0])
+
+
+def test_lod_stage_and_level_choice(tmp_path):
+    """파이프라인 단계로 생성한 .vtp 를 재생 상태에 맞게 선택"""
+    tmp_path = str(tmp_path)
+    frd_dir = os.path.join(tmp_path, "frd", "C000001")
+    lod_root = os.path.join(tmp_path, "lod")
+    os.makedirs(frd_dir, exist_ok=True)
+    shutil.copy(FRD_PATH, os.path.join(frd_dir, "2025061215.frd"))
+    summary = surface_lod.run_lod_stage(os.path.join(tmp_path, "frd"), lod_root)
+    assert summary["updated"] == {"C000001": ["2025061215"]}
+    assert surface_lod.run_lod_stage(os.path.join(tmp_path, "frd"), lod_root)["updated"] == {}
+
+    levels = surface_lod.available_levels("C000001", "2025061215", lod_root)
+    assert set(levels) == set(surface_lod.LOD_LEVELS)
+    assert surface_lod.choose_level({1.0: 100000, 0.25: 25000, 0.05: 5000}) == 0.25
+    assert surface_lod.choose_level({1.0: 100000, 0.25: 25000, 0.05: 5000}, playing=True) == 0.05
+
+    mesh = surface_lod.load_lod_mesh("C000001", "2025061215", lod_root=lod_root)
+    frd = frd_io.read_frd_arrays(FRD_PATH)
+    _, _, _, _, point_data = frd_to_grid(frd)
+    assert mesh["level"] == 1.0
+    assert mesh["point_data"]["S"].shape[1] == 6
+    assert np.nanmax(mesh["point_data"]["S_Mises"]) <= np.nanmax(point_data["S_Mises"]) * (1 + 1e-6)
+
+
+if __name__ == "__main__":
+    test_extract_surface_box()
+    test_decimated_levels_and_scalars()
+    test_lod_stage_and_level_choice(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# test_vtkhdf_series.py
+# 콘크리트별 VTKHDF 시계열 컨테이너 검증
+
+import os
+import shutil
+import tempfile
+import h5py
+import numpy as np
+
+import frd_io
+import vtkhdf_series
+from auto_frd_to_vtk import frd_to_grid
+
+FRD_PATH = "2025061215.frd"
+
+
+def _make_frd_dir(tmp_path, labels):
+    frd_dir = os.path.join(tmp_path, "frd", "C000001")
+    os.makedirs(frd_dir, exist_ok=True)
+    for label in labels:
+        shutil.copy(FRD_PATH, os.path.join(frd_dir, f"{label}.frd"))
+    return os.path.join(tmp_path, "frd")
+
+
+def test_incremental_append_shares_geometry(tmp_path):
+    """새 프레임만 추가되고 메쉬는 한 번만 저장됨"""
+    frd_root = _make_frd_dir(tmp_path, ["2025061215", "2025061216"])
+    series_root = os.path.join(tmp_path, "vtkhdf")
+    path = vtkhdf_series.series_path("C000001", series_root)
+    first = vtkhdf_series.run_series_stage(frd_root, series_root)
+    assert first["updated"] == {"C000001": ["2025061215", "2025061216"]}
+    assert vtkhdf_series.run_series_stage(frd_root, series_root)["updated"] == {}
+
+    _make_frd_dir(tmp_path, ["2025061217"])
+    assert vtkhdf_series.update_series("C000001", frd_root, series_root) == ["2025061217"]
+    assert vtkhdf_series.list_steps(path) == ["2025061215", "2025061216", "2025061217"]
+
+    frd = frd_io.read_frd_arrays(FRD_PATH)
+    points, connectivity, offsets, _, point_data = frd_to_grid(frd)
+    step = vtkhdf_series.read_step(path, "2025061216")
+    assert np.allclose(step["points"], points)
+    assert np.array_equal(step["connectivity"], connectivity)
+    assert np.array_equal(step["offsets"], offsets)
+    assert np.allclose(step["point_data"]["S"], point_data["S"], rtol=1e-6, atol=1e-6)
+
+    with h5py.File(path, "r") as f:
+        assert len(f["VTKHDF/NumberOfPoints"]) == 1
+        assert f["VTKHDF/Points"].shape == (len(points), 3)
+        assert f["VTKHDF/PointData/S"].shape == (3 * len(points), 6)
+
+
+def test_changed_geometry_adds_part(tmp_path):
+    """메쉬가 바뀐 단계는 새 geometry part 를 가리킴"""
+    path = os.path.join(tmp_path, "C000001.vtkhdf")
+    frd = frd_io.read_frd_arrays(FRD_PATH)
+    points, connectivity, offsets, cell_types, point_data = frd_to_grid(frd)
+    assert vtkhdf_series.append_step(path, "2025061215", points, connectivity, offsets,
+                                     cell_types, point_data)
+    assert not vtkhdf_series.append_step(path, "2025061215", points, connectivity, offsets,
+                                         cell_types, point_data)
+    vtkhdf_series.append_step(path, "2025061216", points + 1.0, connectivity, offsets,
+                              cell_types, point_data)
+    assert np.allclose(vtkhdf_series.read_step(path, 0)["points"], points)
+    assert np.allclose(vtkhdf_series.read_step(path, 1)["points"], points + 1.0)
+    data_only = vtkhdf_series.read_step(path, 1, names=["U"], geometry=False)
+    assert "points" not in data_only and list(data_only["point_data"]) == ["U"]
+
+
+def test_array_set_change_rejected_then_rebuilt(tmp_path):
+    """배열 구성이 다른 단계는 거부하고, update_series 는 컨테이너를 다시 만듦"""
+    frd = frd_io.read_frd_arrays(FRD_PATH)
+    points, connectivity, offsets, cell_types, point_data = frd_to_grid(frd)
+    path = os.path.join(tmp_path, "direct.vtkhdf")
+    vtkhdf_series.append_step(path, "2025061215", points, connectivity, offsets, cell_types, point_data)
+    extra = dict(point_data, T=np.zeros(len(points)))
+    missing = {k: v for k, v in point_data.items() if k != "U"}
+    for data in (extra, missing):
+        try:
+            vtkhdf_series.append_step(path, "2025061216", points, connectivity, offsets, cell_types, data)
+            assert False
+        except vtkhdf_series.ArraySetMismatch:
+            pass
+    assert vtkhdf_series.list_steps(path) == ["2025061215"]
+
+    # 컨테이너에 없는 배열을 가진 옛 컨테이너 → 새 프레임 추가 시 전체 재생성
+    frd_root = _make_frd_dir(tmp_path, ["2025061215", "2025061216"])
+    series_root = os.path.join(tmp_path, "vtkhdf")
+    series = vtkhdf_series.series_path("C000001", series_root)
+    os.makedirs(series_root)
+    vtkhdf_series.append_step(series, "2025061215", points, connectivity, offsets, cell_types, missing)
+    assert vtkhdf_series.update_series("C000001", frd_root, series_root) == ["2025061216"]
+    assert vtkhdf_series.list_steps(series) == ["2025061215", "2025061216"]
+    with h5py.File(series, "r") as f:
+        assert set(f["VTKHDF/PointData"]) == set(point_data)
+        for name in point_data:
+            assert len(f["VTKHDF/Steps/PointDataOffsets"][name]) == 2
+    assert sorted(os.listdir(series_root)) == ["C000001.vtkhdf", "C000001.vtkhdf.lock"]
+
+
+if __name__ == "__main__":
+    test_incremental_append_shares_geometry(tempfile.mkdtemp())
+    test_changed_geometry_adds_part(tempfile.mkdtemp())
+    test_array_set_change_rejected_then_rebuilt(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
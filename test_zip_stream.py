@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# test_zip_stream.py
+# 선택 파일 ZIP 스트리밍: 토큰 발급/만료/사용자 확인, 무압축 ZIP 조각 출력 검증
+
+import io
+import json
+import os
+import tempfile
+import zipfile
+
+from flask import Flask, request
+
+import zip_stream
+
+
+def test_iter_zip_streams_stored_entries(tmp_path):
+    """파일을 READ_CHUNK 단위로 읽어 조각으로 내보내고, 결과는 정상 ZIP"""
+    tmp_path = str(tmp_path)
+    big = os.path.join(tmp_path, "2025060100.frd")
+    with open(big, "wb") as f:
+        f.write(os.urandom(300_000))
+    small = os.path.join(tmp_path, "a.inp")
+    with open(small, "w") as f:
+        f.write("*NODE\n")
+
+    entries = [(big, "2025-06-01/2025060100.frd"), (small, "기타/a.inp"),
+               (os.path.join(tmp_path, "missing.inp"), "missing.inp")]
+    parts = list(zip_stream.iter_zip(entries, chunk_size=64 * 1024))
+    assert len(parts) > 5 and all(parts)
+    assert max(len(p) for p in parts) <= 64 * 1024 + 1024
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["2025-06-01/2025060100.frd", "기타/a.inp"]
+        assert all(i.compress_type == zipfile.ZIP_STORED for i in zf.infolist())
+        with open(big, "rb") as f:
+            assert zf.read("2025-06-01/2025060100.frd") == f.read()
+
+
+def test_token_route(tmp_path):
+    """발급한 사용자만 받을 수 있고, 사용자 없는 토큰은 발급/사용 불가, 만료/잘못된 토큰은 404"""
+    tmp_path = str(tmp_path)
+    token_dir = os.path.join(tmp_path, "tokens")
+    saved_ttl = zip_stream.TOKEN_TTL
+    app = Flask(__name__)
+
+    @app.route("/files/zip/<token>")
+    def download_zip(token):
+        return zip_stream.zip_response(token, request.cookies.get("login_user"), token_dir)
+
+    try:
+        path = os.path.join(tmp_path, "b.vtk")
+        with open(path, "w") as f:
+            f.write("# vtk DataFile\n")
+        assert zip_stream.issue_token([(os.path.join(tmp_path, "none.vtk"), "none.vtk")], "x.zip",
+                                      "user1", token_dir) is None
+        assert zip_stream.issue_token([(path, "b.vtk")], "x.zip", None, token_dir) is None
+        token = zip_stream.issue_token([(path, "b.vtk")], "vtk_전체파일_1개.zip", "user1", token_dir)
+        assert zip_stream.download_url(token) == f"/files/zip/{token}"
+
+        client = app.test_client()
+        assert client.get(f"/files/zip/{token}").status_code == 403   # 로그인 쿠키 없음
+        client.set_cookie("login_user", "user1")
+        resp = client.get(f"/files/zip/{token}")
+        assert resp.status_code == 200 and resp.is_streamed
+        assert "filename*=UTF-8''vtk_%EC%A0%84%EC%B2%B4" in resp.headers["Content-Disposition"]
+        with zipfile.ZipFile(io.BytesIO(resp.get_data())) as zf:
+            assert zf.read("b.vtk") == b"# vtk DataFile\n"
+
+        assert client.get("/files/zip/not-a-token").status_code == 404
+        client.set_cookie("login_user", "user2")
+        assert client.get(f"/files/zip/{token}").status_code == 403
+
+        # 사용자 정보가 없는 토큰 파일(이전 형식)은 누구도 사용할 수 없음
+        orphan = zip_stream.issue_token([(path, "b.vtk")], "b.zip", "user2", token_dir)
+        info = zip_stream.load_token(orphan, token_dir)
+        info["user"] = None
+        with open(os.path.join(token_dir, f"{orphan}.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        assert client.get(f"/files/zip/{orphan}").status_code == 403
+
+        # 만료된 토큰은 거부되고, 다음 발급 때 정리됨
+        zip_stream.TOKEN_TTL = -1
+        expired = zip_stream.issue_token([(path, "b.vtk")], "b.zip", "user2", token_dir)
+        assert client.get(f"/files/zip/{expired}").status_code == 404
+        zip_stream.TOKEN_TTL = saved_ttl
+        zip_stream.issue_token([(path, "b.vtk")], "b.zip", "user2", token_dir)
+        assert f"{expired}.json" not in os.listdir(token_dir)
+    finally:
+        zip_stream.TOKEN_TTL = saved_ttl
+
+
+if __name__ == "__main__":
+    test_iter_zip_streams_stored_entries(tempfile.mkdtemp())
+    test_token_route(tempfile.mkdtemp())
+    print("✅ 모든 테스트 통과")
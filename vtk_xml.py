@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+VTK XML 파일 writer / reader (vtk 패키지 없이 NumPy 만 사용)
+- UnstructuredGrid(.vtu) / PolyData(.vtp) 를 appended raw binary + zlib 압축 형식으로 한 번에 기록
+- ParaView / vtkXMLUnstructuredGridReader / vtkXMLPolyDataReader 에서 그대로 읽을 수 있는 형식
+"""
+
+import os
+import re
+import zlib
+
+import numpy as np
+
+# NumPy dtype → VTK 타입 이름
+_VTK_TYPES = {
+    np.dtype(np.float32): "Float32",
+    np.dtype(np.float64): "Float64",
+    np.dtype(np.int8): "Int8",
+    np.dtype(np.uint8): "UInt8",
+    np.dtype(np.int32): "Int32",
+    np.dtype(np.int64): "Int64",
+    np.dtype(np.uint64): "UInt64",
+}
+_NUMPY_TYPES = {v: k for k, v in _VTK_TYPES.items()}
+
+# 압축 블록 크기 (VTK 기본값과 동일)
+BLOCK_SIZE = 1 << 15
+
+
+def _encode_array(array, compress=True, level=6):
+    """배열을 appended 데이터 블록(UInt64 헤더 포함)으로 변환"""
+    raw = np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<"), copy=False).tobytes()
+    if not compress:
+        return np.array([len(raw)], dtype="<u8").tobytes() + raw
+
+    if not raw:
+        return np.array([0, BLOCK_SIZE, 0], dtype="<u8").tobytes()
+    blocks = [raw[i:i + BLOCK_SIZE] for i in range(0, len(raw), BLOCK_SIZE)]
+    compressed = [zlib.compress(b, level) for b in blocks]
+    last_size = len(blocks[-1]) if len(blocks[-1]) < BLOCK_SIZE else 0
+    header = [len(blocks), BLOCK_SIZE, last_size] + [len(c) for c in compressed]
+    return np.array(header, dtype="<u8").tobytes() + b"".join(compressed)
+
+
+def _data_array_tag(name, array, offset):
+    n_comp = 1 if array.ndim == 1 else array.shape[1]
+    return (f'<DataArray type="{_VTK_TYPES[array.dtype]}" Name="{name}" '
+            f'NumberOfComponents="{n_comp}" format="appended" offset="{offset}"/>')
+
+
+def _write_appended(path, data_type, piece_attrs, arrays, compress):
+    """(섹션, 이름, 배열) 목록을 appended 형식 XML 파일로 기록. Returns: 파일 크기"""
+    # appended 데이터와 offset 계산
+    encoded, tags, offset = [], {}, 0
+    for section, name, array in arrays:
+        data = _encode_array(array, compress)
+        tags.setdefault(section, []).append(_data_array_tag(name, array, offset))
+        encoded.append(data)
+        offset += len(data)
+
+    compressor = ' compressor="vtkZLibDataCompressor"' if compress else ""
+    attrs = " ".join(f'{k}="{v}"' for k, v in piece_attrs.items())
+    header = [
+        '<?xml version="1.0"?>',
+        f'<VTKFile type="{data_type}" version="1.0" byte_order="LittleEndian" '
+        f'header_type="UInt64"{compressor}>',
+        f'  <{data_type}>',
+        f'    <Piece {attrs}>',
+    ]
+    for section in ("PointData", "CellData", "Points", "Cells", "Polys"):
+        if section not in tags:
+            continue
+        header.append(f'      <{section}>')
+        header += [f'        {tag}' for tag in tags[section]]
+        header.append(f'      </{section}>')
+    header += [
+        '    </Piece>',
+        f'  </{data_type}>',
+        '  <AppendedData encoding="raw">',
+    ]
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(("\n".join(header) + "\n   _").encode("ascii"))
+        for data in encoded:
+            f.write(data)
+        f.write(b"\n  </AppendedData>\n</VTKFile>\n")
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _data_arrays(section, data, float_dtype):
+    return [(section, name, np.asarray(values, dtype=float_dtype)) for name, values in (data or {}).items()]
+
+
+def write_vtu(vtu_path, points, connectivity, offsets, cell_types, point_data=None,
+              cell_data=None, compress=True, float_dtype=np.float32):
+    """UnstructuredGrid 를 appended binary(.vtu)로 기록.
+
+    points:       (n, 3) 좌표
+    connectivity: 모든 셀의 노드 인덱스를 이어 붙인 1차원 배열
+    offsets:      셀별 connectivity 끝 위치 (VTK 규칙)
+    cell_types:   셀별 VTK 셀 타입
+    point_data / cell_data: {이름: (n,) 또는 (n, k) 배열}
+    """
+    points = np.asarray(points, dtype=float_dtype)
+    arrays = [
+        ("Points", "Points", points),
+        ("Cells", "connectivity", np.asarray(connectivity, dtype=np.int64)),
+        ("Cells", "offsets", np.asarray(offsets, dtype=np.int64)),
+        ("Cells", "types", np.asarray(cell_types, dtype=np.uint8)),
+    ]
+    arrays += _data_arrays("PointData", point_data, float_dtype)
+    arrays += _data_arrays("CellData", cell_data, float_dtype)
+    piece = {"NumberOfPoints": len(points), "NumberOfCells": len(cell_types)}
+    return _write_appended(vtu_path, "UnstructuredGrid", piece, arrays, compress)
+
+
+def write_vtp(vtp_path, points, triangles, point_data=None, compress=True, float_dtype=np.float32):
+    """삼각형 표면(PolyData)을 appended binary(.vtp)로 기록.
+
+    points:    (n, 3) 좌표
+    triangles: (m, 3) 노드 인덱스
+    """
+    points = np.asarray(points, dtype=float_dtype)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    arrays = [
+        ("Points", "Points", points),
+        ("Polys", "connectivity", triangles.ravel()),
+        ("Polys", "offsets", np.arange(3, 3 * len(triangles) + 1, 3, dtype=np.int64)),
+    ]
+    arrays += _data_arrays("PointData", point_data, float_dtype)
+    piece = {"NumberOfPoints": len(points), "NumberOfVerts": 0, "NumberOfLines": 0,
+             "NumberOfStrips": 0, "NumberOfPolys": len(triangles)}
+    return _write_appended(vtp_path, "PolyData", piece, arrays, compress)
+
+
+def _decode_array(buf, start, vtk_type, n_comp, compressed):
+    dtype = _NUMPY_TYPES[vtk_type].newbyteorder("<")
+    if compressed:
+        n_blocks = int(np.frombuffer(buf, "<u8", 1, start)[0])
+        header = np.frombuffer(buf, "<u8", 3 + n_blocks, start)
+        pos = start + 8 * (3 + n_blocks)
+        raw = []
+        for size in header[3:]:
+            raw.append(zlib.decompress(buf[pos:pos + int(size)]))
+            pos += int(size)
+        data = b"".join(raw)
+    else:
+        size = int(np.frombuffer(buf, "<u8", 1, start)[0])
+        data = buf[start + 8:start + 8 + size]
+    array = np.frombuffer(data, dtype=dtype)
+    return array.reshape(-1, n_comp) if n_comp > 1 else array
+
+
+def read_vtu(vtu_path):
+    """write_vtu / write_vtp 로 기록한 appended .vtu/.vtp 를 읽음 (검증/후처리용).
+
+    Returns
+    -------
+    dict: points, connectivity, offsets, types(.vtu 만), point_data, cell_data
+    """
+    with open(vtu_path, "rb") as f:
+        buf = f.read()
+    marker = buf.index(b'<AppendedData encoding="raw">')
+    xml = buf[:marker].decode("ascii")
+    data_start = buf.index(b"_", marker) + 1
+    compressed = "vtkZLibDataCompressor" in xml
+
+    result = {"point_data": {}, "cell_data": {}}
+    section = None
+    for line in xml.splitlines():
+        tag = line.strip()
+        for name in ("PointData", "CellData", "Points", "Cells", "Polys"):
+            if tag.startswith(f"<{name}"):
+                section = name
+        if not tag.startswith("<DataArray"):
+            continue
+        attrs = dict(re.findall(r'(\w+)="([^"]*)"', tag))
+        array = _decode_array(buf, data_start + int(attrs["offset"]), attrs["type"],
+                              int(attrs.get("NumberOfComponents", 1)), compressed)
+        if section == "PointData":
+            result["point_data"][attrs["Name"]] = array
+        elif section == "CellData":
+            result["cell_data"][attrs["Name"]] = array
+        elif section == "Points":
+            result["points"] = array
+        else:
+            result[attrs["Name"]] = array
+    return result
+
+
+def read_vtp(vtp_path):
+    """write_vtp 로 기록한 .vtp 를 읽음. Returns: dict (points, triangles, point_data)"""
+    result = read_vtu(vtp_path)
+    result["triangles"] = result.pop("connectivity").reshape(-1, 3)
+    return result
+
+
+def read_vtk_header(path, size=4096):
+    """VTK(XML/legacy) 파일의 앞부분만 읽어 반환 (전체 파일을 읽지 않는 검증용)"""
+    with open(path, "rb") as f:
+        return f.read(size).decode("ascii", errors="replace")
@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+콘크리트별 3D 해석 결과 시계열 컨테이너 (VTKHDF, UnstructuredGrid transient)
+- assets/vtkhdf/{concrete_pk}.vtkhdf 파일 하나에 모든 시간 단계를 저장
+- 메쉬(좌표/연결)는 한 번만 저장하고 시간 단계마다 point data 만 이어 붙임
+  (메쉬가 바뀐 경우에만 새 geometry part 를 추가)
+- Steps/*Offsets 로 원하는 시간 단계만 잘라 읽을 수 있음 (ParaView / vtkHDFReader 호환)
+- 파이프라인에서는 run_series_stage 로 새 FRD 프레임만 증분 추가
+- 모든 단계는 같은 point data 배열 구성을 가져야 함. 구성이 바뀐 프레임이 들어오면
+  컨테이너를 전체 다시 만듦 (갱신은 {path}.lock 파일 잠금으로 프로세스 간 직렬화)
+"""
+
+import os
+import glob
+import fcntl
+import logging
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import h5py
+import numpy as np
+
+import frd_io
+from auto_frd_to_vtk import frd_to_grid
+
+SERIES_ROOT = "assets/vtkhdf"
+VTKHDF_VERSION = (2, 2)
+COMPRESSION = "gzip"
+COMPRESSION_LEVEL = 4
+# 시간 라벨 형식 (FRD 파일명과 동일)
+LABEL_FORMAT = "%Y%m%d%H"
+
+
+# 로거 설정
+def setup_vtkhdf_series_logger():
+    """vtkhdf_series 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('vtkhdf_series_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'vtkhdf_series.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | VTKHDF_SERIES | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_vtkhdf_series_logger()
+
+
+class ArraySetMismatch(ValueError):
+    """추가하려는 단계의 point data 배열 구성이 컨테이너와 다름"""
+
+
+def series_path(concrete_pk, series_root=SERIES_ROOT):
+    return os.path.join(series_root, f"{concrete_pk}.vtkhdf")
+
+
+def label_to_time(label):
+    """'YYYYMMDDHH' → POSIX 초 (UTC 기준으로 고정하여 서버 시간대와 무관)"""
+    return datetime.strptime(label, LABEL_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+
+
+def time_to_label(value):
+    return datetime.fromtimestamp(float(value), tz=timezone.utc).strftime(LABEL_FORMAT)
+
+
+# ---------------------------------------------------------------------------
+# 기록
+# ---------------------------------------------------------------------------
+
+def _create_dataset(group, name, data):
+    """이어 붙일 수 있는(첫 축 가변) 압축 데이터셋 생성"""
+    data = np.asarray(data)
+    chunk_rows = max(1, min(len(data), 1 << 16))
+    group.create_dataset(name, data=data, maxshape=(None,) + data.shape[1:],
+                         chunks=(chunk_rows,) + data.shape[1:],
+                         compression=COMPRESSION, compression_opts=COMPRESSION_LEVEL)
+
+
+def _append(group, name, data):
+    """데이터셋 끝에 추가. Returns: 추가 전 길이 (= 새 데이터의 offset)"""
+    data = np.asarray(data)
+    if name not in group:
+        _create_dataset(group, name, data)
+        return 0
+    dset = group[name]
+    start = dset.shape[0]
+    dset.resize(start + len(data), axis=0)
+    dset[start:] = data
+    return start
+
+
+def _init_file(f):
+    root = f.create_group("VTKHDF")
+    root.attrs["Version"] = np.array(VTKHDF_VERSION, dtype=np.int64)
+    root.attrs.create("Type", np.bytes_("UnstructuredGrid"))
+    root.create_group("PointData")
+    steps = root.create_group("Steps")
+    steps.attrs["NSteps"] = 0
+    steps.create_group("PointDataOffsets")
+    return root
+
+
+def _same_geometry(root, part, points, connectivity, types):
+    """마지막 geometry part 와 메쉬가 같은지 확인"""
+    n_points = int(root["NumberOfPoints"][part])
+    n_conn = int(root["NumberOfConnectivityIds"][part])
+    if n_points != len(points) or n_conn != len(connectivity):
+        return False
+    point_start = int(root["NumberOfPoints"][:part].sum())
+    conn_start = int(root["NumberOfConnectivityIds"][:part].sum())
+    cell_start = int(root["NumberOfCells"][:part].sum())
+    return (np.allclose(root["Points"][point_start:point_start + n_points], points)
+            and np.array_equal(root["Connectivity"][conn_start:conn_start + n_conn], connectivity)
+            and np.array_equal(root["Types"][cell_start:cell_start + len(types)], types))
+
+
+def append_step(path, label, points, connectivity, offsets, cell_types, point_data):
+    """시간 단계 하나를 컨테이너 끝에 추가 (파일이 없으면 생성).
+
+    offsets 는 VTK XML 규칙(셀별 끝 위치)으로 받으며 VTKHDF 규칙(앞에 0 포함)으로 저장.
+    이미 있는 라벨이면 추가하지 않고 False 반환.
+    point data 배열 이름이 기존 단계들과 다르면 ArraySetMismatch (모든 단계의 offset 길이가 NSteps 로 같아야 함)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    connectivity = np.asarray(connectivity, dtype=np.int64)
+    cell_types = np.asarray(cell_types, dtype=np.uint8)
+    time_value = label_to_time(label)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with h5py.File(path, "a") as f:
+        root = f["VTKHDF"] if "VTKHDF" in f else _init_file(f)
+        steps = root["Steps"]
+        n_steps = int(steps.attrs["NSteps"])
+        if n_steps and np.any(steps["Values"][:] == time_value):
+            return False
+        if n_steps and set(point_data) != set(root["PointData"]):
+            raise ArraySetMismatch(f"point data 배열 구성이 다릅니다: {sorted(point_data)} "
+                                   f"(컨테이너: {sorted(root['PointData'])})")
+
+        # 메쉬가 같으면 기존 geometry part 재사용
+        part = len(root["NumberOfPoints"]) - 1 if "NumberOfPoints" in root else -1
+        if part < 0 or not _same_geometry(root, part, points, connectivity, cell_types):
+            part = _append(root, "NumberOfPoints", [len(points)])
+            _append(root, "NumberOfCells", [len(cell_types)])
+            _append(root, "NumberOfConnectivityIds", [len(connectivity)])
+            _append(root, "Points", points)
+            _append(root, "Types", cell_types)
+            _append(root, "Connectivity", connectivity)
+            _append(root, "Offsets", np.concatenate([[0], np.asarray(offsets, dtype=np.int64)]))
+            logger.info(f"geometry part {part} 추가: {path} (노드 {len(points)}개)")
+
+        _append(steps, "Values", [time_value])
+        _append(steps, "PartOffsets", [part])
+        _append(steps, "NumberOfParts", [1])
+        _append(steps, "PointOffsets", [int(root["NumberOfPoints"][:part].sum())])
+        _append(steps, "CellOffsets", [[int(root["NumberOfCells"][:part].sum())]])
+        _append(steps, "ConnectivityIdOffsets", [[int(root["NumberOfConnectivityIds"][:part].sum())]])
+
+        for name, values in point_data.items():
+            values = np.asarray(values, dtype=np.float32)
+            if name in root["PointData"] and root["PointData"][name].shape[1:] != values.shape[1:]:
+                raise ValueError(f"point data 성분 수가 다릅니다: {name}")
+            offset = _append(root["PointData"], name, values)
+            _append(steps["PointDataOffsets"], name, [offset])
+        steps.attrs["NSteps"] = n_steps + 1
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 읽기 (시간 단계별 offset 으로 필요한 구간만 읽음)
+# ---------------------------------------------------------------------------
+
+def list_steps(path):
+    """컨테이너에 저장된 시간 라벨 목록 (저장 순서)"""
+    if not os.path.exists(path):
+        return []
+    with h5py.File(path, "r") as f:
+        steps = f["VTKHDF/Steps"]
+        if int(steps.attrs["NSteps"]) == 0:
+            return []
+        return [time_to_label(v) for v in steps["Values"][:]]
+
+
+def _step_index(steps, step):
+    if isinstance(step, str):
+        matches = np.nonzero(steps["Values"][:] == label_to_time(step))[0]
+        if not len(matches):
+            raise KeyError(f"시간 단계가 없습니다: {step}")
+        return int(matches[0])
+    return int(step)
+
+
+def read_step(path, step, names=None, geometry=True):
+    """시간 단계 하나를 읽음.
+
+    step: 인덱스(int) 또는 'YYYYMMDDHH' 라벨
+    names: 읽을 point data 이름 목록 (None 이면 전체)
+    geometry=False 이면 point data 만 읽음 (메쉬는 클라이언트가 한 번만 받는 경우)
+
+    Returns
+    -------
+    dict: label, points, connectivity, offsets(VTK XML 규칙), types, point_data
+    """
+    with h5py.File(path, "r") as f:
+        root = f["VTKHDF"]
+        steps = root["Steps"]
+        index = _step_index(steps, step)
+        part = int(steps["PartOffsets"][index])
+        n_points = int(root["NumberOfPoints"][part])
+        point_start = int(steps["PointOffsets"][index])
+
+        result = {"label": time_to_label(steps["Values"][index]), "point_data": {}}
+        if geometry:
+            n_cells = int(root["NumberOfCells"][part])
+            n_conn = int(root["NumberOfConnectivityIds"][part])
+            cell_start = int(steps["CellOffsets"][index, 0])
+            conn_start = int(steps["ConnectivityIdOffsets"][index, 0])
+            # Offsets 는 part 마다 n_cells + 1 개씩 저장됨
+            offset_start = cell_start + part
+            result["points"] = root["Points"][point_start:point_start + n_points]
+            result["connectivity"] = root["Connectivity"][conn_start:conn_start + n_conn]
+            result["offsets"] = root["Offsets"][offset_start + 1:offset_start + n_cells + 1]
+            result["types"] = root["Types"][cell_start:cell_start + n_cells]
+
+        for name in names or list(root["PointData"]):
+            start = int(steps["PointDataOffsets"][name][index])
+            result["point_data"][name] = root["PointData"][name][start:start + n_points]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 파이프라인 단계
+# ---------------------------------------------------------------------------
+
+def _frd_labels(frd_dir):
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(frd_dir, "*.frd")))
+
+
+def _append_frd(path, frd_path, label):
+    frd = frd_io.read_frd_arrays(frd_path)
+    points, connectivity, offsets, cell_types, point_data = frd_to_grid(frd)
+    return append_step(path, label, points, connectivity, offsets, cell_types, point_data)
+
+
+@contextmanager
+def _series_lock(path):
+    """컨테이너 갱신 잠금 (웹/자동화 프로세스가 같은 파일을 동시에 고치지 않도록)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _rebuild(path, frd_dir, labels):
+    """모든 프레임으로 컨테이너를 임시 파일(고유 이름)에 다시 만든 뒤 교체"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                    dir=os.path.dirname(path) or ".")
+    os.close(fd)
+    os.remove(tmp_path)   # h5py 가 새로 만들도록 빈 파일은 지움 (이름만 확보)
+    try:
+        for label in labels:
+            _append_frd(tmp_path, os.path.join(frd_dir, f"{label}.frd"), label)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def update_series(concrete_pk, frd_root="frd", series_root=SERIES_ROOT):
+    """frd/{concrete_pk} 의 새 프레임만 컨테이너에 추가. Returns: 추가된 라벨 목록
+
+    이미 저장된 마지막 시간보다 이전 프레임이 새로 생긴 경우(재해석 등)나
+    새 프레임의 point data 배열 구성이 다른 경우에는 컨테이너를 다시 만듦.
+    """
+    frd_dir = os.path.join(frd_root, str(concrete_pk))
+    path = series_path(concrete_pk, series_root)
+    with _series_lock(path):
+        labels = [l for l in _frd_labels(frd_dir) if len(l) == 10 and l.isdigit()]
+        existing = list_steps(path)
+        new_labels = [l for l in labels if l not in set(existing)]
+        if not new_labels:
+            return []
+
+        if existing and min(new_labels) < max(existing):
+            logger.info(f"이전 시간 프레임 추가로 컨테이너 재생성: {path}")
+            _rebuild(path, frd_dir, labels)
+            return new_labels
+
+        try:
+            for label in new_labels:
+                _append_frd(path, os.path.join(frd_dir, f"{label}.frd"), label)
+        except ArraySetMismatch as e:
+            logger.info(f"배열 구성 변경으로 컨테이너 재생성: {path} - {e}")
+            _rebuild(path, frd_dir, labels)
+    logger.info(f"{concrete_pk}: {len(new_labels)}개 시간 단계 추가 ({new_labels[0]}~{new_labels[-1]})")
+    return new_labels
+
+
+def run_series_stage(frd_root="frd", series_root=SERIES_ROOT, concrete_pks=None):
+    """파이프라인 단계: 콘크리트별 컨테이너 증분 갱신
+
+    Returns
+    -------
+    dict: stage, updated({concrete_pk: [추가된 라벨]}), failed([concrete_pk])
+    """
+    summary = {"stage": "series", "updated": {}, "failed": []}
+    if not os.path.isdir(frd_root):
+        return summary
+    if concrete_pks is None:
+        concrete_pks = sorted(d for d in os.listdir(frd_root) if os.path.isdir(os.path.join(frd_root, d)))
+    for concrete_pk in concrete_pks:
+        try:
+            added = update_series(concrete_pk, frd_root, series_root)
+            if added:
+                summary["updated"][concrete_pk] = added
+                print(f"✅ {concrete_pk}: {len(added)}개 시간 단계 추가")
+        except Exception as e:
+            summary["failed"].append(concrete_pk)
+            logger.error(f"시계열 컨테이너 갱신 실패: {concrete_pk} - {e}")
+            print(f"❌ {concrete_pk} 시계열 컨테이너 갱신 실패: {e}")
+    return summary
+
+
+if __name__ == "__main__":
+    print("🚀 콘크리트별 VTKHDF 시계열 컨테이너 갱신 시작...")
+    result = run_series_stage()
+    print(f"🎉 완료: 갱신 {len(result['updated'])}개, 실패 {len(result['failed'])}개")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+선택 파일 ZIP 스트리밍 다운로드
+- Dash 콜백은 압축할 파일 목록을 토큰으로 등록(issue_token)하고 다운로드 URL 만 돌려줌
+  (ZIP 을 BytesIO 로 만들어 base64 로 콜백 JSON 에 싣던 방식을 대체)
+- Flask 라우트(/files/zip/<token>)는 파일을 하나씩 READ_CHUNK 단위로 읽어 ZIP 조각을 바로 응답으로 보냄
+  → 메모리 사용이 파일 크기와 무관 (수 GB FRD 도 가능)
+- INP/FRD/VTK 는 이미 압축 효율이 낮거나 크므로 무압축(ZIP_STORED), 4GB 를 넘는 파일은 ZIP64
+- 토큰은 TOKEN_DIR 아래 JSON 파일로 저장해 여러 워커 프로세스에서 공유하고, TOKEN_TTL 이 지나면 만료.
+  토큰은 항상 발급한 사용자(login_user 쿠키)에 묶이며 그 사용자만 사용할 수 있음 (사용자 없는 토큰은 발급/사용 불가)
+
+사용 예:
+    token = issue_token([("frd/C001/2025060100.frd", "2025-06-01/2025060100.frd")], "frd_files.zip", user_id)
+    url = download_url(token)   # → /files/zip/<token>
+"""
+
+import os
+import re
+import json
+import time
+import secrets
+import zipfile
+import logging
+from urllib.parse import quote
+
+from flask import Response
+
+TOKEN_DIR = os.path.join("data", "zip_tokens")
+# 토큰 유효 시간 (초)
+TOKEN_TTL = 600
+# 파일을 읽어 응답으로 보내는 단위 (bytes)
+READ_CHUNK = 1024 * 1024
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+# 로거 설정
+def setup_zip_stream_logger():
+    """zip_stream 전용 로거 설정"""
+    log_dir = "log"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    logger = logging.getLogger('zip_stream_logger')
+    logger.setLevel(logging.INFO)
+
+    # 기존 핸들러 제거 (중복 방지)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'zip_stream.log'), encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정 (로그인 로그와 동일한 형식)
+    formatter = logging.Formatter('%(asctime)s | %(levelname)s | ZIP_STREAM | %(message)s')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    return logger
+
+logger = setup_zip_stream_logger()
+
+
+def _purge_expired(token_dir, now):
+    """만료된 토큰 파일 삭제"""
+    for name in os.listdir(token_dir):
+        if not name.endswith(".json"):   # 쓰는 중인 .tmp 는 건드리지 않음
+            continue
+        path = os.path.join(token_dir, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                expired = json.load(f)["expires"] < now
+        except (OSError, ValueError, KeyError):
+            expired = True
+        if expired:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def issue_token(entries, filename, user_id, token_dir=None):
+    """압축할 파일 목록을 등록하고 토큰을 반환 (사용자가 없거나 존재하는 파일이 없으면 None).
+
+    entries: [(파일 경로, ZIP 안의 경로), ...]
+    """
+    if not user_id:
+        logger.warning(f"사용자 없이 토큰 발급 시도 거부: {filename}")
+        return None
+    token_dir = token_dir or TOKEN_DIR
+    files = [(os.path.abspath(path), arcname) for path, arcname in entries if os.path.isfile(path)]
+    if not files:
+        return None
+    os.makedirs(token_dir, exist_ok=True)
+    now = time.time()
+    _purge_expired(token_dir, now)
+
+    token = secrets.token_urlsafe(24)
+    path = os.path.join(token_dir, f"{token}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"files": files, "filename": filename, "user": user_id, "expires": now + TOKEN_TTL},
+                  f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    logger.info(f"토큰 발급: user={user_id} 파일 {len(files)}개 → {filename}")
+    return token
+
+
+def load_token(token, token_dir=None):
+    """토큰 정보(files, filename, user, expires) 또는 None (형식 오류/없음/만료)"""
+    if not token or not _TOKEN_RE.match(token):
+        return None
+    try:
+        with open(os.path.join(token_dir or TOKEN_DIR, f"{token}.json"), encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if info.get("expires", 0) < time.time():
+        return None
+    return info
+
+
+def download_url(token):
+    """토큰의 다운로드 경로"""
+    return f"/files/zip/{token}"
+
+
+class _Sink:
+    """ZipFile 이 쓰는 바이트를 모아 두었다가 꺼내 주는 쓰기 전용 스트림 (seek/tell 없음 → 데이터 디스크립터 사용)"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _iter_zip_parts(entries, chunk_size):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        for path, arcname in entries:
+            if not os.path.isfile(path):
+                logger.warning(f"파일 없음, 건너뜀: {path}")
+                continue
+            zinfo = zipfile.ZipInfo.from_file(path, arcname)
+            zinfo.compress_type = zipfile.ZIP_STORED
+            with open(path, "rb") as src, zf.open(zinfo, "w") as dest:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()   # 데이터 디스크립터
+    yield sink.drain()           # 중앙 디렉터리
+
+
+def iter_zip(entries, chunk_size=READ_CHUNK):
+    """[(파일 경로, ZIP 안의 경로), ...] → 무압축 ZIP 바이트 조각 제너레이터 (빈 조각은 보내지 않음)"""
+    for data in _iter_zip_parts(entries, chunk_size):
+        if data:
+            yield data
+
+
+def _content_disposition(filename):
+    """한글 파일명은 filename* (RFC 5987), 구형 브라우저용 ASCII 이름도 함께"""
+    fallback = filename.encode("ascii", "ignore").decode() or "download.zip"
+    return f'attachment; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename)}'
+
+
+def zip_response(token, user_id, token_dir=None):
+    """토큰의 파일들을 ZIP 으로 스트리밍하는 flask Response (없거나 만료 404, 사용자 불일치/없음 403)"""
+    info = load_token(token, token_dir)
+    if info is None:
+        return Response("다운로드 링크가 없거나 만료되었습니다", status=404)
+    if not info.get("user") or info["user"] != user_id:
+        logger.warning(f"다른 사용자의 토큰 사용 시도: user={user_id} token_user={info.get('user')}")
+        return Response("다운로드 권한이 없습니다", status=403)
+    logger.info(f"ZIP 전송 시작: user={user_id} 파일 {len(info['files'])}개 → {info['filename']}")
+    return Response(iter_zip(info["files"]), mimetype="application/zip", headers={
+        "Content-Disposition": _content_disposition(info["filename"]),
+        "Cache-Control": "no-store",
+    })